@@ -0,0 +1,129 @@
+"""So sánh lịch trả nợ tính theo cột (NumPy) với vòng lặp từng tháng trước đây.
+
+Kiểm tra phương thức gốc đều khớp tuyệt đối (từng giá trị float) với vòng lặp cũ,
+kiểm tra tính nhất quán của trả đều/ân hạn/balloon, rồi đo thời gian.
+
+Chạy: python benchmarks/bench_amortization.py
+"""
+import os
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from thamdinh.amortization import ANNUITY, EQUAL_PRINCIPAL, build_schedule, schedule_to_dataframe  # noqa: E402
+from thamdinh.finance import calculate_financial_metrics  # noqa: E402
+
+
+def legacy_metrics(financial_info):
+    """Bản cũ: vòng lặp từng tháng, mỗi tháng một dict rồi dựng DataFrame"""
+    metrics = {}
+    loan_amount = financial_info.get('loan_amount', 0)
+    interest_rate = financial_info.get('interest_rate', 0) / 100 / 12
+    loan_term = financial_info.get('loan_term', 0)
+    monthly_income = financial_info.get('monthly_income', 0)
+    monthly_expense = financial_info.get('monthly_expense', 0)
+    if loan_amount > 0 and loan_term > 0:
+        monthly_principal = loan_amount / loan_term
+        repayment_schedule = []
+        remaining_balance = loan_amount
+        for month in range(1, loan_term + 1):
+            interest_payment = remaining_balance * interest_rate
+            principal_payment = monthly_principal
+            total_payment = principal_payment + interest_payment
+            remaining_balance -= principal_payment
+            repayment_schedule.append({
+                'Tháng': month,
+                'Dư nợ đầu kỳ': remaining_balance + principal_payment,
+                'Trả gốc': principal_payment,
+                'Trả lãi': interest_payment,
+                'Tổng trả': total_payment,
+                'Dư nợ cuối kỳ': max(0, remaining_balance)
+            })
+        metrics['repayment_schedule'] = pd.DataFrame(repayment_schedule)
+        metrics['monthly_principal'] = monthly_principal
+        metrics['first_month_interest'] = loan_amount * interest_rate
+        metrics['first_month_payment'] = monthly_principal + metrics['first_month_interest']
+        metrics['total_interest'] = sum([row['Trả lãi'] for row in repayment_schedule])
+        metrics['total_payment'] = loan_amount + metrics['total_interest']
+        metrics['net_income'] = monthly_income - monthly_expense
+        metrics['debt_service_ratio'] = (metrics['first_month_payment'] / monthly_income * 100) if monthly_income > 0 else 0
+        metrics['surplus'] = metrics['net_income'] - metrics['first_month_payment']
+        metrics['dscr'] = (metrics['net_income'] / metrics['first_month_payment']) if metrics['first_month_payment'] > 0 else 0
+    return metrics
+
+
+def check_equal_principal_matches_legacy():
+    rng = np.random.default_rng(0)
+    cases = [(500_000_000, 8.5, 60), (1_000_000_000, 0, 360), (123_456_789, 11.25, 7), (1, 99.9, 1)]
+    cases += [(float(rng.integers(1, 10 ** 10)), float(rng.uniform(0, 20)), int(rng.integers(1, 481)))
+              for _ in range(300)]
+    for loan_amount, rate, term in cases:
+        info = {'loan_amount': loan_amount, 'interest_rate': rate, 'loan_term': term,
+                'monthly_income': 40_000_000, 'monthly_expense': 15_000_000}
+        legacy = legacy_metrics(info)
+        metrics = calculate_financial_metrics(info)
+        # So khớp tuyệt đối từng giá trị; kiểu cột có thể khác khi vòng lặp cũ trả về số 0 kiểu int
+        pd.testing.assert_frame_equal(schedule_to_dataframe(metrics['schedule']), legacy['repayment_schedule'],
+                                      check_dtype=False, check_exact=True)
+        for key in ('monthly_principal', 'first_month_interest', 'first_month_payment', 'total_interest',
+                    'total_payment', 'net_income', 'debt_service_ratio', 'surplus', 'dscr'):
+            assert metrics[key] == legacy[key], (key, loan_amount, rate, term)
+    print(f"Gốc đều: {len(cases)} trường hợp khớp tuyệt đối với vòng lặp cũ.")
+
+
+def check_other_methods():
+    for method in (EQUAL_PRINCIPAL, ANNUITY):
+        for rate in (0, 8.5):
+            for grace, balloon in ((0, 0), (6, 0), (0, 200_000_000), (12, 100_000_000)):
+                s = build_schedule(500_000_000, rate, 120, method, grace, balloon)
+                assert np.allclose(s['principal'].sum(), 500_000_000)
+                assert np.allclose(s['payment'], s['principal'] + s['interest'])
+                assert np.allclose(s['opening_balance'][1:], s['closing_balance'][:-1])
+                assert abs(s['closing_balance'][-1]) < 1e-3
+                assert (s['principal'][:grace] == 0).all()
+                if method == ANNUITY:
+                    # Các kỳ trả đều (trừ kỳ cuối có balloon) có tổng trả bằng nhau
+                    level = s['payment'][grace:-1]
+                    assert np.allclose(level, level[0])
+    print("Trả đều, ân hạn gốc, balloon: các ràng buộc số dư đều thỏa.")
+
+
+def legacy_loop_only(loan_amount, rate, term):
+    monthly_rate = rate / 100 / 12
+    monthly_principal = loan_amount / term
+    rows = []
+    remaining_balance = loan_amount
+    for month in range(1, term + 1):
+        interest_payment = remaining_balance * monthly_rate
+        remaining_balance -= monthly_principal
+        rows.append({'Tháng': month, 'Dư nợ đầu kỳ': remaining_balance + monthly_principal,
+                     'Trả gốc': monthly_principal, 'Trả lãi': interest_payment,
+                     'Tổng trả': monthly_principal + interest_payment,
+                     'Dư nợ cuối kỳ': max(0, remaining_balance)})
+    return rows
+
+
+def main():
+    check_equal_principal_matches_legacy()
+    check_other_methods()
+
+    number = 2000
+    print("\nLịch 360 tháng (µs/lần):")
+    for label, func in [
+        ("vòng lặp cũ (list dict)", lambda: legacy_loop_only(1e9, 8.5, 360)),
+        ("vòng lặp cũ + DataFrame", lambda: pd.DataFrame(legacy_loop_only(1e9, 8.5, 360))),
+        ("NumPy gốc đều", lambda: build_schedule(1e9, 8.5, 360)),
+        ("NumPy trả đều", lambda: build_schedule(1e9, 8.5, 360, ANNUITY)),
+        ("NumPy trả đều + ân hạn + balloon", lambda: build_schedule(1e9, 8.5, 360, ANNUITY, 12, 2e8)),
+        ("NumPy + DataFrame hiển thị", lambda: schedule_to_dataframe(build_schedule(1e9, 8.5, 360))),
+    ]:
+        seconds = min(timeit.repeat(func, number=number, repeat=5)) / number
+        print(f"  {label:<36}{seconds * 1e6:10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""Đo kho hồ sơ ``CaseStore`` với nhiều hồ sơ giả lập: thời gian lưu, dung lượng, tra cứu theo CCCD, số điện
+thoại, tên, khoảng ngày và mở lại một hồ sơ, so với duyệt toàn bộ bảng (không dùng chỉ mục).
+Kèm kích thước lịch trả nợ khi lưu nén theo cột so với pickle DataFrame.
+
+Chạy: python benchmarks/bench_case_store.py [số hồ sơ]   (mặc định 100.000)
+"""
+import datetime
+import os
+import pickle
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from thamdinh.amortization import schedule_to_dataframe  # noqa: E402
+from thamdinh.case_store import CaseStore, pack_schedule, unpack_schedule  # noqa: E402
+from thamdinh.finance import calculate_financial_metrics  # noqa: E402
+from thamdinh.formatting import format_number  # noqa: E402
+from thamdinh.text import fold_vietnamese  # noqa: E402
+
+FAMILY = ['Nguyễn', 'Trần', 'Lê', 'Phạm', 'Hoàng', 'Phan', 'Võ', 'Đặng', 'Bùi', 'Đỗ', 'Hồ', 'Ngô']
+MIDDLE = ['Văn', 'Thị', 'Đức', 'Minh', 'Hữu', 'Quang', 'Thanh', 'Ngọc']
+GIVEN = ['An', 'Bình', 'Cường', 'Dũng', 'Đức', 'Hà', 'Hải', 'Hạnh', 'Hùng', 'Lan', 'Linh', 'Long', 'Mai', 'Nam',
+         'Phúc', 'Quân', 'Sơn', 'Tâm', 'Thảo', 'Thủy', 'Trung', 'Tuấn', 'Vân', 'Yến']
+BATCH = 5000
+REPEAT = 200
+
+
+def sample_cases(count, seed=0):
+    """Hồ sơ giả lập có lịch trả nợ (dùng chung vài lịch để sinh nhanh), trả về (danh sách hồ sơ, CCCD, điện thoại)"""
+    rng = np.random.default_rng(seed)
+    financial_info = [{'loan_amount': 5e8 * (index + 1), 'interest_rate': 9.0, 'loan_term': 12 * (index + 1),
+                       'repayment_method': 'annuity', 'monthly_income': 4e7, 'monthly_expense': 1.2e7}
+                      for index in range(10)]
+    metrics = [calculate_financial_metrics(info) for info in financial_info]
+    cccd = [f"0420{value:08d}" for value in rng.integers(0, 10 ** 8, count)]
+    phone = [f"09{value:08d}" for value in rng.integers(0, 10 ** 8, count)]
+    names = [f"{FAMILY[a]} {MIDDLE[b]} {GIVEN[c]}" for a, b, c in zip(
+        rng.integers(0, len(FAMILY), count), rng.integers(0, len(MIDDLE), count), rng.integers(0, len(GIVEN), count))]
+    cases = [{'customer_info': {'name': names[index], 'cccd': cccd[index], 'phone': phone[index]},
+              'financial_info': financial_info[index % 10],
+              'metrics': metrics[index % 10], 'source_file': f"pasdv_{index}.docx"} for index in range(count)]
+    return cases, cccd, phone
+
+
+def _time(run):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        result = run()
+    return (time.perf_counter() - start) / REPEAT * 1000, result
+
+
+def full_scan(path, predicate):
+    """Cách không có chỉ mục: đọc mọi dòng rồi lọc trong Python"""
+    conn = sqlite3.connect(path)
+    try:
+        return [row for row in conn.execute('SELECT id, name, cccd, phone, created_at FROM cases') if predicate(row)]
+    finally:
+        conn.close()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    metrics = calculate_financial_metrics({'loan_amount': 1.5e9, 'interest_rate': 8.5, 'loan_term': 360,
+                                           'repayment_method': 'annuity', 'monthly_income': 4e7,
+                                           'monthly_expense': 1.2e7})
+    blob = pack_schedule(metrics['schedule'])
+    restored = unpack_schedule(blob)
+    assert all(np.array_equal(restored[key], value) for key, value in metrics['schedule'].items())
+    print(f"Lịch 360 tháng: pickle DataFrame {len(pickle.dumps(schedule_to_dataframe(metrics['schedule'])))} byte, "
+          f"nén theo cột {len(blob)} byte (khôi phục chính xác)")
+
+    cases, cccd, phone = sample_cases(count)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'cases.sqlite3')
+        store = CaseStore(path)
+        start = time.perf_counter()
+        for offset in range(0, count, BATCH):
+            store.save_many(cases[offset:offset + BATCH])
+        seconds = time.perf_counter() - start
+        stats = store.stats()
+        print(f"Lưu {format_number(count)} hồ sơ: {seconds:.1f}s, "
+              f"{stats['bytes'] / 1024 / 1024:.0f}MB ({stats['bytes'] / count / 1024:.1f}KB/hồ sơ)")
+
+        today = datetime.date.today()
+        target = count // 2
+        name = cases[target]['customer_info']['name']
+        folded = fold_vietnamese(name)
+        queries = [
+            (f"CCCD {cccd[target]}", lambda: store.search(cccd[target]),
+             lambda row: row[2] == cccd[target]),
+            (f"SĐT đầu {phone[target][:6]}", lambda: store.search(phone[target][:6]),
+             lambda row: row[3].startswith(phone[target][:6]) or row[2].startswith(phone[target][:6])),
+            (f"tên \"{folded}\"", lambda: store.search(folded),
+             lambda row: all(word in fold_vietnamese(row[1]).split() for word in folded.split())),
+            ("hôm nay", lambda: store.search('', today, today), lambda row: True),
+        ]
+        print(f"\n{'':<34}{'chỉ mục':>10}{'duyệt bảng':>12}{'kết quả':>9}")
+        for label, indexed, predicate in queries:
+            indexed_ms, rows = _time(indexed)
+            start = time.perf_counter()
+            full_scan(path, predicate)
+            scan_ms = (time.perf_counter() - start) * 1000
+            print(f"  {label:<32}{indexed_ms:8.2f}ms{scan_ms:10.0f}ms{len(rows):9}")
+        load_ms, case = _time(lambda: store.load(target + 1))
+        assert case['customer_info']['name'] == name
+        print(f"  {'mở lại một hồ sơ':<32}{load_ms:8.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""So sánh biểu đồ tab 5 kiểu cũ (dựng lại mỗi lần chạy, SVG có điểm đánh dấu) với bản có bộ nhớ đệm,
+rút gọn điểm trên máy chủ và WebGL; đo thêm biểu đồ danh mục khoản vay.
+
+Mỗi lần chạy lại, ``st.plotly_chart`` còn kiểm tra lại hình và chuyển sang JSON; phần này được đo
+riêng ("gửi") bằng đúng hai bước đó. Thời gian vẽ trong trình duyệt không đo ở đây: tỉ lệ theo số điểm
+gửi đi, và WebGL nhanh hơn SVG nhiều khi có hàng chục nghìn điểm.
+
+Chạy: python benchmarks/bench_charts.py [số khoản vay]   (mặc định 1.000)
+"""
+import os
+import statistics
+import sys
+import time
+
+import plotly.graph_objects as go
+import plotly.io
+import plotly.tools
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_portfolio import sample_loans  # noqa: E402
+from thamdinh import charts  # noqa: E402
+from thamdinh.cache import LRUCache  # noqa: E402
+from thamdinh.finance import calculate_financial_metrics, metrics_cache_key  # noqa: E402
+from thamdinh.portfolio import loans_cache_key, portfolio_cash_flow, stack_schedules  # noqa: E402
+
+REPEAT = 5
+FINANCIAL_INFO = {'loan_amount': 2e9, 'interest_rate': 8.5, 'loan_term': 360, 'repayment_method': 'annuity',
+                  'monthly_income': 6e7, 'monthly_expense': 2e7}
+
+
+def legacy_schedule_figures(schedule):
+    """Như tab 5 trước đây: dư nợ bằng go.Scatter có điểm đánh dấu, gốc/lãi bằng cột chồng"""
+    balance = go.Figure(go.Scatter(x=schedule['month'], y=schedule['closing_balance'], mode='lines+markers',
+                                   name='Dư nợ', line=dict(color='#1f77b4', width=2), marker=dict(size=6)))
+    balance.update_layout(xaxis_title="Tháng", yaxis_title="Dư nợ (đồng)", hovermode='x unified')
+    bars = go.Figure([go.Bar(x=schedule['month'], y=schedule['principal'], name='Trả gốc'),
+                      go.Bar(x=schedule['month'], y=schedule['interest'], name='Trả lãi')])
+    bars.update_layout(barmode='stack', xaxis_title="Tháng", yaxis_title="Số tiền (đồng)", hovermode='x unified')
+    return [balance, bars]
+
+
+def legacy_portfolio_figure(stacked):
+    """Cách làm thẳng: mỗi khoản vay một đường SVG với đủ mọi tháng"""
+    figure = go.Figure()
+    bounds = [0] + [index for index in range(1, len(stacked['loan']))
+                    if stacked['loan'][index] != stacked['loan'][index - 1]] + [len(stacked['loan'])]
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        figure.add_trace(go.Scatter(x=stacked['month'][start:end], y=stacked['closing_balance'][start:end],
+                                    mode='lines', showlegend=False))
+    return [figure]
+
+
+def _send(figures):
+    """Phần ``st.plotly_chart`` làm mỗi lần chạy lại: kiểm tra hình rồi chuyển sang JSON; trả về số byte"""
+    size = 0
+    for figure in figures:
+        figure = plotly.tools.return_figure_from_figure_or_data(figure, validate_figure=True)
+        size += len(plotly.io.to_json(figure, validate=False))
+    return size
+
+
+def _points(figures):
+    return sum(len(trace.x) for figure in figures for trace in figure.data if trace.x is not None)
+
+
+def _time(function):
+    samples = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = function()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), result
+
+
+def _row(label, build, cached):
+    build_seconds, figures = _time(build)
+    cached_seconds, _ = _time(cached)
+    send_seconds, size = _time(lambda: _send(figures))
+    print(f"  {label:<32}{build_seconds * 1000:10.1f}ms{cached_seconds * 1000:10.2f}ms{send_seconds * 1000:9.1f}ms"
+          f"{_points(figures):>10}{size / 1024:9.0f}KB  {', '.join(sorted({t.type for f in figures for t in f.data}))}")
+
+
+def _header(title):
+    print(f"\n{title:<34}{'dựng':>12}{'chạy lại':>12}{'gửi':>11}{'điểm':>10}{'JSON':>11}  loại")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    cache = LRUCache(maxsize=32)
+
+    for term in (60, 360, 480):
+        info = dict(FINANCIAL_INFO, loan_term=term)
+        metrics = calculate_financial_metrics(info)
+        schedule = metrics['schedule']
+        key = metrics_cache_key(info)
+
+        def build_new():
+            return [charts.balance_figure(schedule), charts.principal_interest_figure(schedule)]
+
+        _header(f"Lịch {term} tháng (2 biểu đồ)")
+        _row('cũ: dựng lại mỗi lần, SVG', lambda: legacy_schedule_figures(schedule),
+             lambda: legacy_schedule_figures(schedule))
+        _row('mới: bộ nhớ đệm, tự chọn WebGL', build_new, lambda: cache.get_or_compute(('schedule', key), build_new))
+
+    loans = sample_loans(count)
+    start = time.perf_counter()
+    stacked = stack_schedules(loans)
+    flow = portfolio_cash_flow(stacked)
+    print(f"\nDanh mục {count} khoản vay: {len(stacked['month'])} điểm (khoản vay × tháng), "
+          f"ghép lịch và cộng theo tháng {(time.perf_counter() - start) * 1000:.0f}ms")
+
+    def build_portfolio():
+        stacked = stack_schedules(loans)
+        flow = portfolio_cash_flow(stacked)
+        return [charts.portfolio_cash_flow_figure(flow), charts.portfolio_balance_figure(stacked, flow)]
+
+    _header("Biểu đồ danh mục")
+    _row('cũ: mỗi khoản vay một đường SVG', lambda: legacy_portfolio_figure(stacked),
+         lambda: legacy_portfolio_figure(stacked))
+    _row('mới: rút gọn + WebGL + đệm', build_portfolio,
+         lambda: cache.get_or_compute(('portfolio', loans_cache_key(loans)), build_portfolio))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""So sánh đọc văn bản docx bằng python-docx và bằng bộ đọc luồng (thời gian, bộ nhớ đỉnh).
+
+Mỗi phép đo chạy trong một tiến trình riêng để bộ nhớ đỉnh (RSS) không bị ảnh hưởng
+bởi lần đo trước; RSS tính cả bộ nhớ của lxml mà tracemalloc không thấy được.
+
+Chạy: python benchmarks/bench_docx_reader.py
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# (số đoạn diễn giải, số hàng bảng)
+SIZES = [(200, 50), (5000, 1000), (30000, 5000)]
+
+
+def _measure(method, path):
+    """Chạy trong tiến trình con: đọc file và in kết quả dạng JSON"""
+    from docx import Document
+
+    from benchmarks.memory import reset_peak_rss, rss_kb
+    from thamdinh.docx_reader import read_docx_text
+    from thamdinh.extraction import extract_info_from_text
+
+    reset_peak_rss()
+    baseline = rss_kb('VmRSS')
+    start = time.perf_counter()
+    if method == 'python-docx':
+        text = '\n'.join(para.text for para in Document(path).paragraphs)
+    else:
+        text = read_docx_text(path)
+    seconds = time.perf_counter() - start
+    info = extract_info_from_text(text)
+    print(json.dumps({
+        'seconds': seconds,
+        'peak_mb': (rss_kb('VmHWM') - baseline) / 1024,
+        'chars': len(text),
+        'fields': sum(len(section) for section in info),
+    }))
+
+
+def main():
+    from benchmarks.samples import sample_docx
+
+    print(f"{'Tài liệu':<34}{'Cách đọc':<14}{'Thời gian':>12}{'RSS tăng':>12}{'Ký tự':>12}{'Số trường':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for filler, table_rows in SIZES:
+            path = os.path.join(tmp, f"pasdv_{filler}.docx")
+            with open(path, 'wb') as f:
+                f.write(sample_docx(filler, table_rows=table_rows))
+            label = f"{filler} đoạn + {table_rows} hàng ({os.path.getsize(path) / 1024:,.0f} KB)"
+            results = {}
+            for method in ('python-docx', 'stream'):
+                output = subprocess.run([sys.executable, __file__, '--measure', method, path],
+                                        check=True, capture_output=True, text=True).stdout
+                results[method] = json.loads(output)
+                result = results[method]
+                print(f"{label:<34}{method:<14}{result['seconds'] * 1000:10.1f}ms{result['peak_mb']:10.1f}MB"
+                      f"{result['chars']:12,}{result['fields']:11}")
+                label = ''
+            speedup = results['python-docx']['seconds'] / results['stream']['seconds']
+            print(f"{'':<34}{'tăng tốc':<14}{speedup:11.1f}x")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 4 and sys.argv[1] == '--measure':
+        _measure(sys.argv[2], sys.argv[3])
+    else:
+        main()
@@ -0,0 +1,104 @@
+"""Đo tra cứu trùng khách hàng/TSĐB (``find_duplicates``) khi kho có nhiều hồ sơ, so với so khớp lần lượt mọi hồ
+sơ (đọc toàn bộ thông tin nhận dạng rồi ``match_reasons`` từng cặp). Chỉ mục LSH có thể bỏ sót vài địa chỉ tương
+đồng sát ngưỡng nên số hồ sơ trùng tìm được được so với kết quả duyệt hết.
+
+Mỗi hồ sơ có 11 khóa tra cứu, 200.000 hồ sơ cho 2,2 triệu khóa. Các truy vấn: trùng CCCD, trùng số
+điện thoại, họ tên + nơi cư trú gõ không dấu và viết tắt, địa chỉ TSĐB viết khác, khách hàng mới.
+
+Chạy: python benchmarks/bench_duplicates.py [số hồ sơ]   (mặc định 200.000)
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_case_store import FAMILY, GIVEN, MIDDLE  # noqa: E402
+from thamdinh.case_store import CaseStore  # noqa: E402
+from thamdinh.duplicates import case_identity, find_duplicates, match_reasons  # noqa: E402
+from thamdinh.formatting import format_number  # noqa: E402
+
+COMMUNES = ['Thạch Hà', 'Thạch Long', 'Thạch Sơn', 'Cẩm Xuyên', 'Cẩm Bình', 'Kỳ Anh', 'Kỳ Tân', 'Đức Thọ',
+            'Đức Lạng', 'Hương Khê', 'Hương Sơn', 'Nghi Xuân', 'Can Lộc', 'Lộc Hà', 'Vũ Quang', 'Hồng Lĩnh']
+BATCH = 10_000
+REPEAT = 200
+
+
+def sample_case(rng):
+    commune = COMMUNES[rng.integers(len(COMMUNES))]
+    village = rng.integers(1, 40)
+    return {
+        'customer_info': {'name': f"{FAMILY[rng.integers(len(FAMILY))]} {MIDDLE[rng.integers(len(MIDDLE))]} "
+                                  f"{GIVEN[rng.integers(len(GIVEN))]}",
+                          'cccd': f"0420{rng.integers(10 ** 8):08d}", 'phone': f"09{rng.integers(10 ** 8):08d}",
+                          'address': f"Thôn {village}, xã {commune}, tỉnh Hà Tĩnh"},
+        'financial_info': {'loan_amount': float(rng.integers(1, 50) * 10 ** 8)},
+        'collateral_info': {'address': f"Thửa số {rng.integers(1, 2000)}, tờ bản đồ số {rng.integers(1, 60)}, "
+                                       f"thôn {village}, xã {commune}"},
+    }
+
+
+def full_scan(path, customer_info, collateral_info):
+    """So khớp với mọi hồ sơ đã lưu, trả về tập mã hồ sơ trùng"""
+    identity = case_identity(customer_info, collateral_info)
+    conn = sqlite3.connect(path)
+    try:
+        rows = conn.execute('SELECT cases.id, cccd, phone, case_identity.name, address, collateral FROM cases '
+                            'JOIN case_identity ON case_identity.id = cases.id').fetchall()
+    finally:
+        conn.close()
+    fields = ('cccd', 'phone', 'name', 'address', 'collateral')
+    return {row[0] for row in rows if match_reasons(identity, dict(zip(fields, row[1:])))}
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    rng = np.random.default_rng(0)
+    cases = [sample_case(rng) for _ in range(count)]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'cases.sqlite3')
+        store = CaseStore(path)
+        start = time.perf_counter()
+        for offset in range(0, count, BATCH):
+            store.save_many(cases[offset:offset + BATCH])
+        conn = sqlite3.connect(path)
+        keys = conn.execute('SELECT COUNT(*) FROM case_keys').fetchone()[0]
+        conn.close()
+        print(f"Lưu {format_number(count)} hồ sơ ({format_number(keys)} khóa): {time.perf_counter() - start:.1f}s, "
+              f"{os.path.getsize(path) / 1024 / 1024:.0f}MB")
+
+        target = cases[count // 2]
+        customer, collateral = target['customer_info'], target['collateral_info']
+        queries = [
+            ("trùng CCCD", {'cccd': customer['cccd']}, {}),
+            ("trùng SĐT", {'phone': '+84' + customer['phone'][1:]}, {}),
+            ("họ tên + địa chỉ không dấu, viết tắt",
+             {'name': customer['name'].upper(),
+              'address': f"thon {customer['address'].split(',')[0].split()[-1]}, x. "
+                         f"{customer['address'].split('xã ')[1].split(',')[0]}, t. Ha Tinh"}, {}),
+            ("địa chỉ TSĐB viết khác", {}, {'address': collateral['address'].replace('Thửa số', 'Thua').replace(
+                'tờ bản đồ số', 'to ban do')}),
+            ("khách hàng mới", {'name': 'Khổng Minh Tú', 'cccd': '001999999999', 'phone': '0888888888',
+                                'address': 'Phường Bắc Hà, TP Hà Tĩnh'}, {'address': 'Số 5 đường Phan Đình Phùng'}),
+        ]
+        find_duplicates(store, customer, {}, collateral)
+        print(f"\n{'':<40}{'chỉ mục':>10}{'duyệt hết':>11}{'trùng (chỉ mục/duyệt hết)':>28}")
+        for label, customer_info, collateral_info in queries:
+            start = time.perf_counter()
+            for _ in range(REPEAT):
+                report = find_duplicates(store, customer_info, {}, collateral_info)
+            indexed_ms = (time.perf_counter() - start) / REPEAT * 1000
+            start = time.perf_counter()
+            scanned = full_scan(path, customer_info, collateral_info)
+            scan_ms = (time.perf_counter() - start) * 1000
+            found = {match['id'] for match in report['matches']}
+            assert found <= scanned, label
+            print(f"  {label:<38}{indexed_ms:8.2f}ms{scan_ms:9.0f}ms{len(found):>6}/{len(scanned)}")
+
+
+if __name__ == '__main__':
+    main()
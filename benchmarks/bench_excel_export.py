@@ -0,0 +1,114 @@
+"""So sánh xuất Excel kiểu cũ (chuỗi đã định dạng, pandas + openpyxl) với xlsxwriter ghi luồng, ô số thực.
+
+Mỗi phép đo chạy trong một tiến trình riêng; RSS tăng tính từ sau khi đã dựng dữ liệu đầu vào.
+Cách cũ cho danh mục được mô phỏng bằng cách ghép lịch trả nợ của mọi khoản vay vào một DataFrame
+rồi định dạng chuỗi như ``export_to_excel`` trước đây (chỉ riêng sheet lịch trả nợ).
+
+Chạy: python benchmarks/bench_excel_export.py [--full]   (--full thêm danh mục 10.000 khoản vay kèm lịch chi tiết)
+"""
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+MONEY_LABELS = ['Dư nợ đầu kỳ', 'Trả gốc', 'Trả lãi', 'Tổng trả', 'Dư nợ cuối kỳ']
+
+# (tên, số khoản vay, cách xuất, kèm lịch chi tiết)
+CASES = [
+    ('1 hồ sơ, 360 tháng', 1, 'legacy', True),
+    ('1 hồ sơ, 360 tháng', 1, 'xlsxwriter', True),
+    ('1.000 khoản vay', 1000, 'legacy', True),
+    ('1.000 khoản vay', 1000, 'xlsxwriter', True),
+    ('10.000 khoản vay', 10000, 'xlsxwriter', False),
+]
+FULL_CASES = [
+    ('10.000 khoản vay', 10000, 'xlsxwriter', True),
+]
+
+
+def _legacy_export(schedules):
+    """Cách cũ: DataFrame, mọi ô tiền thành chuỗi "1.234.567", ghi bằng openpyxl"""
+    import pandas as pd
+
+    from thamdinh.formatting import format_number
+
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+        df = pd.concat(schedules, ignore_index=True)
+        for col in MONEY_LABELS:
+            df[col] = df[col].apply(lambda x: format_number(x))
+        df.to_excel(writer, sheet_name='Kế hoạch trả nợ', index=False)
+    return output.getvalue()
+
+
+def _measure(count, method, detail):
+    """Chạy trong tiến trình con: xuất và in kết quả dạng JSON"""
+    from benchmarks.bench_portfolio import sample_loans
+    from benchmarks.memory import reset_peak_rss, rss_kb
+    from thamdinh.amortization import ANNUITY, schedule_to_dataframe
+    from thamdinh.excel_export import write_case_workbook, write_portfolio_workbook
+    from thamdinh.finance import calculate_financial_metrics
+
+    if count == 1:
+        financial_info = {'loan_amount': 2e9, 'interest_rate': 8.5, 'loan_term': 360, 'repayment_method': ANNUITY,
+                          'monthly_income': 6e7, 'monthly_expense': 2e7}
+        metrics = calculate_financial_metrics(financial_info)
+    else:
+        loans = sample_loans(count)
+        if method == 'legacy':
+            records = loans.to_dict('records')
+    reset_peak_rss()
+    baseline = rss_kb('VmRSS')
+    start = time.perf_counter()
+    if method == 'legacy':
+        if count == 1:
+            data = _legacy_export([schedule_to_dataframe(metrics['schedule'])])
+        else:
+            schedules = []
+            for index, financial_info in enumerate(records):
+                df = schedule_to_dataframe(calculate_financial_metrics(financial_info)['schedule'])
+                df.insert(0, 'Khoản vay', str(index))
+                schedules.append(df)
+            data = _legacy_export(schedules)
+        rows = None
+    else:
+        output = io.BytesIO()
+        if count == 1:
+            write_case_workbook(output, financial_info, metrics)
+            rows = len(metrics['schedule']['month'])
+        else:
+            rows = write_portfolio_workbook(output, loans, detail=detail)
+        data = output.getvalue()
+    seconds = time.perf_counter() - start
+    print(json.dumps({
+        'seconds': seconds,
+        'peak_mb': (rss_kb('VmHWM') - baseline) / 1024,
+        'size_kb': len(data) / 1024,
+        'rows': rows,
+    }))
+
+
+def main():
+    cases = CASES + (FULL_CASES if '--full' in sys.argv else [])
+    print(f"{'Dữ liệu':<22}{'Cách xuất':<12}{'Lịch chi tiết':>14}{'Thời gian':>12}{'RSS tăng':>11}{'File':>11}")
+    for label, count, method, detail in cases:
+        output = subprocess.run([sys.executable, __file__, '--measure', str(count), method, str(int(detail))],
+                                check=True, capture_output=True, text=True).stdout
+        result = json.loads(output)
+        rows = 'có' if detail else 'không'
+        if result['rows'] is not None and detail:
+            rows = f"{result['rows']:,} hàng"
+        print(f"{label:<22}{method:<12}{rows:>14}{result['seconds']:11.2f}s{result['peak_mb']:9.1f}MB"
+              f"{result['size_kb']:9,.0f}KB")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 5 and sys.argv[1] == '--measure':
+        _measure(int(sys.argv[2]), sys.argv[3], sys.argv[4] == '1')
+    else:
+        main()
@@ -0,0 +1,45 @@
+"""So sánh bộ trích xuất theo bảng mẫu với cách gọi re.search tuần tự trước đây.
+
+Chạy: python benchmarks/bench_extraction.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.samples import sample_text  # noqa: E402
+from tests.legacy_extraction import VARIANTS, legacy_extract_info_from_text  # noqa: E402
+from thamdinh.extraction import extract_info_from_text  # noqa: E402
+
+
+def _bench(func, text, number):
+    return min(timeit.repeat(lambda: func(text), number=number, repeat=5)) / number
+
+
+def main():
+    for filler in (0, 200, 5000):
+        for _, variant in VARIANTS:
+            text = variant(sample_text(filler))
+            assert extract_info_from_text(text) == legacy_extract_info_from_text(text)
+    assert extract_info_from_text("") == legacy_extract_info_from_text("")
+    print("Kết quả trùng khớp với bản cũ trên mọi biến thể.\n")
+
+    for filler, number in ((0, 2000), (200, 500), (5000, 20), (50000, 3)):
+        base = sample_text(filler)
+        print(f"Văn bản {len(base) / 1024:,.0f} KB ({filler} đoạn diễn giải):")
+        print(f"  {'biến thể':<20}{'tuần tự':>12}{'bảng mẫu':>12}{'tăng tốc':>10}")
+        for name, variant in VARIANTS:
+            text = variant(base)
+            legacy = _bench(legacy_extract_info_from_text, text, number)
+            engine = _bench(extract_info_from_text, text, number)
+            print(f"  {name:<20}{legacy * 1e6:10.1f}µs{engine * 1e6:10.1f}µs{legacy / engine:9.2f}x")
+
+    texts = [sample_text(50, index) for index in range(500)]
+    legacy = min(timeit.repeat(lambda: [legacy_extract_info_from_text(t) for t in texts], number=1, repeat=3))
+    engine = min(timeit.repeat(lambda: [extract_info_from_text(t) for t in texts], number=1, repeat=3))
+    print(f"\nLô 500 hồ sơ: tuần tự {legacy * 1000:.1f} ms, bảng mẫu {engine * 1000:.1f} ms ({legacy / engine:.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
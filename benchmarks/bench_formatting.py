@@ -0,0 +1,86 @@
+"""So sánh định dạng/đọc số kiểu Việt Nam từng giá trị (``Series.apply``) với bản theo cột.
+
+Kiểm tra ``format_numbers``/``parse_numbers`` cho cùng kết quả với ``format_number``/``parse_number``
+trên cột ngẫu nhiên (trừ giá trị không hợp lệ, được xử lý riêng), rồi đo thời gian trên cột 1.000.000 giá trị.
+Phần hiển thị so bảng chuỗi đã định dạng (cách cũ) với bảng số giữ nguyên kèm column config của Streamlit:
+thời gian dựng bảng và dung lượng Arrow gửi xuống trình duyệt.
+
+Chạy: python benchmarks/bench_formatting.py [số giá trị]   (mặc định 1.000.000)
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from thamdinh.formatting import format_number, format_numbers, parse_number, parse_numbers  # noqa: E402
+
+REPEAT = 3
+MONEY_LABELS = ['Dư nợ đầu kỳ', 'Trả gốc', 'Trả lãi', 'Tổng trả', 'Dư nợ cuối kỳ']
+
+
+def check_matches_scalar():
+    rng = np.random.default_rng(1)
+    values = np.concatenate([rng.lognormal(17, 4, 50_000) * rng.choice([-1, 1], 50_000),
+                             rng.integers(-10 ** 6, 10 ** 6, 10_000), [0.0, -0.0, 0.5, -0.5, 1.5, 999.5, 1e18, 1e25]])
+    formatted = format_numbers(values)
+    assert formatted.tolist() == [format_number(value) for value in values]
+    assert np.array_equal(parse_numbers(formatted.astype(object)), [parse_number(text) for text in formatted])
+    texts = ['1.234.567', '12,5', ' 3 ', '-1.000', '1e5', ',5', '1,2,3', '', None, 'abc', '123456789012345678']
+    parsed = parse_numbers(texts)
+    assert np.isnan(parsed[[6, 7, 8, 9]]).all()
+    expected = [parse_number(text) for index, text in enumerate(texts) if index not in (6, 7, 8, 9)]
+    assert parsed[[0, 1, 2, 3, 4, 5, 10]].tolist() == expected
+    assert format_numbers([np.nan, np.inf, None, 'abc', 1000]).tolist() == ['', '', '', '', '1.000']
+    print(f"{len(values)} số và {len(texts)} chuỗi mẫu: bản theo cột khớp bản từng giá trị.")
+
+
+def _time(function, repeat=1):
+    """Thời gian nhanh nhất trong ``repeat`` lần chạy và kết quả lần cuối"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    check_matches_scalar()
+
+    rng = np.random.default_rng(0)
+    values = pd.Series(rng.lognormal(17, 3, count) * rng.choice([-1, 1], count, p=[0.1, 0.9]))
+    texts = pd.Series(format_numbers(values.to_numpy()).astype(object))
+    print(f"\nCột {count:,} giá trị{'apply':>14}{'theo cột':>12}{'nhanh hơn':>12}".replace(',', '.'))
+    for label, scalar, vectorized in [
+        ('Định dạng số', lambda: values.apply(format_number), lambda: format_numbers(values)),
+        ('Đọc chuỗi', lambda: texts.apply(parse_number), lambda: parse_numbers(texts)),
+    ]:
+        old, _ = _time(scalar, REPEAT)
+        new, _ = _time(vectorized, REPEAT)
+        print(f"  {label:<20}{old:12.2f}s{new:11.2f}s{old / new:11.1f}x")
+
+    # Bảng lịch trả nợ ``count`` dòng: cách cũ sao chép bảng rồi thay 5 cột tiền bằng chuỗi
+    table = pd.DataFrame({'Tháng': np.arange(1, count + 1)} |
+                         {label: rng.uniform(0, 2e9, count) for label in MONEY_LABELS})
+
+    def string_copy():
+        display = table.copy()
+        for label in MONEY_LABELS:
+            display[label] = display[label].apply(format_number)
+        return display
+
+    print(f"\nHiển thị bảng {count:,} dòng{'dựng bảng':>15}{'Arrow':>10}".replace(',', '.'))
+    for label, build in [('chuỗi (apply, cũ)', string_copy), ('số + column config', lambda: table)]:
+        seconds, display = _time(build)
+        size = pa.Table.from_pandas(display, preserve_index=False).nbytes
+        print(f"  {label:<22}{seconds:14.2f}s{size / 2 ** 20:8.0f}MB")
+
+
+if __name__ == '__main__':
+    main()
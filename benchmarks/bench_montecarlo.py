@@ -0,0 +1,91 @@
+"""So sánh mô phỏng Monte Carlo khả năng trả nợ viết vòng lặp từng đường/từng tháng với ``simulate_repayment``.
+
+Cách cũ chỉ đo một mẫu đường rồi nhân lên. Bản theo mảng được đo ba kiểu: sinh cả lưới đường × tháng một lần
+(không chia khối), chia khối trên một tiến trình, và chia khối trên mọi lõi; kèm bộ nhớ RSS đỉnh của tiến trình
+chính (mỗi tiến trình con chỉ giữ một khối, như bản một tiến trình).
+Kết quả chia khối giống hệt nhau dù chạy bao nhiêu tiến trình.
+
+Chạy: python benchmarks/bench_montecarlo.py [số đường]   (mặc định 100.000, lịch 360 tháng)
+"""
+import math
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.memory import reset_peak_rss, rss_kb  # noqa: E402
+from thamdinh.finance import calculate_financial_metrics  # noqa: E402
+from thamdinh.montecarlo import SIMULATION_DEFAULTS, simulate_repayment  # noqa: E402
+
+SAMPLE = 500
+FINANCIAL_INFO = {'loan_amount': 1.5e9, 'interest_rate': 8.5, 'loan_term': 360, 'repayment_method': 'annuity',
+                  'monthly_income': 2.5e7, 'monthly_expense': 7e6}
+
+
+def legacy_simulation(payments, income, expense, paths, params=SIMULATION_DEFAULTS, seed=0):
+    """Cách làm thẳng: mỗi đường một vòng lặp qua từng tháng"""
+    rng = random.Random(seed)
+    sigma_income = params['income_volatility'] / 100 / math.sqrt(12)
+    sigma_expense = params['expense_volatility'] / 100 / math.sqrt(12)
+    drift_income = math.log1p(params['income_growth'] / 100) / 12 - sigma_income ** 2 / 2
+    drift_expense = math.log1p(params['expense_growth'] / 100) / 12 - sigma_expense ** 2 / 2
+    shock = params['shock_probability'] / 100 / 12
+    short_paths = 0
+    for _ in range(paths):
+        log_income = log_expense = 0.0
+        shock_left = 0
+        for month, payment in enumerate(payments):
+            if month:
+                log_income += drift_income + sigma_income * rng.gauss(0, 1)
+                log_expense += drift_expense + sigma_expense * rng.gauss(0, 1)
+            if rng.random() < shock:
+                shock_left = params['shock_duration']
+            factor = 1 - params['shock_severity'] / 100 if shock_left > 0 else 1
+            shock_left -= 1
+            if income * math.exp(log_income) * factor - expense * math.exp(log_expense) < payment:
+                short_paths += 1
+                break
+    return short_paths / paths * 100
+
+
+def _measure(label, run):
+    reset_peak_rss()
+    baseline = rss_kb('VmRSS')
+    start = time.perf_counter()
+    result = run()
+    seconds = time.perf_counter() - start
+    print(f"  {label:<34}{seconds:9.2f}s{(rss_kb('VmHWM') - baseline) / 1024:9.0f}MB"
+          f"{result['shortfall_probability']:10.2f}%")
+    return result
+
+
+def main():
+    paths = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    payments = calculate_financial_metrics(FINANCIAL_INFO)['schedule']['payment']
+    income, expense = FINANCIAL_INFO['monthly_income'], FINANCIAL_INFO['monthly_expense']
+    simulate_repayment(payments, income, expense, 1000, seed=0)
+
+    print(f"{format(paths, ',').replace(',', '.')} đường × {len(payments)} tháng, {os.cpu_count()} lõi"
+          f"\n{'':<36}{'thời gian':>9}{'RSS đỉnh':>11}{'thiếu hụt':>11}")
+    start = time.perf_counter()
+    probability = legacy_simulation(payments, income, expense, SAMPLE)
+    print(f"  {'cũ: vòng lặp (ước tính)':<34}{(time.perf_counter() - start) / SAMPLE * paths:9.2f}s{'':>11}"
+          f"{probability:10.2f}%")
+    _measure('mảng, không chia khối', lambda: simulate_repayment(payments, income, expense, paths, seed=0,
+                                                                  max_workers=1, chunk_paths=paths))
+    single = _measure('mảng, chia khối, 1 tiến trình',
+                      lambda: simulate_repayment(payments, income, expense, paths, seed=0, max_workers=1))
+    parallel = _measure(f'mảng, chia khối, {os.cpu_count()} tiến trình',
+                        lambda: simulate_repayment(payments, income, expense, paths, seed=0))
+    for key, value in single.items():
+        if key not in ('seconds', 'workers'):
+            assert np.array_equal(value, parallel[key]), key
+    print("Kết quả chia khối giống hệt nhau giữa 1 và nhiều tiến trình.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""So sánh tính chỉ tiêu danh mục theo cột với việc gọi calculate_financial_metrics cho từng khoản vay.
+
+Chạy: python benchmarks/bench_portfolio.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from thamdinh.amortization import ANNUITY, EQUAL_PRINCIPAL  # noqa: E402
+from thamdinh.finance import calculate_financial_metrics  # noqa: E402
+from thamdinh.portfolio import METRIC_COLUMNS, compute_portfolio_metrics  # noqa: E402
+
+
+def sample_loans(count, seed=0):
+    rng = np.random.default_rng(seed)
+    loan_term = rng.integers(1, 361, count)
+    loan_amount = rng.integers(10, 10_000, count) * 1_000_000.0
+    return pd.DataFrame({
+        'loan_amount': loan_amount,
+        'interest_rate': np.round(rng.uniform(0, 18, count), 2) * (rng.random(count) > 0.05),
+        'loan_term': loan_term,
+        'monthly_income': rng.integers(0, 200, count) * 1_000_000.0,
+        'monthly_expense': rng.integers(0, 80, count) * 1_000_000.0,
+        'repayment_method': rng.choice([EQUAL_PRINCIPAL, ANNUITY], count),
+        'grace_months': np.where(rng.random(count) < 0.3, rng.integers(0, 25, count), 0),
+        'balloon_amount': np.where(rng.random(count) < 0.2, loan_amount * rng.uniform(0, 1, count), 0.0),
+    })
+
+
+def loop_metrics(loans):
+    return [calculate_financial_metrics(row) for row in loans.to_dict('records')]
+
+
+def check_matches_per_loan():
+    loans = sample_loans(3000, seed=1)
+    # Thêm các trường hợp biên: không hợp lệ, một tháng, ân hạn đến kỳ cuối, balloon toàn bộ
+    edge = pd.DataFrame([
+        {'loan_amount': 0, 'interest_rate': 8.5, 'loan_term': 60, 'monthly_income': 1e7, 'monthly_expense': 0},
+        {'loan_amount': 1e8, 'interest_rate': 8.5, 'loan_term': 0, 'monthly_income': 1e7, 'monthly_expense': 0},
+        {'loan_amount': 1e8, 'interest_rate': 8.5, 'loan_term': 1, 'monthly_income': 0, 'monthly_expense': 0,
+         'repayment_method': ANNUITY, 'balloon_amount': 5e7},
+        {'loan_amount': 1e8, 'interest_rate': 12, 'loan_term': 24, 'monthly_income': 1e7, 'monthly_expense': 2e6,
+         'repayment_method': EQUAL_PRINCIPAL, 'grace_months': 40, 'balloon_amount': 3e7},
+        {'loan_amount': 1e8, 'interest_rate': 12, 'loan_term': 24, 'monthly_income': 1e7, 'monthly_expense': 2e6,
+         'repayment_method': ANNUITY, 'grace_months': 23, 'balloon_amount': 2e8},
+    ])
+    loans = pd.concat([loans, edge], ignore_index=True)
+    loans['repayment_method'] = loans['repayment_method'].fillna(EQUAL_PRINCIPAL)
+    loans[['grace_months', 'balloon_amount']] = loans[['grace_months', 'balloon_amount']].fillna(0)
+
+    vectorized = compute_portfolio_metrics(loans)
+    for index, metrics in zip(loans.index, loop_metrics(loans)):
+        row = vectorized.loc[index]
+        if not metrics:
+            assert row[METRIC_COLUMNS].isna().all(), index
+            continue
+        # Công thức đóng và cộng dồn từng tháng lệch nhau ở mức làm tròn dấu phẩy động (dưới 1 đồng)
+        tolerance = 1e-9 * loans.at[index, 'loan_amount']
+        for key in METRIC_COLUMNS:
+            assert np.isclose(row[key], metrics[key], rtol=1e-9, atol=tolerance), (index, key, row[key], metrics[key])
+    print(f"{len(loans)} khoản vay: kết quả theo cột khớp với tính từng khoản (sai số < 1e-9 số tiền vay).")
+
+
+def main():
+    check_matches_per_loan()
+
+    print(f"\n{'Số khoản vay':>14}{'từng khoản':>14}{'theo cột':>12}{'tăng tốc':>10}")
+    for count in (1_000, 10_000, 100_000):
+        loans = sample_loans(count)
+        start = time.perf_counter()
+        compute_portfolio_metrics(loans)
+        vectorized = time.perf_counter() - start
+        # Vòng lặp quá chậm với danh mục lớn: đo trên 5.000 khoản rồi nhân tỷ lệ
+        sample = loans.head(min(count, 5_000))
+        start = time.perf_counter()
+        loop_metrics(sample)
+        loop = (time.perf_counter() - start) * count / len(sample)
+        note = '' if len(sample) == count else ' (ước tính)'
+        print(f"{count:>14,}{loop:13.2f}s{vectorized * 1000:10.1f}ms{loop / vectorized:9.0f}x{note}")
+
+
+if __name__ == '__main__':
+    main()
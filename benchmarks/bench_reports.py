@@ -0,0 +1,144 @@
+"""So sánh các cách dựng báo cáo thẩm định (Word bằng python-docx, Word từ file mẫu, PDF bằng fpdf)
+và đo thông lượng tạo báo cáo hàng loạt vào một file zip.
+
+- Thời gian từng báo cáo: trung vị nhiều lần dựng cho khoản vay 360 tháng (sau một lần chạy làm nóng).
+  Cách cũ được mô phỏng bằng các lệnh add_heading/add_paragraph như ``export_appraisal_report`` trước đây;
+  "kèm bảng" thêm bảng lịch trả nợ bằng ``doc.add_table`` (cách làm thẳng với python-docx).
+  "fpdf gốc" là PDF khi bỏ phần ghi font nhanh của ``ReportPDF._putfonts``.
+- Thông lượng: ``generate_report_zip`` cho N hồ sơ ngẫu nhiên, một tiến trình và mọi nhân CPU.
+
+Chạy: python benchmarks/bench_reports.py [số hồ sơ]   (mặc định 100)
+"""
+import io
+import os
+import statistics
+import sys
+import time
+
+from fpdf import FPDF
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+REPEAT = 5
+
+CUSTOMER_INFO = {'name': 'Nguyễn Văn An', 'cccd': '042080001234', 'address': 'Thạch Hà, Hà Tĩnh',
+                 'phone': '0912345678', 'email': 'an@example.com'}
+FINANCIAL_INFO = {'purpose': 'Mua nhà ở', 'total_need': 2.5e9, 'equity': 5e8, 'loan_amount': 2e9,
+                  'interest_rate': 8.5, 'loan_term': 360, 'repayment_method': 'annuity',
+                  'monthly_income': 6e7, 'monthly_expense': 2e7}
+COLLATERAL_INFO = {'type': 'Quyền sử dụng đất', 'value': 3.2e9, 'address': 'Thạch Hà, Hà Tĩnh', 'area': 120}
+
+# (định dạng, kèm biểu đồ) cho phần đo hàng loạt
+BATCH_CASES = [('docx', False), ('docx', True), ('pdf', False)]
+
+
+def _legacy_report(metrics, table):
+    """Cách cũ: mỗi dòng một lệnh add_paragraph; ``table`` thêm bảng lịch trả nợ bằng add_table"""
+    from docx import Document
+
+    from thamdinh.amortization import SCHEDULE_COLUMNS
+    from thamdinh.formatting import format_number
+    from thamdinh.word_report import CONTEXT_FIELDS, report_context
+
+    context = report_context(CUSTOMER_INFO, FINANCIAL_INFO, COLLATERAL_INFO, metrics)
+    doc = Document()
+    doc.add_heading('BÁO CÁO THẨM ĐỊNH PHƯƠNG ÁN VAY VỐN', 0).alignment = 1
+    group = None
+    for name, _, key, _ in CONTEXT_FIELDS:
+        if name != group:
+            group = name
+            doc.add_heading(name, 1)
+        doc.add_paragraph(f"{key}: {context[f'{name}.{key}']}")
+    if table:
+        schedule = metrics['schedule']
+        grid = doc.add_table(rows=1, cols=len(SCHEDULE_COLUMNS))
+        for cell, label in zip(grid.rows[0].cells, SCHEDULE_COLUMNS.values()):
+            cell.text = label
+        for index in range(len(schedule['month'])):
+            cells = grid.add_row().cells
+            for cell, key in zip(cells, SCHEDULE_COLUMNS):
+                cell.text = str(schedule[key][index]) if key == 'month' else format_number(schedule[key][index])
+    output = io.BytesIO()
+    doc.save(output)
+    return output.getvalue()
+
+
+def _plain_fpdf_report(metrics):
+    """PDF như ``render_pdf_report`` nhưng ghi font bằng ``FPDF._putfonts`` gốc"""
+    from thamdinh.pdf_report import ReportPDF, render_pdf_report
+
+    patched = ReportPDF._putfonts
+    ReportPDF._putfonts = FPDF._putfonts
+    try:
+        return render_pdf_report(CUSTOMER_INFO, FINANCIAL_INFO, COLLATERAL_INFO, metrics)
+    finally:
+        ReportPDF._putfonts = patched
+
+
+def _time(function):
+    function()
+    samples = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        data = function()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), len(data)
+
+
+def bench_single():
+    from thamdinh.finance import calculate_financial_metrics
+    from thamdinh.pdf_report import render_pdf_report
+    from thamdinh.word_report import load_template, render_report
+
+    metrics = calculate_financial_metrics(FINANCIAL_INFO)
+    start = time.perf_counter()
+    template = load_template()
+    print(f"Biên dịch mẫu Word mặc định: {(time.perf_counter() - start) * 1000:.0f}ms (một lần mỗi tiến trình)")
+    cases = [
+        ('Word: python-docx (cũ, không bảng)', lambda: _legacy_report(metrics, False)),
+        ('Word: python-docx + bảng 360 hàng', lambda: _legacy_report(metrics, True)),
+        ('Word: mẫu + bảng, không biểu đồ', lambda: render_report(template, CUSTOMER_INFO, FINANCIAL_INFO,
+                                                                  COLLATERAL_INFO, metrics, charts=False)),
+        ('Word: mẫu + bảng + 2 biểu đồ', lambda: render_report(template, CUSTOMER_INFO, FINANCIAL_INFO,
+                                                               COLLATERAL_INFO, metrics)),
+        ('PDF: fpdf gốc + bảng', lambda: _plain_fpdf_report(metrics)),
+        ('PDF: fpdf + bảng', lambda: render_pdf_report(CUSTOMER_INFO, FINANCIAL_INFO, COLLATERAL_INFO, metrics)),
+    ]
+    print(f"{'Một báo cáo (360 tháng)':<38}{'Thời gian':>12}{'File':>10}")
+    for label, function in cases:
+        seconds, size = _time(function)
+        print(f"{label:<38}{seconds * 1000:10.1f}ms{size / 1024:8.0f}KB")
+
+
+def bench_batch(count):
+    from benchmarks.bench_portfolio import sample_loans
+    from thamdinh.reports import generate_report_zip
+
+    cases = [{'file': f"ho_so_{index}.docx", 'customer_info': CUSTOMER_INFO, 'financial_info': financial_info,
+              'collateral_info': COLLATERAL_INFO}
+             for index, financial_info in enumerate(sample_loans(count).to_dict('records'))]
+    cpus = os.cpu_count() or 1
+    print(f"\n{'Hàng loạt':<14}{'Định dạng':<10}{'Biểu đồ':<9}{'Tiến trình':>11}{'Thời gian':>11}"
+          f"{'Báo cáo/giây':>14}{'TB/báo cáo':>12}{'File zip':>11}")
+    for report_format, charts in BATCH_CASES:
+        for workers in sorted({1, cpus}):
+            output = io.BytesIO()
+            start = time.perf_counter()
+            results = list(generate_report_zip(cases, output, report_format, max_workers=workers, charts=charts))
+            seconds = time.perf_counter() - start
+            errors = sum(1 for result in results if result['error'])
+            average = statistics.mean(result['seconds'] for result in results)
+            print(f"{f'{count} hồ sơ':<14}{report_format:<10}{'có' if charts else 'không':<9}{workers:>11}"
+                  f"{seconds:10.1f}s{count / seconds:14.1f}{average * 1000:10.0f}ms"
+                  f"{len(output.getvalue()) / 2 ** 20:9.1f}MB" + (f"  ({errors} lỗi)" if errors else ''))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    bench_single()
+    bench_batch(count)
+
+
+if __name__ == '__main__':
+    main()
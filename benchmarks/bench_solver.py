@@ -0,0 +1,90 @@
+"""So sánh tìm giới hạn khoản vay bằng cách thử dần với ``calculate_financial_metrics`` và bằng ``solve_limits``.
+
+Kiểm tra trên các hồ sơ ngẫu nhiên (hai phương thức, ân hạn, gốc cuối kỳ) rằng số tiền vay tối đa, thời hạn
+tối thiểu và lãi suất tối đa đạt DSCR/DTI còn giá trị vượt qua một chút thì không đạt. Sau đó đo thời gian
+cho một hồ sơ (cách cũ: tăng số tiền vay từng bước 10 triệu, tăng thời hạn từng tháng, tăng lãi suất từng
+0,01%) và cho cả danh mục.
+
+Chạy: python benchmarks/bench_solver.py [số khoản vay]   (mặc định 100.000)
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_portfolio import sample_loans  # noqa: E402
+from thamdinh.finance import DSCR_MIN, DTI_MAX, calculate_financial_metrics  # noqa: E402
+from thamdinh.formatting import format_number  # noqa: E402
+from thamdinh.solver import MAX_TERM, solve_case, solve_portfolio  # noqa: E402
+
+CHECKS = 400
+FINANCIAL_INFO = {'loan_amount': 9e8, 'interest_rate': 9.0, 'loan_term': 120, 'repayment_method': 'annuity',
+                  'monthly_income': 4e7, 'monthly_expense': 1.2e7}
+
+
+def _passes(financial_info):
+    metrics = calculate_financial_metrics(financial_info)
+    return metrics['dscr'] >= DSCR_MIN * (1 - 1e-9) and metrics['debt_service_ratio'] <= DTI_MAX * (1 + 1e-9)
+
+
+def check_limits():
+    rng = np.random.default_rng(0)
+    for index in range(CHECKS):
+        info = {'loan_amount': rng.uniform(1e8, 3e9), 'interest_rate': rng.choice([0.0, rng.uniform(3, 15)]),
+                'loan_term': int(rng.integers(1, 300)), 'monthly_income': rng.uniform(1e7, 1e8),
+                'monthly_expense': rng.uniform(0, 5e7), 'repayment_method': ('equal_principal', 'annuity')[index % 2],
+                'grace_months': int(rng.choice([0, rng.integers(0, 12)])),
+                'balloon_amount': rng.choice([0.0, rng.uniform(0, 1e8)])}
+        limits = solve_case(info)
+        if limits['max_loan'] > info['balloon_amount']:
+            assert _passes(dict(info, loan_amount=limits['max_loan'])), info
+            assert not _passes(dict(info, loan_amount=limits['max_loan'] * 1.0001 + 1)), info
+        if not np.isnan(limits['min_term']):
+            assert _passes(dict(info, loan_term=int(limits['min_term']))), info
+            if limits['min_term'] - 1 > info['grace_months']:
+                assert not _passes(dict(info, loan_term=int(limits['min_term']) - 1)), info
+        if not np.isnan(limits['max_rate']):
+            assert _passes(dict(info, interest_rate=limits['max_rate'])), info
+            assert not _passes(dict(info, interest_rate=limits['max_rate'] + 1e-6)), info
+        assert limits['passed'] == _passes(info), info
+    print(f"{CHECKS} hồ sơ ngẫu nhiên: các giới hạn đúng tại biên DSCR/DTI.")
+
+
+def trial_and_error(financial_info):
+    """Cách cũ: thử lần lượt đến khi không còn đạt"""
+    loan = 0.0
+    while _passes(dict(financial_info, loan_amount=loan + 1e7)):
+        loan += 1e7
+    term = next((term for term in range(1, MAX_TERM + 1) if _passes(dict(financial_info, loan_term=term))), None)
+    rate = 0.0
+    while _passes(dict(financial_info, interest_rate=rate + 0.01)):
+        rate += 0.01
+    return loan, term, rate
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    check_limits()
+
+    start = time.perf_counter()
+    old = trial_and_error(FINANCIAL_INFO)
+    old_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    limits = solve_case(FINANCIAL_INFO)
+    new_seconds = time.perf_counter() - start
+    print(f"\nMột hồ sơ: thử dần {old_seconds * 1000:.0f}ms (vay {format_number(old[0])}, {old[1]} tháng, "
+          f"{old[2]:.2f}%), công thức {new_seconds * 1000:.2f}ms (vay {format_number(limits['max_loan'])}, "
+          f"{limits['min_term']:.0f} tháng, {limits['max_rate']:.4f}%)")
+
+    loans = sample_loans(count)
+    start = time.perf_counter()
+    solve_portfolio(loans)
+    print(f"Danh mục {format_number(count)} khoản vay: {(time.perf_counter() - start) * 1000:.0f}ms, "
+          f"ước tính thử dần {old_seconds * count / 60:.0f} phút")
+
+
+if __name__ == '__main__':
+    main()
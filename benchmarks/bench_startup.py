@@ -0,0 +1,143 @@
+"""So sánh thời gian khởi động của app trước và sau khi tách gói giao diện, nạp thư viện nặng khi cần.
+
+Mỗi phép đo chạy trong một tiến trình mới (chưa có module nào trong bộ nhớ) và lặp lại vài lần,
+lấy trung vị:
+
+- import: thời gian chạy các câu lệnh import ở cấp module của ``app.py`` (tách riêng phần streamlit);
+- vẽ lần đầu: lần chạy script đầu tiên bằng ``AppTest`` (màn hình chào), rồi lần chạy đầu tiên khi
+  đã có hồ sơ và một lần chạy lại, kèm các thư viện nặng đã bị nạp sau các lần chạy đó.
+
+Phiên bản "trước" được lấy từ git (mặc định là commit ngay trước khi thêm gói ``giaodien``).
+
+Chạy: python benchmarks/bench_startup.py [revision]
+"""
+import ast
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+REPEAT = 3
+# streamlit tự import gói plotly rỗng (nạp lười), nên kiểm tra plotly.express
+HEAVY_MODULES = ['pandas', 'plotly.express', 'google.generativeai', 'docx']
+
+
+def _app_imports(app_path):
+    """Các câu lệnh import ở cấp module của app.py (kể cả trong khối try)"""
+    with open(app_path, encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    nodes = []
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            nodes.append(node)
+        elif isinstance(node, ast.Try):
+            nodes.extend(child for child in node.body if isinstance(child, (ast.Import, ast.ImportFrom)))
+    return ast.Module(body=nodes, type_ignores=[])
+
+
+def _measure_import(root):
+    """Chạy trong tiến trình con: thời gian import streamlit và phần còn lại của app.py"""
+    code = compile(_app_imports(os.path.join(root, 'app.py')), 'app_imports', 'exec')
+    start = time.perf_counter()
+    import streamlit  # noqa: F401
+    streamlit_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    exec(code, {})
+    print(json.dumps({'streamlit': streamlit_seconds, 'app': time.perf_counter() - start}))
+
+
+def _measure_paint(root):
+    """Chạy trong tiến trình con: thời gian các lần chạy script đầu tiên"""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(root, 'app.py'), default_timeout=120)
+    start = time.perf_counter()
+    at.run()
+    welcome_seconds = time.perf_counter() - start
+    at.session_state['data_extracted'] = True
+    at.session_state['customer_info'] = {'name': 'Nguyễn Văn An', 'cccd': '042080001234'}
+    at.session_state['financial_info'] = {'loan_amount': 5e8, 'interest_rate': 8.5, 'loan_term': 60,
+                                          'monthly_income': 4e7, 'monthly_expense': 1.5e7}
+    at.session_state['collateral_info'] = {'value': 1.2e9, 'type': 'QSDĐ'}
+    start = time.perf_counter()
+    at.run()
+    case_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    at.run()
+    rerun_seconds = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(at.exception)
+    print(json.dumps({
+        'welcome': welcome_seconds,
+        'case': case_seconds,
+        'rerun': rerun_seconds,
+        'heavy': [name for name in HEAVY_MODULES if name in sys.modules],
+    }))
+
+
+def _run(kind, root, cache_dir):
+    env = dict(os.environ, PYTHONPATH=root, THAMDINH_CACHE_DIR=cache_dir, PYTHONWARNINGS='ignore')
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), f'--{kind}', root], cwd=root, env=env,
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _median(results, key):
+    return statistics.median(result[key] for result in results)
+
+
+def _default_revision():
+    """Commit ngay trước commit thêm gói giao diện; chưa commit thì so với HEAD"""
+    added = subprocess.run(['git', 'log', '--diff-filter=A', '--format=%H', '--', 'giaodien/__init__.py'],
+                           cwd=ROOT, check=True, capture_output=True, text=True).stdout.split()
+    return f"{added[-1]}^" if added else 'HEAD'
+
+
+def _export_revision(revision, target):
+    archive = subprocess.run(['git', 'archive', '--format=tar', revision], cwd=ROOT, check=True,
+                             capture_output=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(target, filter='data')
+
+
+def main():
+    revision = sys.argv[1] if len(sys.argv) > 1 else _default_revision()
+    print(f"Trước: {revision} · Sau: thư mục làm việc · trung vị {REPEAT} lần đo, mỗi lần một tiến trình mới")
+    print(f"{'Phiên bản':<10}{'streamlit':>11}{'import app':>12}{'màn hình chào':>15}{'mở hồ sơ':>11}"
+          f"{'chạy lại':>10}  Thư viện nặng đã nạp")
+    with tempfile.TemporaryDirectory() as tmp:
+        before = os.path.join(tmp, 'before')
+        _export_revision(revision, before)
+        rows = {}
+        for label, root in (('trước', before), ('sau', ROOT)):
+            imports = [_run('import', root, os.path.join(tmp, 'cache')) for _ in range(REPEAT)]
+            paints = [_run('paint', root, os.path.join(tmp, 'cache')) for _ in range(REPEAT)]
+            rows[label] = row = {
+                'streamlit': _median(imports, 'streamlit'),
+                'app': _median(imports, 'app'),
+                'welcome': _median(paints, 'welcome'),
+                'case': _median(paints, 'case'),
+                'rerun': _median(paints, 'rerun'),
+            }
+            print(f"{label:<10}{row['streamlit'] * 1000:9.0f}ms{row['app'] * 1000:10.0f}ms"
+                  f"{row['welcome'] * 1000:13.0f}ms{row['case'] * 1000:9.0f}ms{row['rerun'] * 1000:8.0f}ms"
+                  f"  {', '.join(paints[-1]['heavy']) or '-'}")
+        print(f"{'tăng tốc':<10}{'':>11}"
+              + ''.join(f"{rows['trước'][key] / rows['sau'][key]:{width - 1}.1f}x"
+                        for key, width in (('app', 12), ('welcome', 15), ('case', 11), ('rerun', 10))))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 3 and sys.argv[1] == '--import':
+        _measure_import(sys.argv[2])
+    elif len(sys.argv) == 3 and sys.argv[1] == '--paint':
+        _measure_paint(sys.argv[2])
+    else:
+        main()
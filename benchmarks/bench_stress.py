@@ -0,0 +1,81 @@
+"""So sánh stress test tính từng kịch bản bằng ``calculate_financial_metrics`` với lưới theo mảng ``stress_grid``.
+
+Kiểm tra hai cách cho cùng DSCR, DTI và số dư sau trả nợ trên lưới nhỏ, rồi đo thời gian trên lưới
+lãi suất × thu nhập × chi phí × thời hạn cỡ 10.000 và 100.000 kịch bản (cách cũ chỉ đo một mẫu kịch bản
+rồi nhân lên), và thời gian dựng hai bản đồ nhiệt DSCR/DTI.
+
+Chạy: python benchmarks/bench_stress.py
+"""
+import itertools
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from thamdinh.charts import stress_heatmap  # noqa: E402
+from thamdinh.finance import DSCR_MIN, DTI_MAX, calculate_financial_metrics  # noqa: E402
+from thamdinh.stress import STRESS_AXES, axis_values, grid_slice, stress_grid  # noqa: E402
+
+SAMPLE = 300
+FINANCIAL_INFO = {'loan_amount': 1.5e9, 'interest_rate': 9.0, 'loan_term': 120, 'monthly_income': 4.5e7,
+                  'monthly_expense': 1.8e7}
+# (bước lãi suất, bước thu nhập, bước chi phí, bước thời hạn): khoảng 7.500 và 145.000 kịch bản
+GRID_STEPS = [(1.0, 5, 10, 60), (0.5, 2, 5, 24)]
+
+
+def _axes(steps):
+    rate_step, income_step, expense_step, term_step = steps
+    return (axis_values(-2, 6, rate_step), axis_values(-60, 20, income_step), axis_values(0, 60, expense_step),
+            axis_values(12, 360, term_step))
+
+
+def _scenario(info, rate, income, expense, term):
+    return dict(info, interest_rate=rate, monthly_income=info['monthly_income'] * (1 + income / 100),
+                monthly_expense=info['monthly_expense'] * (1 + expense / 100), loan_term=term)
+
+
+def check_matches_scalar():
+    for method in ('equal_principal', 'annuity'):
+        info = dict(FINANCIAL_INFO, repayment_method=method, grace_months=6, balloon_amount=2e8)
+        grid = stress_grid(info, [-1, 0, 2.5], [-40, 0], [0, 35], [36, 121])
+        for index in itertools.product(*(range(len(values)) for values in grid['axes'].values())):
+            values = [grid['axes'][axis][position] for axis, position in zip(STRESS_AXES, index)]
+            metrics = calculate_financial_metrics(_scenario(info, *values))
+            for name, key in (('dscr', 'dscr'), ('dti', 'debt_service_ratio'), ('surplus', 'surplus')):
+                assert np.isclose(grid[name][index], metrics[key], rtol=1e-9), (method, values, name)
+    print("Lưới theo mảng khớp calculate_financial_metrics (2 phương thức, ân hạn và trả cuối kỳ).")
+
+
+def main():
+    check_matches_scalar()
+    print(f"\n{'Số kịch bản':>16}{'từng kịch bản':>16}{'theo mảng':>12}{'nhanh hơn':>12}{'đạt':>8}")
+    for steps in GRID_STEPS:
+        axes = _axes(steps)
+        base_rate = FINANCIAL_INFO['interest_rate']
+        scenarios = list(itertools.product(*axes))
+
+        sample = scenarios[::max(len(scenarios) // SAMPLE, 1)]
+        start = time.perf_counter()
+        for rate_shift, income, expense, term in sample:
+            calculate_financial_metrics(_scenario(FINANCIAL_INFO, base_rate + rate_shift, income, expense, term))
+        old = (time.perf_counter() - start) / len(sample) * len(scenarios)
+
+        start = time.perf_counter()
+        grid = stress_grid(FINANCIAL_INFO, *axes)
+        new = time.perf_counter() - start
+        print(f"{len(scenarios):>16,}{old:15.2f}s{new * 1000:10.1f}ms{old / new:11.0f}x"
+              f"{grid['passed'].mean() * 100:7.1f}%")
+
+    start = time.perf_counter()
+    fixed = {'expense': 0, 'term': len(grid['axes']['term']) // 2}
+    for name, threshold, higher in (('dscr', DSCR_MIN, True), ('dti', DTI_MAX, False)):
+        stress_heatmap(grid_slice(grid, name, 'income', 'rate', fixed), grid['axes']['income'],
+                       grid['axes']['rate'], STRESS_AXES['income'], STRESS_AXES['rate'], name, threshold, higher)
+    print(f"\nHai bản đồ nhiệt DSCR/DTI: {(time.perf_counter() - start) * 1000:.0f}ms (gồm nạp Plotly lần đầu)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,26 @@
+"""Đo bộ nhớ RSS của tiến trình hiện tại (tính cả bộ nhớ ngoài Python như lxml, zlib)."""
+import resource
+import sys
+
+
+def reset_peak_rss():
+    """Đặt lại mức RSS đỉnh (Linux) để không tính phần bộ nhớ tạm lúc import"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def rss_kb(field):
+    """``VmRSS`` (hiện tại) hoặc ``VmHWM`` (đỉnh) tính bằng KB"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS trả về byte, Linux trả về KB
+    return peak / 1024 if sys.platform == 'darwin' else peak
@@ -0,0 +1,72 @@
+"""Sinh dữ liệu PASDV giả lập cho các benchmark."""
+import io
+import random
+
+HEADER_LINES = [
+    "PHƯƠNG ÁN SỬ DỤNG VỐN",
+    "Họ và tên: {name} - Sinh năm 1980",
+    "CMND/CCCD/hộ chiếu: {cccd}",
+    "Nơi cư trú: Xã Thạch Hà, tỉnh Hà Tĩnh",
+    "Số điện thoại: {phone}",
+    "Email: khachhang{index}@example.com",
+    "Mục đích vay: Mở rộng cửa hàng tạp hóa",
+    "Tổng nhu cầu vốn: 800.000.000 đồng",
+    "Vốn đối ứng của khách hàng: 300.000.000 đồng",
+    "Vốn vay Agribank số tiền: {loan} đồng",
+    "Lãi suất: 8,5%/năm",
+    "Thời hạn vay: 60 tháng",
+    "Tổng thu nhập của hộ gia đình: 40.000.000 đồng",
+    "Thu nhập từ kinh doanh tạp hóa: 25.000.000 đồng/tháng",
+    "Tổng chi phí hàng tháng: 15.000.000",
+]
+
+FOOTER_LINES = [
+    "Tài sản 1: Quyền sử dụng đất và tài sản gắn liền với đất. Thửa số 12",
+    "Địa chỉ: Thôn 3, xã Thạch Hà Diện tích đất: 150,5 m2",
+    "Giá trị: 1.200.000.000 đồng",
+]
+
+FILLER = ("Diễn giải phương án kinh doanh đoạn {0}: khách hàng có kinh nghiệm buôn bán "
+          "lâu năm, nguồn hàng ổn định, lượng khách quen đều đặn tại khu vực chợ trung tâm.")
+
+
+def sample_lines(filler_paragraphs=0, index=0):
+    """Các dòng văn bản của một PASDV; phần diễn giải nằm giữa thông tin vay và TSĐB"""
+    rnd = random.Random(index)
+    values = {
+        'name': f"Nguyễn Văn {chr(65 + index % 26)}",
+        'cccd': f"0420{rnd.randrange(10 ** 8):08d}",
+        'phone': f"09{rnd.randrange(10 ** 8):08d}",
+        'index': index,
+        'loan': "{:,}".format(rnd.randrange(1, 50) * 10 ** 8 // 10).replace(",", "."),
+    }
+    lines = [line.format(**values) for line in HEADER_LINES]
+    lines += [FILLER.format(i) for i in range(filler_paragraphs)]
+    lines += FOOTER_LINES
+    return lines
+
+
+def sample_text(filler_paragraphs=0, index=0):
+    """Nội dung văn bản PASDV dạng chuỗi"""
+    return '\n'.join(sample_lines(filler_paragraphs, index))
+
+
+def sample_docx(filler_paragraphs=0, index=0, table_rows=0):
+    """File PASDV dạng bytes .docx, có thể kèm bảng số liệu"""
+    from docx import Document
+
+    doc = Document()
+    lines = sample_lines(filler_paragraphs, index)
+    for line in lines[:-len(FOOTER_LINES)]:
+        doc.add_paragraph(line)
+    if table_rows:
+        table = doc.add_table(rows=table_rows, cols=3)
+        for row_index, row in enumerate(table.rows):
+            row.cells[0].text = f"Tháng {row_index + 1}"
+            row.cells[1].text = "Doanh thu:"
+            row.cells[2].text = f"{(row_index + 1) * 1000000:,} đồng".replace(",", ".")
+    for line in lines[-len(FOOTER_LINES):]:
+        doc.add_paragraph(line)
+    output = io.BytesIO()
+    doc.save(output)
+    return output.getvalue()
@@ -0,0 +1,6 @@
+"""Giao diện Streamlit của hệ thống thẩm định, chia theo từng phần của trang.
+
+Các module chỉ được import một lần cho mỗi tiến trình; mỗi lần Streamlit chạy lại script,
+``app.py`` chỉ gọi các hàm ``render`` của phần đang hiển thị. Thư viện nặng (pandas, plotly,
+google-generativeai, python-docx) được import bên trong hàm cần đến chúng.
+"""
@@ -0,0 +1,144 @@
+"""Gọi Gemini từ giao diện: hiển thị kết quả theo luồng, thời gian và số token."""
+import streamlit as st
+
+from giaodien.resources import get_ai_response_cache
+from thamdinh import llm, summarize
+from thamdinh.formatting import format_number
+
+
+# Hàm báo chờ khi bị giới hạn tần suất (chỉ dùng trên luồng chính của script)
+def warn_rate_limit_wait(delay, attempt, max_retries):
+    st.warning(f"⏳ Rate limit reached. Đang chờ {delay:.0f} giây trước khi thử lại... (Lần {attempt + 1}/{max_retries})")
+
+
+# Hàm gửi prompt tới Gemini, nhận kết quả theo luồng và dùng lại phản hồi đã lưu nếu có
+def stream_with_cache(cache, api_key, model_name, prompt, bypass_cache=False, on_wait=None):
+    """Trả về llm.ResponseStream; ``cache`` là ``get_ai_response_cache()`` lấy trên luồng chính của script.
+    An toàn khi gọi và duyệt từ luồng phụ nếu on_wait=None"""
+    return llm.cached_stream(cache, model_name, prompt,
+                             lambda p: llm.stream_text(api_key, model_name, p, on_wait=on_wait),
+                             bypass=bypass_cache)
+
+
+# Hàm bắt đầu một lần phân tích: rút gọn tài liệu dài theo ngân sách token rồi gửi prompt phân tích
+def start_analysis_stream(cache, api_key, data_source, data_content, model_name, bypass_cache=False,
+                          token_budget=summarize.DEFAULT_TOKEN_BUDGET, on_wait=None):
+    """Trả về llm.ResponseStream; không gọi Streamlit nên an toàn khi gọi từ luồng phụ nếu on_wait=None"""
+    condense_report = None
+    if data_source == "file":
+        data_content, condense_report = summarize.condense_document(
+            data_content, lambda prompt: ''.join(stream_with_cache(cache, api_key, model_name, prompt, bypass_cache)),
+            token_budget)
+    prompt = llm.build_analysis_prompt(data_source, data_content)
+    stream = stream_with_cache(cache, api_key, model_name, prompt, bypass_cache, on_wait=on_wait)
+    stream.meta['condense'] = condense_report
+    return stream
+
+
+# Hàm lấy thông tin thời gian và token của một phản hồi đã nhận xong
+def stream_info(stream):
+    return {
+        'cached': stream.cached,
+        'first_chunk_seconds': stream.first_chunk_seconds,
+        'total_seconds': stream.total_seconds,
+        'tokens': summarize.analysis_token_report(stream.prompt, stream.text, stream.meta.get('condense')),
+    }
+
+
+# Hàm mô tả nguồn, thời gian và số token của phản hồi AI
+def describe_response(info):
+    if not info:
+        return ""
+    parts = []
+    if info.get('cached'):
+        parts.append("⚡ Kết quả lấy từ bộ nhớ đệm")
+    elif info.get('first_chunk_seconds') is not None:
+        parts.append(f"⏱️ Đoạn đầu sau {info['first_chunk_seconds']:.1f} giây · Tổng {info['total_seconds']:.1f} giây")
+    tokens = info.get('tokens')
+    if tokens:
+        token_text = f"🔢 ~{tokens['total_tokens']:,} token (prompt {tokens['prompt_tokens']:,}, trả lời {tokens['response_tokens']:,}"
+        if tokens.get('sections'):
+            token_text += (f"; tài liệu {tokens['document_tokens']:,} token được tóm tắt từ {tokens['sections']} phần"
+                           f" còn {tokens['content_tokens']:,}")
+            if tokens.get('truncated'):
+                token_text += ", đã cắt bớt"
+        parts.append(token_text + ")")
+    if info.get('excerpts'):
+        parts.append(f"📎 {info['excerpts']} đoạn trích từ PASDV")
+    if info.get('window'):
+        parts.append(f"💬 kèm {info['window']} tin nhắn gần nhất")
+    return " · ".join(parts)
+
+
+# Hàm chuyển lỗi gọi AI thành thông báo hiển thị
+def format_ai_error(e):
+    error_msg = str(e)
+    if llm.is_rate_limit_error(e):
+        return f"""
+⚠️ **LỖI RATE LIMIT / QUOTA**
+
+API key của bạn đã vượt quá giới hạn sử dụng.
+
+**Giải pháp:**
+1. **Đợi một lúc** (thường là 1-2 phút) rồi thử lại
+2. **Chọn model khác** ở dropdown bên dưới (gemini-1.5-flash hoặc gemini-1.5-pro)
+3. **Kiểm tra usage**: https://ai.dev/usage?tab=rate-limit
+4. **Tạo API key mới**: https://aistudio.google.com/app/apikey
+
+**Chi tiết lỗi:** {error_msg}
+"""
+    return f"❌ Lỗi phân tích: {error_msg}"
+
+
+# Hàm phân tích bằng Gemini, hiển thị dần kết quả khi model sinh ra
+def analyze_with_gemini(api_key, data_source, data_content, model_name='gemini-1.5-flash', bypass_cache=False,
+                        token_budget=summarize.DEFAULT_TOKEN_BUDGET):
+    """Phân tích dữ liệu bằng Gemini, trả về (nội dung, thông tin thời gian và token)"""
+    if not llm.GENAI_AVAILABLE:
+        return "⚠️ Thư viện Google Generative AI chưa được cài đặt.\nVui lòng chạy: pip install google-generativeai", None
+    
+    try:
+        with st.spinner("Đang chuẩn bị nội dung phân tích..."):
+            stream = start_analysis_stream(get_ai_response_cache(), api_key, data_source, data_content, model_name,
+                                           bypass_cache, token_budget, on_wait=warn_rate_limit_wait)
+        st.write_stream(stream)
+        return stream.text, stream_info(stream)
+    except Exception as e:
+        return format_ai_error(e), None
+
+
+# Hàm tổng hợp các chỉ tiêu để gửi AI phân tích
+def build_metrics_summary():
+    return f"""
+THÔNG TIN KHÁCH HÀNG:
+- Họ và tên: {st.session_state.customer_info.get('name', 'N/A')}
+- Thu nhập hàng tháng: {format_number(st.session_state.financial_info.get('monthly_income', 0))} đồng
+- Chi phí hàng tháng: {format_number(st.session_state.financial_info.get('monthly_expense', 0))} đồng
+
+THÔNG TIN VAY VỐN:
+- Số tiền vay: {format_number(st.session_state.financial_info.get('loan_amount', 0))} đồng
+- Lãi suất: {st.session_state.financial_info.get('interest_rate', 0)}%/năm
+- Thời hạn: {st.session_state.financial_info.get('loan_term', 0)} tháng
+
+CÁC CHỈ TIÊU TÀI CHÍNH:
+- Trả nợ hàng tháng: {format_number(st.session_state.metrics.get('first_month_payment', 0))} đồng
+- Thu nhập ròng: {format_number(st.session_state.metrics.get('net_income', 0))} đồng
+- Tỷ lệ trả nợ/thu nhập: {st.session_state.metrics.get('debt_service_ratio', 0):.2f}%
+- DSCR: {st.session_state.metrics.get('dscr', 0):.2f}
+- Số dư sau trả nợ: {format_number(st.session_state.metrics.get('surplus', 0))} đồng
+- Tổng lãi phải trả: {format_number(st.session_state.metrics.get('total_interest', 0))} đồng
+
+TÀI SẢN ĐẢM BẢO:
+- Loại: {st.session_state.collateral_info.get('type', 'N/A')}
+- Giá trị: {format_number(st.session_state.collateral_info.get('value', 0))} đồng
+- LTV: {(st.session_state.financial_info.get('loan_amount', 0) / st.session_state.collateral_info.get('value', 1) * 100):.2f}%
+"""
+
+
+# Hàm hiển thị kết quả phân tích AI
+def show_analysis(source_label, analysis, info):
+    st.markdown("#### Kết Quả Phân Tích:")
+    st.info(f"**Nguồn dữ liệu:** {source_label}")
+    if describe_response(info):
+        st.caption(describe_response(info))
+    st.write(analysis)
@@ -0,0 +1,159 @@
+"""Kết quả trích xuất hàng loạt."""
+import io
+import time
+from datetime import datetime
+
+import streamlit as st
+
+from giaodien import case_view, state
+from giaodien.exports import export_portfolio_excel
+from giaodien.resources import cached_figure
+from giaodien.tab_charts import render_mode_picker
+from giaodien.tab_export import render_template_picker
+
+
+# Hàm hiển thị kết quả trích xuất hàng loạt
+def render():
+    if not st.session_state.get('batch_results'):
+        return
+    import pandas as pd
+
+    from thamdinh import batch
+    from thamdinh.portfolio import OPTIONAL_COLUMNS, REQUIRED_COLUMNS
+
+    with st.expander(f"📦 Kết Quả Trích Xuất Hàng Loạt ({len(st.session_state.batch_results)} file)", expanded=True):
+        batch_results = st.session_state.batch_results
+        batch_df = batch.batch_results_to_dataframe(batch_results)
+        error_count = sum(1 for result in batch_results if result['error'])
+
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Tổng số file", len(batch_results))
+        col2.metric("Thành công", len(batch_results) - error_count)
+        col3.metric("Lỗi", error_count)
+
+        st.dataframe(batch_df, use_container_width=True, hide_index=True)
+
+        col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
+        ok_results = [result for result in batch_results if not result['error']]
+        with col1:
+            selected_file = st.selectbox("Chọn hồ sơ để thẩm định chi tiết:",
+                                         [result['file'] for result in ok_results])
+        with col2:
+            if st.button("📂 Mở Hồ Sơ", use_container_width=True, disabled=not ok_results):
+                selected = next(result for result in ok_results if result['file'] == selected_file)
+                st.session_state.customer_info = dict(selected['customer_info'])
+                st.session_state.financial_info = dict(selected['financial_info'])
+                st.session_state.collateral_info = dict(selected['collateral_info'])
+                st.session_state.uploaded_content = selected['full_text']
+                st.session_state.data_extracted = True
+                st.session_state.data_modified = False
+                state.start_new_case(selected['file'])
+                case_view.check_duplicates()
+                st.rerun()
+        with col3:
+            st.download_button(
+                label="📥 Tải CSV",
+                data=batch_df.to_csv(index=False).encode('utf-8-sig'),
+                file_name=f"trich_xuat_hang_loat_{datetime.now().strftime('%Y%m%d')}.csv",
+                mime="text/csv",
+                use_container_width=True
+            )
+        with col4:
+            loans = pd.DataFrame([result['financial_info'] for result in ok_results],
+                                 columns=REQUIRED_COLUMNS + list(OPTIONAL_COLUMNS))
+            labels = [result['file'] for result in ok_results]
+            # Danh mục được dựng khi bấm tải: tổng hợp, từng khoản vay, dòng tiền và lịch trả nợ chi tiết
+            st.download_button(
+                label="📥 Tải Excel",
+                data=lambda: export_portfolio_excel(loans, labels),
+                file_name=f"danh_muc_khoan_vay_{datetime.now().strftime('%Y%m%d')}.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                use_container_width=True,
+                disabled=not ok_results
+            )
+
+        if ok_results:
+            render_portfolio_charts(loans)
+        render_batch_reports(ok_results)
+
+        if st.button("🗑️ Xóa Kết Quả Hàng Loạt"):
+            del st.session_state.batch_results
+            for key in ('report_zip', 'report_results', 'report_seconds'):
+                st.session_state.pop(key, None)
+            st.rerun()
+
+
+# Hàm hiển thị dòng tiền và dư nợ của danh mục từ các hồ sơ đã trích xuất
+def render_portfolio_charts(loans):
+    from thamdinh import charts
+    from thamdinh.portfolio import loans_cache_key, portfolio_cash_flow, stack_schedules
+
+    st.markdown("#### 📈 Dòng Tiền Danh Mục")
+    render_mode = render_mode_picker('portfolio_render_mode')
+
+    # Lịch trả nợ của mọi khoản vay được ghép và cộng theo tháng một lần cho mỗi danh mục
+    def build():
+        stacked = stack_schedules(loans)
+        flow = portfolio_cash_flow(stacked)
+        return (charts.portfolio_cash_flow_figure(flow, render_mode),
+                charts.portfolio_balance_figure(stacked, flow, render_mode))
+
+    cash_flow_figure, balance_figure = cached_figure('portfolio', (loans_cache_key(loans), render_mode), build)
+    col1, col2 = st.columns(2)
+    with col1:
+        st.plotly_chart(cash_flow_figure, use_container_width=True)
+    with col2:
+        st.plotly_chart(balance_figure, use_container_width=True)
+
+
+# Hàm tạo báo cáo thẩm định (Word hoặc PDF) cho cả lô, tải về một file zip
+def render_batch_reports(ok_results):
+    import pandas as pd
+
+    from thamdinh.reports import REPORT_FORMATS, generate_report_zip
+
+    st.markdown("#### 📄 Báo Cáo Thẩm Định Hàng Loạt")
+    report_format = st.radio("Định dạng báo cáo:", list(REPORT_FORMATS), format_func=REPORT_FORMATS.get,
+                             horizontal=True, key='batch_report_format')
+    template = None
+    charts = False
+    if report_format == 'docx':
+        template = render_template_picker('batch_report_template')
+        charts = st.checkbox("Kèm biểu đồ lịch trả nợ", value=True, key='batch_report_charts')
+    if st.button("📄 Tạo Báo Cáo (.zip)", disabled=not ok_results):
+        progress = st.progress(0.0, text="Đang tạo báo cáo...")
+        output = io.BytesIO()
+        reports = []
+        start = time.perf_counter()
+        for result in generate_report_zip(ok_results, output, report_format, template, charts=charts):
+            reports.append(result)
+            progress.progress(len(reports) / len(ok_results), text=f"Đã tạo {len(reports)}/{len(ok_results)} báo cáo")
+        progress.empty()
+        st.session_state.report_zip = output.getvalue()
+        st.session_state.report_results = reports
+        st.session_state.report_seconds = time.perf_counter() - start
+
+    if not st.session_state.get('report_zip'):
+        return
+    reports = st.session_state.report_results
+    seconds = st.session_state.report_seconds
+    done = sum(1 for result in reports if not result['error'])
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Báo cáo đã tạo", f"{done}/{len(reports)}")
+    col2.metric("Tổng thời gian", f"{seconds:.1f} giây")
+    col3.metric("Trung bình/báo cáo", f"{sum(result['seconds'] for result in reports) / len(reports):.2f} giây")
+    col4.metric("Báo cáo/giây", f"{len(reports) / seconds:.1f}" if seconds else "-")
+    st.dataframe(pd.DataFrame({
+        'Hồ sơ': [result['file'] for result in reports],
+        'Báo cáo': [result['report'] for result in reports],
+        'Thời gian (giây)': [round(result['seconds'], 3) for result in reports],
+        'Dung lượng (KB)': [round(result['size'] / 1024, 1) for result in reports],
+        'Lỗi': [result['error'] or '' for result in reports],
+    }), use_container_width=True, hide_index=True)
+    st.download_button(
+        label="📥 Tải Báo Cáo (.zip)",
+        data=st.session_state.report_zip,
+        file_name=f"bao_cao_tham_dinh_{datetime.now().strftime('%Y%m%d')}.zip",
+        mime="application/zip",
+        use_container_width=True
+    )
@@ -0,0 +1,158 @@
+"""Lưu hồ sơ đang mở vào kho hồ sơ, tìm và mở lại hồ sơ đã lưu, cảnh báo trùng khách hàng/TSĐB."""
+import time
+from datetime import datetime
+
+import streamlit as st
+
+from giaodien.resources import get_case_store
+from giaodien.state import init_session_state, refresh_metrics
+from thamdinh.case_store import CASE_FIELDS, SEARCH_LIMIT
+from thamdinh.duplicates import describe_reasons, find_duplicates
+from thamdinh.formatting import format_number
+
+
+# Hàm mở một hồ sơ đã lưu
+def open_case(case):
+    """Thay toàn bộ hồ sơ đang mở (kể cả kết quả phân tích AI và lịch sử chat) bằng hồ sơ đã lưu"""
+    for key in CASE_FIELDS:
+        if key in case:
+            st.session_state[key] = case[key]
+        else:
+            st.session_state.pop(key, None)
+    st.session_state.uploaded_content = case['uploaded_content']
+    st.session_state.source_file = case['source_file']
+    st.session_state.case_id = case['id']
+    st.session_state.data_extracted = True
+    st.session_state.data_modified = False
+    init_session_state()
+    # Giữ mã hồ sơ trên URL để tải lại trang vẫn mở đúng hồ sơ
+    st.query_params['case'] = str(case['id'])
+    check_duplicates()
+
+
+# Hàm kiểm tra hồ sơ đang mở có trùng khách hàng/TSĐB với hồ sơ đã lưu
+def check_duplicates():
+    st.session_state.duplicates = find_duplicates(get_case_store(), st.session_state.customer_info,
+                                                  st.session_state.financial_info, st.session_state.collateral_info,
+                                                  exclude_id=st.session_state.case_id)
+
+
+# Hàm hiển thị cảnh báo trùng khách hàng/TSĐB của hồ sơ đang mở
+def render_duplicates():
+    report = st.session_state.duplicates
+    if not report or not report['matches']:
+        return
+    if report['applicant_cases']:
+        st.error(f"⚠️ Khách hàng đã có {report['applicant_cases']} hồ sơ khác trong kho · Tổng số tiền vay đề nghị "
+                 f"(kể cả hồ sơ này): {format_number(report['total_exposure'])} đ")
+    if report['collateral_cases']:
+        st.warning(f"🏠 Tài sản đảm bảo trùng với {report['collateral_cases']} hồ sơ khác · Tổng số tiền vay trên "
+                   f"TSĐB: {format_number(report['collateral_loans'])} đ")
+    related = sum(1 for match in report['matches'] if not (match['same_applicant'] or match['same_collateral']))
+    if related:
+        st.info(f"👥 {related} hồ sơ có thể liên quan (trùng số điện thoại hoặc họ tên + nơi cư trú nhưng khác CCCD)")
+    with st.expander("🔎 Chi Tiết Hồ Sơ Trùng"):
+        st.dataframe([{
+            'Mã': match['id'],
+            'Họ tên': match['name'],
+            'CCCD': match['cccd'],
+            'Số điện thoại': match['phone'],
+            'Số tiền vay': match['loan_amount'],
+            'File': match['source_file'],
+            'Trùng': describe_reasons(match['reasons']),
+            'Cùng khách hàng': match['same_applicant'],
+        } for match in report['matches']], use_container_width=True, hide_index=True,
+            column_config={'Số tiền vay': st.column_config.NumberColumn(format="localized")})
+        col1, col2 = st.columns([3, 1])
+        col1.caption(f"⚡ Tra cứu trong {report['seconds'] * 1000:.2f}ms · mở hồ sơ theo mã ở mục Hồ Sơ Đã Lưu")
+        if col2.button("🔄 Kiểm Tra Lại", use_container_width=True):
+            check_duplicates()
+            st.rerun()
+
+
+# Hàm mở lại hồ sơ có mã trên URL sau khi tải lại trang
+def restore_from_url():
+    """Tải lại trang làm mất session state; nếu URL có ?case=<mã> thì mở lại hồ sơ đó từ kho"""
+    if st.session_state.data_extracted or 'case' not in st.query_params:
+        return
+    case_id = st.query_params['case']
+    case = get_case_store().load(int(case_id)) if case_id.isdigit() else None
+    if case is None:
+        st.query_params.pop('case', None)
+        return
+    open_case(case)
+
+
+# Hàm hiển thị nút lưu hồ sơ đang mở (trong sidebar)
+def render_save():
+    if not st.session_state.data_extracted:
+        return
+    case_id = st.session_state.case_id
+    # Khóa cố định: nhãn đổi sau lần lưu đầu nhưng nút vẫn là một widget (không mất lần bấm kế tiếp)
+    if st.button("💾 Cập Nhật Hồ Sơ Đã Lưu" if case_id else "💾 Lưu Hồ Sơ", key="save_case", use_container_width=True,
+                 help="Lưu thông tin, chỉ tiêu, kết quả phân tích AI và lịch sử chat để mở lại sau"):
+        refresh_metrics()
+        case = {key: st.session_state[key] for key in CASE_FIELDS if key in st.session_state}
+        case['uploaded_content'] = st.session_state.uploaded_content
+        case['source_file'] = st.session_state.source_file
+        case_id = get_case_store().save(case, case_id)
+        st.session_state.case_id = case_id
+        st.query_params['case'] = str(case_id)
+        st.toast(f"💾 Đã lưu hồ sơ #{case_id}")
+    if case_id:
+        st.caption(f"🗂️ Đang mở hồ sơ #{case_id} trong kho")
+
+
+# Hàm hiển thị ô tìm kiếm hồ sơ đã lưu
+def render_search():
+    store = get_case_store()
+    with st.expander(f"🗂️ Hồ Sơ Đã Lưu ({format_number(store.stats()['size'])})"):
+        col1, col2 = st.columns([2, 1])
+        with col1:
+            query = st.text_input("Tìm theo tên, CCCD hoặc số điện thoại:", key="case_query",
+                                  placeholder="VD: nguyen van an, 042080..., 0912...",
+                                  help="Tên không cần gõ dấu và có thể gõ đầu từ; CCCD/số điện thoại khớp theo đầu số")
+        with col2:
+            dates = st.date_input("Ngày lưu (từ - đến):", value=(), key="case_dates", format="DD/MM/YYYY")
+        date_from = dates[0] if dates else None
+        date_to = dates[1] if len(dates) > 1 else date_from
+
+        start = time.perf_counter()
+        results = store.search(query, date_from, date_to)
+        st.caption(f"Tìm thấy {len(results)} hồ sơ trong {(time.perf_counter() - start) * 1000:.1f}ms"
+                   + (f" (hiển thị {SEARCH_LIMIT} hồ sơ mới nhất)" if len(results) == SEARCH_LIMIT else ""))
+        if not results:
+            return
+
+        st.dataframe([{
+            'Mã': row['id'],
+            'Họ tên': row['name'],
+            'CCCD': row['cccd'],
+            'Số điện thoại': row['phone'],
+            'Số tiền vay': row['loan_amount'],
+            'File': row['source_file'],
+            'Ngày lưu': datetime.fromtimestamp(row['created_at']).strftime('%d/%m/%Y %H:%M'),
+            'Cập nhật': datetime.fromtimestamp(row['updated_at']).strftime('%d/%m/%Y %H:%M'),
+        } for row in results], use_container_width=True, hide_index=True,
+            column_config={'Số tiền vay': st.column_config.NumberColumn(format="localized")})
+
+        labels = {row['id']: f"#{row['id']} · {row['name'] or 'Chưa có tên'} · {row['cccd'] or row['phone']}"
+                  for row in results}
+        col1, col2, col3 = st.columns([2, 1, 1])
+        with col1:
+            selected_id = st.selectbox("Chọn hồ sơ:", list(labels), format_func=labels.get, key="case_selected")
+        with col2:
+            if st.button("📂 Mở Hồ Sơ Đã Lưu", use_container_width=True):
+                case = store.load(selected_id)
+                if case is None:
+                    st.warning("⚠️ Hồ sơ không còn trong kho")
+                else:
+                    open_case(case)
+                    st.rerun()
+        with col3:
+            if st.button("🗑️ Xóa Hồ Sơ", use_container_width=True):
+                store.delete(selected_id)
+                if st.session_state.case_id == selected_id:
+                    st.session_state.case_id = None
+                    st.query_params.pop('case', None)
+                st.rerun()
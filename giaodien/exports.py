@@ -0,0 +1,40 @@
+"""Xuất chỉ tiêu, kế hoạch trả nợ, danh mục khoản vay ra Excel và báo cáo thẩm định ra Word/PDF."""
+import io
+
+
+# Hàm xuất Excel
+def export_to_excel(financial_info, metrics, customer_info=None):
+    """Xuất chỉ tiêu và bảng kế hoạch trả nợ ra Excel (ô số thực, định dạng phân cách hàng nghìn)"""
+    from thamdinh.excel_export import write_case_workbook
+
+    output = io.BytesIO()
+    write_case_workbook(output, financial_info, metrics, customer_info)
+    return output.getvalue()
+
+
+# Hàm xuất danh mục khoản vay ra Excel
+def export_portfolio_excel(loans, labels=None, detail=True):
+    """Xuất tổng hợp, danh mục, dòng tiền theo tháng và (tùy chọn) lịch trả nợ từng khoản vay"""
+    from thamdinh.excel_export import write_portfolio_workbook
+
+    output = io.BytesIO()
+    write_portfolio_workbook(output, loans, labels, detail)
+    return output.getvalue()
+
+
+# Hàm xuất báo cáo thẩm định
+def export_appraisal_report(customer_info, financial_info, collateral_info, metrics, analysis_file, analysis_metrics,
+                            template=None, charts=True):
+    """Xuất báo cáo thẩm định ra Word theo mẫu (``template`` là bytes file mẫu .docx, mặc định dùng mẫu có sẵn)"""
+    from thamdinh.word_report import load_template, render_report
+
+    return render_report(load_template(template), customer_info, financial_info, collateral_info, metrics,
+                         analysis_file, analysis_metrics, charts)
+
+
+# Hàm xuất báo cáo thẩm định ra PDF
+def export_appraisal_pdf(customer_info, financial_info, collateral_info, metrics, analysis_file, analysis_metrics):
+    """Xuất báo cáo thẩm định ra PDF (có bảng lịch trả nợ, font Unicode hiển thị tiếng Việt)"""
+    from thamdinh.pdf_report import render_pdf_report
+
+    return render_pdf_report(customer_info, financial_info, collateral_info, metrics, analysis_file, analysis_metrics)
@@ -0,0 +1,74 @@
+"""Bộ nhớ đệm dùng chung qua các lần chạy lại và giữa các phiên."""
+import os
+
+import streamlit as st
+
+from thamdinh import extraction, llm
+from thamdinh.amortization import SCHEDULE_COLUMNS, schedule_to_dataframe
+from thamdinh.cache import LRUCache
+from thamdinh.case_store import CaseStore, default_data_dir
+from thamdinh.disk_cache import DiskCache, default_cache_dir
+from thamdinh.finance import metrics_cache_key
+
+
+# Hàm lấy bộ nhớ đệm kết quả trích xuất (lưu trên đĩa, dùng chung mọi phiên)
+@st.cache_resource
+def get_extraction_cache():
+    return DiskCache(os.path.join(default_cache_dir(), 'extraction.sqlite3'), max_bytes=200 * 1024 * 1024)
+
+
+# Hàm lấy kho hồ sơ đã lưu (lưu trên đĩa, dùng chung mọi phiên)
+@st.cache_resource
+def get_case_store():
+    return CaseStore(os.path.join(default_data_dir(), 'cases.sqlite3'))
+
+
+# Hàm trích xuất thông tin từ file docx
+def extract_info_from_docx(file):
+    """Trích xuất thông tin từ file docx, dùng lại kết quả nếu file đã được trích xuất trước đó"""
+    (customer_info, financial_info, collateral_info, full_text), cached = extraction.extract_info_cached(
+        file.getvalue(), get_extraction_cache())
+    st.session_state.uploaded_content = full_text
+    st.session_state.extraction_cached = cached
+    return customer_info, financial_info, collateral_info
+
+
+# Hàm lấy bộ nhớ đệm bảng lịch trả nợ (dùng chung qua các lần chạy lại)
+@st.cache_resource
+def get_schedule_table_cache():
+    return LRUCache(maxsize=16)
+
+
+# Hàm lấy cấu hình cột hiển thị bảng lịch trả nợ
+def schedule_column_config():
+    """Cột tiền giữ giá trị số, trình duyệt tự định dạng theo ngôn ngữ của người dùng (vi-VN: 1.234.567)"""
+    config = {label: st.column_config.NumberColumn(label, format="localized", step=1)
+              for key, label in SCHEDULE_COLUMNS.items() if key != 'month'}
+    config[SCHEDULE_COLUMNS['month']] = st.column_config.NumberColumn(SCHEDULE_COLUMNS['month'], format="%d")
+    return config
+
+
+# Hàm lấy bảng lịch trả nợ của hồ sơ đang mở
+def schedule_table(financial_info, metrics):
+    """Trả về bảng số (hiển thị bằng ``schedule_column_config``), dựng một lần cho mỗi bộ thông tin tài chính"""
+    return get_schedule_table_cache().get_or_compute(metrics_cache_key(financial_info),
+                                                     lambda: schedule_to_dataframe(metrics['schedule']))
+
+
+# Hàm lấy bộ nhớ đệm biểu đồ (dùng chung qua các lần chạy lại)
+@st.cache_resource
+def get_chart_cache():
+    return LRUCache(maxsize=32)
+
+
+# Hàm lấy biểu đồ đã dựng
+def cached_figure(name, key, build):
+    """Biểu đồ ``name`` cho khóa dữ liệu đầu vào ``key``, chỉ gọi ``build()`` khi chưa có trong bộ nhớ đệm"""
+    return get_chart_cache().get_or_compute((name, key), build)
+
+
+# Hàm lấy bộ nhớ đệm phản hồi AI (lưu trên đĩa, dùng chung mọi phiên)
+@st.cache_resource
+def get_ai_response_cache():
+    return DiskCache(os.path.join(default_cache_dir(), 'gemini_responses.sqlite3'), max_bytes=50 * 1024 * 1024,
+                     default_ttl=llm.RESPONSE_CACHE_TTL)
@@ -0,0 +1,120 @@
+"""Sidebar: cấu hình API, chọn model và upload file."""
+import streamlit as st
+
+from giaodien import case_view, state
+from giaodien.resources import (extract_info_from_docx, get_ai_response_cache, get_case_store,
+                                 get_extraction_cache)
+from thamdinh import duplicates, llm, summarize
+
+MODEL_OPTIONS = {
+    'Gemini 1.5 Flash (Nhanh - Khuyến nghị)': 'gemini-1.5-flash',
+    'Gemini 1.5 Pro (Chất lượng cao)': 'gemini-1.5-pro',
+    'Gemini 2.0 Flash (Mới nhất)': 'gemini-2.0-flash'
+}
+
+
+# Hàm hiển thị sidebar
+def render():
+    """Trả về cấu hình AI người dùng chọn (API key, model, ngân sách token, bỏ qua bộ nhớ đệm)"""
+    with st.sidebar:
+        st.markdown("### 🔑 Cấu Hình API")
+        api_key = st.text_input("Nhập Gemini API Key:", type="password", help="Nhập API key từ Google AI Studio")
+
+        # Chọn model
+        st.markdown("### 🤖 Chọn Model AI")
+        selected_model_display = st.selectbox(
+            "Model:",
+            options=list(MODEL_OPTIONS.keys()),
+            help="Chọn model phù hợp với API key của bạn"
+        )
+        selected_model = MODEL_OPTIONS[selected_model_display]
+
+        # Thư viện google-generativeai chỉ được nạp khi gửi yêu cầu AI đầu tiên
+        if api_key and llm.GENAI_AVAILABLE:
+            st.success("✅ Đã nhập API Key")
+        elif api_key and not llm.GENAI_AVAILABLE:
+            st.warning("⚠️ Thư viện google-generativeai chưa được cài đặt!")
+
+        token_budget = st.number_input("Ngân sách token cho nội dung file:", min_value=1000, max_value=500000,
+                                       value=summarize.DEFAULT_TOKEN_BUDGET, step=1000,
+                                       help="File dài hơn sẽ được chia phần và tóm tắt song song trước khi phân tích")
+        bypass_ai_cache = st.checkbox("🔄 Bỏ qua bộ nhớ đệm AI",
+                                      help="Luôn gửi yêu cầu mới tới Gemini và ghi đè phản hồi đã lưu")
+        ai_cache_stats = get_ai_response_cache().stats()
+        st.caption(f"⚡ Phản hồi AI đã lưu: {ai_cache_stats['size']} · {ai_cache_stats['hits']} lần dùng lại / "
+                   f"{ai_cache_stats['misses']} lần gọi mới")
+        if api_key:
+            limiter_stats = llm.get_rate_limiter().stats(llm.bucket_key(api_key, selected_model))
+            st.caption(f"🚦 Hàng đợi Gemini (dùng chung API key): {limiter_stats['queue_depth']} đang chờ · "
+                       f"chờ TB {limiter_stats['avg_wait']:.1f}s, tối đa {limiter_stats['max_wait']:.1f}s · "
+                       f"{limiter_stats['acquired']} request · {limiter_stats['throttled']} lần 429")
+
+        st.markdown("---")
+        st.markdown("### 📤 Upload File")
+        upload_mode = st.radio("Chế độ:", ["Một hồ sơ", "Hàng loạt"], horizontal=True,
+                               help="Hàng loạt: chọn nhiều file .docx hoặc file .zip chứa các PASDV")
+
+        if upload_mode == "Một hồ sơ":
+            uploaded_file = st.file_uploader("Chọn file PASDV (.docx)", type=['docx'])
+
+            if uploaded_file is not None:
+                if st.button("🔍 Trích Xuất Dữ Liệu", use_container_width=True):
+                    with st.spinner("Đang xử lý..."):
+                        customer_info, financial_info, collateral_info = extract_info_from_docx(uploaded_file)
+                        st.session_state.customer_info = customer_info
+                        st.session_state.financial_info = financial_info
+                        st.session_state.collateral_info = collateral_info
+                        st.session_state.data_extracted = True
+                        st.session_state.data_modified = False
+                        state.start_new_case(uploaded_file.name)
+                        case_view.check_duplicates()
+                        if st.session_state.extraction_cached:
+                            st.toast("⚡ Dùng lại kết quả trích xuất đã lưu của file này")
+                        st.success("✅ Trích xuất thành công!")
+                        st.rerun()
+        else:
+            uploaded_files = st.file_uploader("Chọn các file PASDV (.docx hoặc .zip)", type=['docx', 'zip'],
+                                              accept_multiple_files=True)
+
+            if uploaded_files:
+                if st.button("🔍 Trích Xuất Hàng Loạt", use_container_width=True):
+                    # Trích xuất hàng loạt cần pandas để tổng hợp kết quả
+                    from thamdinh import batch
+
+                    items, results = batch.collect_batch_files(uploaded_files)
+                    total = len(items) + len(results)
+                    progress = st.progress(0.0, text=f"Đang xử lý 0/{total} file...")
+                    for result in batch.run_batch_extraction(items, cache=get_extraction_cache()):
+                        results.append(result)
+                        progress.progress(len(results) / total, text=f"Đang xử lý {len(results)}/{total} file...")
+                    progress.progress(1.0, text=f"✅ Đã xử lý {total} file")
+                    # Đánh dấu khách hàng/TSĐB trùng giữa các file trong lô và với hồ sơ đã lưu
+                    for result, report in zip(results, duplicates.find_batch_duplicates(results, get_case_store())):
+                        result['duplicates'] = report
+                    st.session_state.batch_results = results
+                    st.rerun()
+
+        case_view.render_save()
+
+        extraction_stats = get_extraction_cache().stats()
+        st.caption(f"⚡ Kết quả trích xuất đã lưu: {extraction_stats['size']} file "
+                   f"({extraction_stats['bytes'] / 1024 / 1024:.1f}/{extraction_stats['max_bytes'] / 1024 / 1024:.0f} MB) · "
+                   f"{extraction_stats['hits']} lần dùng lại")
+
+        st.markdown("---")
+        with st.expander("ℹ️ Hướng dẫn xử lý lỗi Rate Limit"):
+            st.markdown("""
+            **Nếu gặp lỗi 429:**
+            1. Đợi 1-2 phút
+            2. Chọn model khác
+            3. Kiểm tra quota: [AI Studio](https://ai.dev/usage)
+            4. Tạo API key mới nếu cần
+            """)
+
+    return {
+        'api_key': api_key,
+        'model': selected_model,
+        'model_display': selected_model_display,
+        'token_budget': token_budget,
+        'bypass_cache': bypass_ai_cache,
+    }
@@ -0,0 +1,44 @@
+"""Khởi tạo và cập nhật session state."""
+import streamlit as st
+
+from thamdinh.finance import cached_financial_metrics
+
+_DEFAULTS = {
+    'data_extracted': False,
+    'customer_info': dict,
+    'financial_info': dict,
+    'collateral_info': dict,
+    'chat_history': list,
+    'chat_summary': "",
+    'chat_summarized': 0,
+    'data_modified': False,
+    'uploaded_content': "",
+    'case_id': None,
+    'source_file': "",
+    'duplicates': None,
+}
+
+
+# Hàm khởi tạo session state
+def init_session_state():
+    for key, default in _DEFAULTS.items():
+        if key not in st.session_state:
+            st.session_state[key] = default() if callable(default) else default
+
+
+# Hàm đánh dấu hồ sơ vừa mở là hồ sơ mới (chưa lưu vào kho hồ sơ)
+def start_new_case(source_file=""):
+    st.session_state.case_id = None
+    st.session_state.source_file = source_file
+    st.query_params.pop('case', None)
+
+
+# Hàm cập nhật chỉ tiêu tài chính của hồ sơ đang mở
+def refresh_metrics():
+    """Tính lại (có bộ nhớ đệm) trước khi vẽ tab, vì chỉ tab đang mở được chạy
+    nên các tab biểu đồ, phân tích AI, xuất dữ liệu không thể dựa vào tab chỉ tiêu"""
+    metrics = cached_financial_metrics(st.session_state.financial_info)
+    if 'schedule' in metrics:
+        st.session_state.metrics = metrics
+    return metrics
+
@@ -0,0 +1,65 @@
+"""CSS, tiêu đề và chân trang dùng chung."""
+import streamlit as st
+
+PAGE_CSS = """
+<style>
+    .main-header {
+        font-size: 2.5rem;
+        font-weight: bold;
+        color: #1f77b4;
+        text-align: center;
+        padding: 1rem 0;
+        background: linear-gradient(90deg, #e3f2fd 0%, #bbdefb 100%);
+        border-radius: 10px;
+        margin-bottom: 2rem;
+    }
+    .metric-card {
+        background: white;
+        padding: 1rem;
+        border-radius: 10px;
+        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+    }
+    .stTabs [data-baseweb="tab-list"] {
+        gap: 24px;
+    }
+    .stTabs [data-baseweb="tab"] {
+        height: 50px;
+        padding: 0 24px;
+        background-color: #f0f2f6;
+        border-radius: 5px 5px 0 0;
+    }
+    .stTabs [aria-selected="true"] {
+        background-color: #1f77b4;
+        color: white;
+    }
+    div[data-testid="stNumberInput"] input {
+        font-weight: bold;
+        color: #1f77b4;
+    }
+</style>
+"""
+
+HEADER_HTML = '<div class="main-header">🏦 HỆ THỐNG THẨM ĐỊNH PHƯƠNG ÁN KINH DOANH</div>'
+
+FOOTER_HTML = """
+<div style='text-align: center; color: #666; padding: 1rem;'>
+    <p>🏦 Hệ Thống Thẩm Định Phương Án Kinh Doanh v1.1</p>
+    <p>Powered by Streamlit & Google Gemini AI | With Rate Limit Protection</p>
+</div>
+"""
+
+
+# Hàm chèn CSS tùy chỉnh
+def apply_styles():
+    st.markdown(PAGE_CSS, unsafe_allow_html=True)
+
+
+# Hàm hiển thị tiêu đề trang
+def render_header():
+    st.markdown(HEADER_HTML, unsafe_allow_html=True)
+
+
+# Hàm hiển thị chân trang
+def render_footer():
+    st.markdown("---")
+    st.markdown(FOOTER_HTML, unsafe_allow_html=True)
@@ -0,0 +1,99 @@
+"""Tab phân tích bằng AI Gemini."""
+import time
+
+import streamlit as st
+
+from giaodien.ai import (analyze_with_gemini, build_metrics_summary, format_ai_error, show_analysis,
+                         start_analysis_stream, stream_info)
+from giaodien.resources import get_ai_response_cache
+from thamdinh import llm
+
+
+# Hàm hiển thị tab phân tích AI
+def render(settings):
+    api_key = settings['api_key']
+    selected_model = settings['model']
+    selected_model_display = settings['model_display']
+    bypass_ai_cache = settings['bypass_cache']
+    token_budget = settings['token_budget']
+
+    st.subheader("🤖 Phân Tích Bằng AI Gemini")
+
+    if not api_key:
+        st.warning("⚠️ Vui lòng nhập API Key ở sidebar để sử dụng tính năng này!")
+    elif not llm.GENAI_AVAILABLE:
+        st.error("⚠️ Thư viện google-generativeai chưa được cài đặt!")
+    else:
+        st.info(f"🤖 **Model đang sử dụng:** {selected_model_display}")
+
+        has_metrics = bool(st.session_state.get('metrics'))
+        run_all = st.button("⚡ Phân Tích Toàn Bộ (chạy song song)", use_container_width=True,
+                            disabled=not (st.session_state.uploaded_content and has_metrics),
+                            help="Gửi đồng thời yêu cầu phân tích file và phân tích chỉ số")
+
+        analysis_sources = {
+            'file': "File Upload (.docx)",
+            'metrics': "Các chỉ số tài chính đã nhập",
+        }
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.markdown("### 📄 Phân Tích Từ File Upload")
+            run_file = st.button("🔍 Phân Tích File", use_container_width=True)
+            file_slot = st.empty()
+
+        with col2:
+            st.markdown("### 📊 Phân Tích Từ Các Chỉ Số")
+            run_metrics = st.button("🔍 Phân Tích Chỉ Số", use_container_width=True)
+            metrics_slot = st.empty()
+
+        slots = {'file': file_slot, 'metrics': metrics_slot}
+        for source, slot in slots.items():
+            if f'analysis_{source}' in st.session_state:
+                with slot.container():
+                    show_analysis(analysis_sources[source], st.session_state[f'analysis_{source}'],
+                                  st.session_state.get(f'analysis_{source}_info'))
+
+        single_requests = []
+        if run_file and st.session_state.uploaded_content:
+            single_requests.append(('file', st.session_state.uploaded_content))
+        if run_metrics and has_metrics:
+            single_requests.append(('metrics', build_metrics_summary()))
+        for source, data_content in single_requests:
+            with slots[source].container():
+                st.markdown("#### Kết Quả Phân Tích:")
+                st.info(f"**Nguồn dữ liệu:** {analysis_sources[source]}")
+                analysis, info = analyze_with_gemini(api_key, source, data_content, selected_model, bypass_ai_cache,
+                                                     token_budget)
+            st.session_state[f'analysis_{source}'] = analysis
+            st.session_state[f'analysis_{source}_info'] = info
+            with slots[source].container():
+                show_analysis(analysis_sources[source], analysis, info)
+
+        if run_all:
+            # Hai yêu cầu chạy trên luồng phụ, không có ScriptRunContext nên không được gọi Streamlit: bộ nhớ đệm
+            # (st.cache_resource) và nội dung từ session state được lấy sẵn ở đây rồi truyền vào dưới dạng đối tượng
+            # thường; luồng chính nhận từng đoạn văn bản và cập nhật khung tương ứng
+            cache = get_ai_response_cache()
+            jobs = {}
+            for source, data_content in (('file', st.session_state.uploaded_content),
+                                         ('metrics', build_metrics_summary())):
+                jobs[source] = lambda source=source, data_content=data_content: start_analysis_stream(
+                    cache, api_key, source, data_content, selected_model, bypass_ai_cache, token_budget)
+                slots[source].info("⏳ Đang phân tích...")
+            partial = {source: '' for source in jobs}
+            start = time.perf_counter()
+            for source, chunk, stream, error in llm.stream_concurrently(jobs):
+                if chunk is not None:
+                    partial[source] += chunk
+                    slots[source].markdown(partial[source])
+                    continue
+                if error is None:
+                    analysis, info = stream.text, stream_info(stream)
+                else:
+                    analysis, info = format_ai_error(error), None
+                st.session_state[f'analysis_{source}'] = analysis
+                st.session_state[f'analysis_{source}_info'] = info
+                with slots[source].container():
+                    show_analysis(analysis_sources[source], analysis, info)
+            st.caption(f"⏱️ Hoàn tất cả hai phân tích sau {time.perf_counter() - start:.1f} giây")
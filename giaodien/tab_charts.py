@@ -0,0 +1,64 @@
+"""Tab biểu đồ phân tích."""
+import importlib.util
+
+import streamlit as st
+
+from giaodien.resources import cached_figure, get_chart_cache
+from thamdinh.finance import metrics_cache_key
+
+
+# Hàm chọn chế độ vẽ biểu đồ đường
+def render_mode_picker(key):
+    from thamdinh.charts import RENDER_MODES
+
+    return st.radio("Chế độ vẽ:", list(RENDER_MODES), format_func=RENDER_MODES.get, horizontal=True, key=key,
+                    help="Tự động: WebGL khi biểu đồ có nhiều điểm, SVG khi ít điểm")
+
+
+# Hàm hiển thị tab biểu đồ
+def render():
+    st.subheader("📈 Biểu Đồ Phân Tích")
+
+    # Plotly chỉ được nạp khi dựng biểu đồ (lần đầu mở tab hoặc khi dữ liệu đổi)
+    if importlib.util.find_spec('plotly') is None:
+        st.warning("⚠️ Thư viện Plotly chưa được cài đặt. Biểu đồ không khả dụng.")
+        st.info("Để sử dụng biểu đồ, vui lòng cài đặt: `pip install plotly`")
+        return
+    from thamdinh import charts
+
+    if 'metrics' in st.session_state and st.session_state.metrics:
+        metrics = st.session_state.metrics
+        financial_info = st.session_state.financial_info
+        render_mode = render_mode_picker('chart_render_mode')
+        # Biểu đồ được dựng một lần cho mỗi bộ thông tin tài chính và chế độ vẽ
+        key = metrics_cache_key(financial_info) + (render_mode,)
+
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.markdown("#### Cơ Cấu Thanh Toán Tháng Đầu")
+            st.plotly_chart(cached_figure('payment_mix', key, lambda: charts.payment_mix_figure(metrics)),
+                            use_container_width=True)
+
+            st.markdown("#### Thu Chi Hàng Tháng")
+            st.plotly_chart(cached_figure('income_expense', key,
+                                          lambda: charts.income_expense_figure(financial_info, metrics)),
+                            use_container_width=True)
+
+        with col2:
+            if 'schedule' in metrics:
+                schedule = metrics['schedule']
+                st.markdown("#### Diễn Biến Dư Nợ")
+                st.plotly_chart(cached_figure('balance', key, lambda: charts.balance_figure(schedule, render_mode)),
+                                use_container_width=True)
+
+                st.markdown("#### Gốc & Lãi Theo Tháng")
+                st.plotly_chart(cached_figure('principal_interest', key,
+                                              lambda: charts.principal_interest_figure(schedule, render_mode)),
+                                use_container_width=True)
+
+        chart_stats = get_chart_cache().stats()
+        st.caption(f"⚡ Bộ nhớ đệm biểu đồ: {chart_stats['hits']} lần dùng lại / {chart_stats['misses']} lần dựng mới "
+                   f"({chart_stats['size']}/{chart_stats['maxsize']} mục)")
+    else:
+        st.info("Vui lòng nhập đầy đủ thông tin tài chính để xem biểu đồ")
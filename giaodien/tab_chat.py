@@ -0,0 +1,116 @@
+"""Tab chatbox AI nhiều lượt."""
+import streamlit as st
+
+from giaodien.ai import describe_response, stream_info, stream_with_cache, warn_rate_limit_wait
+from giaodien.resources import get_ai_response_cache
+from thamdinh import chat, llm, retrieval
+from thamdinh.formatting import format_number
+
+
+# Hàm hiển thị tab chatbox
+def render(settings):
+    api_key = settings['api_key']
+    selected_model = settings['model']
+    selected_model_display = settings['model_display']
+    bypass_ai_cache = settings['bypass_cache']
+
+    st.subheader("💬 Chatbox AI Gemini")
+
+    if not api_key:
+        st.warning("⚠️ Vui lòng nhập API Key ở sidebar để sử dụng tính năng này!")
+    elif not llm.GENAI_AVAILABLE:
+        st.error("⚠️ Thư viện google-generativeai chưa được cài đặt!")
+    else:
+        st.info(f"🤖 **Model đang sử dụng:** {selected_model_display}")
+
+        history = st.session_state.chat_history
+        pages = chat.page_count(history)
+        page = pages
+        if pages > 1:
+            page = st.selectbox("Trang lịch sử:", list(range(1, pages + 1)), index=pages - 1,
+                                format_func=lambda number: f"Trang {number}/{pages}" + (" (mới nhất)" if number == pages else ""))
+        if st.session_state.chat_summary:
+            with st.expander("📝 Tóm tắt phần hội thoại cũ (gửi kèm thay cho toàn bộ lịch sử)"):
+                st.write(st.session_state.chat_summary)
+
+        chat_container = st.container()
+        with chat_container:
+            for message in chat.page_messages(history, page):
+                if message['role'] == 'user':
+                    st.markdown(f"**👤 Bạn:** {message['content']}")
+                else:
+                    st.markdown(f"**🤖 AI:** {message['content']}")
+                    if describe_response(message.get('info')):
+                        st.caption(describe_response(message.get('info')))
+                st.markdown("---")
+
+        col1, col2 = st.columns([5, 1])
+        with col1:
+            user_input = st.text_input("Nhập câu hỏi của bạn:", key="chat_input")
+        with col2:
+            send_chat = st.button("Gửi", use_container_width=True)
+
+        if send_chat and user_input:
+            context = f"""
+Thông tin khách hàng và dự án:
+- Tên: {st.session_state.customer_info.get('name', 'N/A')}
+- Số tiền vay: {format_number(st.session_state.financial_info.get('loan_amount', 0))} đồng
+- Lãi suất: {st.session_state.financial_info.get('interest_rate', 0)}%
+- Thu nhập: {format_number(st.session_state.financial_info.get('monthly_income', 0))} đồng/tháng
+"""
+            # Chỉ gửi kèm các đoạn PASDV liên quan nhất đến câu hỏi để prompt không lớn theo độ dài tài liệu
+            excerpts = []
+            if st.session_state.uploaded_content:
+                excerpts = retrieval.get_document_index(st.session_state.uploaded_content).top_chunks(user_input)
+            if excerpts:
+                context += "\nCác đoạn liên quan trong phương án sử dụng vốn:\n" + "\n---\n".join(excerpts) + "\n"
+
+            with chat_container:
+                st.markdown(f"**👤 Bạn:** {user_input}")
+                st.markdown("**🤖 AI:**")
+                cache = get_ai_response_cache()
+                try:
+                    # Tin nhắn rơi khỏi cửa sổ gần nhất được gộp vào bản tóm tắt trước khi gửi
+                    start = chat.window_start(history)
+                    if start > st.session_state.chat_summarized:
+                        with st.spinner("Đang tóm tắt phần hội thoại cũ..."):
+                            st.session_state.chat_summary = chat.update_summary(
+                                st.session_state.chat_summary, history[st.session_state.chat_summarized:start],
+                                lambda prompt: ''.join(stream_with_cache(cache, api_key, selected_model, prompt,
+                                                                         bypass_ai_cache,
+                                                                         on_wait=warn_rate_limit_wait)))
+                        st.session_state.chat_summarized = start
+                    window_size = len(history) - start
+                    contents = chat.build_contents(history[start:], user_input, context, st.session_state.chat_summary)
+                    stream = stream_with_cache(cache, api_key, selected_model, contents, bypass_ai_cache,
+                                               on_wait=warn_rate_limit_wait)
+                    st.write_stream(stream)
+
+                    history.append({
+                        'role': 'user',
+                        'content': user_input
+                    })
+                    history.append({
+                        'role': 'assistant',
+                        'content': stream.text,
+                        'info': dict(stream_info(stream), excerpts=len(excerpts), window=window_size)
+                    })
+                except Exception as e:
+                    ai_response = f"❌ Lỗi: {str(e)}"
+                    history.append({
+                        'role': 'user',
+                        'content': user_input
+                    })
+                    history.append({
+                        'role': 'assistant',
+                        'content': ai_response,
+                        'error': True
+                    })
+
+            st.rerun()
+
+        if st.button("🗑️ Xóa Lịch Sử Chat", use_container_width=True):
+            st.session_state.chat_history = []
+            st.session_state.chat_summary = ""
+            st.session_state.chat_summarized = 0
+            st.rerun()
@@ -0,0 +1,116 @@
+"""Tab xuất dữ liệu."""
+from datetime import datetime
+
+import streamlit as st
+
+from giaodien.exports import export_appraisal_pdf, export_appraisal_report, export_to_excel
+from giaodien.resources import schedule_column_config, schedule_table
+
+
+# Hàm chọn file mẫu báo cáo Word (dùng cho báo cáo từng hồ sơ và hàng loạt)
+def render_template_picker(key):
+    """Trả về bytes file mẫu đã tải lên (hợp lệ), hoặc None để dùng mẫu mặc định"""
+    from thamdinh.word_report import default_template, load_template
+
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        uploaded = st.file_uploader("Mẫu báo cáo (.docx, để trống để dùng mẫu mặc định)", type=['docx'], key=key)
+    with col2:
+        st.download_button(
+            label="📄 Tải Mẫu Mặc Định",
+            data=default_template,
+            file_name="mau_bao_cao_tham_dinh.docx",
+            mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+            use_container_width=True,
+            key=f"{key}_default"
+        )
+    st.caption("Trong mẫu: {{customer.name}}, {{financial.loan_amount}}, {{metrics.dscr}}...; hàng bảng có "
+               "{{row.month}}, {{row.payment}}... được lặp cho từng tháng; ảnh có alt text {{chart.balance}} "
+               "hoặc {{chart.payment}} được thay bằng biểu đồ.")
+    if uploaded is None:
+        return None
+    template = uploaded.getvalue()
+    try:
+        load_template(template)
+    except (ValueError, SyntaxError) as e:
+        st.error(f"❌ File mẫu không hợp lệ, dùng mẫu mặc định: {e}")
+        return None
+    return template
+
+
+# Hàm hiển thị tab xuất dữ liệu
+def render():
+    st.subheader("📥 Xuất Dữ Liệu")
+
+    export_option = st.selectbox(
+        "Chọn loại dữ liệu xuất:",
+        ["Bảng kế hoạch trả nợ (Excel)", "Báo cáo thẩm định (Word)", "Báo cáo thẩm định (PDF)"]
+    )
+
+    if export_option == "Bảng kế hoạch trả nợ (Excel)":
+        st.markdown("### 📊 Xuất Bảng Kế Hoạch Trả Nợ")
+
+        if st.session_state.get('metrics'):
+            repayment_schedule = schedule_table(st.session_state.financial_info, st.session_state.metrics)
+            st.dataframe(repayment_schedule, use_container_width=True, column_config=schedule_column_config())
+
+            # File chỉ được dựng khi bấm tải (trên luồng riêng, không gọi Streamlit)
+            financial_info = dict(st.session_state.financial_info)
+            metrics = st.session_state.metrics
+            customer_info = dict(st.session_state.customer_info)
+            st.download_button(
+                label="📥 Tải Xuống Excel",
+                data=lambda: export_to_excel(financial_info, metrics, customer_info),
+                file_name=f"ke_hoach_tra_no_{datetime.now().strftime('%Y%m%d')}.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                use_container_width=True
+            )
+        else:
+            st.warning("⚠️ Chưa có dữ liệu kế hoạch trả nợ!")
+
+    elif export_option == "Báo cáo thẩm định (Word)":
+        st.markdown("### 📄 Xuất Báo Cáo Thẩm Định")
+
+        if 'metrics' in st.session_state:
+            template = render_template_picker('report_template')
+            charts = st.checkbox("Kèm biểu đồ lịch trả nợ", value=True, key='report_charts')
+
+            # Báo cáo chỉ được dựng khi bấm tải (trên luồng riêng, không gọi Streamlit)
+            customer_info = dict(st.session_state.customer_info)
+            financial_info = dict(st.session_state.financial_info)
+            collateral_info = dict(st.session_state.collateral_info)
+            metrics = st.session_state.metrics
+            analysis_file = st.session_state.get('analysis_file', '')
+            analysis_metrics = st.session_state.get('analysis_metrics', '')
+            st.download_button(
+                label="📥 Tải Xuống Word",
+                data=lambda: export_appraisal_report(customer_info, financial_info, collateral_info, metrics,
+                                                     analysis_file, analysis_metrics, template, charts),
+                file_name=f"bao_cao_tham_dinh_{datetime.now().strftime('%Y%m%d')}.docx",
+                mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+                use_container_width=True
+            )
+        else:
+            st.warning("⚠️ Chưa có dữ liệu để xuất báo cáo!")
+
+    else:
+        st.markdown("### 🧾 Xuất Báo Cáo Thẩm Định (PDF)")
+
+        if 'metrics' in st.session_state:
+            # Báo cáo chỉ được dựng khi bấm tải (trên luồng riêng, không gọi Streamlit)
+            customer_info = dict(st.session_state.customer_info)
+            financial_info = dict(st.session_state.financial_info)
+            collateral_info = dict(st.session_state.collateral_info)
+            metrics = st.session_state.metrics
+            analysis_file = st.session_state.get('analysis_file', '')
+            analysis_metrics = st.session_state.get('analysis_metrics', '')
+            st.download_button(
+                label="📥 Tải Xuống PDF",
+                data=lambda: export_appraisal_pdf(customer_info, financial_info, collateral_info, metrics,
+                                                  analysis_file, analysis_metrics),
+                file_name=f"bao_cao_tham_dinh_{datetime.now().strftime('%Y%m%d')}.pdf",
+                mime="application/pdf",
+                use_container_width=True
+            )
+        else:
+            st.warning("⚠️ Chưa có dữ liệu để xuất báo cáo!")
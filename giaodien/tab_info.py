@@ -0,0 +1,212 @@
+"""Các tab nhập liệu: thông tin khách hàng, tài chính và tài sản đảm bảo."""
+import streamlit as st
+
+from thamdinh.amortization import REPAYMENT_METHODS
+from thamdinh.finance import DSCR_MIN, DTI_MAX, LTV_MAX, LTV_WARNING
+from thamdinh.formatting import format_number, parse_number
+
+
+# Hàm hiển thị tab thông tin khách hàng
+def render_customer():
+    st.subheader("📋 Thông Tin Định Danh Khách Hàng")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        name = st.text_input("Họ và tên:", value=st.session_state.customer_info.get('name', ''))
+        cccd = st.text_input("CCCD:", value=st.session_state.customer_info.get('cccd', ''))
+        phone = st.text_input("Số điện thoại:", value=st.session_state.customer_info.get('phone', ''))
+
+    with col2:
+        email = st.text_input("Email:", value=st.session_state.customer_info.get('email', ''))
+        address = st.text_area("Địa chỉ:", value=st.session_state.customer_info.get('address', ''), height=100)
+
+    if st.button("💾 Lưu Thay Đổi", key="save_customer"):
+        st.session_state.customer_info.update({
+            'name': name,
+            'cccd': cccd,
+            'phone': phone,
+            'email': email,
+            'address': address
+        })
+        st.session_state.data_modified = True
+        st.success("✅ Đã lưu thay đổi!")
+
+
+# Hàm hiển thị tab thông tin tài chính
+def render_financial():
+    st.subheader("💰 Thông Tin Tài Chính")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.markdown("#### Thông Tin Vay Vốn")
+        purpose = st.text_area("Mục đích vay:", value=st.session_state.financial_info.get('purpose', ''), height=80)
+
+        total_need_input = st.text_input("Tổng nhu cầu vốn (đồng):", 
+                                    value=format_number(st.session_state.financial_info.get('total_need', 0)),
+                                    help="Nhập số, có thể dùng dấu chấm phân cách")
+        total_need = parse_number(total_need_input)
+
+        equity_input = st.text_input("Vốn đối ứng (đồng):", 
+                                value=format_number(st.session_state.financial_info.get('equity', 0)),
+                                help="Nhập số, có thể dùng dấu chấm phân cách")
+        equity = parse_number(equity_input)
+
+        loan_amount_input = st.text_input("Số tiền vay (đồng):", 
+                                     value=format_number(st.session_state.financial_info.get('loan_amount', 0)),
+                                     help="Nhập số, có thể dùng dấu chấm phân cách")
+        loan_amount = parse_number(loan_amount_input)
+
+        interest_rate_input = st.text_input("Lãi suất (%/năm):", 
+                                       value=str(st.session_state.financial_info.get('interest_rate', 8.5)).replace('.', ','),
+                                       help="Ví dụ: 8,5 hoặc 8.5")
+        interest_rate = float(interest_rate_input.replace(',', '.')) if interest_rate_input else 0
+
+        loan_term_input = st.text_input("Thời hạn vay (tháng):", 
+                                   value=str(int(st.session_state.financial_info.get('loan_term', 60))),
+                                   help="Nhập số tháng")
+        loan_term = int(loan_term_input) if loan_term_input else 0
+
+        method_keys = list(REPAYMENT_METHODS)
+        current_method = st.session_state.financial_info.get('repayment_method', method_keys[0])
+        repayment_method = st.selectbox("Phương thức trả nợ:", method_keys,
+                                        index=method_keys.index(current_method) if current_method in method_keys else 0,
+                                        format_func=lambda key: REPAYMENT_METHODS[key])
+
+        grace_months = st.number_input("Ân hạn gốc (tháng):", min_value=0, max_value=max(loan_term - 1, 0),
+                                       value=min(int(st.session_state.financial_info.get('grace_months', 0)), max(loan_term - 1, 0)),
+                                       help="Số tháng đầu chỉ trả lãi")
+
+        balloon_amount_input = st.text_input("Gốc trả cuối kỳ (đồng):", 
+                                        value=format_number(st.session_state.financial_info.get('balloon_amount', 0)),
+                                        help="Phần gốc trả một lần vào tháng cuối, để 0 nếu không có")
+        balloon_amount = parse_number(balloon_amount_input)
+
+    with col2:
+        st.markdown("#### Thu Chi Hàng Tháng")
+
+        monthly_income_input = st.text_input("Thu nhập hàng tháng (đồng):", 
+                                        value=format_number(st.session_state.financial_info.get('monthly_income', 0)),
+                                        help="Nhập số, có thể dùng dấu chấm phân cách")
+        monthly_income = parse_number(monthly_income_input)
+
+        monthly_expense_input = st.text_input("Chi phí hàng tháng (đồng):", 
+                                         value=format_number(st.session_state.financial_info.get('monthly_expense', 0)),
+                                         help="Nhập số, có thể dùng dấu chấm phân cách")
+        monthly_expense = parse_number(monthly_expense_input)
+
+        project_income_input = st.text_input("Thu nhập từ dự án (đồng/tháng):", 
+                                        value=format_number(st.session_state.financial_info.get('project_income', 0)),
+                                        help="Nhập số, có thể dùng dấu chấm phân cách")
+        project_income = parse_number(project_income_input)
+
+        if total_need > 0:
+            equity_ratio = (equity / total_need) * 100
+            st.metric("Tỷ lệ vốn đối ứng", f"{equity_ratio:.2f}%")
+
+    render_policy_limits({
+        'loan_amount': loan_amount,
+        'interest_rate': interest_rate,
+        'loan_term': loan_term,
+        'repayment_method': repayment_method,
+        'grace_months': int(grace_months),
+        'balloon_amount': balloon_amount,
+        'monthly_income': monthly_income,
+        'monthly_expense': monthly_expense,
+    })
+
+    if st.button("💾 Lưu Thay Đổi", key="save_financial"):
+        st.session_state.financial_info.update({
+            'purpose': purpose,
+            'total_need': total_need,
+            'equity': equity,
+            'loan_amount': loan_amount,
+            'interest_rate': interest_rate,
+            'loan_term': loan_term,
+            'repayment_method': repayment_method,
+            'grace_months': int(grace_months),
+            'balloon_amount': balloon_amount,
+            'monthly_income': monthly_income,
+            'monthly_expense': monthly_expense,
+            'project_income': project_income
+        })
+        st.session_state.data_modified = True
+        st.success("✅ Đã lưu thay đổi!")
+
+
+# Hàm hiển thị giới hạn khoản vay theo chính sách (DSCR, DTI, LTV) cho số liệu đang nhập
+def render_policy_limits(financial_info):
+    import math
+
+    from thamdinh.solver import MAX_TERM, solve_case
+
+    st.markdown("#### 🎯 Giới Hạn Theo Chính Sách")
+    limits = solve_case(financial_info, st.session_state.collateral_info)
+    if math.isnan(limits['max_loan']):
+        st.info("Nhập số tiền vay và thời hạn để xem giới hạn theo chính sách")
+        return
+    col1, col2, col3 = st.columns(3)
+    ltv_limit = (f"{format_number(limits['max_loan_ltv'])} đ" if math.isfinite(limits['max_loan_ltv'])
+                 else "chưa có giá trị tài sản đảm bảo")
+    col1.metric("Số tiền vay tối đa", f"{format_number(limits['max_loan'])} đ",
+                help=f"Theo DSCR/DTI: {format_number(limits['max_loan_debt_service'])} đ · Theo LTV: {ltv_limit}")
+    col2.metric("Thời hạn tối thiểu",
+                f"{limits['min_term']:.0f} tháng" if not math.isnan(limits['min_term']) else "Không đạt",
+                help=f"Với số tiền vay và lãi suất hiện tại (tối đa {MAX_TERM} tháng)")
+    col3.metric("Lãi suất tối đa",
+                f"{limits['max_rate']:.2f}%/năm" if not math.isnan(limits['max_rate']) else "Không đạt",
+                help="Với số tiền vay và thời hạn hiện tại")
+    st.caption(f"Khoản trả tối đa {format_number(limits['max_installment'])} đ/tháng để DSCR ≥ {DSCR_MIN} và "
+               f"DTI ≤ {DTI_MAX}%; số tiền vay không quá {LTV_MAX}% giá trị tài sản đảm bảo")
+    if limits['passed']:
+        st.success("✅ Phương án hiện tại đạt DSCR, DTI và LTV")
+    else:
+        st.warning("⚠️ Phương án hiện tại chưa đạt chính sách")
+
+
+# Hàm hiển thị tab tài sản đảm bảo
+def render_collateral():
+    st.subheader("🏠 Tài Sản Đảm Bảo")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        collateral_type = st.text_input("Loại tài sản:", 
+                                       value=st.session_state.collateral_info.get('type', ''))
+
+        collateral_value_input = st.text_input("Giá trị tài sản (đồng):", 
+                                          value=format_number(st.session_state.collateral_info.get('value', 0)),
+                                          help="Nhập số, có thể dùng dấu chấm phân cách")
+        collateral_value = parse_number(collateral_value_input)
+
+        collateral_area_input = st.text_input("Diện tích (m²):", 
+                                         value=str(st.session_state.collateral_info.get('area', 0)).replace('.', ','),
+                                         help="Ví dụ: 120,50 hoặc 120.5")
+        collateral_area = float(collateral_area_input.replace(',', '.')) if collateral_area_input else 0
+
+    with col2:
+        collateral_address = st.text_area("Địa chỉ tài sản:", 
+                                         value=st.session_state.collateral_info.get('address', ''),
+                                         height=100)
+
+        if collateral_value > 0 and st.session_state.financial_info.get('loan_amount', 0) > 0:
+            ltv = (st.session_state.financial_info['loan_amount'] / collateral_value) * 100
+            st.metric("Tỷ lệ LTV", f"{ltv:.2f}%")
+
+            if ltv > LTV_WARNING:
+                st.warning(f"⚠️ LTV cao hơn {LTV_WARNING}%")
+            elif ltv > LTV_MAX:
+                st.info(f"ℹ️ LTV trong khoảng {LTV_MAX}-{LTV_WARNING}%")
+            else:
+                st.success(f"✅ LTV dưới {LTV_MAX}%")
+
+    if st.button("💾 Lưu Thay Đổi", key="save_collateral"):
+        st.session_state.collateral_info.update({
+            'type': collateral_type,
+            'value': collateral_value,
+            'area': collateral_area,
+            'address': collateral_address
+        })
+        st.session_state.data_modified = True
+        st.success("✅ Đã lưu thay đổi!")
@@ -0,0 +1,221 @@
+"""Tab chỉ tiêu tài chính và kế hoạch trả nợ."""
+import importlib.util
+import time
+
+import streamlit as st
+
+from giaodien.resources import get_schedule_table_cache, schedule_column_config, schedule_table
+from thamdinh.finance import DSCR_MIN, DTI_MAX, METRICS_CACHE, cached_financial_metrics, metrics_cache_key
+from thamdinh.formatting import format_number
+
+
+# Hàm hiển thị tab chỉ tiêu và kế hoạch trả nợ
+def render():
+    st.subheader("📊 Các Chỉ Tiêu Tài Chính & Kế Hoạch Trả Nợ")
+
+    metrics = cached_financial_metrics(st.session_state.financial_info)
+
+    if metrics:
+        col1, col2, col3, col4 = st.columns(4)
+
+        with col1:
+            st.metric("Trả nợ gốc/tháng", 
+                     f"{format_number(metrics.get('monthly_principal', 0))} đ")
+        with col2:
+            st.metric("Trả lãi tháng đầu", 
+                     f"{format_number(metrics.get('first_month_interest', 0))} đ")
+        with col3:
+            st.metric("Tổng trả tháng đầu", 
+                     f"{format_number(metrics.get('first_month_payment', 0))} đ")
+        with col4:
+            st.metric("Tổng lãi phải trả", 
+                     f"{format_number(metrics.get('total_interest', 0))} đ")
+
+        st.markdown("---")
+
+        col1, col2, col3, col4 = st.columns(4)
+
+        with col1:
+            st.metric("Thu nhập ròng/tháng", 
+                     f"{format_number(metrics.get('net_income', 0))} đ")
+        with col2:
+            debt_ratio = metrics.get('debt_service_ratio', 0)
+            st.metric("Tỷ lệ trả nợ/Thu nhập", 
+                     f"{debt_ratio:.2f}%",
+                     delta="Tốt" if debt_ratio <= DTI_MAX else "Cao")
+        with col3:
+            st.metric("Số dư sau trả nợ", 
+                     f"{format_number(metrics.get('surplus', 0))} đ")
+        with col4:
+            dscr = metrics.get('dscr', 0)
+            st.metric("DSCR", 
+                     f"{dscr:.2f}",
+                     delta="Tốt" if dscr >= DSCR_MIN else "Thấp")
+
+        st.markdown("---")
+        st.markdown("### 📅 Kế Hoạch Trả Nợ Chi Tiết")
+
+        if 'schedule' in metrics:
+            df = schedule_table(st.session_state.financial_info, metrics)
+            st.dataframe(df, use_container_width=True, height=400, column_config=schedule_column_config())
+
+        metrics_stats = METRICS_CACHE.stats()
+        table_stats = get_schedule_table_cache().stats()
+        st.caption(f"⚡ Bộ nhớ đệm chỉ tiêu: {metrics_stats['hits']} lần dùng lại / {metrics_stats['misses']} lần tính mới "
+                   f"({metrics_stats['size']}/{metrics_stats['maxsize']} mục) · "
+                   f"Bảng lịch trả nợ: {table_stats['hits']} lần dùng lại / {table_stats['misses']} lần tính mới")
+
+        st.markdown("---")
+        render_stress_test(st.session_state.financial_info)
+
+        st.markdown("---")
+        render_monte_carlo(st.session_state.financial_info, metrics)
+
+
+# Hàm hiển thị kiểm tra sức chịu đựng: lưới lãi suất × thu nhập × chi phí × thời hạn
+def render_stress_test(financial_info):
+    st.markdown("### 🧪 Kiểm Tra Sức Chịu Đựng (Stress Test)")
+    if importlib.util.find_spec('plotly') is None:
+        st.info("Cài đặt Plotly để xem bản đồ nhiệt: `pip install plotly`")
+        return
+    import numpy as np
+
+    from thamdinh.charts import stress_heatmap
+    from thamdinh.stress import STRESS_AXES, axis_values, grid_slice, pass_share, stress_grid
+
+    base_term = min(max(int(financial_info.get('loan_term', 0) or 0), 1), 480)
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        rate_range = st.slider("Lãi suất tăng/giảm (điểm %)", -5.0, 10.0, (0.0, 3.0), step=0.25, key='stress_rate')
+        rate_step = st.select_slider("Bước lãi suất", [0.1, 0.25, 0.5, 1.0], value=0.5, key='stress_rate_step')
+    with col2:
+        income_range = st.slider("Thu nhập thay đổi (%)", -80, 50, (-30, 0), step=1, key='stress_income')
+        income_step = st.select_slider("Bước thu nhập", [1, 2, 5, 10], value=5, key='stress_income_step')
+    with col3:
+        expense_range = st.slider("Chi phí thay đổi (%)", -50, 100, (0, 30), step=1, key='stress_expense')
+        expense_step = st.select_slider("Bước chi phí", [1, 2, 5, 10], value=10, key='stress_expense_step')
+    with col4:
+        term_range = st.slider("Thời hạn (tháng)", 1, 480, (base_term, base_term), key='stress_term')
+        term_step = st.select_slider("Bước thời hạn", [1, 6, 12, 24, 60], value=12, key='stress_term_step')
+
+    start = time.perf_counter()
+    try:
+        grid = stress_grid(financial_info, axis_values(*rate_range, rate_step),
+                           axis_values(*income_range, income_step), axis_values(*expense_range, expense_step),
+                           axis_values(*term_range, term_step))
+    except ValueError as e:
+        st.warning(f"⚠️ {e}")
+        return
+    seconds = time.perf_counter() - start
+    axes = grid['axes']
+
+    total = grid['passed'].size
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Số kịch bản", format_number(total))
+    col2.metric("Đạt cả DSCR và DTI", f"{grid['passed'].mean() * 100:.1f}%")
+    col3.metric("DSCR thấp nhất", f"{np.nanmin(grid['dscr']):.2f}")
+    col4.metric("DTI cao nhất", f"{np.nanmax(grid['dti']):.1f}%")
+    st.caption(f"Ngưỡng: DSCR ≥ {DSCR_MIN}, DTI ≤ {DTI_MAX}% · tính {format_number(total)} kịch bản trong "
+               f"{seconds * 1000:.0f} ms")
+
+    # Hai chiều làm trục bản đồ nhiệt, hai chiều còn lại cố định tại một giá trị
+    names = list(STRESS_AXES)
+    col1, col2 = st.columns(2)
+    x_axis = col1.selectbox("Trục ngang", names, index=1, format_func=STRESS_AXES.get, key='stress_x')
+    y_axis = col2.selectbox("Trục dọc", [name for name in names if name != x_axis], format_func=STRESS_AXES.get,
+                            key='stress_y')
+    base = {'rate': float(financial_info.get('interest_rate', 0) or 0), 'income': 0, 'expense': 0, 'term': base_term}
+    fixed = {}
+    columns = st.columns(2)
+    for column, axis in zip(columns, [name for name in names if name not in (x_axis, y_axis)]):
+        values = axes[axis]
+        default = values[int(np.argmin(np.abs(values - base[axis])))]
+        value = column.select_slider(f"{STRESS_AXES[axis]} (cố định)", list(values), value=default,
+                                     format_func=lambda value: f"{value:g}", key=f'stress_fixed_{axis}')
+        fixed[axis] = list(values).index(value)
+
+    x_label, y_label = STRESS_AXES[x_axis], STRESS_AXES[y_axis]
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("#### DSCR")
+        st.plotly_chart(stress_heatmap(grid_slice(grid, 'dscr', x_axis, y_axis, fixed), axes[x_axis], axes[y_axis],
+                                       x_label, y_label, 'DSCR', DSCR_MIN), use_container_width=True)
+    with col2:
+        st.markdown("#### DTI (%)")
+        st.plotly_chart(stress_heatmap(grid_slice(grid, 'dti', x_axis, y_axis, fixed), axes[x_axis], axes[y_axis],
+                                       x_label, y_label, 'DTI (%)', DTI_MAX, higher_is_better=False,
+                                       value_format='.1f'), use_container_width=True)
+    if total > grid_slice(grid, 'passed', x_axis, y_axis, fixed).size:
+        st.markdown("#### Tỷ lệ kịch bản đạt (trên mọi giá trị của hai chiều còn lại)")
+        st.plotly_chart(stress_heatmap(pass_share(grid, x_axis, y_axis), axes[x_axis], axes[y_axis], x_label,
+                                       y_label, 'Đạt (%)', 50, value_format='.0f'), use_container_width=True)
+
+
+# Hàm hiển thị mô phỏng Monte Carlo khả năng trả nợ
+def render_monte_carlo(financial_info, metrics):
+    from thamdinh.montecarlo import SIMULATION_DEFAULTS, simulate_repayment
+
+    st.markdown("### 🎲 Mô Phỏng Monte Carlo Khả Năng Trả Nợ")
+    st.caption("Thu nhập và chi phí biến động ngẫu nhiên từng tháng, kèm các cú sốc mất thu nhập; "
+               "so với số tiền phải trả từng tháng của lịch trả nợ")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        paths = st.select_slider("Số đường mô phỏng", [1_000, 10_000, 50_000, 100_000, 200_000], value=10_000,
+                                 format_func=format_number, key='mc_paths')
+        seed = st.number_input("Hạt giống ngẫu nhiên", min_value=0, value=0, step=1, key='mc_seed')
+    with col2:
+        income_growth = st.number_input("Tăng thu nhập (%/năm)", -20.0, 30.0,
+                                        SIMULATION_DEFAULTS['income_growth'], 0.5, key='mc_income_growth')
+        income_volatility = st.number_input("Biến động thu nhập (%/năm)", 0.0, 100.0,
+                                            SIMULATION_DEFAULTS['income_volatility'], 1.0, key='mc_income_volatility')
+    with col3:
+        expense_growth = st.number_input("Tăng chi phí (%/năm)", -20.0, 30.0,
+                                         SIMULATION_DEFAULTS['expense_growth'], 0.5, key='mc_expense_growth')
+        expense_volatility = st.number_input("Biến động chi phí (%/năm)", 0.0, 100.0,
+                                             SIMULATION_DEFAULTS['expense_volatility'], 1.0,
+                                             key='mc_expense_volatility')
+    with col4:
+        shock_probability = st.number_input("Xác suất sốc thu nhập (%/năm)", 0.0, 100.0,
+                                            SIMULATION_DEFAULTS['shock_probability'], 1.0, key='mc_shock_probability')
+        shock_severity = st.number_input("Thu nhập mất khi sốc (%)", 0.0, 100.0,
+                                         SIMULATION_DEFAULTS['shock_severity'], 5.0, key='mc_shock_severity')
+        shock_duration = st.number_input("Thời gian sốc (tháng)", 1, 60, SIMULATION_DEFAULTS['shock_duration'],
+                                         key='mc_shock_duration')
+    params = {
+        'income_growth': income_growth,
+        'income_volatility': income_volatility,
+        'expense_growth': expense_growth,
+        'expense_volatility': expense_volatility,
+        'shock_probability': shock_probability,
+        'shock_severity': shock_severity,
+        'shock_duration': shock_duration,
+    }
+
+    # Kết quả giữ lại qua các lần chạy lại, chỉ hiển thị khi khớp phương án vay và tham số hiện tại
+    key = metrics_cache_key(financial_info) + (paths, seed) + tuple(params.values())
+    if st.button("▶️ Chạy Mô Phỏng", key='run_monte_carlo'):
+        with st.spinner(f"Đang mô phỏng {format_number(paths)} đường..."):
+            st.session_state.monte_carlo = (key, simulate_repayment(
+                metrics['schedule']['payment'], financial_info.get('monthly_income', 0),
+                financial_info.get('monthly_expense', 0), paths, params, seed))
+    stored = st.session_state.get('monte_carlo')
+    if not stored or stored[0] != key:
+        st.info("Bấm \"Chạy Mô Phỏng\" để xem kết quả với phương án và tham số hiện tại")
+        return
+    simulation = stored[1]
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Xác suất có tháng thiếu hụt", f"{simulation['shortfall_probability']:.1f}%")
+    col2.metric("Thiếu hụt kỳ vọng", f"{format_number(simulation['expected_shortfall'])} đ",
+                help="Tổng số tiền thiếu để trả nợ trong cả thời hạn, trung bình trên mọi đường")
+    col3.metric("Thiếu hụt khi đã thiếu", f"{format_number(simulation['conditional_shortfall'])} đ",
+                help="Trung bình trên các đường có ít nhất một tháng thiếu hụt")
+    col4.metric("Thiếu hụt P95", f"{format_number(simulation['shortfall_p95'])} đ")
+    st.caption(f"{format_number(simulation['paths'])} đường × {simulation['months']} tháng · "
+               f"số tháng thiếu hụt trung bình {simulation['mean_shortfall_months']:.1f} · "
+               f"DSCR thấp nhất (trung vị) {simulation['min_dscr_median']:.2f} · "
+               f"{simulation['seconds']:.2f} giây trên {simulation['workers']} tiến trình")
+    if importlib.util.find_spec('plotly') is not None:
+        from thamdinh.charts import shortfall_probability_figure
+
+        st.plotly_chart(shortfall_probability_figure(simulation), use_container_width=True)
@@ -0,0 +1,51 @@
+"""Màn hình chào khi chưa có hồ sơ."""
+import streamlit as st
+
+
+# Hàm hiển thị hướng dẫn bắt đầu
+def render():
+    st.markdown("""
+    <div style='text-align: center; padding: 3rem;'>
+        <h2>👋 Chào Mừng Đến Với Hệ Thống Thẩm Định</h2>
+        <p style='font-size: 1.2rem; color: #666;'>
+            Vui lòng upload file phương án sử dụng vốn (.docx) ở sidebar để bắt đầu!
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
+
+    st.markdown("---")
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        st.markdown("""
+        ### 📤 Bước 1: Upload File
+        - Click vào sidebar bên trái
+        - Chọn file PASDV.docx
+        - Click "Trích xuất dữ liệu"
+        """)
+
+    with col2:
+        st.markdown("""
+        ### ✏️ Bước 2: Chỉnh Sửa
+        - Xem và chỉnh sửa thông tin
+        - Sử dụng nút +/- để điều chỉnh
+        - Lưu thay đổi khi cần
+        """)
+
+    with col3:
+        st.markdown("""
+        ### 📊 Bước 3: Phân Tích
+        - Xem các chỉ tiêu tài chính
+        - Phân tích bằng AI
+        - Xuất báo cáo
+        """)
+
+    st.markdown("---")
+
+    with st.expander("ℹ️ Hướng dẫn lấy Gemini API Key"):
+        st.markdown("""
+        1. Truy cập: https://aistudio.google.com/app/apikey
+        2. Đăng nhập bằng tài khoản Google
+        3. Click "Create API Key"
+        4. Copy API Key và paste vào ô bên sidebar
+        """)
@@ -0,0 +1,85 @@
+"""Bản trích xuất cũ (mỗi trường một lần re.search trên toàn bộ văn bản) làm chuẩn so sánh cho bộ trích xuất
+theo bảng mẫu, kèm các biến thể văn bản PASDV dùng chung cho test và benchmark."""
+import re
+
+from thamdinh.formatting import parse_number
+
+
+def legacy_extract_info_from_text(full_text):
+    """Bản trích xuất cũ: mỗi trường một lần re.search trên toàn bộ văn bản"""
+    customer_info = {}
+    financial_info = {}
+    collateral_info = {}
+
+    name_match = re.search(r'Họ và tên:\s*([^\n\r-]+)', full_text)
+    if name_match:
+        customer_info['name'] = name_match.group(1).strip()
+    cccd_match = re.search(r'(?:CMND/)?CCCD(?:/hộ chiếu)?:\s*(\d+)', full_text)
+    if cccd_match:
+        customer_info['cccd'] = cccd_match.group(1).strip()
+    address_match = re.search(r'Nơi cư trú:\s*([^\n\r]+)', full_text)
+    if address_match:
+        customer_info['address'] = address_match.group(1).strip()
+    phone_match = re.search(r'Số điện thoại:\s*(\d+)', full_text)
+    if phone_match:
+        customer_info['phone'] = phone_match.group(1).strip()
+    email_match = re.search(r'Email:\s*([^\s\n\r]+)', full_text)
+    if email_match:
+        customer_info['email'] = email_match.group(1).strip()
+
+    total_need_match = re.search(r'Tổng nhu cầu vốn:\s*([\d.,]+)\s*đồng', full_text)
+    if total_need_match:
+        financial_info['total_need'] = parse_number(total_need_match.group(1))
+    equity_match = re.search(r'Vốn đối ứng[^:]*:\s*([\d.,]+)\s*đồng', full_text)
+    if equity_match:
+        financial_info['equity'] = parse_number(equity_match.group(1))
+    loan_match = re.search(r'Vốn vay[^:]*số tiền:\s*([\d.,]+)\s*đồng', full_text)
+    if loan_match:
+        financial_info['loan_amount'] = parse_number(loan_match.group(1))
+    interest_match = re.search(r'Lãi suất:\s*([\d.,]+)%', full_text)
+    if interest_match:
+        financial_info['interest_rate'] = float(interest_match.group(1).replace(',', '.'))
+    term_match = re.search(r'Thời hạn vay:\s*(\d+)\s*tháng', full_text)
+    if term_match:
+        financial_info['loan_term'] = int(term_match.group(1))
+    purpose_match = re.search(r'Mục đích vay:\s*([^\n\r]+)', full_text)
+    if purpose_match:
+        financial_info['purpose'] = purpose_match.group(1).strip()
+    for pattern in [r'Tổng thu nhập[^:]*:\s*([\d.,]+)\s*đồng', r'Thu nhập[^:]*:\s*([\d.,]+)\s*đồng/tháng']:
+        income_match = re.search(pattern, full_text)
+        if income_match:
+            financial_info['monthly_income'] = parse_number(income_match.group(1))
+            break
+    expense_match = re.search(r'Tổng chi phí hàng tháng:\s*([\d.,]+)', full_text)
+    if expense_match:
+        financial_info['monthly_expense'] = parse_number(expense_match.group(1))
+    project_income_match = re.search(r'Thu nhập từ kinh doanh[^:]*:\s*([\d.,]+)\s*đồng/tháng', full_text)
+    if project_income_match:
+        financial_info['project_income'] = parse_number(project_income_match.group(1))
+
+    collateral_type_match = re.search(r'Tài sản \d+:\s*([^\n\r.]+)', full_text)
+    if collateral_type_match:
+        collateral_info['type'] = collateral_type_match.group(1).strip()
+    for pattern in [r'Giá trị:\s*([\d.,]+)\s*đồng', r'Giá trị[^:]*:\s*([\d.,]+)\s*đồng']:
+        collateral_value_match = re.search(pattern, full_text)
+        if collateral_value_match:
+            collateral_info['value'] = parse_number(collateral_value_match.group(1))
+            break
+    collateral_address_match = re.search(r'Địa chỉ:\s*([^\n\r]+?)(?:Diện tích|Giấy|Tỷ lệ|\n|$)', full_text)
+    if collateral_address_match:
+        collateral_info['address'] = collateral_address_match.group(1).strip()
+    area_match = re.search(r'Diện tích đất:\s*([\d.,]+)\s*m', full_text)
+    if area_match:
+        collateral_info['area'] = parse_number(area_match.group(1))
+
+    return customer_info, financial_info, collateral_info
+
+
+VARIANTS = [
+    ("đầy đủ", lambda text: text),
+    ("thu nhập dự phòng", lambda text: text.replace("Tổng thu nhập của hộ gia đình", "Thu nhập khác")),
+    ("giá trị dự phòng", lambda text: text.replace("Giá trị: ", "Giá trị thẩm định: ")),
+    ("thiếu TN dự án", lambda text: text.replace("Thu nhập từ kinh doanh", "Nguồn thu")),
+    ("thiếu CCCD", lambda text: text.replace("CMND/CCCD/hộ chiếu", "Giấy tờ")),
+    ("nhãn lặp", lambda text: "Giá trị còn lại: 5.000 đồng\n" + text),
+]
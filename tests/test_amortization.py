@@ -0,0 +1,89 @@
+"""Lịch trả nợ tính theo cột: khớp vòng lặp cũ với gốc đều, đúng công thức trả đều, ràng buộc ân hạn/balloon."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.bench_amortization import legacy_loop_only, legacy_metrics
+from thamdinh.amortization import ANNUITY, EQUAL_PRINCIPAL, build_schedule, schedule_to_dataframe
+from thamdinh.finance import calculate_financial_metrics
+
+CASES = [(500_000_000, 8.5, 60), (1_000_000_000, 0, 360), (123_456_789, 11.25, 7), (1, 99.9, 1),
+         (750_000_000.5, 0, 13), (2_000_000_000, 14.75, 480)]
+CASES += [(float(loan_amount), float(rate), int(term)) for loan_amount, rate, term in zip(
+    np.random.default_rng(0).integers(1, 10 ** 10, 50), np.random.default_rng(1).uniform(0, 20, 50),
+    np.random.default_rng(2).integers(1, 481, 50))]
+
+
+@pytest.mark.parametrize('loan_amount, rate, term', CASES)
+def test_equal_principal_matches_legacy_loop(loan_amount, rate, term):
+    legacy = pd.DataFrame(legacy_loop_only(loan_amount, rate, term))
+    schedule = schedule_to_dataframe(build_schedule(loan_amount, rate, term))
+    # Khớp tuyệt đối từng giá trị float; vòng lặp cũ trả về số 0 kiểu int ở cột dư nợ cuối kỳ
+    pd.testing.assert_frame_equal(schedule, legacy, check_dtype=False, check_exact=True)
+
+
+@pytest.mark.parametrize('loan_amount, rate, term', CASES[:6])
+def test_equal_principal_metrics_match_legacy(loan_amount, rate, term):
+    info = {'loan_amount': loan_amount, 'interest_rate': rate, 'loan_term': term,
+            'monthly_income': 40_000_000, 'monthly_expense': 15_000_000}
+    legacy = legacy_metrics(info)
+    metrics = calculate_financial_metrics(info)
+    for key in ('monthly_principal', 'first_month_interest', 'first_month_payment', 'total_interest',
+                'total_payment', 'net_income', 'debt_service_ratio', 'surplus', 'dscr'):
+        assert metrics[key] == legacy[key], key
+
+
+@pytest.mark.parametrize('rate', [0, 6, 8.5, 24])
+@pytest.mark.parametrize('term', [1, 12, 360])
+def test_annuity_level_payment(rate, term):
+    loan_amount = 1_000_000_000
+    schedule = build_schedule(loan_amount, rate, term, ANNUITY)
+    monthly_rate = rate / 100 / 12
+    expected = loan_amount * monthly_rate / (1 - (1 + monthly_rate) ** -term) if rate else loan_amount / term
+    # Dư nợ tính theo công thức đóng nên sai số làm tròn dưới 0,01 đồng
+    np.testing.assert_allclose(schedule['payment'], expected, rtol=1e-10)
+    np.testing.assert_allclose(schedule['interest'], schedule['opening_balance'] * monthly_rate, rtol=1e-12)
+    assert schedule['principal'].sum() == pytest.approx(loan_amount, abs=1e-4)
+    assert schedule['closing_balance'][-1] == 0
+
+
+@pytest.mark.parametrize('method', [EQUAL_PRINCIPAL, ANNUITY])
+@pytest.mark.parametrize('rate', [0, 8.5])
+@pytest.mark.parametrize('grace, balloon', [(0, 0), (6, 0), (0, 200_000_000), (12, 100_000_000), (119, 0)])
+def test_grace_and_balloon_balances(method, rate, grace, balloon):
+    loan_amount, term = 500_000_000, 120
+    schedule = build_schedule(loan_amount, rate, term, method, grace, balloon)
+    monthly_rate = rate / 100 / 12
+    np.testing.assert_array_equal(schedule['month'], np.arange(1, term + 1))
+    assert schedule['opening_balance'][0] == loan_amount
+    np.testing.assert_allclose(schedule['opening_balance'][1:], schedule['closing_balance'][:-1], atol=1e-4)
+    np.testing.assert_allclose(schedule['closing_balance'], schedule['opening_balance'] - schedule['principal'],
+                               atol=1e-4)
+    np.testing.assert_allclose(schedule['payment'], schedule['principal'] + schedule['interest'], rtol=1e-12)
+    np.testing.assert_allclose(schedule['interest'], schedule['opening_balance'] * monthly_rate, rtol=1e-9)
+    # Ân hạn: chỉ trả lãi, dư nợ giữ nguyên
+    assert (schedule['principal'][:grace] == 0).all()
+    np.testing.assert_allclose(schedule['opening_balance'][:grace + 1], loan_amount)
+    # Balloon: dư nợ trước kỳ cuối còn ít nhất khoản balloon, kỳ cuối tất toán
+    assert schedule['opening_balance'][-1] >= balloon - 1e-4
+    assert schedule['principal'][-1] >= balloon - 1e-4
+    assert schedule['principal'].sum() == pytest.approx(loan_amount, abs=1e-4)
+    assert schedule['closing_balance'][-1] == pytest.approx(0, abs=1e-4)
+    assert (schedule['closing_balance'] >= 0).all()
+    if method == ANNUITY:
+        level = schedule['payment'][grace:-1]
+        np.testing.assert_allclose(level, np.full_like(level, schedule['payment'][grace]), rtol=1e-10)
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'loan_term': 0},
+    {'grace_months': 12},
+    {'grace_months': -1},
+    {'balloon_amount': 2_000_000},
+    {'balloon_amount': -1},
+    {'method': 'bullet'},
+])
+def test_invalid_arguments(kwargs):
+    arguments = dict({'loan_amount': 1_000_000, 'annual_rate': 8.5, 'loan_term': 12}, **kwargs)
+    with pytest.raises(ValueError):
+        build_schedule(**arguments)
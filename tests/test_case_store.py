@@ -0,0 +1,174 @@
+"""Kho hồ sơ: lưu/mở lại chính xác (kể cả lịch trả nợ nén), tìm theo tên, CCCD, số điện thoại và ngày tạo."""
+import datetime
+import gc
+import sqlite3
+import warnings
+
+import numpy as np
+import pytest
+
+from thamdinh.amortization import ANNUITY, EQUAL_PRINCIPAL, build_schedule
+from thamdinh.case_store import CaseStore, pack_schedule, unpack_schedule
+from thamdinh.finance import calculate_financial_metrics
+
+FINANCIAL_INFO = {'loan_amount': 1.5e9, 'interest_rate': 8.5, 'loan_term': 360, 'repayment_method': 'annuity',
+                  'monthly_income': 4e7, 'monthly_expense': 1.2e7}
+
+
+def _case(name, cccd='', phone='', **fields):
+    return dict({'customer_info': {'name': name, 'cccd': cccd, 'phone': phone},
+                 'financial_info': {'loan_amount': 5e8}}, **fields)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CaseStore(str(tmp_path / 'cases.sqlite3'))
+
+
+@pytest.mark.parametrize('schedule', [
+    build_schedule(1.5e9, 8.5, 360, ANNUITY),
+    build_schedule(123_456_789, 11.25, 7, EQUAL_PRINCIPAL, 2, 1e7),
+    build_schedule(1, 0, 1),
+    {'month': np.arange(1, 4), 'opening_balance': np.array([1.5, np.nan, -0.0]),
+     'principal': np.array([np.inf, 1e-300, 5e300]), 'interest': np.zeros(3), 'payment': np.ones(3),
+     'closing_balance': np.array([0.1, 0.2, 0.3])},
+])
+def test_pack_schedule_round_trip(schedule):
+    restored = unpack_schedule(pack_schedule(schedule))
+    assert list(restored) == list(schedule)
+    for key, values in schedule.items():
+        # So từng bit: giữ cả NaN, vô cùng và -0.0
+        assert np.array_equal(restored[key].view(np.uint64) if key != 'month' else restored[key],
+                              np.asarray(values).view(np.uint64) if key != 'month' else values), key
+
+
+def test_save_load_round_trip(store):
+    metrics = calculate_financial_metrics(FINANCIAL_INFO)
+    case = {'customer_info': {'name': 'Nguyễn Văn An', 'cccd': '042080001234', 'phone': '0912 345 678'},
+            'financial_info': FINANCIAL_INFO, 'collateral_info': {'value': 3e9, 'address': 'Thửa 12, Thạch Hà'},
+            'metrics': metrics, 'analysis_file': 'Phân tích 📊', 'chat_history': [{'role': 'user', 'content': 'Chào'}],
+            'uploaded_content': 'Họ và tên: Nguyễn Văn An\n' * 100, 'source_file': 'pasdv.docx'}
+    case_id = store.save(case)
+    loaded = store.load(case_id)
+    assert loaded['id'] == case_id
+    for key in ('customer_info', 'financial_info', 'collateral_info', 'analysis_file', 'chat_history',
+                'uploaded_content', 'source_file'):
+        assert loaded[key] == case[key], key
+    assert 'analysis_metrics' not in loaded
+    for key, value in metrics.items():
+        if key == 'schedule':
+            for column, values in value.items():
+                assert np.array_equal(loaded['metrics']['schedule'][column], values), column
+        else:
+            assert loaded['metrics'][key] == value, key
+    assert store.load(case_id + 1) is None
+
+
+def test_update_keeps_created_at(store):
+    case_id = store.save(_case('Trần Thị Bình', '042080000001'))
+    created_at = store.load(case_id)['created_at']
+    assert store.save(_case('Trần Thị Bình Minh', '042080000002'), case_id) == case_id
+    loaded = store.load(case_id)
+    assert loaded['created_at'] == created_at
+    assert loaded['updated_at'] >= created_at
+    assert loaded['customer_info']['cccd'] == '042080000002'
+    assert [row['id'] for row in store.search('042080000001')] == []
+    assert [row['id'] for row in store.search('bình minh')] == [case_id]
+    # Mã chưa có trong kho (đã xóa): lưu thành hồ sơ mới
+    assert store.save(_case('Lê Văn C'), 9999) != 9999
+
+
+def test_search(store):
+    an = store.save(_case('Nguyễn Văn An', '042080001234', '0912345678'))
+    anh = store.save(_case('Nguyễn Thị Ánh', '042090005678', '+84 913 000 111'))
+    binh = store.save(_case('Trần Đức Bình', '001085009999', '0988.777.666'))
+    ids = lambda query, *args: [row['id'] for row in store.search(query, *args)]  # noqa: E731
+
+    # Tên: không phân biệt dấu, hoa thường, thứ tự từ; khớp đầu từ
+    assert ids('nguyen') == [anh, an]
+    assert ids('NGUYỄN VĂN an') == [an]
+    assert ids('an nguyen') == [anh, an]
+    assert ids('van nguyen') == [an]
+    assert ids('anh') == [anh]
+    assert ids('ngu a') == [anh, an]
+    assert ids('duc binh') == [binh]
+    assert ids('Đức') == [binh]
+    assert ids('nguyen binh') == []
+    # CCCD và số điện thoại: khớp đầu số, bỏ dấu cách/dấu chấm, +84 thành 0
+    assert ids('042080001234') == [an]
+    assert ids('0420') == [anh, an]
+    assert ids('042 09') == [anh]
+    assert ids('0913000111') == [anh]
+    assert ids('+84 913') == [anh]
+    assert ids('0988.777') == [binh]
+    assert ids('09') == [binh, anh, an]
+    assert ids('0000') == []
+    # Không có điều kiện: mọi hồ sơ, mới nhất trước
+    assert ids('') == [binh, anh, an]
+    assert ids('!!!') == []
+    assert len(store.search('', limit=2)) == 2
+
+    row = store.search('042080001234')[0]
+    assert row == {'id': an, 'name': 'Nguyễn Văn An', 'cccd': '042080001234', 'phone': '0912345678',
+                   'loan_amount': 5e8, 'source_file': '', 'created_at': row['created_at'],
+                   'updated_at': row['updated_at']}
+
+
+def test_search_by_date(store):
+    case_id = store.save(_case('Phạm Văn D'))
+    today = datetime.date.today()
+    yesterday = today - datetime.timedelta(days=1)
+    assert [row['id'] for row in store.search('', today, today)] == [case_id]
+    assert [row['id'] for row in store.search('pham', yesterday)] == [case_id]
+    assert store.search('', None, yesterday) == []
+    assert store.search('', today + datetime.timedelta(days=1)) == []
+
+
+def test_delete(store):
+    case_id = store.save(_case('Hoàng Văn E', '042080000003'))
+    store.delete(case_id)
+    assert store.load(case_id) is None
+    assert store.search('hoang') == []
+    assert store.search('0420800') == []
+    assert store.stats()['size'] == 0
+
+
+def test_reopen_keeps_data(tmp_path):
+    path = str(tmp_path / 'data' / 'cases.sqlite3')
+    first = CaseStore(path)
+    case_ids = first.save_many([_case('Võ Thị F', '042080000004', '0911111111'), _case('Đặng Văn G')])
+    assert first.search('vo thi') != []
+
+    reopened = CaseStore(path)
+    assert reopened.stats()['size'] == 2
+    assert reopened.load(case_ids[0])['customer_info']['name'] == 'Võ Thị F'
+    assert [row['id'] for row in reopened.search('vo thi')] == [case_ids[0]]
+    assert [row['id'] for row in reopened.search('0911')] == [case_ids[0]]
+    assert [row['id'] for row in reopened.search('dang')] == [case_ids[1]]
+    # Kết nối đọc đã mở của kho cũ vẫn thấy hồ sơ ghi từ kho mới
+    new_id = reopened.save(_case('Bùi Văn H'))
+    assert [row['id'] for row in first.search('bui')] == [new_id]
+    conn = sqlite3.connect(path)
+    try:
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    finally:
+        conn.close()
+
+
+def test_open_does_not_leak_connections(tmp_path, monkeypatch):
+    # Giữ lại mọi kết nối đã mở để kiểm tra đều đã được đóng (Python < 3.13 không báo ResourceWarning)
+    opened = []
+    connect = CaseStore._connect
+    monkeypatch.setattr(CaseStore, '_connect', lambda self: opened.append(connect(self)) or opened[-1])
+    path = str(tmp_path / 'cases.sqlite3')
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', ResourceWarning)
+        for index in range(5):
+            store = CaseStore(path)
+            store.save(_case(f"Khách hàng {index}"))
+            del store
+            gc.collect()
+    assert len(opened) == 10
+    for conn in opened:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute('SELECT 1')
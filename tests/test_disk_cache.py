@@ -0,0 +1,37 @@
+"""Bộ nhớ đệm trên đĩa: đọc/ghi qua các lần mở và không để lại kết nối SQLite chưa đóng."""
+import gc
+import sqlite3
+import warnings
+
+import pytest
+
+from thamdinh.disk_cache import DiskCache
+
+
+def test_open_does_not_leak_connections(tmp_path, monkeypatch):
+    # Giữ lại mọi kết nối đã mở để kiểm tra đều đã được đóng (Python < 3.13 không báo ResourceWarning)
+    opened = []
+    connect = DiskCache._connect
+    monkeypatch.setattr(DiskCache, '_connect', lambda self: opened.append(connect(self)) or opened[-1])
+    path = str(tmp_path / 'cache.sqlite3')
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', ResourceWarning)
+        for _ in range(5):
+            cache = DiskCache(path)
+            cache.set('key', {'value': 1})
+            assert cache.get('key') == {'value': 1}
+            del cache
+            gc.collect()
+    assert opened
+    for conn in opened:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute('SELECT 1')
+
+
+def test_values_survive_reopen(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    DiskCache(path).set('key', [1, 'hai'])
+    cache = DiskCache(path)
+    assert cache.get('key') == [1, 'hai']
+    assert cache.get('missing', 'default') == 'default'
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
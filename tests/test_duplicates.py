@@ -0,0 +1,229 @@
+"""Phát hiện trùng khách hàng/TSĐB: chuẩn hóa, khóa tra cứu, so khớp, kiểm tra cả lô và lập chỉ mục kho cũ."""
+import json
+import sqlite3
+import time
+
+import pytest
+
+from thamdinh.case_store import CaseStore
+from thamdinh.duplicates import (SIGNATURE_BANDS, case_identity, describe_reasons, find_batch_duplicates,
+                                 find_duplicates, identity_keys, match_reasons, normalize_address)
+
+CUSTOMER = {'name': 'Nguyễn Văn An', 'cccd': '042080001234', 'phone': '0912345678',
+            'address': 'Thôn 3, xã Thạch Hà, tỉnh Hà Tĩnh'}
+COLLATERAL = {'address': 'Thửa số 125, tờ bản đồ số 14, thôn 3, xã Thạch Hà'}
+
+
+def _identity(customer_info=None, collateral_info=None):
+    return case_identity(customer_info, collateral_info)
+
+
+def _keys(identity, field):
+    return {key for name, key in identity_keys(identity) if name == field}
+
+
+def test_normalize_address():
+    assert normalize_address('P.Bắc Hà, TP Hà Tĩnh') == 'phuong bac ha thanh pho ha tinh'
+    assert normalize_address('X. Thạch Hà, H. Thạch Hà, T. Hà Tĩnh') == 'xa thach ha huyen thach ha tinh ha tinh'
+    assert normalize_address(None) == ''
+
+
+def test_case_identity_normalizes_numbers():
+    identity = _identity({'name': ' NGUYỄN  văn AN ', 'cccd': '042 080 001 234', 'phone': '+84 912.345.678'})
+    assert identity == {'cccd': '042080001234', 'phone': '0912345678', 'name': 'nguyen van an', 'address': '',
+                        'collateral': ''}
+    assert _identity() == {'cccd': '', 'phone': '', 'name': '', 'address': '', 'collateral': ''}
+
+
+def test_identity_keys_reformatted_numbers():
+    original = _identity(CUSTOMER, COLLATERAL)
+    reformatted = _identity({'cccd': '042-080-001-234', 'phone': '(+84) 912 345 678'})
+    assert _keys(reformatted, 'cccd') == _keys(original, 'cccd')
+    assert _keys(reformatted, 'phone') == _keys(original, 'phone')
+    assert _keys(_identity({'cccd': '042080001235'}), 'cccd').isdisjoint(_keys(original, 'cccd'))
+
+
+def test_identity_keys_person():
+    original = _identity(CUSTOMER)
+    # Không dấu, hoa thường, đảo thứ tự từ, viết tắt và số 0 đứng đầu không đổi khóa
+    variant = _identity({'name': 'AN NGUYEN VAN', 'address': 'thon 03, x. Thach Ha, t. Ha Tinh'})
+    assert len(_keys(original, 'person')) == 1
+    assert _keys(variant, 'person') == _keys(original, 'person')
+    assert _keys(_identity(dict(CUSTOMER, address='Thôn 4, xã Thạch Hà')), 'person') != _keys(original, 'person')
+    # Họ tên thiếu nơi cư trú không được đưa vào chỉ mục
+    assert _keys(_identity({'name': CUSTOMER['name']}), 'person') == set()
+    assert identity_keys(_identity()) == []
+
+
+def test_identity_keys_collateral_bands():
+    original = _identity(collateral_info=COLLATERAL)
+    variant = _identity(collateral_info={'address': 'Thua 125, to ban do 14, thon 3, xa Thach Ha'})
+    assert len(_keys(original, 'collateral')) == SIGNATURE_BANDS
+    # Địa chỉ viết khác vẫn trùng ít nhất một dải LSH
+    assert _keys(original, 'collateral') & _keys(variant, 'collateral')
+    # Thửa đất bên cạnh (khác số thửa) không chung dải nào
+    neighbour = _identity(collateral_info={'address': COLLATERAL['address'].replace('125', '126')})
+    assert _keys(original, 'collateral').isdisjoint(_keys(neighbour, 'collateral'))
+
+
+def test_match_reasons():
+    original = _identity(CUSTOMER, COLLATERAL)
+    assert match_reasons(original, original) == {'cccd': 1.0, 'phone': 1.0, 'person': 1.0, 'collateral': 1.0}
+
+    variant = _identity({'name': 'nguyen van AN', 'cccd': '042 080 001 234', 'phone': '+84912345678',
+                         'address': 'thon 3, x. Thach Ha, t. Ha Tinh'},
+                        {'address': 'Thua so 125, to ban do so 14, thon 3, xa Thach Ha'})
+    reasons = match_reasons(variant, original)
+    assert set(reasons) == {'cccd', 'phone', 'person', 'collateral'}
+    assert all(0.6 <= score <= 1 for score in reasons.values())
+
+    # Tên gần giống (khác một chữ) không được coi là cùng người
+    assert 'person' not in match_reasons(_identity(dict(CUSTOMER, name='Nguyễn Văn Anh')), original)
+    # Cùng tên, khác số thôn: người khác
+    assert 'person' not in match_reasons(_identity(dict(CUSTOMER, address='Thôn 5, xã Thạch Hà, tỉnh Hà Tĩnh')),
+                                         original)
+    # Cùng các số, khác hẳn phần chữ của địa chỉ
+    assert match_reasons(_identity(collateral_info={'address': 'Thửa 125, tờ 14, tổ 3, phường Nam Hồng'}),
+                         original) == {}
+    assert match_reasons(_identity(), original) == {}
+
+
+def test_describe_reasons():
+    assert describe_reasons({'cccd': 1.0, 'collateral': 0.857}) == 'CCCD, Địa chỉ TSĐB (86%)'
+
+
+def _result(file, customer_info, collateral_info=None, loan_amount=1e8, error=None):
+    return {'file': file, 'error': error, 'customer_info': customer_info, 'financial_info': {'loan_amount': loan_amount},
+            'collateral_info': collateral_info or {}}
+
+
+def test_find_batch_duplicates():
+    results = [
+        _result('a.docx', CUSTOMER, COLLATERAL, 5e8),
+        # Cùng khách hàng: CCCD, số điện thoại viết khác
+        _result('b.docx', {'name': 'NGUYEN VAN AN', 'cccd': '042.080.001.234', 'phone': '+84 912 345 678'}, None, 3e8),
+        # Người khác thế chấp cùng thửa đất (địa chỉ viết khác)
+        _result('c.docx', {'name': 'Lê Thị Cúc', 'cccd': '042090009999'},
+                {'address': 'Thua 125, to ban do 14, thon 3, xa Thach Ha'}, 2e8),
+        # Người thân dùng chung số điện thoại nhưng khác CCCD
+        _result('d.docx', {'name': 'Nguyễn Văn Bình', 'cccd': '042085000001', 'phone': '0912 345 678'}),
+        _result('e.docx', {'name': 'Phan Văn Đông', 'cccd': '001999999999'}, {'address': 'Số 5 Phan Đình Phùng'}),
+        _result('f.docx', CUSTOMER, COLLATERAL, error='File hỏng'),
+    ]
+    reports = find_batch_duplicates(results)
+    assert reports[5] is None
+
+    first = reports[0]
+    files = {match['source_file']: match for match in first['matches']}
+    assert set(files) == {'b.docx', 'c.docx', 'd.docx'}
+    assert all(match['id'] is None for match in first['matches'])
+    assert files['b.docx']['same_applicant'] and set(files['b.docx']['reasons']) == {'cccd', 'phone'}
+    assert files['c.docx']['same_collateral'] and not files['c.docx']['same_applicant']
+    assert not files['d.docx']['same_applicant'] and set(files['d.docx']['reasons']) == {'phone'}
+    # Cùng khách hàng trước
+    assert first['matches'][0]['source_file'] == 'b.docx'
+    assert first['applicant_cases'] == 1
+    assert first['total_exposure'] == 8e8
+    assert first['collateral_cases'] == 1
+    assert first['collateral_loans'] == 7e8
+
+    assert [match['source_file'] for match in reports[1]['matches'] if match['same_applicant']] == ['a.docx']
+    assert [match['source_file'] for match in reports[2]['matches']] == ['a.docx']
+    assert reports[4]['matches'] == []
+    assert reports[4]['total_exposure'] == 1e8
+
+
+def test_find_batch_duplicates_with_store(tmp_path):
+    store = CaseStore(str(tmp_path / 'cases.sqlite3'))
+    saved = store.save({'customer_info': CUSTOMER, 'financial_info': {'loan_amount': 4e8}, 'source_file': 'cu.docx'})
+    reports = find_batch_duplicates([_result('moi.docx', dict(CUSTOMER, cccd='042 080 001 234'), None, 1e8)], store)
+    assert [(match['id'], match['source_file']) for match in reports[0]['matches']] == [(saved, 'cu.docx')]
+    assert reports[0]['total_exposure'] == 5e8
+
+
+def test_find_duplicates_in_store(tmp_path):
+    store = CaseStore(str(tmp_path / 'cases.sqlite3'))
+    case_id = store.save({'customer_info': CUSTOMER, 'collateral_info': COLLATERAL,
+                          'financial_info': {'loan_amount': 4e8}})
+    report = find_duplicates(store, {'phone': '+84 912 345 678'}, {'loan_amount': 1e8}, {})
+    assert [match['id'] for match in report['matches']] == [case_id]
+    assert report['total_exposure'] == 5e8
+    # Hồ sơ đang mở không trùng với chính nó
+    assert find_duplicates(store, CUSTOMER, {}, COLLATERAL, exclude_id=case_id)['matches'] == []
+    # Cập nhật và xóa hồ sơ cập nhật luôn khóa tra cứu
+    store.save({'customer_info': dict(CUSTOMER, phone='0987000000')}, case_id)
+    assert find_duplicates(store, {'phone': '0912345678'}, {}, {})['matches'] == []
+    store.delete(case_id)
+    assert find_duplicates(store, CUSTOMER, {}, COLLATERAL)['matches'] == []
+
+
+# Cấu trúc kho trước khi có chỉ mục trùng hồ sơ (không có case_identity, case_keys; user_version 0)
+OLD_SCHEMA = """
+CREATE TABLE cases (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL DEFAULT '',
+    cccd TEXT NOT NULL DEFAULT '',
+    phone TEXT NOT NULL DEFAULT '',
+    loan_amount REAL NOT NULL DEFAULT 0,
+    source_file TEXT NOT NULL DEFAULT '',
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    data TEXT NOT NULL,
+    full_text BLOB,
+    schedule BLOB
+);
+CREATE INDEX cases_cccd ON cases (cccd);
+CREATE INDEX cases_phone ON cases (phone);
+CREATE INDEX cases_created_at ON cases (created_at);
+CREATE VIRTUAL TABLE case_names USING fts5 (name, tokenize = 'unicode61 remove_diacritics 0');
+"""
+
+
+def test_reindex_store_without_duplicate_keys(tmp_path):
+    path = str(tmp_path / 'cases.sqlite3')
+    old_cases = [
+        (CUSTOMER, COLLATERAL, 4e8),
+        ({'name': 'Lê Thị Cúc', 'cccd': '042090009999', 'phone': '0977000111'}, {}, 2e8),
+    ]
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.executescript(OLD_SCHEMA)
+        for customer_info, collateral_info, loan_amount in old_cases:
+            data = {'customer_info': customer_info, 'financial_info': {'loan_amount': loan_amount},
+                    'collateral_info': collateral_info}
+            case_id = conn.execute(
+                'INSERT INTO cases (name, cccd, phone, loan_amount, created_at, updated_at, data) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)', (customer_info['name'], customer_info['cccd'], customer_info['phone'],
+                                                 loan_amount, time.time(), time.time(),
+                                                 json.dumps(data, ensure_ascii=False))).lastrowid
+            conn.execute('INSERT INTO case_names (rowid, name) VALUES (?, ?)', (case_id, customer_info['name']))
+    conn.close()
+
+    store = CaseStore(path)
+    conn = sqlite3.connect(path)
+    try:
+        assert conn.execute('PRAGMA user_version').fetchone()[0] >= 1
+        assert conn.execute('SELECT COUNT(*) FROM case_identity').fetchone()[0] == 2
+        keys = conn.execute('SELECT COUNT(*) FROM case_keys').fetchone()[0]
+    finally:
+        conn.close()
+    expected = sum(len(identity_keys(case_identity(customer_info, collateral_info)))
+                   for customer_info, collateral_info, _ in old_cases)
+    assert keys == expected
+
+    report = find_duplicates(store, {'cccd': '042 080 001 234'}, {'loan_amount': 1e8},
+                             {'address': 'Thua 125, to ban do 14, thon 3, xa Thach Ha'})
+    assert [match['id'] for match in report['matches']] == [1]
+    assert set(report['matches'][0]['reasons']) == {'cccd', 'collateral'}
+    assert report['total_exposure'] == 5e8
+    assert [match['id'] for match in find_duplicates(store, {'phone': '0977 000 111'}, {}, {})['matches']] == [2]
+    # Mở lại lần nữa không lập chỉ mục lại (không nhân đôi dòng)
+    CaseStore(path)
+    conn = sqlite3.connect(path)
+    try:
+        assert conn.execute('SELECT COUNT(*) FROM case_identity').fetchone()[0] == 2
+    finally:
+        conn.close()
+    # Hồ sơ cũ sửa/xóa được sau khi lập chỉ mục
+    store.delete(1)
+    assert find_duplicates(store, {'cccd': '042080001234'}, {}, {})['matches'] == []
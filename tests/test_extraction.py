@@ -0,0 +1,48 @@
+"""Bộ trích xuất theo bảng mẫu cho kết quả giống hệt cách gọi re.search tuần tự trước đây."""
+import pytest
+
+from benchmarks.samples import sample_text
+from tests.legacy_extraction import VARIANTS, legacy_extract_info_from_text
+from thamdinh.extraction import extract_info_from_text
+
+
+@pytest.mark.parametrize('filler', [0, 50, 2000])
+@pytest.mark.parametrize('variant', [variant for _, variant in VARIANTS], ids=[name for name, _ in VARIANTS])
+def test_matches_legacy(variant, filler):
+    text = variant(sample_text(filler, filler))
+    assert extract_info_from_text(text) == legacy_extract_info_from_text(text)
+
+
+@pytest.mark.parametrize('text', [
+    '',
+    'Họ và tên: Trần Thị B',
+    'CCCD: 042080000001\nCMND/CCCD/hộ chiếu: 042080000002',
+    'Thu nhập khác: 5.000.000 đồng/tháng\nThu nhập từ kinh doanh: 7.000.000 đồng/tháng',
+    'Giá trị còn lại: 5.000 đồng\nGiá trị: 9.000 đồng',
+    'Giá trị thẩm định: 8.000 đồng',
+    'Địa chỉ: Thôn 3, xã Thạch Hà Giấy chứng nhận số 1',
+    'Lãi suất: 7.5%/năm\nThời hạn vay: 36 tháng',
+])
+def test_matches_legacy_edge_cases(text):
+    assert extract_info_from_text(text) == legacy_extract_info_from_text(text)
+
+
+def test_fallback_patterns():
+    _, financial_info, collateral_info = extract_info_from_text(
+        'Thu nhập khác: 5.000.000 đồng/tháng\nGiá trị thẩm định: 8.000 đồng')
+    assert financial_info == {'monthly_income': 5_000_000.0}
+    assert collateral_info == {'value': 8000.0}
+    # Mẫu chính thắng mẫu dự phòng dù xuất hiện sau trong văn bản
+    _, _, collateral_info = extract_info_from_text('Giá trị còn lại: 5.000 đồng\nGiá trị: 9.000 đồng')
+    assert collateral_info == {'value': 9000.0}
+
+
+def test_sample_document():
+    customer_info, financial_info, collateral_info = extract_info_from_text(sample_text(0, 1))
+    assert customer_info['name'] == 'Nguyễn Văn B'
+    assert customer_info['address'] == 'Xã Thạch Hà, tỉnh Hà Tĩnh'
+    assert financial_info['interest_rate'] == 8.5
+    assert financial_info['loan_term'] == 60
+    assert financial_info['project_income'] == 25_000_000
+    assert collateral_info == {'type': 'Quyền sử dụng đất và tài sản gắn liền với đất', 'value': 1_200_000_000,
+                               'address': 'Thôn 3, xã Thạch Hà', 'area': 150.5}
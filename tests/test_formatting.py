@@ -0,0 +1,59 @@
+"""Định dạng/đọc số cả cột cho cùng kết quả với từng giá trị, kể cả khi không có pyarrow."""
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from thamdinh.formatting import format_number, format_numbers, parse_number, parse_numbers
+
+TEXTS = ['1.234.567', '1.234,5', '-2.000', '0', ',5', ' 12 ', '+5', '1e6', 'abc', '', '12,3,4']
+
+
+@pytest.fixture(params=['pyarrow', 'numpy'])
+def backend(request, monkeypatch):
+    if request.param == 'numpy':
+        # Giả lập môi trường không cài pyarrow: import pyarrow báo ImportError
+        monkeypatch.setitem(sys.modules, 'pyarrow', None)
+    return request.param
+
+
+def test_format_numbers_matches_format_number():
+    values = np.concatenate([np.random.default_rng(0).uniform(-1e13, 1e13, 1000), [0, -0.4, 0.5, 1.5, 2.5, 1e20]])
+    assert list(format_numbers(values)) == [format_number(value) for value in values]
+
+
+@pytest.mark.parametrize('values', [
+    TEXTS,
+    pd.Series(TEXTS),
+    pd.Series(TEXTS, dtype=object),
+    np.array(TEXTS, dtype=object),
+    list(format_numbers(np.random.default_rng(1).uniform(-1e12, 1e12, 500))),
+])
+def test_parse_numbers_matches_parse_number(backend, values):
+    parsed = parse_numbers(values, invalid=0)
+    assert list(parsed) == [parse_number(text) if text else 0 for text in values]
+    if isinstance(values, pd.Series):
+        assert parsed.index.equals(values.index)
+
+
+def test_parse_numbers_missing_values(backend):
+    parsed = parse_numbers(pd.Series(['1.000', None, np.nan, '', 'x']))
+    assert parsed.iloc[0] == 1000
+    assert parsed.iloc[1:].isna().all()
+
+
+def test_parse_numbers_keeps_numeric_columns(backend):
+    assert list(parse_numbers(pd.Series([1.5, np.nan, 3]), invalid=-1)) == [1.5, -1, 3]
+
+
+@pytest.mark.parametrize('values, expected', [
+    (pd.Series(['1.000', 5]), [1000, 5]),
+    (pd.Series(['1.000', True]), [1000, 1]),
+    (pd.Series(['1.000', 2.5, np.nan, None, 'x']), [1000, 2.5, -1, -1, -1]),
+    (['2.500,5', np.int64(7), np.float32(0.5)], [2500.5, 7, 0.5]),
+    (np.array([3, '1.234'], dtype=object), [3, 1234]),
+    (pd.Series([pd.Timestamp('2024-01-01'), '12']), [-1, 12]),
+])
+def test_parse_numbers_mixed_types(backend, values, expected):
+    assert list(parse_numbers(values, invalid=-1)) == expected
@@ -0,0 +1,46 @@
+"""Token bucket dùng chung: thứ tự chờ, phạt khi bị 429 và số request đang chờ."""
+import pytest
+
+from thamdinh.rate_limit import TokenBucketLimiter
+
+KEY = 'key:model'
+
+
+@pytest.fixture
+def limiter(tmp_path):
+    # 1 token/giây: các lượt chờ cách nhau 1 giây, đủ dài để test không phụ thuộc tốc độ máy
+    return TokenBucketLimiter(str(tmp_path / 'rate_limit.sqlite3'), rate=1, capacity=1)
+
+
+def test_reservations_queue_in_order(limiter):
+    waits = [limiter.reserve(KEY) for _ in range(3)]
+    assert waits[0] == 0
+    assert waits[1] == pytest.approx(1, abs=0.05)
+    assert waits[2] == pytest.approx(2, abs=0.05)
+    stats = limiter.stats(KEY)
+    assert stats['queue_depth'] == 2
+    assert stats['acquired'] == 3 and stats['waited'] == 2
+    assert stats['max_wait'] == pytest.approx(2, abs=0.05)
+
+
+def test_penalize_without_waiters_has_empty_queue(limiter):
+    limiter.penalize(KEY, 30)
+    stats = limiter.stats(KEY)
+    assert stats['queue_depth'] == 0
+    assert stats['throttled'] == 1
+    # Request kế tiếp chờ hết thời gian phạt và là request duy nhất đang chờ
+    assert limiter.reserve(KEY) == pytest.approx(30, abs=0.05)
+    assert limiter.stats(KEY)['queue_depth'] == 1
+
+
+def test_penalize_keeps_queued_requests(limiter):
+    limiter.reserve(KEY)
+    limiter.reserve(KEY)
+    limiter.penalize(KEY, 10)
+    assert limiter.stats(KEY)['queue_depth'] == 1
+    assert limiter.reserve(KEY) == pytest.approx(10, abs=0.05)
+    assert limiter.stats(KEY)['queue_depth'] == 2
+
+
+def test_unknown_key(limiter):
+    assert limiter.stats('other')['queue_depth'] == 0
@@ -0,0 +1,127 @@
+"""Giới hạn khoản vay của ``solve_limits`` nằm đúng tại biên DSCR/DTI khi tính lại bằng calculate_financial_metrics."""
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from thamdinh.finance import DSCR_MIN, DTI_MAX, LTV_MAX, calculate_financial_metrics
+from thamdinh.solver import MAX_TERM, solve_case, solve_portfolio
+
+FINANCIAL_INFO = {'loan_amount': 9e8, 'interest_rate': 9.0, 'loan_term': 120, 'repayment_method': 'annuity',
+                  'monthly_income': 4e7, 'monthly_expense': 1.2e7}
+
+
+def _random_cases(count):
+    rng = np.random.default_rng(0)
+    return [{'loan_amount': rng.uniform(1e8, 3e9), 'interest_rate': rng.choice([0.0, rng.uniform(3, 15)]),
+             'loan_term': int(rng.integers(1, 300)), 'monthly_income': rng.uniform(1e7, 1e8),
+             'monthly_expense': rng.uniform(0, 5e7), 'repayment_method': ('equal_principal', 'annuity')[index % 2],
+             'grace_months': int(rng.choice([0, rng.integers(0, 12)])),
+             'balloon_amount': rng.choice([0.0, rng.uniform(0, 1e8)])} for index in range(count)]
+
+
+CASES = [FINANCIAL_INFO, dict(FINANCIAL_INFO, repayment_method='equal_principal'),
+         dict(FINANCIAL_INFO, interest_rate=0), dict(FINANCIAL_INFO, grace_months=12, balloon_amount=2e8)]
+CASES += _random_cases(120)
+
+
+def _margin(financial_info):
+    """Mức dư so với chính sách: ≥ 1 là đạt, = 1 khi đúng tại biên DSCR hoặc DTI"""
+    metrics = calculate_financial_metrics(financial_info)
+    return min(metrics['dscr'] / DSCR_MIN, DTI_MAX / metrics['debt_service_ratio'])
+
+
+def _passes(financial_info):
+    return _margin(financial_info) >= 1 - 1e-9
+
+
+@pytest.mark.parametrize('info', CASES)
+def test_max_loan_on_boundary(info):
+    limits = solve_case(info)
+    if limits['max_loan'] <= info.get('balloon_amount', 0):
+        # Gốc cuối kỳ bị giới hạn bằng số tiền vay: vẫn đạt, nhưng biên nằm ở chỗ gãy của khoản trả
+        assert limits['max_loan'] == 0 or _passes(dict(info, loan_amount=limits['max_loan']))
+        return
+    assert _margin(dict(info, loan_amount=limits['max_loan'])) == pytest.approx(1, abs=1e-9)
+    assert not _passes(dict(info, loan_amount=limits['max_loan'] * 1.0001 + 1))
+
+
+@pytest.mark.parametrize('info', CASES)
+def test_min_term_is_shortest_passing_term(info):
+    limits = solve_case(info)
+    if math.isnan(limits['min_term']):
+        # Không đạt ngay cả với thời hạn dài nhất được xét
+        assert not _passes(dict(info, loan_term=MAX_TERM))
+        return
+    assert limits['min_term'] == int(limits['min_term'])
+    assert _passes(dict(info, loan_term=int(limits['min_term'])))
+    if limits['min_term'] - 1 > info.get('grace_months', 0):
+        assert not _passes(dict(info, loan_term=int(limits['min_term']) - 1))
+
+
+@pytest.mark.parametrize('info', CASES)
+def test_max_rate_on_boundary(info):
+    limits = solve_case(info)
+    if math.isnan(limits['max_rate']):
+        assert not _passes(dict(info, interest_rate=0))
+        return
+    assert _passes(dict(info, interest_rate=limits['max_rate']))
+    assert not _passes(dict(info, interest_rate=limits['max_rate'] + 1e-6))
+    if limits['max_rate'] > 0:
+        assert _margin(dict(info, interest_rate=limits['max_rate'])) == pytest.approx(1, abs=1e-9)
+
+
+@pytest.mark.parametrize('info', CASES)
+def test_passed_matches_metrics(info):
+    assert solve_case(info)['passed'] == _passes(info)
+
+
+@pytest.mark.parametrize('changes', [{'loan_amount': 0}, {'loan_term': 0}, {'loan_amount': -1e8}])
+def test_invalid_loan_is_nan(changes):
+    limits = solve_case(dict(FINANCIAL_INFO, **changes))
+    assert math.isnan(limits['max_loan'])
+    assert math.isnan(limits['min_term'])
+    assert math.isnan(limits['max_rate'])
+    assert not limits['passed']
+
+
+@pytest.mark.parametrize('monthly_expense', [4e7, 5e7])
+def test_non_positive_net_income(monthly_expense):
+    limits = solve_case(dict(FINANCIAL_INFO, monthly_expense=monthly_expense))
+    assert limits['max_installment'] == 0
+    assert limits['max_loan'] == 0
+    assert math.isnan(limits['min_term'])
+    assert math.isnan(limits['max_rate'])
+    assert not limits['passed']
+
+
+def test_term_beyond_max_term_is_nan():
+    # Khoản trả tối đa chỉ lớn hơn tiền lãi một chút: cần hơn MAX_TERM tháng
+    info = dict(FINANCIAL_INFO, loan_amount=2.35e9, interest_rate=8.0)
+    limits = solve_case(info)
+    assert limits['max_installment'] > info['loan_amount'] * 0.08 / 12
+    assert math.isnan(limits['min_term'])
+    assert not _passes(dict(info, loan_term=MAX_TERM))
+
+
+def test_ltv_limit():
+    limits = solve_case(FINANCIAL_INFO, {'value': 1e9})
+    assert limits['max_loan_ltv'] == 1e9 * LTV_MAX / 100
+    assert limits['max_loan'] == min(limits['max_loan_ltv'], limits['max_loan_debt_service'])
+    assert math.isinf(solve_case(FINANCIAL_INFO)['max_loan_ltv'])
+
+
+def test_portfolio_matches_single_case():
+    cases = CASES[:40]
+    loans = pd.DataFrame(cases)
+    portfolio = solve_portfolio(loans)
+    for index, info in enumerate(cases):
+        single = solve_case(info)
+        for name, value in portfolio.iloc[index].items():
+            assert value == pytest.approx(single[name], nan_ok=True), name
+
+
+def test_unknown_repayment_method():
+    with pytest.raises(ValueError):
+        solve_case(dict(FINANCIAL_INFO, repayment_method='bullet'))
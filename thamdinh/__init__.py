@@ -0,0 +1 @@
+"""Các thành phần xử lý nghiệp vụ thẩm định, tách khỏi giao diện Streamlit."""
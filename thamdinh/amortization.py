@@ -0,0 +1,90 @@
+"""Lịch trả nợ tính theo cột bằng NumPy cho các phương thức trả nợ."""
+import numpy as np
+
+EQUAL_PRINCIPAL = 'equal_principal'
+ANNUITY = 'annuity'
+
+REPAYMENT_METHODS = {
+    EQUAL_PRINCIPAL: 'Gốc đều, lãi giảm dần',
+    ANNUITY: 'Trả đều hàng tháng (gốc + lãi cố định)',
+}
+
+# Tên cột hiển thị của lịch trả nợ
+SCHEDULE_COLUMNS = {
+    'month': 'Tháng',
+    'opening_balance': 'Dư nợ đầu kỳ',
+    'principal': 'Trả gốc',
+    'interest': 'Trả lãi',
+    'payment': 'Tổng trả',
+    'closing_balance': 'Dư nợ cuối kỳ',
+}
+
+
+# Hàm tính lịch trả nợ
+def build_schedule(loan_amount, annual_rate, loan_term, method=EQUAL_PRINCIPAL, grace_months=0, balloon_amount=0.0):
+    """Tính lịch trả nợ, trả về dict các cột numpy (mỗi phần tử là một tháng)
+
+    - grace_months: số tháng đầu chỉ trả lãi (ân hạn gốc)
+    - balloon_amount: phần gốc trả một lần vào tháng cuối
+    """
+    if loan_term <= 0:
+        raise ValueError("Thời hạn vay phải lớn hơn 0")
+    if not 0 <= grace_months < loan_term:
+        raise ValueError("Số tháng ân hạn phải nhỏ hơn thời hạn vay")
+    if not 0 <= balloon_amount <= loan_amount:
+        raise ValueError("Khoản trả gốc cuối kỳ phải nằm trong khoảng 0 đến số tiền vay")
+    if method not in REPAYMENT_METHODS:
+        raise ValueError(f"Phương thức trả nợ không hợp lệ: {method}")
+
+    monthly_rate = annual_rate / 100 / 12
+    amortizing_months = loan_term - grace_months
+
+    if method == EQUAL_PRINCIPAL:
+        principal = np.zeros(loan_term)
+        principal[grace_months:] = (loan_amount - balloon_amount) / amortizing_months
+        principal[-1] += balloon_amount
+        # Trừ dồn tuần tự như vòng lặp cộng dồn: balance[m] = balance[m-1] - principal[m]
+        balances = np.subtract.accumulate(np.concatenate(([loan_amount], principal)))
+        remaining = balances[1:]
+        interest = balances[:-1] * monthly_rate
+        opening = remaining + principal
+        payment = principal + interest
+        closing = np.maximum(remaining, 0)
+    else:
+        growth = 1 + monthly_rate
+        if monthly_rate:
+            discount = growth ** -amortizing_months
+            installment = (loan_amount - balloon_amount * discount) * monthly_rate / (1 - discount)
+        else:
+            installment = (loan_amount - balloon_amount) / amortizing_months
+        # Dư nợ sau j kỳ trả đều: L(1+r)^j - A((1+r)^j - 1)/r
+        paid_periods = np.concatenate((np.zeros(grace_months + 1), np.arange(1, amortizing_months + 1)))
+        if monthly_rate:
+            compound = growth ** paid_periods
+            balances = loan_amount * compound - installment * (compound - 1) / monthly_rate
+        else:
+            balances = loan_amount - installment * paid_periods
+        opening = balances[:-1]
+        interest = opening * monthly_rate
+        principal = balances[:-1] - balances[1:]
+        # Tháng cuối tất toán toàn bộ dư nợ còn lại (kể cả khoản balloon)
+        principal[-1] = opening[-1]
+        payment = principal + interest
+        closing = np.maximum(opening - principal, 0)
+
+    return {
+        'month': np.arange(1, loan_term + 1),
+        'opening_balance': opening,
+        'principal': principal,
+        'interest': interest,
+        'payment': payment,
+        'closing_balance': closing,
+    }
+
+
+# Hàm dựng bảng hiển thị từ lịch trả nợ
+def schedule_to_dataframe(schedule):
+    """Chuyển lịch trả nợ dạng cột thành DataFrame với tên cột tiếng Việt"""
+    import pandas as pd
+
+    return pd.DataFrame({label: schedule[key] for key, label in SCHEDULE_COLUMNS.items()})
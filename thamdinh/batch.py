@@ -0,0 +1,211 @@
+"""Trích xuất hàng loạt nhiều file PASDV song song trên nhiều tiến trình."""
+import io
+import multiprocessing
+import os
+import signal
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+
+import pandas as pd
+
+from thamdinh.extraction import extract_info_from_docx, extraction_cache_key
+from thamdinh.portfolio import OPTIONAL_COLUMNS, REQUIRED_COLUMNS, compute_portfolio_metrics
+from thamdinh.solver import SOLVER_COLUMNS, solve_portfolio
+
+# Thời gian tối đa cho một file (giây) để một file lỗi/chậm không giữ cả lô
+DEFAULT_TIMEOUT = 60
+
+# Các cột hiển thị trong bảng kết quả: (nhóm thông tin, khóa, nhãn)
+BATCH_COLUMNS = [
+    ('customer_info', 'name', 'Họ và tên'),
+    ('customer_info', 'cccd', 'CCCD'),
+    ('customer_info', 'phone', 'Số điện thoại'),
+    ('customer_info', 'email', 'Email'),
+    ('customer_info', 'address', 'Địa chỉ'),
+    ('financial_info', 'purpose', 'Mục đích vay'),
+    ('financial_info', 'total_need', 'Tổng nhu cầu vốn'),
+    ('financial_info', 'equity', 'Vốn đối ứng'),
+    ('financial_info', 'loan_amount', 'Số tiền vay'),
+    ('financial_info', 'interest_rate', 'Lãi suất (%/năm)'),
+    ('financial_info', 'loan_term', 'Thời hạn (tháng)'),
+    ('financial_info', 'monthly_income', 'Thu nhập/tháng'),
+    ('financial_info', 'monthly_expense', 'Chi phí/tháng'),
+    ('financial_info', 'project_income', 'Thu nhập dự án/tháng'),
+    ('collateral_info', 'type', 'Loại TSĐB'),
+    ('collateral_info', 'value', 'Giá trị TSĐB'),
+    ('collateral_info', 'address', 'Địa chỉ TSĐB'),
+    ('collateral_info', 'area', 'Diện tích (m²)'),
+]
+
+# Các chỉ tiêu tính cho từng hồ sơ trong lô: (khóa, nhãn)
+BATCH_METRIC_COLUMNS = [
+    ('installment', 'Trả nợ/tháng'),
+    ('debt_service_ratio', 'DTI (%)'),
+    ('dscr', 'DSCR'),
+    ('surplus', 'Thặng dư/tháng'),
+]
+
+
+class ExtractionTimeout(Exception):
+    """Trích xuất một file vượt quá thời gian cho phép"""
+
+
+def _empty_result(name):
+    return {
+        'file': name,
+        'customer_info': {},
+        'financial_info': {},
+        'collateral_info': {},
+        'full_text': '',
+        'error': None,
+        'seconds': 0.0,
+        'cached': False,
+    }
+
+
+# Hàm gom file từ upload (docx hoặc zip chứa nhiều docx)
+def collect_batch_files(uploaded_files):
+    """Trả về (danh sách (tên, bytes) cần trích xuất, danh sách kết quả lỗi sẵn)"""
+    items = []
+    errors = []
+    for uploaded in uploaded_files:
+        data = uploaded.getvalue()
+        if not uploaded.name.lower().endswith('.zip'):
+            items.append((uploaded.name, data))
+            continue
+        try:
+            with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                for info in archive.infolist():
+                    base_name = os.path.basename(info.filename)
+                    if (info.is_dir() or info.filename.startswith('__MACOSX/')
+                            or base_name.startswith('~$')
+                            or not base_name.lower().endswith('.docx')):
+                        continue
+                    items.append((f"{uploaded.name}/{info.filename}", archive.read(info)))
+        except (zipfile.BadZipFile, OSError) as e:
+            result = _empty_result(uploaded.name)
+            result['error'] = f"File zip không hợp lệ: {e}"
+            errors.append(result)
+    return items, errors
+
+
+@contextmanager
+def _time_limit(seconds):
+    """Ngắt xử lý bằng SIGALRM khi quá thời gian (chỉ trên hệ thống hỗ trợ)"""
+    if not seconds or not hasattr(signal, 'SIGALRM'):
+        yield
+        return
+
+    def _raise_timeout(signum, frame):
+        raise ExtractionTimeout(f"Quá thời gian xử lý ({seconds} giây)")
+
+    previous = signal.signal(signal.SIGALRM, _raise_timeout)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+# Hàm chạy trong tiến trình con: mọi lỗi được gói vào kết quả
+def extract_one(name, data, timeout=DEFAULT_TIMEOUT):
+    """Trích xuất một file, không để lỗi lan ra ngoài"""
+    result = _empty_result(name)
+    start = time.perf_counter()
+    try:
+        with _time_limit(timeout):
+            customer_info, financial_info, collateral_info, full_text = extract_info_from_docx(io.BytesIO(data))
+        result.update({
+            'customer_info': customer_info,
+            'financial_info': financial_info,
+            'collateral_info': collateral_info,
+            'full_text': full_text,
+        })
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+# Hàm trích xuất hàng loạt bằng process pool
+def run_batch_extraction(items, max_workers=None, timeout=DEFAULT_TIMEOUT, cache=None):
+    """Trích xuất song song, trả về từng kết quả ngay khi file đó xong
+
+    Nếu có ``cache`` (DiskCache), file đã trích xuất trước đó được trả về ngay không cần xử lý lại,
+    và kết quả thành công của file mới được lưu vào cache.
+    """
+    pending = []
+    for name, data in items:
+        key = extraction_cache_key(data) if cache is not None else None
+        cached = cache.get(key) if key else None
+        if cached is None:
+            pending.append((name, data, key))
+            continue
+        result = _empty_result(name)
+        customer_info, financial_info, collateral_info, full_text = cached
+        result.update({
+            'customer_info': customer_info,
+            'financial_info': financial_info,
+            'collateral_info': collateral_info,
+            'full_text': full_text,
+            'cached': True,
+        })
+        yield result
+
+    if not pending:
+        return
+    max_workers = max(1, min(max_workers or os.cpu_count() or 1, len(pending)))
+    # spawn an toàn hơn fork khi tiến trình cha (server Streamlit) đang chạy nhiều thread
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+        futures = {executor.submit(extract_one, name, data, timeout): (name, key) for name, data, key in pending}
+        for future in as_completed(futures):
+            name, key = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                # Tiến trình con bị dừng đột ngột (hết bộ nhớ, crash thư viện...)
+                result = _empty_result(name)
+                result['error'] = f"{type(e).__name__}: {e}"
+            if key and not result['error']:
+                cache.set(key, [result['customer_info'], result['financial_info'],
+                                result['collateral_info'], result['full_text']])
+            yield result
+
+
+# Hàm dựng bảng kết quả, mỗi file một dòng
+def batch_results_to_dataframe(results):
+    """Chuyển danh sách kết quả trích xuất thành DataFrame"""
+    rows = []
+    for result in results:
+        if result['error']:
+            status = '❌ Lỗi'
+        else:
+            status = '⚡ Đã lưu sẵn' if result.get('cached') else '✅ Thành công'
+        row = {'File': result['file'], 'Trạng thái': status}
+        for section, key, label in BATCH_COLUMNS:
+            row[label] = result[section].get(key)
+        rows.append(row)
+    df = pd.DataFrame(rows)
+
+    loans = pd.DataFrame([result['financial_info'] for result in results],
+                         columns=REQUIRED_COLUMNS + list(OPTIONAL_COLUMNS))
+    metrics = compute_portfolio_metrics(loans)
+    for key, label in BATCH_METRIC_COLUMNS:
+        df[label] = metrics[key].round(2).to_numpy()
+    limits = solve_portfolio(loans, [pd.to_numeric(result['collateral_info'].get('value'), errors='coerce')
+                                     for result in results])
+    for key, label in SOLVER_COLUMNS:
+        df[label] = limits[key].round(2).to_numpy()
+    # Kết quả kiểm tra trùng (duplicates.find_batch_duplicates) nếu đã chạy
+    reports = [result.get('duplicates') for result in results]
+    if any(reports):
+        df['Hồ sơ trùng KH'] = [report['applicant_cases'] if report else None for report in reports]
+        df['Tổng vay của KH'] = [report['total_exposure'] if report else None for report in reports]
+        df['Hồ sơ trùng TSĐB'] = [report['collateral_cases'] if report else None for report in reports]
+    df['Thời gian (giây)'] = [round(result['seconds'], 3) for result in results]
+    df['Lỗi'] = [result['error'] or '' for result in results]
+    return df
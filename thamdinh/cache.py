@@ -0,0 +1,50 @@
+"""Bộ nhớ đệm LRU giới hạn kích thước, có đếm số lần dùng lại/tính mới."""
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Bộ nhớ đệm giữ tối đa ``maxsize`` mục, bỏ mục lâu nhất chưa dùng khi đầy"""
+
+    def __init__(self, maxsize=128):
+        if maxsize <= 0:
+            raise ValueError("Kích thước bộ nhớ đệm phải lớn hơn 0")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get_or_compute(self, key, compute):
+        """Trả về giá trị đã lưu của ``key``, chưa có thì gọi ``compute()`` rồi lưu lại"""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+        # Tính ngoài khóa để các luồng khác không phải chờ; hai luồng cùng tính một khóa chỉ tốn thêm một lần tính
+        value = compute()
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Số lần dùng lại, số lần tính mới và số mục đang lưu"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._data), 'maxsize': self.maxsize}
@@ -0,0 +1,301 @@
+"""Kho hồ sơ thẩm định lưu trên đĩa (SQLite), tra cứu lại được sau khi tải lại trang hoặc khởi động lại server.
+
+Mỗi hồ sơ là một dòng: thông tin khách hàng/tài chính/tài sản, chỉ tiêu, kết quả phân tích AI và lịch sử chat
+dạng JSON; toàn văn file nén zlib; lịch trả nợ lưu các cột số float64 xếp theo byte rồi nén (tháng suy ra từ thứ
+tự nên không lưu). CCCD, số điện thoại (chỉ giữ chữ số) và ngày tạo có chỉ mục; tên khách hàng được tìm theo
+từng từ (bỏ dấu, khớp đầu từ) qua bảng FTS5. Bảng ``case_keys`` giữ khóa tra cứu trùng khách hàng/TSĐB (xem
+``thamdinh.duplicates``), cập nhật cùng giao dịch với hồ sơ. Như DiskCache, mỗi thao tác mở kết nối riêng.
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from thamdinh.amortization import SCHEDULE_COLUMNS
+from thamdinh.duplicates import MAX_CANDIDATES, case_identity, identity_keys
+from thamdinh.text import fold_vietnamese, normalize_digits, normalize_phone, tokenize
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cases (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL DEFAULT '',
+    cccd TEXT NOT NULL DEFAULT '',
+    phone TEXT NOT NULL DEFAULT '',
+    loan_amount REAL NOT NULL DEFAULT 0,
+    source_file TEXT NOT NULL DEFAULT '',
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    data TEXT NOT NULL,
+    full_text BLOB,
+    schedule BLOB
+);
+CREATE INDEX IF NOT EXISTS cases_cccd ON cases (cccd);
+CREATE INDEX IF NOT EXISTS cases_phone ON cases (phone);
+CREATE INDEX IF NOT EXISTS cases_created_at ON cases (created_at);
+CREATE VIRTUAL TABLE IF NOT EXISTS case_names USING fts5 (name, tokenize = 'unicode61 remove_diacritics 0');
+CREATE TABLE IF NOT EXISTS case_identity (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    address TEXT NOT NULL,
+    collateral TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS case_keys (
+    key INTEGER NOT NULL,
+    case_id INTEGER NOT NULL,
+    PRIMARY KEY (key, case_id)
+) WITHOUT ROWID;
+"""
+
+# Các khóa session state của hồ sơ được lưu dạng JSON (chỉ lưu khóa có mặt, như kết quả phân tích AI đã chạy)
+CASE_FIELDS = [
+    'customer_info', 'financial_info', 'collateral_info', 'metrics',
+    'analysis_file', 'analysis_file_info', 'analysis_metrics', 'analysis_metrics_info',
+    'chat_history', 'chat_summary', 'chat_summarized',
+]
+# Các cột tiền của lịch trả nợ theo thứ tự lưu
+_SCHEDULE_MONEY = [key for key in SCHEDULE_COLUMNS if key != 'month']
+SEARCH_LIMIT = 50
+# Thông tin nhận dạng (như duplicates.case_identity) và cột lưu tương ứng
+_IDENTITY_FIELDS = ('cccd', 'phone', 'name', 'address', 'collateral')
+_IDENTITY_COLUMNS = 'cases.cccd, cases.phone, case_identity.name, address, collateral'
+# Phiên bản cấu trúc dữ liệu (PRAGMA user_version); kho cũ hơn được lập lại chỉ mục trùng hồ sơ khi mở
+_SCHEMA_VERSION = 1
+
+
+# Hàm lấy thư mục lưu dữ liệu
+def default_data_dir():
+    """Thư mục lưu kho hồ sơ, đổi được bằng biến môi trường THAMDINH_DATA_DIR"""
+    return os.environ.get('THAMDINH_DATA_DIR') or os.path.join(os.path.expanduser('~'), '.local', 'share',
+                                                                 'thamdinh')
+
+
+# Hàm nén lịch trả nợ
+def pack_schedule(schedule):
+    """Các cột tiền (float64, little-endian) nối liền nhau, xếp lại theo từng byte (byte thứ k của mọi số đứng
+    cạnh nhau, các byte dấu/số mũ gần giống nhau nén tốt hơn) rồi nén zlib"""
+    columns = np.stack([np.asarray(schedule[key], dtype='<f8') for key in _SCHEDULE_MONEY])
+    return zlib.compress(columns.view(np.uint8).reshape(-1, 8).T.tobytes())
+
+
+def unpack_schedule(blob):
+    """Ngược lại của ``pack_schedule``: dict cột như ``build_schedule``"""
+    shuffled = np.frombuffer(zlib.decompress(blob), dtype=np.uint8).reshape(8, -1)
+    columns = np.ascontiguousarray(shuffled.T).view('<f8').reshape(len(_SCHEDULE_MONEY), -1)
+    schedule = {'month': np.arange(1, columns.shape[1] + 1)}
+    schedule.update({key: columns[index].astype(float) for index, key in enumerate(_SCHEDULE_MONEY)})
+    return schedule
+
+
+def _json_default(value):
+    # Số NumPy trong chỉ tiêu (np.float64...) lưu thành số thường
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Không lưu được kiểu {type(value).__name__}")
+
+
+def _day_start(day):
+    return time.mktime(day.timetuple())
+
+
+class CaseStore:
+    """Kho hồ sơ thẩm định trên SQLite
+
+    Tìm kiếm và tra cứu trùng dùng lại một kết nối (chỉ để đọc) cho mỗi luồng: kết nối mới phải đọc lại cấu trúc bảng
+    (~0,3ms, nhiều hơn cả truy vấn). Mỗi câu lệnh đọc vẫn thấy dữ liệu mới nhất đã ghi từ kết nối khác (WAL).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.executescript(_SCHEMA)
+                if conn.execute('PRAGMA user_version').fetchone()[0] < _SCHEMA_VERSION:
+                    for case_id, data in conn.execute('SELECT id, data FROM cases').fetchall():
+                        data = json.loads(data)
+                        self._index(conn, case_id,
+                                    case_identity(data.get('customer_info'), data.get('collateral_info')))
+                    conn.execute(f'PRAGMA user_version = {_SCHEMA_VERSION}')
+        finally:
+            conn.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _reader(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def _row(self, case):
+        customer_info = case.get('customer_info') or {}
+        metrics = dict(case.get('metrics') or {})
+        schedule = metrics.pop('schedule', None)
+        data = {key: case[key] for key in CASE_FIELDS if key in case}
+        if metrics:
+            data['metrics'] = metrics
+        full_text = case.get('uploaded_content') or ''
+        identity = case_identity(customer_info, case.get('collateral_info'))
+        return (
+            customer_info.get('name') or '',
+            identity['cccd'],
+            identity['phone'],
+            float((case.get('financial_info') or {}).get('loan_amount', 0) or 0),
+            case.get('source_file') or '',
+            json.dumps(data, ensure_ascii=False, default=_json_default),
+            zlib.compress(full_text.encode('utf-8')) if full_text else None,
+            pack_schedule(schedule) if schedule is not None else None,
+        ), identity
+
+    @staticmethod
+    def _index(conn, case_id, identity):
+        conn.execute('INSERT INTO case_identity (id, name, address, collateral) VALUES (?, ?, ?, ?)',
+                     (case_id, identity['name'], identity['address'], identity['collateral']))
+        conn.executemany('INSERT OR IGNORE INTO case_keys (key, case_id) VALUES (?, ?)',
+                         [(key, case_id) for _, key in identity_keys(identity)])
+
+    @staticmethod
+    def _unindex(conn, case_id):
+        """Xóa tên và khóa tra cứu cũ của hồ sơ (khóa được tạo lại từ thông tin nhận dạng đã lưu)"""
+        row = conn.execute(f'SELECT {_IDENTITY_COLUMNS} FROM cases JOIN case_identity ON case_identity.id = cases.id '
+                           'WHERE cases.id = ?', (case_id,)).fetchone()
+        if row is not None:
+            identity = dict(zip(_IDENTITY_FIELDS, row))
+            conn.executemany('DELETE FROM case_keys WHERE key = ? AND case_id = ?',
+                             [(key, case_id) for _, key in identity_keys(identity)])
+        conn.execute('DELETE FROM case_identity WHERE id = ?', (case_id,))
+        conn.execute('DELETE FROM case_names WHERE rowid = ?', (case_id,))
+
+    def _write(self, conn, row, identity, case_id, now):
+        updated = 0
+        if case_id is not None:
+            self._unindex(conn, case_id)
+            updated = conn.execute(
+                'UPDATE cases SET name = ?, cccd = ?, phone = ?, loan_amount = ?, source_file = ?, data = ?, '
+                'full_text = ?, schedule = ?, updated_at = ? WHERE id = ?', row + (now, case_id)).rowcount
+        if not updated:
+            case_id = conn.execute(
+                'INSERT INTO cases (name, cccd, phone, loan_amount, source_file, data, full_text, schedule, '
+                'created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', row + (now, now)).lastrowid
+        conn.execute('INSERT INTO case_names (rowid, name) VALUES (?, ?)', (case_id, fold_vietnamese(row[0])))
+        self._index(conn, case_id, identity)
+        return case_id
+
+    def save(self, case, case_id=None):
+        """Lưu hồ sơ (dict các khóa của CASE_FIELDS, thêm 'uploaded_content', 'source_file'), trả về mã hồ sơ;
+        có ``case_id`` thì ghi đè hồ sơ đó và giữ ngày tạo"""
+        return self.save_many([case], [case_id])[0]
+
+    def save_many(self, cases, case_ids=None):
+        """Như ``save`` cho nhiều hồ sơ trong một giao dịch (nhanh hơn nhiều khi lưu cả lô), trả về danh sách mã"""
+        rows = [self._row(case) for case in cases]
+        case_ids = list(case_ids) if case_ids is not None else [None] * len(rows)
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                return [self._write(conn, row, identity, case_id, now)
+                        for (row, identity), case_id in zip(rows, case_ids)]
+        finally:
+            conn.close()
+
+    def load(self, case_id):
+        """Hồ sơ đã lưu (dict như ``save`` nhận, thêm 'id', 'created_at', 'updated_at'; lịch trả nợ nằm trong
+        'metrics'), hoặc None nếu không có"""
+        conn = self._connect()
+        try:
+            row = conn.execute('SELECT data, full_text, schedule, source_file, created_at, updated_at FROM cases '
+                               'WHERE id = ?', (case_id,)).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        data, full_text, schedule, source_file, created_at, updated_at = row
+        case = json.loads(data)
+        if schedule is not None:
+            case.setdefault('metrics', {})['schedule'] = unpack_schedule(schedule)
+        case.update({
+            'id': case_id,
+            'uploaded_content': zlib.decompress(full_text).decode('utf-8') if full_text else '',
+            'source_file': source_file,
+            'created_at': created_at,
+            'updated_at': updated_at,
+        })
+        return case
+
+    def delete(self, case_id):
+        conn = self._connect()
+        try:
+            with conn:
+                self._unindex(conn, case_id)
+                conn.execute('DELETE FROM cases WHERE id = ?', (case_id,))
+        finally:
+            conn.close()
+
+    def search(self, query='', date_from=None, date_to=None, limit=SEARCH_LIMIT):
+        """Tìm hồ sơ, mới tạo trước: ``query`` toàn chữ số khớp đầu CCCD hoặc số điện thoại, ngược lại khớp đầu
+        từng từ của tên (không phân biệt dấu, hoa thường); ``date_from``/``date_to`` (date) lọc theo ngày tạo.
+        Trả về danh sách dict 'id', 'name', 'cccd', 'phone', 'loan_amount', 'source_file', 'created_at', 'updated_at'
+        """
+        conditions, params = [], []
+        query = (query or '').strip()
+        if query and not re.search(r'[^\d\s.+()-]', query):
+            digits, phone = normalize_digits(query), normalize_phone(query)
+            # Đầu số quốc tế gõ dở ("+84 913") chưa đủ 11 chữ số để normalize_phone nhận ra
+            if query.startswith('+84'):
+                phone = '0' + digits[2:]
+            # Khoảng [q, q + "~") dùng được chỉ mục như tìm theo tiền tố
+            conditions.append('((cccd >= ? AND cccd < ?) OR (phone >= ? AND phone < ?))')
+            params += [digits, digits + '~', phone, phone + '~']
+        elif query:
+            words = tokenize(query)
+            if not words:
+                return []
+            conditions.append('id IN (SELECT rowid FROM case_names WHERE case_names MATCH ?)')
+            params.append(' AND '.join(f'"{word}"*' for word in words))
+        if date_from is not None:
+            conditions.append('created_at >= ?')
+            params.append(_day_start(date_from))
+        if date_to is not None:
+            conditions.append('created_at < ?')
+            params.append(_day_start(date_to) + 86400)
+        sql = ('SELECT id, name, cccd, phone, loan_amount, source_file, created_at, updated_at FROM cases'
+               + (' WHERE ' + ' AND '.join(conditions) if conditions else '')
+               + ' ORDER BY created_at DESC LIMIT ?')
+        rows = self._reader().execute(sql, params + [limit]).fetchall()
+        keys = ('id', 'name', 'cccd', 'phone', 'loan_amount', 'source_file', 'created_at', 'updated_at')
+        return [dict(zip(keys, row)) for row in rows]
+
+    def match_candidates(self, keys, exclude_id=None, limit=MAX_CANDIDATES):
+        """Các hồ sơ có ít nhất một khóa tra cứu trong ``keys`` (xem ``duplicates.identity_keys``), tối đa ``limit``
+        hồ sơ mới nhất cho mỗi khóa; mỗi dòng như ``search`` thêm 'identity' (như ``duplicates.case_identity``)"""
+        if not keys:
+            return []
+        lookup = ' UNION '.join(['SELECT * FROM (SELECT case_id FROM case_keys WHERE key = ? '
+                                 'ORDER BY case_id DESC LIMIT ?)'] * len(keys))
+        sql = ('SELECT cases.id, cases.name, loan_amount, source_file, created_at, updated_at, '
+               f'{_IDENTITY_COLUMNS} FROM cases JOIN case_identity ON case_identity.id = cases.id '
+               f'WHERE cases.id IN ({lookup})')
+        rows = self._reader().execute(sql, [value for key in keys for value in (key, limit)]).fetchall()
+        names = ('id', 'name', 'loan_amount', 'source_file', 'created_at', 'updated_at')
+        return [dict(zip(names, row), cccd=row[6], phone=row[7], identity=dict(zip(_IDENTITY_FIELDS, row[6:])))
+                for row in rows if row[0] != exclude_id]
+
+    def stats(self):
+        """Số hồ sơ và dung lượng file dữ liệu"""
+        conn = self._connect()
+        try:
+            count = conn.execute('SELECT COUNT(*) FROM cases').fetchone()[0]
+        finally:
+            conn.close()
+        return {'size': count, 'bytes': os.path.getsize(self.path)}
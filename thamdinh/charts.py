@@ -0,0 +1,222 @@
+"""Dựng biểu đồ Plotly cho hồ sơ và danh mục khoản vay.
+
+Chuỗi dài được rút gọn ngay trên máy chủ trước khi gửi xuống trình duyệt (giữ điểm cao nhất/thấp nhất
+của từng khoảng nên không mất đỉnh), và vẽ bằng WebGL (``Scattergl``) khi nhiều điểm thay vì SVG.
+Plotly chỉ được nạp khi dựng biểu đồ.
+"""
+import math
+
+import numpy as np
+
+# Chế độ vẽ: tên -> nhãn hiển thị ("auto": WebGL khi chuỗi dài hơn WEBGL_THRESHOLD điểm, như plotly.express)
+RENDER_MODES = {
+    'auto': 'Tự động',
+    'webgl': 'WebGL',
+    'svg': 'SVG',
+}
+WEBGL_THRESHOLD = 1000
+# Số điểm tối đa gửi xuống trình duyệt cho mỗi biểu đồ đường
+MAX_POINTS = 4000
+# Chuỗi ngắn hơn thì vẫn vẽ điểm đánh dấu / cột chồng như trước
+MARKER_LIMIT = 120
+BAR_LIMIT = 120
+
+PRINCIPAL_COLOR = '#1f77b4'
+INTEREST_COLOR = '#ff7f0e'
+
+
+def _use_webgl(render_mode, points):
+    if render_mode not in RENDER_MODES:
+        raise ValueError(f"Chế độ vẽ không hợp lệ: {render_mode}")
+    return render_mode == 'webgl' or (render_mode == 'auto' and points > WEBGL_THRESHOLD)
+
+
+def _scatter(render_mode, points, **kwargs):
+    """Đường ``go.Scattergl`` (WebGL) hoặc ``go.Scatter`` (SVG) theo chế độ vẽ"""
+    import plotly.graph_objects as go
+
+    trace = go.Scattergl if _use_webgl(render_mode, points) else go.Scatter
+    return trace(**kwargs)
+
+
+# Hàm rút gọn chuỗi số liệu dài
+def downsample_indices(ys, max_points=MAX_POINTS):
+    """Chỉ số các điểm giữ lại (tăng dần) khi vẽ các chuỗi ``ys`` cùng trục x
+
+    Chia chuỗi thành các khoảng đều nhau, mỗi khoảng giữ điểm thấp nhất và cao nhất của từng chuỗi,
+    cùng điểm đầu và điểm cuối; chuỗi không dài hơn ``max_points`` được giữ nguyên.
+    """
+    ys = [np.asarray(y, dtype=float) for y in ys]
+    length = len(ys[0]) if ys else 0
+    if length <= max_points:
+        return np.arange(length)
+    buckets = max(max_points // (2 * len(ys)), 1)
+    size = math.ceil(length / buckets)
+    offsets = np.arange(buckets) * size
+    kept = [np.array([0, length - 1])]
+    for y in ys:
+        padded = np.full(buckets * size, np.nan)
+        padded[:length] = y
+        grid = padded.reshape(buckets, size)
+        for fill, pick in ((np.inf, np.argmin), (-np.inf, np.argmax)):
+            kept.append(offsets + pick(np.where(np.isnan(grid), fill, grid), axis=1))
+    indices = np.unique(np.concatenate(kept))
+    return indices[indices < length]
+
+
+def _schedule_series(schedule, keys, max_points):
+    """Tháng và các cột lịch trả nợ sau khi rút gọn"""
+    indices = downsample_indices([schedule[key] for key in keys], max_points)
+    return schedule['month'][indices], [np.asarray(schedule[key])[indices] for key in keys]
+
+
+def _stacked_areas(render_mode, months, principal, interest):
+    """Gốc và lãi dạng vùng chồng (Scattergl không có stackgroup nên tự cộng dồn, hover vẫn hiện số từng phần)"""
+    return [
+        _scatter(render_mode, len(months), x=months, y=principal, name='Trả gốc', mode='lines', fill='tozeroy',
+                 line=dict(color=PRINCIPAL_COLOR, width=1)),
+        _scatter(render_mode, len(months), x=months, y=principal + interest, customdata=interest, name='Trả lãi',
+                 mode='lines', fill='tonexty', line=dict(color=INTEREST_COLOR, width=1),
+                 hovertemplate='%{customdata:,.0f}'),
+    ]
+
+
+# Hàm dựng biểu đồ cơ cấu thanh toán tháng đầu
+def payment_mix_figure(metrics):
+    import plotly.graph_objects as go
+
+    return go.Figure(go.Pie(labels=['Gốc', 'Lãi'],
+                            values=[metrics.get('monthly_principal', 0), metrics.get('first_month_interest', 0)],
+                            marker=dict(colors=[PRINCIPAL_COLOR, INTEREST_COLOR])))
+
+
+# Hàm dựng biểu đồ thu chi hàng tháng
+def income_expense_figure(financial_info, metrics):
+    import plotly.graph_objects as go
+
+    figure = go.Figure(go.Bar(
+        x=['Thu nhập', 'Chi phí', 'Trả nợ', 'Còn lại'],
+        y=[financial_info.get('monthly_income', 0), financial_info.get('monthly_expense', 0),
+           metrics.get('first_month_payment', 0), metrics.get('surplus', 0)],
+        marker_color=['#2ca02c', '#d62728', INTEREST_COLOR, PRINCIPAL_COLOR]))
+    figure.update_layout(showlegend=False, yaxis_title="Số tiền (đồng)")
+    return figure
+
+
+# Hàm dựng biểu đồ diễn biến dư nợ
+def balance_figure(schedule, render_mode='auto', max_points=MAX_POINTS):
+    import plotly.graph_objects as go
+
+    months, (balance,) = _schedule_series(schedule, ['closing_balance'], max_points)
+    figure = go.Figure(_scatter(
+        render_mode, len(months), x=months, y=balance, name='Dư nợ',
+        mode='lines+markers' if len(months) <= MARKER_LIMIT else 'lines',
+        line=dict(color=PRINCIPAL_COLOR, width=2), marker=dict(size=6)))
+    figure.update_layout(xaxis_title="Tháng", yaxis_title="Dư nợ (đồng)", hovermode='x unified')
+    return figure
+
+
+# Hàm dựng biểu đồ gốc và lãi theo tháng
+def principal_interest_figure(schedule, render_mode='auto', max_points=MAX_POINTS):
+    """Cột chồng cho lịch ngắn; lịch dài hơn BAR_LIMIT tháng vẽ vùng chồng (hàng trăm cột SVG rất chậm)"""
+    import plotly.graph_objects as go
+
+    figure = go.Figure()
+    if len(schedule['month']) <= BAR_LIMIT:
+        figure.add_trace(go.Bar(x=schedule['month'], y=schedule['principal'], name='Trả gốc',
+                                marker_color=PRINCIPAL_COLOR))
+        figure.add_trace(go.Bar(x=schedule['month'], y=schedule['interest'], name='Trả lãi',
+                                marker_color=INTEREST_COLOR))
+    else:
+        months, (principal, interest) = _schedule_series(schedule, ['principal', 'interest'], max_points)
+        figure.add_traces(_stacked_areas(render_mode, months, principal, interest))
+    figure.update_layout(barmode='stack', xaxis_title="Tháng", yaxis_title="Số tiền (đồng)", hovermode='x unified')
+    return figure
+
+
+# Hàm dựng biểu đồ dòng tiền danh mục
+def portfolio_cash_flow_figure(flow, render_mode='auto', max_points=MAX_POINTS):
+    """Gốc và lãi thu về theo tháng của cả danh mục (vùng chồng) và số khoản vay còn dư nợ (trục phải);
+    ``flow`` là kết quả ``portfolio_cash_flow``"""
+    import plotly.graph_objects as go
+
+    months, (principal, interest, active) = _schedule_series(flow, ['principal', 'interest', 'active'], max_points)
+    figure = go.Figure(_stacked_areas(render_mode, months, principal, interest))
+    figure.add_trace(_scatter(render_mode, len(months), x=months, y=active, name='Số khoản vay còn dư nợ',
+                              mode='lines', line=dict(color='#2ca02c', width=2, dash='dot'), yaxis='y2'))
+    figure.update_layout(xaxis_title="Tháng", yaxis_title="Số tiền (đồng)", hovermode='x unified',
+                         yaxis2=dict(title="Số khoản vay", overlaying='y', side='right', showgrid=False,
+                                     rangemode='tozero'),
+                         legend=dict(orientation='h', y=-0.2))
+    return figure
+
+
+# Hàm dựng biểu đồ dư nợ từng khoản vay của danh mục
+def portfolio_balance_figure(stacked, flow, render_mode='auto', max_points=MAX_POINTS * 5):
+    """Dư nợ của mọi khoản vay (một đường WebGL duy nhất, ngắt giữa các khoản vay) và tổng dư nợ danh mục
+
+    ``stacked`` là kết quả ``stack_schedules``: khi quá ``max_points`` điểm, mỗi khoản vay chỉ giữ
+    các tháng cách đều nhau và tháng cuối (dư nợ giảm dần nên đường vẫn đúng dáng).
+    """
+    import plotly.graph_objects as go
+
+    loans = stacked['loan']
+    months = stacked['month']
+    stride = max(math.ceil(len(loans) / max_points), 1)
+    last = np.append(loans[1:] != loans[:-1], True) if len(loans) else np.zeros(0, dtype=bool)
+    keep = ((months - 1) % stride == 0) | last
+    loans, months, balance = loans[keep], months[keep].astype(float), stacked['closing_balance'][keep]
+    # Một điểm NaN giữa hai khoản vay để Plotly ngắt đường
+    breaks = np.flatnonzero(loans[1:] != loans[:-1]) + 1
+    months = np.insert(months, breaks, np.nan)
+    balance = np.insert(balance, breaks, np.nan)
+
+    figure = go.Figure(_scatter(render_mode, len(months), x=months, y=balance, name='Từng khoản vay', mode='lines',
+                                line=dict(color='rgba(31, 119, 180, 0.25)', width=1), hoverinfo='skip'))
+    total_months, (total,) = _schedule_series(flow, ['closing_balance'], MAX_POINTS)
+    figure.add_trace(_scatter(render_mode, len(total_months), x=total_months, y=total, name='Tổng dư nợ',
+                              mode='lines', line=dict(color='#d62728', width=3), yaxis='y2'))
+    figure.update_layout(xaxis_title="Tháng", yaxis_title="Dư nợ từng khoản vay (đồng)",
+                         yaxis2=dict(title="Tổng dư nợ (đồng)", overlaying='y', side='right', showgrid=False,
+                                     rangemode='tozero'),
+                         legend=dict(orientation='h', y=-0.2))
+    return figure
+
+
+# Hàm dựng bản đồ nhiệt của lưới stress test
+def stress_heatmap(values, x_values, y_values, x_label, y_label, title, threshold, higher_is_better=True,
+                   value_format='.2f', max_text_cells=400):
+    """Bản đồ nhiệt ``values`` (hàng theo ``y_values``, cột theo ``x_values``), màu đổi tại ngưỡng ``threshold``:
+    xanh là đạt, đỏ là không đạt; lưới nhỏ ghi giá trị trong từng ô"""
+    import plotly.graph_objects as go
+
+    values = np.asarray(values, dtype=float)
+    heatmap = go.Heatmap(
+        z=values, x=[f"{value:g}" for value in x_values], y=[f"{value:g}" for value in y_values],
+        colorscale='RdYlGn' if higher_is_better else 'RdYlGn_r', zmin=0, zmax=2 * threshold, zmid=threshold,
+        colorbar=dict(title=title), hovertemplate=f"{x_label}: %{{x}}<br>{y_label}: %{{y}}<br>"
+                                                  f"{title}: %{{z:{value_format}}}<extra></extra>")
+    if values.size <= max_text_cells:
+        heatmap.update(texttemplate=f"%{{z:{value_format}}}", textfont=dict(size=10))
+    figure = go.Figure(heatmap)
+    figure.update_layout(xaxis_title=x_label, yaxis_title=y_label, xaxis_type='category', yaxis_type='category',
+                         margin=dict(t=30))
+    return figure
+
+
+# Hàm dựng biểu đồ xác suất thiếu hụt của mô phỏng Monte Carlo
+def shortfall_probability_figure(simulation):
+    """Xác suất thiếu hụt từng tháng và xác suất đã thiếu hụt ít nhất một lần tính đến tháng đó (%);
+    ``simulation`` là kết quả ``simulate_repayment``"""
+    import plotly.graph_objects as go
+
+    months = np.arange(1, simulation['months'] + 1)
+    figure = go.Figure([
+        go.Scatter(x=months, y=simulation['monthly_shortfall_probability'], name='Thiếu hụt trong tháng',
+                   mode='lines', line=dict(color=INTEREST_COLOR, width=2)),
+        go.Scatter(x=months, y=simulation['cumulative_shortfall_probability'], name='Đã thiếu hụt ít nhất một lần',
+                   mode='lines', line=dict(color='#d62728', width=2, dash='dot')),
+    ])
+    figure.update_layout(xaxis_title="Tháng", yaxis_title="Xác suất (%)", yaxis_range=[0, 100],
+                         hovermode='x unified', legend=dict(orientation='h', y=-0.2))
+    return figure
@@ -0,0 +1,100 @@
+"""Hội thoại nhiều lượt với lịch sử giới hạn: cửa sổ các lượt gần nhất cộng bản tóm tắt các lượt cũ hơn.
+
+Mỗi câu hỏi gửi kèm tối đa ``max_messages`` tin nhắn gần nhất vừa ngân sách token; các tin
+nhắn rơi khỏi cửa sổ được gộp dần vào một bản tóm tắt, nên kích thước prompt không tăng
+theo độ dài cuộc hội thoại.
+"""
+from thamdinh.summarize import estimate_tokens
+
+# Ngân sách token cho các tin nhắn gần nhất gửi kèm câu hỏi
+HISTORY_TOKEN_BUDGET = 3000
+# Số tin nhắn gần nhất tối đa (mỗi lượt gồm câu hỏi và trả lời)
+MAX_WINDOW_MESSAGES = 8
+# Số tin nhắn hiển thị trên một trang lịch sử
+PAGE_SIZE = 10
+
+SUMMARY_PROMPT = """
+Bạn đang hỗ trợ chuyên viên thẩm định tín dụng. Hãy cập nhật bản tóm tắt cuộc hội thoại dưới đây
+bằng tiếng Việt, tối đa 150 từ, giữ lại các câu hỏi chính, số liệu và kết luận đã trao đổi.
+
+Tóm tắt trước đó:
+{summary}
+
+Các tin nhắn mới cần gộp vào tóm tắt:
+{messages}
+"""
+
+_ROLE_LABELS = {'user': 'Chuyên viên', 'assistant': 'Trợ lý AI'}
+
+
+def _usable(message):
+    """Tin nhắn lỗi không được gửi lại cho model"""
+    return not message.get('error')
+
+
+# Hàm chọn cửa sổ tin nhắn gần nhất
+def window_start(history, token_budget=HISTORY_TOKEN_BUDGET, max_messages=MAX_WINDOW_MESSAGES):
+    """Chỉ số tin nhắn đầu tiên của cửa sổ: lấy ngược từ cuối cho đến khi hết số tin hoặc ngân sách"""
+    start = len(history)
+    used = 0
+    count = 0
+    while start > 0 and count < max_messages:
+        message = history[start - 1]
+        tokens = estimate_tokens(message['content']) if _usable(message) else 0
+        if count and used + tokens > token_budget:
+            break
+        used += tokens
+        count += 1 if _usable(message) else 0
+        start -= 1
+    # Cửa sổ luôn bắt đầu bằng câu hỏi của người dùng
+    while start < len(history) and history[start]['role'] != 'user':
+        start += 1
+    return start
+
+
+def _format_messages(messages):
+    return '\n'.join(f"{_ROLE_LABELS.get(message['role'], message['role'])}: {message['content']}"
+                     for message in messages if _usable(message))
+
+
+# Hàm gộp các tin nhắn cũ vào bản tóm tắt
+def update_summary(summary, messages, summarize):
+    """Trả về bản tóm tắt mới; ``summarize(prompt)`` trả về văn bản tóm tắt"""
+    text = _format_messages(messages)
+    if not text:
+        return summary
+    return summarize(SUMMARY_PROMPT.format(summary=summary or "(chưa có)", messages=text)).strip()
+
+
+# Hàm dựng nội dung gửi model cho một câu hỏi
+def build_contents(window, question, context='', summary=''):
+    """Danh sách lượt hội thoại theo định dạng Gemini (user/model); thông tin hồ sơ và tóm tắt đi kèm câu hỏi cuối"""
+    contents = []
+    for message in window:
+        if not _usable(message):
+            continue
+        role = 'user' if message['role'] == 'user' else 'model'
+        if contents and contents[-1]['role'] == role:
+            contents[-1]['parts'][0] += '\n' + message['content']
+        else:
+            contents.append({'role': role, 'parts': [message['content']]})
+    if contents and contents[-1]['role'] == 'user':
+        # Câu hỏi trước không có trả lời (lỗi): gộp vào câu hỏi mới để các lượt vẫn xen kẽ
+        contents.pop()
+    final = context
+    if summary:
+        final += f"\nTóm tắt phần hội thoại trước:\n{summary}\n"
+    final += f"\n\nCâu hỏi: {question}"
+    contents.append({'role': 'user', 'parts': [final]})
+    return contents
+
+
+# Hàm tính số trang lịch sử
+def page_count(history, page_size=PAGE_SIZE):
+    return max(1, -(-len(history) // page_size))
+
+
+# Hàm lấy tin nhắn của một trang (trang 1 là cũ nhất)
+def page_messages(history, page, page_size=PAGE_SIZE):
+    start = (page - 1) * page_size
+    return history[start:start + page_size]
@@ -0,0 +1,135 @@
+"""Bộ nhớ đệm lưu trên đĩa (SQLite), giữ được qua các phiên làm việc và khi khởi động lại server.
+
+Giá trị được lưu dưới dạng JSON. Mỗi mục có thời điểm truy cập gần nhất để loại bỏ
+theo LRU khi tổng dung lượng vượt giới hạn, và có thể có thời hạn sống (TTL).
+Mỗi thao tác mở kết nối riêng nên dùng được từ nhiều luồng và nhiều tiến trình.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at);
+"""
+
+
+# Hàm lấy thư mục lưu bộ nhớ đệm
+def default_cache_dir():
+    """Thư mục bộ nhớ đệm, đổi được bằng biến môi trường THAMDINH_CACHE_DIR"""
+    return os.environ.get('THAMDINH_CACHE_DIR') or os.path.join(os.path.expanduser('~'), '.cache', 'thamdinh')
+
+
+class DiskCache:
+    """Bộ nhớ đệm key/value trên SQLite, giới hạn tổng dung lượng ``max_bytes``"""
+
+    def __init__(self, path, max_bytes=100 * 1024 * 1024, default_ttl=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key, default=None):
+        """Lấy giá trị của ``key``; mục hết hạn được xóa và coi như chưa có"""
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                row = conn.execute('SELECT value, expires_at FROM entries WHERE key = ?', (key,)).fetchone()
+                if row is not None and row[1] is not None and row[1] <= now:
+                    conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+                    row = None
+                if row is not None:
+                    conn.execute('UPDATE entries SET accessed_at = ? WHERE key = ?', (now, key))
+        finally:
+            conn.close()
+        self._count(row is not None)
+        return default if row is None else json.loads(row[0])
+
+    def set(self, key, value, ttl=None):
+        """Lưu giá trị (phải chuyển được sang JSON), rồi loại mục ít dùng nhất nếu vượt dung lượng"""
+        ttl = self.default_ttl if ttl is None else ttl
+        payload = json.dumps(value, ensure_ascii=False)
+        size = len(payload.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)',
+                             (key, payload, size, now, now, now + ttl if ttl else None))
+                self._evict(conn, now)
+        finally:
+            conn.close()
+
+    def _evict(self, conn, now):
+        conn.execute('DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?', (now,))
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in conn.execute('SELECT key, size FROM entries ORDER BY accessed_at').fetchall():
+            conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def delete(self, key):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+        finally:
+            conn.close()
+
+    def clear(self):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute('DELETE FROM entries')
+        finally:
+            conn.close()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Số lần dùng lại, số lần chưa có, số mục và dung lượng đang lưu"""
+        conn = self._connect()
+        try:
+            count, total = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries').fetchone()
+        finally:
+            conn.close()
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': count, 'bytes': total,
+                    'max_bytes': self.max_bytes}
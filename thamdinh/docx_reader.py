@@ -0,0 +1,113 @@
+"""Đọc văn bản từ file .docx theo luồng, không dựng toàn bộ mô hình đối tượng python-docx.
+
+Nội dung ``word/document.xml`` được giải nén trực tiếp từ file zip và phân tích tăng dần
+bằng ``iterparse``; phần tử nào đã đọc xong được giải phóng ngay nên bộ nhớ không tăng
+theo kích thước tài liệu.
+"""
+import zipfile
+import xml.etree.ElementTree as ET
+
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_MC_FALLBACK = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback'
+
+_BODY = _W + 'body'
+_P = _W + 'p'
+_R = _W + 'r'
+_T = _W + 't'
+_BR = _W + 'br'
+_TR = _W + 'tr'
+_TC = _W + 'tc'
+
+# Phần tử trong một run được quy đổi sang ký tự tương ứng (giống python-docx)
+_RUN_CHARS = {
+    _W + 'tab': '\t',
+    _W + 'ptab': '\t',
+    _W + 'cr': '\n',
+    _W + 'noBreakHyphen': '-',
+}
+
+
+# Hàm duyệt các khối văn bản của file docx
+def iter_docx_blocks(file):
+    """Trả về lần lượt từng đoạn văn và từng hàng bảng (các ô cách nhau bằng tab) theo thứ tự trong tài liệu"""
+    with zipfile.ZipFile(file) as archive:
+        with archive.open('word/document.xml') as xml_file:
+            yield from _iter_blocks(xml_file)
+
+
+def _iter_blocks(xml_file):
+    paragraphs = []  # các đoạn đang mở (đoạn trong text box lồng trong đoạn ngoài)
+    cells = []       # các ô bảng đang mở, mỗi ô là danh sách dòng
+    rows = []        # các hàng bảng đang mở, mỗi hàng là danh sách nội dung ô
+    run_depth = 0
+    fallback_depth = 0
+    depth = 0
+    body = None
+
+    for event, elem in ET.iterparse(xml_file, events=('start', 'end')):
+        tag = elem.tag
+        if event == 'start':
+            depth += 1
+            if tag == _P:
+                paragraphs.append([])
+            elif tag == _R:
+                run_depth += 1
+            elif tag == _TC:
+                cells.append([])
+            elif tag == _TR:
+                rows.append([])
+            elif tag == _MC_FALLBACK:
+                # Nội dung dự phòng trùng với nhánh mc:Choice đã đọc
+                fallback_depth += 1
+            elif tag == _BODY:
+                body = elem
+            continue
+
+        depth -= 1
+        if run_depth and paragraphs and not fallback_depth:
+            if tag == _T:
+                paragraphs[-1].append(elem.text or '')
+            elif tag == _BR:
+                # Ngắt dòng thành "\n", ngắt trang/cột bỏ qua
+                if elem.get(_W + 'type', 'textWrapping') == 'textWrapping':
+                    paragraphs[-1].append('\n')
+            elif tag in _RUN_CHARS:
+                paragraphs[-1].append(_RUN_CHARS[tag])
+
+        if tag == _R:
+            run_depth -= 1
+        elif tag == _P:
+            line = ''.join(paragraphs.pop())
+            elem.clear()
+            if fallback_depth:
+                pass
+            elif cells:
+                cells[-1].append(line)
+            else:
+                yield line
+        elif tag == _TC:
+            cell_text = '\n'.join(cells.pop())
+            if rows:
+                rows[-1].append(cell_text)
+        elif tag == _TR:
+            line = '\t'.join(rows.pop())
+            elem.clear()
+            if fallback_depth:
+                pass
+            elif cells:
+                # Hàng của bảng lồng nằm trong ô của bảng ngoài
+                cells[-1].append(line)
+            else:
+                yield line
+        elif tag == _MC_FALLBACK:
+            fallback_depth -= 1
+
+        if depth == 2 and body is not None:
+            # Bỏ các phần tử cấp thân tài liệu đã xử lý xong
+            body.clear()
+
+
+# Hàm đọc toàn bộ văn bản của file docx
+def read_docx_text(file):
+    """Đọc nội dung văn bản (đoạn văn và bảng) của file docx"""
+    return '\n'.join(iter_docx_blocks(file))
@@ -0,0 +1,228 @@
+"""Phát hiện khách hàng/tài sản đảm bảo đã có trong hồ sơ khác và tổng dư nợ đề nghị của khách hàng.
+
+Họ tên và địa chỉ được bỏ dấu, bỏ dấu câu, mở rộng chữ viết tắt ("X. Thạch Hà" = "xã Thạch Hà"). Mỗi hồ sơ có
+các khóa tra cứu số nguyên 64 bit:
+
+- khóa chính xác cho CCCD và số điện thoại (đã chuẩn hóa);
+- khóa "họ tên + các số trong nơi cư trú" (số nhà, thôn/tổ): tên không phân biệt dấu và thứ tự từ;
+- khóa mờ cho địa chỉ TSĐB: chữ ký MinHash trên các bộ ba ký tự chia thành SIGNATURE_BANDS dải (LSH), mỗi dải
+  một khóa kèm các số trong địa chỉ (số thửa, số tờ bản đồ...). Hai địa chỉ cùng các số, độ tương đồng Jaccard s
+  trùng ít nhất một dải với xác suất 1 - (1 - s^BAND_ROWS)^SIGNATURE_BANDS (~99% khi s = 0,7).
+
+Tra cứu chỉ đọc một số cố định khóa trên chỉ mục B-tree (không phụ thuộc số hồ sơ), ứng viên được kiểm tra lại
+bằng ``match_reasons``. Các số trong địa chỉ phải trùng khớp vì hai thửa đất/hai nhà cạnh nhau có địa chỉ gần
+như giống hệt nhau về chữ.
+"""
+import hashlib
+import time
+import zlib
+
+import numpy as np
+
+from thamdinh.text import normalize_digits, normalize_phone, tokenize
+
+# Chữ viết tắt thường gặp trong địa chỉ (sau khi bỏ dấu)
+ADDRESS_ABBREVIATIONS = {
+    'tp': 'thanh pho',
+    'tx': 'thi xa',
+    'tt': 'thi tran',
+    'p': 'phuong',
+    'q': 'quan',
+    'h': 'huyen',
+    'x': 'xa',
+    't': 'tinh',
+    'kp': 'khu pho',
+    'to': 'to dan pho',
+}
+# Nhãn của các lý do trùng
+MATCH_REASONS = {
+    'cccd': 'CCCD',
+    'phone': 'Số điện thoại',
+    'person': 'Họ tên + nơi cư trú',
+    'collateral': 'Địa chỉ TSĐB',
+}
+# Số dải LSH và số giá trị MinHash mỗi dải
+SIGNATURE_BANDS = 8
+BAND_ROWS = 2
+# Ngưỡng độ tương đồng Jaccard (bộ ba ký tự) của phần chữ trong địa chỉ để coi là trùng
+ADDRESS_SIMILARITY = 0.6
+COLLATERAL_SIMILARITY = 0.7
+# Số hồ sơ gần nhất đọc cho mỗi khóa (tên/địa chỉ rất phổ biến không làm chậm tra cứu)
+MAX_CANDIDATES = 50
+
+_MERSENNE = (1 << 31) - 1
+# Tham số hoán vị MinHash cố định (a·x + b mod 2^31 - 1): sinh từ SHAKE-128 để không đổi giữa các phiên bản NumPy
+_PARAMS = np.frombuffer(hashlib.shake_128(b'thamdinh-minhash').digest(16 * SIGNATURE_BANDS * BAND_ROWS),
+                        dtype='<u8').reshape(2, -1, 1) & np.uint64(_MERSENNE)
+_MULTIPLIERS = _PARAMS[0] | np.uint64(1)
+_OFFSETS = _PARAMS[1]
+
+
+# Hàm chuẩn hóa họ tên, địa chỉ để so khớp
+def normalize_name(text):
+    return ' '.join(tokenize(text or ''))
+
+
+def normalize_address(text):
+    """Bỏ dấu, bỏ dấu câu, mở rộng chữ viết tắt ("P.Bắc Hà, TP Hà Tĩnh" -> "phuong bac ha thanh pho ha tinh")"""
+    return ' '.join(ADDRESS_ABBREVIATIONS.get(word, word) for word in tokenize(text or ''))
+
+
+# Hàm lấy thông tin nhận dạng của hồ sơ
+def case_identity(customer_info, collateral_info):
+    """Dict 'cccd', 'phone', 'name', 'address' (nơi cư trú) và 'collateral' (địa chỉ TSĐB) đã chuẩn hóa"""
+    customer_info, collateral_info = customer_info or {}, collateral_info or {}
+    return {
+        'cccd': normalize_digits(customer_info.get('cccd')),
+        'phone': normalize_phone(customer_info.get('phone')),
+        'name': normalize_name(customer_info.get('name')),
+        'address': normalize_address(customer_info.get('address')),
+        'collateral': normalize_address(collateral_info.get('address')),
+    }
+
+
+# Hàm tách bộ ba ký tự
+def trigrams(text):
+    padded = f" {text} "
+    return {padded[index:index + 3] for index in range(len(padded) - 2)}
+
+
+def similarity(first, second):
+    """Độ tương đồng Jaccard giữa hai tập bộ ba ký tự của hai văn bản đã chuẩn hóa"""
+    if not first or not second:
+        return 0.0
+    first, second = trigrams(first), trigrams(second)
+    return len(first & second) / len(first | second)
+
+
+def _numbers(text):
+    """Các số trong văn bản đã chuẩn hóa, bỏ số 0 đứng đầu và không phụ thuộc thứ tự"""
+    return ' '.join(sorted(str(int(word)) for word in text.split() if word.isdigit()))
+
+
+def _key(*parts):
+    digest = hashlib.blake2b('\x1f'.join(map(str, parts)).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little', signed=True)
+
+
+def _band_keys(field, text):
+    hashes = np.fromiter((zlib.crc32(gram.encode('utf-8')) for gram in trigrams(text)), dtype=np.uint64)
+    signature = ((_MULTIPLIERS * hashes + _OFFSETS) % np.uint64(_MERSENNE)).min(axis=1)
+    bands = signature.reshape(SIGNATURE_BANDS, BAND_ROWS)
+    numbers = _numbers(text)
+    return [_key(field, numbers, band, *values) for band, values in enumerate(bands.tolist())]
+
+
+# Hàm tạo khóa tra cứu của hồ sơ
+def identity_keys(identity):
+    """Danh sách (trường, khóa số nguyên) để ghi vào chỉ mục và để tra cứu"""
+    keys = [(field, _key(field, identity[field])) for field in ('cccd', 'phone') if identity[field]]
+    # Họ tên thiếu nơi cư trú quá dễ trùng người khác nên không được đưa vào chỉ mục
+    if identity['name'] and identity['address']:
+        keys.append(('person', _key('person', ' '.join(sorted(identity['name'].split())),
+                                    _numbers(identity['address']))))
+    if identity['collateral']:
+        keys += [('collateral', key) for key in _band_keys('collateral', identity['collateral'])]
+    return keys
+
+
+# Hàm so khớp thông tin nhận dạng của hai hồ sơ
+def match_reasons(identity, other):
+    """Lý do hai hồ sơ (thông tin như ``case_identity``) trùng nhau: {trường: độ tương đồng}, rỗng nếu không trùng
+
+    - 'cccd', 'phone': trùng chính xác
+    - 'person': cùng họ tên (không phân biệt dấu, thứ tự từ), nơi cư trú cùng các số và tương đồng
+      ≥ ADDRESS_SIMILARITY
+    - 'collateral': địa chỉ TSĐB cùng các số và tương đồng ≥ COLLATERAL_SIMILARITY
+    """
+    reasons = {}
+    for field in ('cccd', 'phone'):
+        if identity[field] and identity[field] == other[field]:
+            reasons[field] = 1.0
+    if (identity['name'] and identity['address'] and sorted(identity['name'].split()) == sorted(other['name'].split())
+            and _numbers(identity['address']) == _numbers(other['address'])):
+        score = similarity(identity['address'], other['address'])
+        if score >= ADDRESS_SIMILARITY:
+            reasons['person'] = score
+    if identity['collateral'] and _numbers(identity['collateral']) == _numbers(other['collateral']):
+        score = similarity(identity['collateral'], other['collateral'])
+        if score >= COLLATERAL_SIMILARITY:
+            reasons['collateral'] = score
+    return reasons
+
+
+def _report(identity, loan_amount, candidates, start):
+    matches = []
+    for candidate in candidates:
+        reasons = match_reasons(identity, candidate['identity'])
+        if not reasons:
+            continue
+        # Hai CCCD khác nhau là hai người (có thể là người thân dùng chung số điện thoại/địa chỉ)
+        other = candidate['identity']['cccd']
+        different_person = identity['cccd'] and other and identity['cccd'] != other
+        matches.append(dict(candidate, reasons=reasons,
+                            same_applicant='cccd' in reasons or (not different_person
+                                                                 and ('phone' in reasons or 'person' in reasons)),
+                            same_collateral='collateral' in reasons))
+    matches.sort(key=lambda match: (not match['same_applicant'], -len(match['reasons'])))
+    applicant = [match for match in matches if match['same_applicant']]
+    collateral = [match for match in matches if match['same_collateral']]
+    return {
+        'matches': matches,
+        'applicant_cases': len(applicant),
+        'total_exposure': loan_amount + sum(match['loan_amount'] for match in applicant),
+        'collateral_cases': len(collateral),
+        'collateral_loans': loan_amount + sum(match['loan_amount'] for match in collateral),
+        'seconds': time.perf_counter() - start,
+    }
+
+
+# Hàm mô tả lý do trùng
+def describe_reasons(reasons):
+    """VD "CCCD, Địa chỉ TSĐB (86%)"; trùng chính xác không ghi độ tương đồng"""
+    return ', '.join(MATCH_REASONS[field] + (f" ({score:.0%})" if score < 1 else '')
+                     for field, score in reasons.items())
+
+
+# Hàm kiểm tra trùng khách hàng/TSĐB với các hồ sơ đã lưu
+def find_duplicates(store, customer_info, financial_info, collateral_info, exclude_id=None):
+    """Các hồ sơ trong kho ``store`` (CaseStore) trùng khách hàng hoặc TSĐB, trừ hồ sơ ``exclude_id``
+
+    Trả về dict: 'matches' (dòng như ``CaseStore.match_candidates`` thêm 'reasons' {trường: độ tương đồng},
+    'same_applicant', 'same_collateral'; cùng khách hàng trước), 'applicant_cases', 'total_exposure' (số tiền vay
+    hiện tại cộng các hồ sơ cùng khách hàng), 'collateral_cases', 'collateral_loans' (tổng vay trên cùng TSĐB),
+    'seconds'. Cùng khách hàng khi trùng CCCD, hoặc trùng số điện thoại/họ tên + nơi cư trú mà CCCD không mâu thuẫn.
+    """
+    start = time.perf_counter()
+    identity = case_identity(customer_info, collateral_info)
+    candidates = store.match_candidates([key for _, key in identity_keys(identity)], exclude_id)
+    loan_amount = float((financial_info or {}).get('loan_amount', 0) or 0)
+    return _report(identity, loan_amount, candidates, start)
+
+
+# Hàm kiểm tra trùng cho kết quả trích xuất hàng loạt
+def find_batch_duplicates(results, store=None):
+    """Như ``find_duplicates`` cho từng kết quả của ``run_batch_extraction`` (None với file lỗi), so với các file
+    khác trong lô và (nếu có) các hồ sơ đã lưu trong ``store``; hồ sơ cùng lô có 'id' None và 'source_file' là
+    tên file"""
+    identities, buckets = {}, {}
+    for index, result in enumerate(results):
+        if result['error']:
+            continue
+        identities[index] = case_identity(result['customer_info'], result['collateral_info'])
+        for _, key in identity_keys(identities[index]):
+            buckets.setdefault(key, []).append(index)
+
+    reports = [None] * len(results)
+    for index, identity in identities.items():
+        start = time.perf_counter()
+        keys = [key for _, key in identity_keys(identity)]
+        candidates = store.match_candidates(keys) if store is not None else []
+        others = sorted({other for key in keys for other in buckets[key] if other != index})
+        candidates += [dict(id=None, name=results[other]['customer_info'].get('name') or '',
+                            cccd=identities[other]['cccd'], phone=identities[other]['phone'], identity=identities[other],
+                            loan_amount=float(results[other]['financial_info'].get('loan_amount', 0) or 0),
+                            source_file=results[other]['file'], created_at=None, updated_at=None) for other in others]
+        loan_amount = float(results[index]['financial_info'].get('loan_amount', 0) or 0)
+        reports[index] = _report(identity, loan_amount, candidates, start)
+    return reports
@@ -0,0 +1,248 @@
+"""Xuất Excel kiểu số thực bằng xlsxwriter ở chế độ ghi luồng (``constant_memory``).
+
+Ô tiền được ghi dạng số kèm định dạng phân cách hàng nghìn, nên Excel vẫn cộng, lọc,
+vẽ biểu đồ được. Mỗi hàng được ghi thẳng ra file tạm ngay khi viết xong nên bộ nhớ
+không tăng theo số hàng; lịch trả nợ của danh mục được dựng và ghi lần lượt từng khoản vay.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+import xlsxwriter
+
+from thamdinh.amortization import REPAYMENT_METHODS, SCHEDULE_COLUMNS
+from thamdinh.portfolio import compute_portfolio_metrics, loan_schedules, normalize_loans
+
+# Excel lưu số thực; dấu phân cách hiển thị theo cài đặt vùng của máy (vùng Việt Nam: 1.234.567)
+NUMBER_FORMATS = {
+    'money': '#,##0',
+    'decimal': '#,##0.00',
+    'integer': '0',
+}
+
+# Số hàng tối đa của một sheet Excel; bảng dài hơn được ghi tiếp sang sheet mới
+MAX_SHEET_ROWS = 1048576
+
+# Cột lịch trả nợ: (khóa, kiểu, độ rộng)
+SCHEDULE_TABLE_COLUMNS = [('month', 'integer', 8)] + [(key, 'money', 18) for key in list(SCHEDULE_COLUMNS)[1:]]
+
+# Các dòng của sheet chỉ tiêu một hồ sơ: (nhóm thông tin, khóa, nhãn, kiểu)
+CASE_SUMMARY_ROWS = [
+    ('customer_info', 'name', 'Khách hàng', 'text'),
+    ('financial_info', 'loan_amount', 'Số tiền vay (đồng)', 'money'),
+    ('financial_info', 'interest_rate', 'Lãi suất (%/năm)', 'decimal'),
+    ('financial_info', 'loan_term', 'Thời hạn vay (tháng)', 'integer'),
+    ('financial_info', 'repayment_method', 'Phương thức trả nợ', 'method'),
+    ('financial_info', 'grace_months', 'Ân hạn gốc (tháng)', 'integer'),
+    ('financial_info', 'balloon_amount', 'Gốc trả cuối kỳ (đồng)', 'money'),
+    ('financial_info', 'monthly_income', 'Thu nhập hàng tháng (đồng)', 'money'),
+    ('financial_info', 'monthly_expense', 'Chi phí hàng tháng (đồng)', 'money'),
+    ('metrics', 'monthly_principal', 'Trả nợ gốc/tháng (đồng)', 'money'),
+    ('metrics', 'first_month_interest', 'Trả lãi tháng đầu (đồng)', 'money'),
+    ('metrics', 'first_month_payment', 'Tổng trả tháng đầu (đồng)', 'money'),
+    ('metrics', 'installment', 'Trả nợ/tháng khi trả gốc (đồng)', 'money'),
+    ('metrics', 'total_interest', 'Tổng lãi phải trả (đồng)', 'money'),
+    ('metrics', 'total_payment', 'Tổng phải trả (đồng)', 'money'),
+    ('metrics', 'net_income', 'Thu nhập ròng/tháng (đồng)', 'money'),
+    ('metrics', 'debt_service_ratio', 'Tỷ lệ trả nợ/Thu nhập (%)', 'decimal'),
+    ('metrics', 'surplus', 'Số dư sau trả nợ (đồng)', 'money'),
+    ('metrics', 'dscr', 'DSCR', 'decimal'),
+]
+
+# Cột sheet danh mục: (khóa, nhãn, kiểu, độ rộng)
+PORTFOLIO_TABLE_COLUMNS = [
+    ('loan_amount', 'Số tiền vay', 'money', 16),
+    ('interest_rate', 'Lãi suất (%/năm)', 'decimal', 10),
+    ('loan_term', 'Thời hạn (tháng)', 'integer', 10),
+    ('repayment_method', 'Phương thức trả nợ', 'method', 22),
+    ('grace_months', 'Ân hạn (tháng)', 'integer', 10),
+    ('balloon_amount', 'Gốc cuối kỳ', 'money', 14),
+    ('monthly_income', 'Thu nhập/tháng', 'money', 14),
+    ('monthly_expense', 'Chi phí/tháng', 'money', 14),
+    ('monthly_principal', 'Trả gốc/tháng', 'money', 14),
+    ('first_month_interest', 'Trả lãi tháng đầu', 'money', 14),
+    ('first_month_payment', 'Tổng trả tháng đầu', 'money', 14),
+    ('installment', 'Trả nợ/tháng', 'money', 14),
+    ('total_interest', 'Tổng lãi phải trả', 'money', 16),
+    ('total_payment', 'Tổng phải trả', 'money', 16),
+    ('net_income', 'Thu nhập ròng/tháng', 'money', 14),
+    ('debt_service_ratio', 'DTI (%)', 'decimal', 9),
+    ('surplus', 'Thặng dư/tháng', 'money', 14),
+    ('dscr', 'DSCR', 'decimal', 8),
+]
+
+
+def _add_formats(workbook):
+    formats = {kind: workbook.add_format({'num_format': num_format}) for kind, num_format in NUMBER_FORMATS.items()}
+    formats['header'] = workbook.add_format({'bold': True, 'font_color': 'white', 'bg_color': '#1f77b4',
+                                             'border': 1, 'text_wrap': True, 'valign': 'vcenter'})
+    formats['label'] = workbook.add_format({'bold': True})
+    return formats
+
+
+def _open_workbook(output):
+    """``output`` là đường dẫn hoặc đối tượng file nhị phân (ví dụ io.BytesIO)"""
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+    return workbook, _add_formats(workbook)
+
+
+def _cell(value, kind):
+    """Giá trị ghi vào ô: NaN/None thành ô trống, phương thức trả nợ thành nhãn tiếng Việt"""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if kind == 'method':
+        return REPAYMENT_METHODS.get(value, value)
+    return value
+
+
+class TableWriter:
+    """Ghi một bảng theo từng hàng (định dạng đặt theo cột), tự sang sheet mới khi hết số hàng Excel"""
+
+    def __init__(self, workbook, formats, name, columns, max_rows=MAX_SHEET_ROWS):
+        """``columns`` là danh sách (tiêu đề, kiểu, độ rộng)"""
+        self.workbook = workbook
+        self.formats = formats
+        self.name = name
+        self.columns = columns
+        self.max_rows = max_rows
+        self.sheets = []
+        self.rows = 0
+        self._next_row = max_rows
+        self._write_row = None
+
+    def _new_sheet(self):
+        name = self.name if not self.sheets else f"{self.name} ({len(self.sheets) + 1})"
+        worksheet = self.workbook.add_worksheet(name)
+        for col, (header, kind, width) in enumerate(self.columns):
+            worksheet.set_column(col, col, width, self.formats.get(kind))
+            worksheet.write_string(0, col, header, self.formats['header'])
+        worksheet.freeze_panes(1, 0)
+        self.sheets.append(worksheet)
+        self._write_row = worksheet.write_row
+        self._next_row = 1
+
+    def start(self):
+        """Tạo sheet đầu tiên ngay (để giữ thứ tự sheet) dù chưa có hàng nào"""
+        if not self.sheets:
+            self._new_sheet()
+        return self
+
+    def write(self, values):
+        if self._next_row >= self.max_rows:
+            self._new_sheet()
+        # Ô không có định dạng riêng dùng định dạng của cột
+        self._write_row(self._next_row, 0, values)
+        self._next_row += 1
+        self.rows += 1
+
+    def write_rows(self, rows):
+        for values in rows:
+            self.write(values)
+
+
+def _schedule_rows(schedule, prefix=()):
+    """Các hàng lịch trả nợ (tháng, dư nợ đầu kỳ, gốc, lãi, tổng trả, dư nợ cuối kỳ)"""
+    table = np.column_stack([schedule[key] for key in SCHEDULE_COLUMNS]).tolist()
+    if prefix:
+        return [list(prefix) + row for row in table]
+    return table
+
+
+def _write_summary(worksheet, formats, rows):
+    """Sheet hai cột (chỉ tiêu, giá trị); ``rows`` là danh sách (nhãn, giá trị, kiểu)"""
+    worksheet.set_column(0, 0, 36)
+    worksheet.set_column(1, 1, 22)
+    worksheet.write_string(0, 0, 'Chỉ tiêu', formats['header'])
+    worksheet.write_string(0, 1, 'Giá trị', formats['header'])
+    for row, (label, value, kind) in enumerate(rows, 1):
+        worksheet.write_string(row, 0, label, formats['label'])
+        value = _cell(value, kind)
+        if value is None:
+            continue
+        if kind in NUMBER_FORMATS:
+            worksheet.write_number(row, 1, float(value), formats[kind])
+        else:
+            worksheet.write_string(row, 1, str(value))
+
+
+# Hàm xuất chỉ tiêu và kế hoạch trả nợ của một hồ sơ
+def write_case_workbook(output, financial_info, metrics, customer_info=None):
+    """Sheet "Chỉ tiêu" và sheet "Kế hoạch trả nợ" (số thực, định dạng phân cách hàng nghìn)"""
+    sources = {'customer_info': customer_info or {}, 'financial_info': financial_info, 'metrics': metrics}
+    summary = [(label, sources[section].get(key), kind) for section, key, label, kind in CASE_SUMMARY_ROWS
+               if key in sources[section]]
+    workbook, formats = _open_workbook(output)
+    try:
+        _write_summary(workbook.add_worksheet('Chỉ tiêu'), formats, summary)
+        table = TableWriter(workbook, formats, 'Kế hoạch trả nợ',
+                            [(SCHEDULE_COLUMNS[key], kind, width) for key, kind, width in SCHEDULE_TABLE_COLUMNS])
+        table.start()
+        if 'schedule' in metrics:
+            table.write_rows(_schedule_rows(metrics['schedule']))
+    finally:
+        workbook.close()
+
+
+# Hàm xuất danh mục nhiều khoản vay
+def write_portfolio_workbook(output, loans, labels=None, detail=True):
+    """Các sheet "Tổng hợp", "Danh mục" (mỗi khoản vay một hàng), "Dòng tiền danh mục" (cộng theo tháng)
+    và, nếu ``detail``, "Lịch trả nợ" của từng khoản vay (sang sheet mới khi quá số hàng Excel)
+
+    ``loans`` có các cột như ``compute_portfolio_metrics``; ``labels`` là tên từng khoản vay
+    (mặc định theo chỉ mục). Trả về số hàng lịch trả nợ chi tiết đã ghi.
+    """
+    metrics = compute_portfolio_metrics(loans)
+    loans = normalize_loans(loans)
+    labels = [str(label) for label in (labels if labels is not None else loans.index)]
+    table = pd.concat([loans, metrics], axis=1)
+
+    workbook, formats = _open_workbook(output)
+    try:
+        # Sheet tổng hợp đứng đầu nhưng được ghi sau cùng, khi đã cộng xong danh mục
+        summary_sheet = workbook.add_worksheet('Tổng hợp')
+        portfolio = TableWriter(workbook, formats, 'Danh mục',
+                                [('Khoản vay', 'text', 24)]
+                                + [(label, kind, width) for _, label, kind, width in PORTFOLIO_TABLE_COLUMNS]).start()
+        cash_flow = TableWriter(workbook, formats, 'Dòng tiền danh mục',
+                                [('Tháng', 'integer', 8), ('Số khoản vay còn dư nợ', 'integer', 12)]
+                                + [(SCHEDULE_COLUMNS[key], 'money', 20) for key, _, _ in SCHEDULE_TABLE_COLUMNS[1:]]).start()
+        schedules = None
+        if detail:
+            schedules = TableWriter(workbook, formats, 'Lịch trả nợ',
+                                    [('Khoản vay', 'text', 24)]
+                                    + [(SCHEDULE_COLUMNS[key], kind, width)
+                                       for key, kind, width in SCHEDULE_TABLE_COLUMNS]).start()
+
+        columns = [(key, kind) for key, _, kind, _ in PORTFOLIO_TABLE_COLUMNS]
+        for label, values in zip(labels, table[[key for key, _ in columns]].itertuples(index=False)):
+            portfolio.write([label] + [_cell(value, kind) for value, (_, kind) in zip(values, columns)])
+
+        # Cộng dồn lịch trả nợ theo tháng trong khi ghi chi tiết từng khoản vay
+        max_term = int(np.floor(loans['loan_term'].max())) if len(loans) else 0
+        totals = {key: np.zeros(max(max_term, 0)) for key in list(SCHEDULE_COLUMNS)[1:]}
+        active = np.zeros(max(max_term, 0), dtype=int)
+        for position, schedule in loan_schedules(loans):
+            term = len(schedule['month'])
+            for key, total in totals.items():
+                total[:term] += schedule[key]
+            active[:term] += 1
+            if schedules is not None:
+                schedules.write_rows(_schedule_rows(schedule, (labels[position],)))
+        flow = np.column_stack([np.arange(1, len(active) + 1), active] + list(totals.values()))
+        cash_flow.write_rows(flow[active > 0].tolist())
+
+        valid = metrics['installment'].notna()
+        summary_rows = [
+            ('Số khoản vay', len(loans), 'integer'),
+            ('Số khoản vay đủ thông tin', int(valid.sum()), 'integer'),
+            ('Tổng số tiền vay (đồng)', float(loans.loc[valid, 'loan_amount'].sum()), 'money'),
+            ('Tổng lãi phải trả (đồng)', float(metrics['total_interest'].sum()), 'money'),
+            ('Tổng trả nợ/tháng (đồng)', float(metrics['installment'].sum()), 'money'),
+            ('DTI trung bình (%)', metrics['debt_service_ratio'].mean(), 'decimal'),
+            ('DSCR trung bình', metrics['dscr'].mean(), 'decimal'),
+            ('Số hàng lịch trả nợ chi tiết', schedules.rows if schedules is not None else 0, 'integer'),
+        ]
+        _write_summary(summary_sheet, formats, summary_rows)
+    finally:
+        workbook.close()
+    return schedules.rows if schedules is not None else 0
@@ -0,0 +1,129 @@
+"""Trích xuất thông tin khách hàng, tài chính và tài sản đảm bảo từ file PASDV."""
+import hashlib
+import io
+import re
+
+from thamdinh.docx_reader import read_docx_text
+from thamdinh.formatting import parse_number
+
+
+def _text(value):
+    return value.strip()
+
+
+def _rate(value):
+    return float(value.replace(',', '.'))
+
+
+# Bảng đăng ký trường cần trích xuất, nhóm theo nhãn mở đầu mỗi mẫu:
+# nhãn -> [(nhóm thông tin, khóa, phần mẫu regex sau nhãn, hàm chuyển đổi, độ ưu tiên)]
+# Mỗi phần mẫu có đúng một nhóm bắt giá trị. Độ ưu tiên nhỏ hơn thắng; mẫu dự phòng
+# (ưu tiên 1) chỉ dùng khi mẫu chính không khớp ở bất kỳ đâu trong văn bản.
+FIELD_PATTERNS = {
+    'Họ và tên:': [('customer_info', 'name', r'\s*([^\n\r-]+)', _text, 0)],
+    'CCCD': [('customer_info', 'cccd', r'(?:/hộ chiếu)?:\s*(\d+)', _text, 0)],
+    'Nơi cư trú:': [('customer_info', 'address', r'\s*([^\n\r]+)', _text, 0)],
+    'Số điện thoại:': [('customer_info', 'phone', r'\s*(\d+)', _text, 0)],
+    'Email:': [('customer_info', 'email', r'\s*([^\s\n\r]+)', _text, 0)],
+    'Tổng nhu cầu vốn:': [('financial_info', 'total_need', r'\s*([\d.,]+)\s*đồng', parse_number, 0)],
+    'Vốn đối ứng': [('financial_info', 'equity', r'[^:]*:\s*([\d.,]+)\s*đồng', parse_number, 0)],
+    'Vốn vay': [('financial_info', 'loan_amount', r'[^:]*số tiền:\s*([\d.,]+)\s*đồng', parse_number, 0)],
+    'Lãi suất:': [('financial_info', 'interest_rate', r'\s*([\d.,]+)%', _rate, 0)],
+    'Thời hạn vay:': [('financial_info', 'loan_term', r'\s*(\d+)\s*tháng', int, 0)],
+    'Mục đích vay:': [('financial_info', 'purpose', r'\s*([^\n\r]+)', _text, 0)],
+    'Tổng thu nhập': [('financial_info', 'monthly_income', r'[^:]*:\s*([\d.,]+)\s*đồng', parse_number, 0)],
+    'Tổng chi phí hàng tháng:': [('financial_info', 'monthly_expense', r'\s*([\d.,]+)', parse_number, 0)],
+    'Thu nhập': [
+        ('financial_info', 'monthly_income', r'[^:]*:\s*([\d.,]+)\s*đồng/tháng', parse_number, 1),
+        ('financial_info', 'project_income', r' từ kinh doanh[^:]*:\s*([\d.,]+)\s*đồng/tháng', parse_number, 0),
+    ],
+    'Tài sản ': [('collateral_info', 'type', r'\d+:\s*([^\n\r.]+)', _text, 0)],
+    'Giá trị': [
+        ('collateral_info', 'value', r':\s*([\d.,]+)\s*đồng', parse_number, 0),
+        ('collateral_info', 'value', r'[^:]*:\s*([\d.,]+)\s*đồng', parse_number, 1),
+    ],
+    'Địa chỉ:': [('collateral_info', 'address', r'\s*([^\n\r]+?)(?:Diện tích|Giấy|Tỷ lệ|\n|$)', _text, 0)],
+    'Diện tích đất:': [('collateral_info', 'area', r'\s*([\d.,]+)\s*m', parse_number, 0)],
+}
+
+
+class FieldExtractor:
+    """Bộ trích xuất dựa trên bảng đăng ký mẫu đã biên dịch sẵn.
+
+    Mỗi trường giữ danh sách (nhãn, phần mẫu sau nhãn đã biên dịch) theo độ ưu tiên. Nhãn được dò bằng
+    ``str.find`` rồi phần sau nhãn được khớp ngay tại đó bằng ``match``; vị trí đầu tiên khớp được là kết quả
+    của ``re.search`` trên cả mẫu như trước đây. ``str.find`` dò chuỗi cố định nhanh hơn ``re`` dò tiền tố chữ
+    (~1,6 lần trên văn bản dài), và mẫu CCCD không còn phải thử nhóm tùy chọn ở từng ký tự.
+
+    Một regex hợp nhất mọi nhãn quét một lượt bằng ``finditer`` đã được đo thử và chậm hơn: ``re`` thử phép
+    hợp ở từng ký tự (~7ns/ký tự, so với ~1ns/ký tự mỗi lần ``str.find``). Với văn bản rất dài, thời gian gần
+    như chỉ là các lượt dò nhãn TSĐB nằm cuối văn bản.
+    """
+
+    def __init__(self, field_patterns):
+        # (nhóm, khóa) -> (hàm chuyển đổi, [(độ ưu tiên, nhãn, mẫu)]), theo thứ tự khai báo trong bảng đăng ký
+        fields = {}
+        for label, specs in field_patterns.items():
+            for section, key, suffix, convert, priority in specs:
+                _, patterns = fields.setdefault((section, key), (convert, []))
+                patterns.append((priority, label, re.compile(suffix).match))
+        self.fields = [(section, key, [spec[1:] for spec in sorted(patterns, key=lambda spec: spec[0])], convert)
+                       for (section, key), (convert, patterns) in fields.items()]
+
+    def extract(self, full_text):
+        """Trích xuất tất cả các trường đã đăng ký từ văn bản"""
+        result = {'customer_info': {}, 'financial_info': {}, 'collateral_info': {}}
+        find = full_text.find
+        for section, key, patterns, convert in self.fields:
+            for label, match in patterns:
+                start = find(label)
+                field_match = None
+                while start >= 0:
+                    field_match = match(full_text, start + len(label))
+                    if field_match:
+                        break
+                    start = find(label, start + 1)
+                if field_match:
+                    result[section][key] = convert(field_match.group(1))
+                    break
+        return result['customer_info'], result['financial_info'], result['collateral_info']
+
+
+_EXTRACTOR = FieldExtractor(FIELD_PATTERNS)
+
+# Tăng khi thay đổi cách đọc/trích xuất để kết quả cũ trong bộ nhớ đệm không còn được dùng
+EXTRACTION_VERSION = 1
+
+
+# Hàm trích xuất thông tin từ văn bản
+def extract_info_from_text(full_text):
+    """Trích xuất thông tin từ nội dung văn bản của PASDV"""
+    return _EXTRACTOR.extract(full_text)
+
+
+# Hàm trích xuất thông tin từ file docx
+def extract_info_from_docx(file):
+    """Trích xuất thông tin từ file docx, trả kèm nội dung văn bản gốc"""
+    full_text = read_docx_text(file)
+    customer_info, financial_info, collateral_info = extract_info_from_text(full_text)
+    return customer_info, financial_info, collateral_info, full_text
+
+
+# Hàm tạo khóa bộ nhớ đệm từ nội dung file
+def extraction_cache_key(data):
+    """Khóa theo mã băm SHA-256 của nội dung file và phiên bản bộ trích xuất"""
+    return f"extract:v{EXTRACTION_VERSION}:{hashlib.sha256(data).hexdigest()}"
+
+
+# Hàm trích xuất từ nội dung file, dùng lại kết quả đã lưu nếu có
+def extract_info_cached(data, cache=None):
+    """Trả về ((customer_info, financial_info, collateral_info, full_text), có_dùng_lại_hay_không)"""
+    if cache is None:
+        return extract_info_from_docx(io.BytesIO(data)), False
+    key = extraction_cache_key(data)
+    cached = cache.get(key)
+    if cached is not None:
+        return tuple(cached), True
+    result = extract_info_from_docx(io.BytesIO(data))
+    cache.set(key, list(result))
+    return result, False
@@ -0,0 +1,82 @@
+"""Các chỉ tiêu tài chính của phương án vay."""
+import numpy as np
+
+from thamdinh.amortization import EQUAL_PRINCIPAL, build_schedule
+from thamdinh.cache import LRUCache
+
+# Ngưỡng đánh giá khả năng trả nợ: DSCR tối thiểu và tỷ lệ trả nợ/thu nhập (DTI, %) tối đa
+DSCR_MIN = 1.25
+DTI_MAX = 40
+# Tỷ lệ dư nợ/giá trị tài sản đảm bảo (LTV, %): tối đa theo chính sách và ngưỡng cảnh báo
+LTV_MAX = 70
+LTV_WARNING = 80
+
+# Các chỉ tiêu đã tính, dùng lại qua các lần Streamlit chạy lại script
+METRICS_CACHE = LRUCache(maxsize=64)
+
+
+# Hàm tính toán các chỉ tiêu tài chính
+def calculate_financial_metrics(financial_info):
+    """Tính toán các chỉ tiêu tài chính"""
+    metrics = {}
+
+    loan_amount = financial_info.get('loan_amount', 0)
+    interest_rate = financial_info.get('interest_rate', 0)
+    loan_term = int(financial_info.get('loan_term', 0))
+    monthly_income = financial_info.get('monthly_income', 0)
+    monthly_expense = financial_info.get('monthly_expense', 0)
+    method = financial_info.get('repayment_method', EQUAL_PRINCIPAL)
+
+    if loan_amount > 0 and loan_term > 0:
+        grace_months = min(max(int(financial_info.get('grace_months', 0)), 0), loan_term - 1)
+        balloon_amount = min(max(financial_info.get('balloon_amount', 0), 0), loan_amount)
+        schedule = build_schedule(loan_amount, interest_rate, loan_term, method, grace_months, balloon_amount)
+
+        # Kỳ trả nợ đầy đủ đầu tiên (sau ân hạn) là căn cứ đánh giá khả năng trả nợ
+        installment = schedule['payment'][grace_months]
+
+        metrics['schedule'] = schedule
+        metrics['monthly_principal'] = schedule['principal'][grace_months]
+        metrics['first_month_interest'] = schedule['interest'][0]
+        metrics['first_month_payment'] = schedule['payment'][0]
+        metrics['installment'] = installment
+        # Cộng dồn tuần tự để khớp với cách cộng từng tháng
+        metrics['total_interest'] = np.add.accumulate(schedule['interest'])[-1]
+        metrics['total_payment'] = loan_amount + metrics['total_interest']
+        metrics['net_income'] = monthly_income - monthly_expense
+        metrics['debt_service_ratio'] = (installment / monthly_income * 100) if monthly_income > 0 else 0
+        metrics['surplus'] = metrics['net_income'] - installment
+        metrics['dscr'] = (metrics['net_income'] / installment) if installment > 0 else 0
+
+    return metrics
+
+
+# Hàm tạo khóa bộ nhớ đệm từ các thông tin tài chính dùng để tính chỉ tiêu
+def metrics_cache_key(financial_info):
+    """Khóa gồm đúng các giá trị đầu vào ảnh hưởng đến chỉ tiêu"""
+    return (
+        float(financial_info.get('loan_amount', 0) or 0),
+        float(financial_info.get('interest_rate', 0) or 0),
+        int(financial_info.get('loan_term', 0) or 0),
+        float(financial_info.get('monthly_income', 0) or 0),
+        float(financial_info.get('monthly_expense', 0) or 0),
+        financial_info.get('repayment_method', EQUAL_PRINCIPAL),
+        int(financial_info.get('grace_months', 0) or 0),
+        float(financial_info.get('balloon_amount', 0) or 0),
+    )
+
+
+def _compute_frozen_metrics(financial_info):
+    metrics = calculate_financial_metrics(financial_info)
+    # Lịch trả nợ dùng chung giữa các lần gọi nên khóa ghi để không bị sửa nhầm
+    for column in metrics.get('schedule', {}).values():
+        column.flags.writeable = False
+    return metrics
+
+
+# Hàm tính chỉ tiêu tài chính có bộ nhớ đệm
+def cached_financial_metrics(financial_info):
+    """Như calculate_financial_metrics nhưng dùng lại kết quả khi thông tin tài chính không đổi"""
+    metrics = METRICS_CACHE.get_or_compute(metrics_cache_key(financial_info),
+                                           lambda: _compute_frozen_metrics(financial_info))
+    return dict(metrics)
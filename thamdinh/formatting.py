@@ -0,0 +1,200 @@
+"""Định dạng và chuyển đổi số theo kiểu Việt Nam (dấu chấm phân cách hàng nghìn).
+
+``format_number``/``parse_number`` xử lý một giá trị; ``format_numbers``/``parse_numbers`` xử lý cả
+pandas Series hoặc mảng NumPy một lần (không gọi hàm Python cho từng phần tử).
+"""
+import numpy as np
+
+# Giá trị tuyệt đối lớn nhất định dạng được bằng int64; lớn hơn thì định dạng từng số
+_INT64_LIMIT = 2.0 ** 63
+# Chuỗi số đã làm sạch mà Arrow đọc thẳng được: dấu trừ, chữ số, tối đa một dấu thập phân
+_SIMPLE_NUMBER = r'^-?(\d+\.?\d*|\.\d+)$'
+# Số dòng xử lý mỗi lượt khi dựng ma trận ký tự (giới hạn bộ nhớ tạm)
+_CHUNK_ROWS = 1 << 16
+
+
+# Hàm định dạng số
+def format_number(num):
+    """Định dạng số với dấu chấm phân cách hàng nghìn"""
+    try:
+        return "{:,.0f}".format(float(num)).replace(",", ".")
+    except (TypeError, ValueError):
+        return str(num)
+
+
+def parse_number(text):
+    """Chuyển đổi text thành số"""
+    try:
+        clean_text = str(text).replace(".", "").replace(",", ".")
+        return float(clean_text)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _wrap(values, result):
+    """Trả kết quả cùng kiểu với đầu vào: Series giữ index và tên, còn lại là mảng NumPy"""
+    import pandas as pd
+
+    if isinstance(values, pd.Series):
+        return pd.Series(result, index=values.index, name=values.name)
+    return result
+
+
+def _as_array(values):
+    """Mảng NumPy một chiều từ Series, mảng, danh sách..."""
+    import pandas as pd
+
+    return np.ravel(values.to_numpy() if isinstance(values, pd.Series) else np.asarray(values))
+
+
+def _digit_strings(magnitude, negative):
+    """Chuỗi "1.234.567" cho mảng số nguyên không âm ``magnitude`` (thêm "-" ở các dòng ``negative``)
+
+    Các số cùng số chữ số và cùng dấu có chung bố cục ký tự, nên mỗi nhóm được dựng thành một ma trận
+    mã ký tự (chữ số tách bằng phép chia, dấu chấm ở cột cố định) rồi xem như mảng chuỗi độ dài cố định.
+    """
+    lengths = np.ones(len(magnitude), dtype=np.int64)
+    for exponent in range(1, 19):
+        lengths += magnitude >= 10 ** exponent
+    width = int(lengths.max()) if len(magnitude) else 1
+    result = np.empty(len(magnitude), dtype=f'U{width + (width - 1) // 3 + 1}')
+    for length in np.flatnonzero(np.bincount(lengths)):
+        exponents = np.arange(length - 1, -1, -1)
+        powers = 10 ** exponents.astype(np.int64)
+        for sign in (False, True):
+            rows = np.flatnonzero((lengths == length) & (negative == sign))
+            # Cột của từng chữ số, chừa cột đầu cho dấu "-" và một cột cho mỗi dấu chấm đứng trước nó
+            digit_columns = sign + np.arange(length) + (length - 1) // 3 - exponents // 3
+            dot_columns = digit_columns[exponents % 3 == 0][:-1] + 1
+            total = sign + length + (length - 1) // 3
+            for begin in range(0, len(rows), _CHUNK_ROWS):
+                part = rows[begin:begin + _CHUNK_ROWS]
+                chars = np.empty((len(part), total), dtype=np.uint32)
+                chars[:, digit_columns] = ord('0') + magnitude[part, None] // powers % 10
+                chars[:, dot_columns] = ord('.')
+                if sign:
+                    chars[:, 0] = ord('-')
+                result[part] = chars.view(f'U{total}').ravel()
+    return result
+
+
+# Hàm định dạng cả cột số
+def format_numbers(values, invalid=''):
+    """Như ``format_number`` cho cả Series/mảng; giá trị không phải số, rỗng, NaN hoặc vô cực thành ``invalid``
+
+    Trả về mảng chuỗi (hoặc Series cùng index); số hữu hạn cho cùng kết quả với ``format_number``.
+    """
+    import pandas as pd
+
+    numbers = _as_array(values)
+    if numbers.dtype.kind in 'biuf':
+        numbers = numbers.astype(float)
+    else:
+        numbers = np.asarray(pd.to_numeric(numbers.astype(object), errors='coerce'), dtype=float)
+    rounded = np.rint(numbers)
+    small = np.abs(rounded) < _INT64_LIMIT
+    text = _digit_strings(np.abs(np.where(small, rounded, 0)).astype(np.int64), np.signbit(rounded) & small)
+    result = np.where(small, text, invalid)
+    # Số quá lớn cho int64 (hiếm): định dạng từng số
+    large = np.flatnonzero(np.isfinite(rounded) & ~small)
+    if len(large):
+        result = result.astype(object)
+        for index in large:
+            result[index] = format_number(numbers[index])
+    return _wrap(values, result)
+
+
+# Hàm chuyển cả cột chuỗi kiểu Việt Nam thành số
+def parse_numbers(values, invalid=np.nan):
+    """Như ``parse_number`` cho cả Series/mảng, trả về float; chuỗi không đọc được (kể cả rỗng, None) thành
+    ``invalid`` thay vì 0 như ``parse_number``. Cột đã là số, và các ô số trong cột lẫn số với chuỗi, được giữ
+    nguyên giá trị.
+
+    Dùng pyarrow (đi kèm Streamlit) nếu có, không có thì đọc bằng NumPy (chậm hơn).
+    """
+    import pandas as pd
+
+    if isinstance(values, pd.Series) and isinstance(values.dtype, pd.StringDtype):
+        text, given = values, None
+    else:
+        text = _as_array(values)
+        if text.dtype.kind in 'biuf':
+            numbers = text.astype(float)
+            return _wrap(values, np.where(np.isnan(numbers), invalid, numbers))
+        if text.dtype.kind in 'US' and not isinstance(values, np.ndarray):
+            # Danh sách lẫn số và chuỗi: np.asarray đã đổi số thành chuỗi ("0.5"), dựng lại giữ nguyên từng giá trị
+            text = _as_array(np.asarray(values, dtype=object))
+        text, given = _split_numbers(text.astype(object))
+    try:
+        numbers = _parse_arrow(text)
+    except ImportError:
+        numbers = _parse_numpy(text)
+    if given is not None:
+        numbers = np.where(np.isnan(given), numbers, given)
+    return _wrap(values, np.where(np.isnan(numbers), invalid, numbers))
+
+
+def _split_numbers(text):
+    """Tách cột object lẫn số và chuỗi (VD ô Excel): trả về (mảng chỉ còn chuỗi/None, mảng số đã có hoặc None)
+
+    Số (kể cả bool) được giữ nguyên giá trị, giá trị khác không phải chuỗi được đổi bằng ``str``.
+    """
+    import pandas as pd
+
+    if pd.api.types.infer_dtype(text, skipna=True) in ('string', 'empty'):
+        return text, None
+    numeric = np.fromiter((isinstance(item, (bool, int, float, np.number)) for item in text), dtype=bool,
+                          count=len(text))
+    given = np.full(len(text), np.nan)
+    given[numeric] = text[numeric].astype(float)
+    text = text.copy()
+    text[numeric] = None
+    other = np.flatnonzero(~numeric & ~pd.isna(text))
+    text[other] = [str(item) for item in text[other]]
+    return text, given
+
+
+def _parse_arrow(text):
+    """Đọc Series/mảng object chuỗi trên mảng Arrow, chuỗi không đọc được thành NaN"""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    # Cột chuỗi của pandas thường đã nằm trên Arrow: đổi sang không cần chép
+    text = pa.array(text, type=pa.string(), from_pandas=True)
+    # Làm sạch và đổi sang số: bỏ dấu chấm, phẩy thành chấm thập phân
+    clean = pc.replace_substring(pc.replace_substring(text, '.', ''), ',', '.')
+    simple = pc.fill_null(pc.match_substring_regex(clean, _SIMPLE_NUMBER), False)
+    numbers = pc.if_else(simple, pc.cast(pc.if_else(simple, clean, '0'), pa.float64()), None)
+    numbers = numbers.to_numpy(zero_copy_only=False).astype(float)
+
+    # Dạng khác (khoảng trắng, "+5", "1e6"...; thường rất ít): đọc từng chuỗi như parse_number
+    simple = simple.to_numpy(zero_copy_only=False)
+    for index in np.flatnonzero(~simple & pc.is_valid(text).to_numpy(zero_copy_only=False)):
+        try:
+            numbers[index] = float(clean[index].as_py())
+        except ValueError:
+            pass
+    return numbers
+
+
+def _parse_numpy(text):
+    """Như ``_parse_arrow`` bằng các hàm chuỗi của NumPy"""
+    import pandas as pd
+
+    text = _as_array(text)
+    valid = ~pd.isna(text)
+    clean = np.char.replace(np.char.replace(text[valid].astype(str), '.', ''), ',', '.')
+    numbers = np.full(len(text), np.nan)
+    try:
+        numbers[valid] = clean.astype(float)
+    except ValueError:
+        # Có chuỗi không đọc được: đọc từng chuỗi như parse_number
+        numbers[valid] = [_to_float(item) for item in clean]
+    return numbers
+
+
+def _to_float(text):
+    try:
+        return float(text)
+    except ValueError:
+        return np.nan
@@ -0,0 +1,255 @@
+"""Gọi mô hình Gemini: prompt phân tích, giới hạn tần suất, thử lại khi bị giới hạn và bộ nhớ đệm phản hồi.
+
+Module không phụ thuộc Streamlit nên các hàm ở đây gọi được từ luồng phụ.
+"""
+import hashlib
+import importlib.util
+import os
+import queue
+import random
+import re
+import threading
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+
+from thamdinh.disk_cache import default_cache_dir
+from thamdinh.rate_limit import TokenBucketLimiter, bucket_key
+
+
+def _module_available(name):
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ModuleNotFoundError:
+        return False
+
+
+# Chỉ kiểm tra thư viện đã được cài; import google.generativeai mất gần 1 giây nên
+# được hoãn đến lần gọi model đầu tiên
+GENAI_AVAILABLE = _module_available('google.generativeai')
+
+# Phản hồi AI được dùng lại trong 7 ngày
+RESPONSE_CACHE_TTL = 7 * 24 * 3600
+
+ANALYSIS_PROMPTS = {
+    'file': """
+Bạn là chuyên gia phân tích tín dụng ngân hàng. Hãy phân tích chi tiết phương án vay vốn dưới đây:
+
+{data_content}
+
+Yêu cầu phân tích:
+1. Đánh giá tổng quan về phương án
+2. Phân tích điểm mạnh và điểm yếu
+3. Đánh giá khả năng trả nợ
+4. Phân tích rủi ro
+5. Kết luận và đề xuất
+
+Hãy trình bày ngắn gọn nhưng đầy đủ và chuyên sâu.
+""",
+    'metrics': """
+Bạn là chuyên gia phân tích tín dụng ngân hàng. Hãy phân tích các chỉ tiêu tài chính sau:
+
+{data_content}
+
+Yêu cầu phân tích:
+1. Đánh giá các chỉ tiêu tài chính quan trọng
+2. So sánh với tiêu chuẩn ngân hàng
+3. Phân tích khả năng trả nợ và dòng tiền
+4. Đánh giá mức độ rủi ro
+5. Kết luận và khuyến nghị
+
+Hãy trình bày ngắn gọn nhưng đầy đủ và chuyên sâu.
+""",
+}
+
+
+# Hàm tạo prompt phân tích
+def build_analysis_prompt(data_source, data_content):
+    """Prompt phân tích từ nội dung file ("file") hoặc từ các chỉ tiêu tài chính (nguồn khác)"""
+    template = ANALYSIS_PROMPTS['file' if data_source == 'file' else 'metrics']
+    return template.replace('{data_content}', data_content)
+
+
+_LIMITER = None
+_LIMITER_LOCK = threading.Lock()
+
+
+# Hàm lấy bộ giới hạn tần suất dùng chung
+def get_rate_limiter():
+    """Token bucket lưu trong thư mục bộ nhớ đệm, dùng chung cho mọi phiên và tiến trình trên máy"""
+    global _LIMITER
+    with _LIMITER_LOCK:
+        if _LIMITER is None:
+            _LIMITER = TokenBucketLimiter(os.path.join(default_cache_dir(), 'rate_limit.sqlite3'))
+        return _LIMITER
+
+
+def is_rate_limit_error(error):
+    error_str = str(error)
+    return "429" in error_str or "quota" in error_str.lower()
+
+
+# Hàm tính thời gian chờ trước lần thử lại
+def backoff_delay(error, attempt, initial_delay=2):
+    """Theo gợi ý "retry in Xs" của máy chủ nếu có, nếu không thì tăng theo cấp số nhân; kèm độ lệch ngẫu nhiên
+    để các phiên bị từ chối cùng lúc không thử lại cùng lúc"""
+    retry_match = re.search(r'retry in ([\d.]+)s', str(error))
+    if retry_match:
+        return float(retry_match.group(1)) + random.uniform(0.5, 1.5)
+    delay = initial_delay * (2 ** attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+# Hàm retry với exponential backoff
+def retry_with_backoff(func, max_retries=3, initial_delay=2, on_wait=None, wait=time.sleep):
+    """Gọi lại ``func`` khi bị giới hạn tần suất
+
+    ``on_wait(delay, attempt, max_retries)`` được gọi trước mỗi lần chờ; ``wait(delay)`` thực hiện việc chờ.
+    """
+    for attempt in range(max_retries):
+        try:
+            return func()
+        except Exception as e:
+            if not is_rate_limit_error(e):
+                raise
+            if attempt == max_retries - 1:
+                raise Exception(f"Đã thử {max_retries} lần nhưng vẫn gặp lỗi rate limit. Vui lòng:\n"
+                                f"1. Đợi vài phút rồi thử lại\n"
+                                f"2. Chọn model khác (gemini-1.5-flash hoặc gemini-1.5-pro)\n"
+                                f"3. Kiểm tra quota tại: https://ai.dev/usage")
+            delay = backoff_delay(e, attempt, initial_delay)
+            if on_wait:
+                on_wait(delay, attempt, max_retries)
+            wait(delay)
+    return None
+
+
+# Hàm gửi prompt tới Gemini và nhận kết quả theo luồng
+def stream_text(api_key, model_name, prompt, on_wait=None):
+    """Trả về lần lượt từng đoạn văn bản khi model sinh ra
+
+    Chờ đến lượt theo token bucket chung của API key và model; lỗi 429 thường xuất hiện trước đoạn đầu tiên
+    nên việc thử lại chỉ áp dụng cho đến khi nhận được đoạn đầu.
+    """
+    if not GENAI_AVAILABLE:
+        raise RuntimeError("Thư viện google-generativeai chưa được cài đặt")
+    import google.generativeai as genai
+
+    genai.configure(api_key=api_key)
+    limiter = get_rate_limiter()
+    key = bucket_key(api_key, model_name)
+
+    def start():
+        limiter.acquire(key)
+        model = genai.GenerativeModel(model_name)
+        chunks = iter(model.generate_content(prompt, stream=True))
+        return next(chunks, None), chunks
+
+    # Khi bị 429, khóa bucket chung thay vì chỉ ngủ tại chỗ: mọi phiên dùng cùng API key/model
+    # đều chờ, và lần thử lại tự chờ trong limiter.acquire
+    first, chunks = retry_with_backoff(start, on_wait=on_wait, wait=lambda delay: limiter.penalize(key, delay))
+    if first is None:
+        return
+    yield first.text
+    for chunk in chunks:
+        yield chunk.text
+
+
+class ResponseStream:
+    """Bọc luồng văn bản: gom nội dung đầy đủ và đo thời gian đến đoạn đầu tiên, tổng thời gian"""
+
+    def __init__(self, chunks, cached=False, on_complete=None, prompt=''):
+        self.cached = cached
+        self.prompt = prompt
+        self.text = ''
+        self.meta = {}
+        self.first_chunk_seconds = None
+        self.total_seconds = None
+        self._chunks = chunks
+        self._on_complete = on_complete
+        self._start = time.perf_counter()
+
+    def __iter__(self):
+        parts = []
+        for chunk in self._chunks:
+            if not chunk:
+                continue
+            if self.first_chunk_seconds is None:
+                self.first_chunk_seconds = time.perf_counter() - self._start
+            parts.append(chunk)
+            yield chunk
+        self.text = ''.join(parts)
+        self.total_seconds = time.perf_counter() - self._start
+        if self._on_complete:
+            self._on_complete(self.text)
+
+
+# Hàm chuyển prompt về dạng văn bản
+def prompt_text(prompt):
+    """Prompt có thể là chuỗi hoặc danh sách lượt hội thoại Gemini ({'role', 'parts'})"""
+    if isinstance(prompt, str):
+        return prompt
+    return '\n'.join(f"[{turn['role']}] " + '\n'.join(turn['parts']) for turn in prompt)
+
+
+# Hàm chuẩn hóa prompt trước khi băm
+def normalize_prompt(prompt):
+    """Chuẩn hóa Unicode (NFC) và khoảng trắng để hai prompt chỉ khác cách xuống dòng/thụt lề có cùng khóa"""
+    return ' '.join(unicodedata.normalize('NFC', prompt_text(prompt)).split())
+
+
+# Hàm tạo khóa bộ nhớ đệm phản hồi
+def response_cache_key(model_name, prompt):
+    digest = hashlib.sha256(normalize_prompt(prompt).encode('utf-8')).hexdigest()
+    return f"gemini:{model_name}:{digest}"
+
+
+# Hàm gọi model theo luồng có bộ nhớ đệm
+def cached_stream(cache, model_name, prompt, start_stream, bypass=False, ttl=RESPONSE_CACHE_TTL):
+    """Trả về ResponseStream; phản hồi đã lưu được trả về nguyên một đoạn
+
+    ``start_stream(prompt)`` chỉ được gọi khi chưa có phản hồi đã lưu. Nội dung chỉ được lưu
+    khi luồng chạy hết không lỗi. ``bypass=True`` luôn gọi model rồi ghi đè phản hồi cũ.
+    """
+    key = response_cache_key(model_name, prompt)
+    if cache is not None and not bypass:
+        cached = cache.get(key)
+        if cached is not None:
+            return ResponseStream(iter([cached]), cached=True, prompt=prompt_text(prompt))
+
+    def store(text):
+        if cache is not None and text:
+            cache.set(key, text, ttl=ttl)
+
+    return ResponseStream(start_stream(prompt), on_complete=store, prompt=prompt_text(prompt))
+
+
+# Hàm chạy đồng thời nhiều luồng phản hồi
+def stream_concurrently(jobs, max_workers=None):
+    """Chạy các hàm trong ``jobs`` (tên -> hàm trả về ResponseStream) trên nhiều luồng
+
+    Trả về lần lượt (tên, đoạn văn bản, luồng đã xong, lỗi) theo thứ tự nhận được:
+    mỗi đoạn mới có ``đoạn văn bản``; khi một luồng xong thì có ``luồng đã xong`` hoặc ``lỗi``.
+    """
+    if not jobs:
+        return
+    events = queue.Queue()
+
+    def run(name, job):
+        try:
+            stream = job()
+            for chunk in stream:
+                events.put((name, chunk, None, None))
+            events.put((name, None, stream, None))
+        except Exception as e:
+            events.put((name, None, None, e))
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(jobs)) as executor:
+        for name, job in jobs.items():
+            executor.submit(run, name, job)
+        remaining = len(jobs)
+        while remaining:
+            event = events.get()
+            if event[1] is None:
+                remaining -= 1
+            yield event
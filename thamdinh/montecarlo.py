@@ -0,0 +1,142 @@
+"""Mô phỏng Monte Carlo khả năng trả nợ theo từng tháng.
+
+Thu nhập và chi phí hàng tháng đi theo bước ngẫu nhiên log-chuẩn (tăng trưởng và biến động theo năm),
+thu nhập thêm các cú sốc (mất một phần thu nhập trong vài tháng) xảy ra ngẫu nhiên. Mỗi đường được so với
+số tiền phải trả từng tháng của lịch trả nợ để tìm các tháng thiếu hụt.
+
+Các đường được sinh theo từng khối (bộ nhớ cố định dù số đường lớn), mỗi khối tính theo mảng NumPy và
+có hạt giống riêng tách từ ``seed`` nên kết quả không phụ thuộc số tiến trình; nhiều khối chạy song song
+trên process pool.
+"""
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+# Tham số mô phỏng mặc định (%/năm, riêng thời gian sốc tính bằng tháng)
+SIMULATION_DEFAULTS = {
+    'income_growth': 3.0,
+    'income_volatility': 15.0,
+    'expense_growth': 4.0,
+    'expense_volatility': 10.0,
+    'shock_probability': 5.0,
+    'shock_severity': 50.0,
+    'shock_duration': 6,
+}
+# Số đường mỗi khối: mỗi mảng (đường × 360 tháng, float32) khoảng 6MB
+CHUNK_PATHS = 4096
+# Dưới số ô (đường × tháng) này chạy ngay trong tiến trình hiện tại (tạo tiến trình con tốn hơn tự tính)
+PARALLEL_MIN_CELLS = 4_000_000
+
+
+# Hàm sinh đường ngẫu nhiên log-chuẩn theo tháng
+def _log_normal_paths(rng, paths, months, growth, volatility):
+    """Hệ số so với tháng đầu (tháng 1 bằng 1) cho ``paths`` đường, tăng trưởng kỳ vọng ``growth`` %/năm"""
+    sigma = volatility / 100 / np.sqrt(12)
+    drift = np.log1p(growth / 100) / 12 - sigma ** 2 / 2
+    steps = rng.standard_normal((paths, months), dtype=np.float32)
+    steps *= sigma
+    steps += drift
+    steps[:, 0] = 0
+    np.cumsum(steps, axis=1, out=steps)
+    return np.exp(steps, out=steps)
+
+
+# Hàm chạy trong tiến trình con: mô phỏng một khối đường
+def simulate_chunk(payments, monthly_income, monthly_expense, params, seed, paths):
+    """Thống kê của ``paths`` đường: tổng thiếu hụt, số tháng thiếu hụt, tháng thiếu hụt đầu tiên (0 nếu không có)
+    và DSCR thấp nhất của từng đường, cùng số đường thiếu hụt ở mỗi tháng"""
+    rng = np.random.default_rng(seed)
+    months = len(payments)
+    income = _log_normal_paths(rng, paths, months, params['income_growth'], params['income_volatility'])
+    income *= monthly_income
+
+    # Cú sốc bắt đầu ngẫu nhiên mỗi tháng, kéo dài shock_duration tháng (các cú sốc chồng nhau không cộng dồn)
+    duration = max(int(params['shock_duration']), 1)
+    starts = rng.random((paths, months), dtype=np.float32) < params['shock_probability'] / 100 / 12
+    started = np.cumsum(starts, axis=1, dtype=np.int32)
+    started[:, duration:] -= started[:, :-duration].copy()
+    income *= np.where(started > 0, np.float32(1 - params['shock_severity'] / 100), np.float32(1))
+    del starts, started
+
+    net = income
+    net -= _log_normal_paths(rng, paths, months, params['expense_growth'], params['expense_volatility']) \
+        * np.float32(monthly_expense)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dscr = np.where(payments > 0, net / payments, np.inf).min(axis=1)
+    net -= payments
+    short = net < 0
+    any_short = short.any(axis=1)
+    return {
+        'total_shortfall': -np.where(short, net, 0).sum(axis=1, dtype=np.float64),
+        'shortfall_months': short.sum(axis=1, dtype=np.int32),
+        'first_shortfall': np.where(any_short, short.argmax(axis=1) + 1, 0).astype(np.int32),
+        'min_dscr': dscr.astype(np.float64),
+        'monthly_shortfalls': short.sum(axis=0, dtype=np.int64),
+    }
+
+
+def _run_chunks(jobs, max_workers):
+    """Lần lượt (vị trí khối, kết quả) theo thứ tự xong trước"""
+    if max_workers == 1:
+        for index, job in enumerate(jobs):
+            yield index, simulate_chunk(*job)
+        return
+    # spawn an toàn hơn fork khi tiến trình cha (server Streamlit) đang chạy nhiều thread
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+        futures = {executor.submit(simulate_chunk, *job): index for index, job in enumerate(jobs)}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+# Hàm mô phỏng Monte Carlo khả năng trả nợ
+def simulate_repayment(payments, monthly_income, monthly_expense, paths=10_000, params=None, seed=None,
+                       max_workers=None, chunk_paths=CHUNK_PATHS):
+    """Mô phỏng ``paths`` đường thu nhập/chi phí (tháng đầu bằng ``monthly_income``/``monthly_expense``) so với
+    số tiền phải trả từng tháng ``payments`` (cột 'payment' của lịch trả nợ)
+
+    ``params`` ghi đè SIMULATION_DEFAULTS. Trả về dict: 'paths', 'months', 'shortfall_probability' (% đường có
+    ít nhất một tháng thiếu hụt), 'expected_shortfall' (tổng thiếu hụt trung bình mỗi đường),
+    'conditional_shortfall' (trung bình trên các đường có thiếu hụt), 'shortfall_p95', 'mean_shortfall_months',
+    'min_dscr_median', 'monthly_shortfall_probability' và 'cumulative_shortfall_probability' (% theo tháng),
+    'workers', 'seconds'.
+    """
+    params = {**SIMULATION_DEFAULTS, **(params or {})}
+    payments = np.asarray(payments, dtype=np.float32)
+    months = len(payments)
+    if paths <= 0 or months == 0:
+        raise ValueError("Cần ít nhất một đường mô phỏng và một tháng trả nợ")
+
+    start = time.perf_counter()
+    sizes = [min(chunk_paths, paths - offset) for offset in range(0, paths, chunk_paths)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(payments, float(monthly_income), float(monthly_expense), params, child, size)
+            for child, size in zip(seeds, sizes)]
+    if paths * months < PARALLEL_MIN_CELLS:
+        max_workers = 1
+    max_workers = max(1, min(max_workers or os.cpu_count() or 1, len(jobs)))
+    chunks = [None] * len(jobs)
+    for index, chunk in _run_chunks(jobs, max_workers):
+        chunks[index] = chunk
+
+    total = np.concatenate([chunk['total_shortfall'] for chunk in chunks])
+    first = np.concatenate([chunk['first_shortfall'] for chunk in chunks])
+    short = total > 0
+    first_counts = np.bincount(first[short], minlength=months + 1)[1:]
+    return {
+        'paths': paths,
+        'months': months,
+        'shortfall_probability': short.mean() * 100,
+        'expected_shortfall': total.mean(),
+        'conditional_shortfall': total[short].mean() if short.any() else 0.0,
+        'shortfall_p95': float(np.percentile(total, 95)),
+        'mean_shortfall_months': np.concatenate([chunk['shortfall_months'] for chunk in chunks]).mean(),
+        'min_dscr_median': float(np.median(np.concatenate([chunk['min_dscr'] for chunk in chunks]))),
+        'monthly_shortfall_probability': sum(chunk['monthly_shortfalls'] for chunk in chunks) / paths * 100,
+        'cumulative_shortfall_probability': np.cumsum(first_counts) / paths * 100,
+        'workers': max_workers,
+        'seconds': time.perf_counter() - start,
+    }
@@ -0,0 +1,185 @@
+"""Báo cáo thẩm định PDF dựng trực tiếp bằng fpdf, font Unicode DejaVu Sans (hiển thị được tiếng Việt).
+
+Font lấy từ thư mục ``THAMDINH_FONT_DIR`` nếu có, mặc định dùng bộ DejaVu đi kèm matplotlib.
+Số đo của font được fpdf lưu sẵn trong thư mục bộ nhớ đệm để không phải đọc lại file TTF mỗi báo cáo.
+Module dùng API nội bộ của fpdf 1.7.2 (``_putfonts``, ``set_global``) nên requirements.txt ghim đúng phiên bản này.
+"""
+import importlib.util
+import os
+from datetime import datetime
+
+import fpdf
+from fpdf import FPDF
+
+from thamdinh.amortization import SCHEDULE_COLUMNS
+from thamdinh.disk_cache import default_cache_dir
+from thamdinh.word_report import report_context, schedule_row_context
+
+FONT_FAMILY = 'DejaVu'
+# Kiểu chữ -> file font
+FONT_FILES = {'': 'DejaVuSans.ttf', 'B': 'DejaVuSans-Bold.ttf'}
+
+# Nội dung báo cáo: (tiêu đề mục, [(nhãn, khóa, đơn vị)]), giống mẫu Word mặc định
+PDF_SECTIONS = [
+    ('I. THÔNG TIN KHÁCH HÀNG', [
+        ('Họ và tên', 'customer.name', ''),
+        ('CCCD', 'customer.cccd', ''),
+        ('Địa chỉ', 'customer.address', ''),
+        ('Số điện thoại', 'customer.phone', ''),
+        ('Email', 'customer.email', ''),
+    ]),
+    ('II. THÔNG TIN TÀI CHÍNH', [
+        ('Mục đích vay', 'financial.purpose', ''),
+        ('Tổng nhu cầu vốn', 'financial.total_need', ' đồng'),
+        ('Vốn đối ứng', 'financial.equity', ' đồng'),
+        ('Số tiền vay', 'financial.loan_amount', ' đồng'),
+        ('Lãi suất', 'financial.interest_rate', '%/năm'),
+        ('Thời hạn vay', 'financial.loan_term', ' tháng'),
+        ('Phương thức trả nợ', 'financial.repayment_method', ''),
+        ('Thu nhập hàng tháng', 'financial.monthly_income', ' đồng'),
+        ('Chi phí hàng tháng', 'financial.monthly_expense', ' đồng'),
+    ]),
+    ('III. TÀI SẢN ĐẢM BẢO', [
+        ('Loại tài sản', 'collateral.type', ''),
+        ('Giá trị', 'collateral.value', ' đồng'),
+        ('Địa chỉ', 'collateral.address', ''),
+        ('Diện tích', 'collateral.area', ' m²'),
+    ]),
+    ('IV. CÁC CHỈ TIÊU TÀI CHÍNH', [
+        ('Trả nợ gốc hàng tháng', 'metrics.monthly_principal', ' đồng'),
+        ('Trả lãi tháng đầu', 'metrics.first_month_interest', ' đồng'),
+        ('Tổng trả tháng đầu', 'metrics.first_month_payment', ' đồng'),
+        ('Tổng lãi phải trả', 'metrics.total_interest', ' đồng'),
+        ('Thu nhập ròng', 'metrics.net_income', ' đồng'),
+        ('Tỷ lệ trả nợ/thu nhập', 'metrics.debt_service_ratio', '%'),
+        ('Số dư sau trả nợ', 'metrics.surplus', ' đồng'),
+        ('DSCR', 'metrics.dscr', ''),
+    ]),
+]
+# Độ rộng cột bảng lịch trả nợ (mm), theo thứ tự SCHEDULE_COLUMNS
+SCHEDULE_WIDTHS = [15, 33, 33, 33, 33, 33]
+ROW_HEIGHT = 5
+# Thư mục lưu số đo font của fpdf
+FONT_CACHE_DIR = os.path.join(default_cache_dir(), 'fpdf')
+
+# fpdf mặc định lưu số đo font cạnh file TTF (thư mục cài đặt, thường không ghi được); đây là cấu hình
+# chung của cả tiến trình nên chỉ đặt một lần khi nạp module
+fpdf.set_global('FPDF_CACHE_MODE', 2)
+fpdf.set_global('FPDF_CACHE_DIR', FONT_CACHE_DIR)
+
+
+# Hàm lấy thư mục chứa font DejaVu
+def font_dir():
+    """Thư mục font, đổi được bằng biến môi trường THAMDINH_FONT_DIR (mặc định: font của matplotlib)"""
+    if os.environ.get('THAMDINH_FONT_DIR'):
+        return os.environ['THAMDINH_FONT_DIR']
+    spec = importlib.util.find_spec('matplotlib')
+    if spec is None or not spec.submodule_search_locations:
+        raise RuntimeError("Không tìm thấy font DejaVu: cài matplotlib hoặc đặt THAMDINH_FONT_DIR")
+    return os.path.join(spec.submodule_search_locations[0], 'mpl-data', 'fonts', 'ttf')
+
+
+class _GlyphSubset(list):
+    """Danh sách ký tự đã dùng của một font, kiểm tra ``in`` bằng set"""
+
+    def __init__(self, codes):
+        super().__init__(codes)
+        self._codes = set(self)
+
+    def __contains__(self, code):
+        return code in self._codes
+
+
+class ReportPDF(FPDF):
+    """FPDF có font DejaVu, chân trang đánh số và ghi font nhanh hơn"""
+
+    def __init__(self):
+        super().__init__(format='A4')
+        self.alias_nb_pages()
+        self.set_margins(15, 15, 15)
+        self.set_auto_page_break(True, 15)
+        os.makedirs(FONT_CACHE_DIR, exist_ok=True)
+        directory = font_dir()
+        for style, name in FONT_FILES.items():
+            self.add_font(FONT_FAMILY, style, os.path.join(directory, name), uni=True)
+
+    def footer(self):
+        self.set_y(-12)
+        self.set_font(FONT_FAMILY, '', 8)
+        self.cell(0, 5, f"Trang {self.page_no()}/{{nb}}", 0, 0, 'C')
+
+    def _putfonts(self):
+        # fpdf 1.7.2 nối mọi ký tự đã in (kể cả trùng) vào 'subset', rồi với mỗi mã ký tự đến mã lớn nhất
+        # (chữ tiếng Việt tới U+1EF9) lại dò "mã in subset" trên danh sách đó: bỏ trùng, dò bằng set
+        for font in self.fonts.values():
+            if font.get('type') == 'TTF':
+                font['subset'] = _GlyphSubset(dict.fromkeys(font['subset']))
+        super()._putfonts()
+
+    def printable(self, text):
+        """Bỏ ký tự font không có (emoji...) để fpdf không lỗi"""
+        widths = self.current_font['cw']
+        return ''.join(char for char in text
+                       if char in '\n\t' or (ord(char) < len(widths) and widths[ord(char)]))
+
+    def heading(self, text, size=12):
+        self.set_font(FONT_FAMILY, 'B', size)
+        self.ln(2)
+        self.cell(0, 8, text, 0, 1)
+        self.set_font(FONT_FAMILY, '', 10)
+
+    def paragraph(self, text):
+        self.multi_cell(0, 5.5, self.printable(text))
+
+    def schedule_header(self):
+        self.set_font(FONT_FAMILY, 'B', 8)
+        self.set_fill_color(230, 233, 250)
+        for width, label in zip(SCHEDULE_WIDTHS, SCHEDULE_COLUMNS.values()):
+            self.cell(width, ROW_HEIGHT + 1, label, 1, 0, 'C', True)
+        self.ln()
+        self.set_font(FONT_FAMILY, '', 8)
+
+    def schedule_table(self, rows):
+        """Bảng lịch trả nợ, lặp lại hàng tiêu đề ở mỗi trang"""
+        self.schedule_header()
+        keys = [f"row.{key}" for key in SCHEDULE_COLUMNS]
+        for row in rows:
+            if self.get_y() + ROW_HEIGHT > self.page_break_trigger:
+                self.add_page()
+                self.schedule_header()
+            for width, key in zip(SCHEDULE_WIDTHS, keys):
+                self.cell(width, ROW_HEIGHT, row[key], 1, 0, 'R')
+            self.ln()
+
+
+# Hàm dựng báo cáo thẩm định PDF
+def render_pdf_report(customer_info, financial_info, collateral_info, metrics, analysis_file='', analysis_metrics=''):
+    """Trả về bytes PDF: cùng nội dung mẫu Word mặc định (không kèm biểu đồ), có bảng lịch trả nợ"""
+    context = report_context(customer_info, financial_info, collateral_info, metrics, analysis_file, analysis_metrics)
+    pdf = ReportPDF()
+    # Thông tin tài liệu của fpdf 1.7.2 chỉ nhận latin-1
+    pdf.set_title('Bao cao tham dinh phuong an vay von')
+    pdf.add_page()
+    pdf.set_font(FONT_FAMILY, 'B', 15)
+    pdf.cell(0, 10, 'BÁO CÁO THẨM ĐỊNH PHƯƠNG ÁN VAY VỐN', 0, 1, 'C')
+    pdf.set_font(FONT_FAMILY, '', 10)
+    pdf.cell(0, 6, f"Ngày lập: {datetime.now().strftime('%d/%m/%Y')}", 0, 1, 'R')
+
+    for title, fields in PDF_SECTIONS:
+        pdf.heading(title)
+        for label, key, unit in fields:
+            if context[key]:
+                pdf.paragraph(f"{label}: {context[key]}{unit}")
+
+    schedule = metrics.get('schedule')
+    if schedule is not None:
+        pdf.heading('V. KẾ HOẠCH TRẢ NỢ')
+        pdf.schedule_table(schedule_row_context(schedule))
+    if analysis_file:
+        pdf.heading('VI. PHÂN TÍCH TỪ FILE UPLOAD')
+        pdf.paragraph(analysis_file)
+    if analysis_metrics:
+        pdf.heading('VII. PHÂN TÍCH TỪ CÁC CHỈ SỐ')
+        pdf.paragraph(analysis_metrics)
+    # fpdf 1.7.2 trả về chuỗi latin-1 chứa dữ liệu nhị phân
+    return pdf.output(dest='S').encode('latin-1')
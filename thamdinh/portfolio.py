@@ -0,0 +1,187 @@
+"""Tính chỉ tiêu tài chính cho cả danh mục khoản vay trong một lượt tính theo cột.
+
+Mỗi hàng của DataFrame đầu vào là một khoản vay với các cột giống khóa của
+``financial_info``. Kết quả dùng công thức đóng nên không phải dựng lịch trả nợ
+từng tháng; giá trị trùng với ``calculate_financial_metrics`` cho từng khoản vay.
+"""
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from thamdinh.amortization import ANNUITY, EQUAL_PRINCIPAL, SCHEDULE_COLUMNS, build_schedule
+
+# Cột đầu vào bắt buộc và cột tùy chọn (kèm giá trị mặc định)
+REQUIRED_COLUMNS = ['loan_amount', 'interest_rate', 'loan_term', 'monthly_income', 'monthly_expense']
+OPTIONAL_COLUMNS = {'repayment_method': EQUAL_PRINCIPAL, 'grace_months': 0, 'balloon_amount': 0.0}
+
+METRIC_COLUMNS = ['monthly_principal', 'first_month_interest', 'first_month_payment', 'installment',
+                  'total_interest', 'total_payment', 'net_income', 'debt_service_ratio', 'surplus', 'dscr']
+
+
+def _column(loans, name, default):
+    if name in loans:
+        return loans[name]
+    return pd.Series(default, index=loans.index)
+
+
+def _numeric(loans, name, default=0.0):
+    values = pd.to_numeric(_column(loans, name, default), errors='coerce')
+    return values.fillna(default).to_numpy(dtype=float)
+
+
+# Hàm tính khoản trả cố định hàng tháng của phương thức trả đều
+def level_payment(loan_amount, monthly_rate, amortizing_months, balloon_amount=0):
+    """A = (L - B·(1+r)^-n)·r / (1 - (1+r)^-n) cho mảng NumPy (lãi suất theo tháng, dạng thập phân);
+    ``n`` là số kỳ trả gốc sau ân hạn, ``B`` phần gốc trả cuối kỳ (không tính trong A)"""
+    monthly_rate = np.asarray(monthly_rate, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        discount = (1 + monthly_rate) ** -np.asarray(amortizing_months, dtype=float)
+        return np.where(monthly_rate > 0, (loan_amount - balloon_amount * discount) * monthly_rate / (1 - discount),
+                        (loan_amount - balloon_amount) / amortizing_months)
+
+
+# Hàm tính chỉ tiêu tài chính theo công thức đóng cho mảng khoản vay
+def closed_form_metrics(loan_amount, interest_rate, loan_term, monthly_income, monthly_expense, annuity,
+                        grace_months=0, balloon_amount=0):
+    """Các chỉ tiêu như ``calculate_financial_metrics`` cho mảng NumPy (lãi suất %/năm, ``annuity`` là mảng
+    bool: trả đều hay gốc đều); các đối số được broadcast với nhau nên có thể là lưới nhiều chiều.
+    Trả về dict {tên chỉ tiêu: mảng}; khoản vay thiếu số tiền vay hoặc thời hạn có chỉ tiêu là NaN.
+    """
+    loan_amount, loan_term = np.asarray(loan_amount, dtype=float), np.floor(np.asarray(loan_term, dtype=float))
+    monthly_rate = np.asarray(interest_rate, dtype=float) / 100 / 12
+    monthly_income = np.asarray(monthly_income, dtype=float)
+    monthly_expense = np.asarray(monthly_expense, dtype=float)
+
+    valid = (loan_amount > 0) & (loan_term > 0)
+    # Khoản vay không hợp lệ vẫn tính trên giá trị giả rồi gán NaN, tránh chia cho 0
+    loan = np.where(valid, loan_amount, 1.0)
+    term = np.where(valid, loan_term, 1.0)
+    grace = np.clip(np.floor(grace_months), 0, term - 1)
+    balloon = np.clip(balloon_amount, 0, loan)
+    amortizing = term - grace
+
+    # Dư nợ trong thời gian ân hạn chưa giảm nên lãi kỳ đầu và kỳ trả gốc đầu tiên như nhau
+    grace_interest = loan * monthly_rate
+
+    # Gốc đều: lãi cộng dồn trên dư nợ giảm tuyến tính
+    equal_principal = (loan - balloon) / amortizing
+    equal_total_interest = monthly_rate * (grace * loan + amortizing * loan
+                                           - equal_principal * amortizing * (amortizing - 1) / 2)
+
+    level = level_payment(loan, monthly_rate, amortizing, balloon)
+    annuity_principal = level - grace_interest
+    # Tổng trả trong kỳ trả đều là n·A cộng khoản balloon cuối kỳ
+    annuity_total_interest = grace * grace_interest + amortizing * level + balloon - loan
+
+    monthly_principal = np.where(annuity, annuity_principal, equal_principal)
+    # Khi chỉ còn một kỳ trả gốc, khoản balloon rơi đúng vào kỳ đó
+    monthly_principal = monthly_principal + np.where(amortizing == 1, balloon, 0.0)
+    installment = monthly_principal + grace_interest
+    first_month_payment = np.where(grace > 0, grace_interest, installment)
+    total_interest = np.where(annuity, annuity_total_interest, equal_total_interest)
+
+    net_income = monthly_income - monthly_expense
+    with np.errstate(divide='ignore', invalid='ignore'):
+        debt_service_ratio = np.where(monthly_income > 0, installment / monthly_income * 100, 0.0)
+        dscr = np.where(installment > 0, net_income / installment, 0.0)
+
+    metrics = {
+        'monthly_principal': monthly_principal,
+        'first_month_interest': grace_interest,
+        'first_month_payment': first_month_payment,
+        'installment': installment,
+        'total_interest': total_interest,
+        'total_payment': loan + total_interest,
+        'net_income': net_income,
+        'debt_service_ratio': debt_service_ratio,
+        'surplus': net_income - installment,
+        'dscr': dscr,
+    }
+    return {name: np.where(valid, value, np.nan) for name, value in metrics.items()}
+
+
+# Hàm tính chỉ tiêu tài chính cho danh mục khoản vay
+def compute_portfolio_metrics(loans):
+    """Tính các chỉ tiêu tài chính cho mọi khoản vay trong DataFrame, trả về DataFrame cùng chỉ mục
+
+    Khoản vay thiếu số tiền vay hoặc thời hạn có các chỉ tiêu là NaN.
+    """
+    missing = [name for name in REQUIRED_COLUMNS if name not in loans]
+    if missing:
+        raise ValueError(f"Thiếu cột dữ liệu: {', '.join(missing)}")
+
+    methods = _column(loans, 'repayment_method', EQUAL_PRINCIPAL).fillna(EQUAL_PRINCIPAL).to_numpy()
+    unknown = set(methods) - {EQUAL_PRINCIPAL, ANNUITY}
+    if unknown:
+        raise ValueError(f"Phương thức trả nợ không hợp lệ: {', '.join(map(str, sorted(unknown, key=str)))}")
+
+    metrics = closed_form_metrics(_numeric(loans, 'loan_amount'), _numeric(loans, 'interest_rate'),
+                                  _numeric(loans, 'loan_term'), _numeric(loans, 'monthly_income'),
+                                  _numeric(loans, 'monthly_expense'), methods == ANNUITY,
+                                  _numeric(loans, 'grace_months'), _numeric(loans, 'balloon_amount'))
+    return pd.DataFrame({name: metrics[name] for name in METRIC_COLUMNS}, index=loans.index)
+
+
+# Hàm lấy khóa bộ nhớ đệm của một danh mục khoản vay
+def loans_cache_key(loans):
+    """Mã băm theo tên cột và giá trị của bảng khoản vay (không tính chỉ mục)"""
+    digest = hashlib.sha1(repr(list(loans.columns)).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(loans, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+# Hàm chuẩn hóa bảng khoản vay
+def normalize_loans(loans):
+    """Thêm cột tùy chọn còn thiếu và ép kiểu số như khi tính chỉ tiêu danh mục"""
+    loans = loans.copy()
+    for name, default in OPTIONAL_COLUMNS.items():
+        if name not in loans:
+            loans[name] = default
+        loans[name] = loans[name].fillna(default)
+    for name in REQUIRED_COLUMNS + ['grace_months', 'balloon_amount']:
+        loans[name] = pd.to_numeric(loans[name], errors='coerce').fillna(0.0)
+    return loans
+
+
+def loan_schedules(loans):
+    """Lần lượt (vị trí, lịch trả nợ) của các khoản vay hợp lệ trong bảng đã chuẩn hóa; ân hạn và gốc cuối kỳ
+    được giới hạn như calculate_financial_metrics"""
+    amounts = loans['loan_amount'].to_numpy(dtype=float)
+    rates = loans['interest_rate'].to_numpy(dtype=float)
+    terms = np.floor(loans['loan_term'].to_numpy(dtype=float)).astype(int)
+    methods = loans['repayment_method'].to_numpy()
+    graces = loans['grace_months'].to_numpy(dtype=float)
+    balloons = loans['balloon_amount'].to_numpy(dtype=float)
+    for position in np.flatnonzero((amounts > 0) & (terms > 0)):
+        term = terms[position]
+        grace = min(max(int(graces[position]), 0), term - 1)
+        balloon = min(max(balloons[position], 0.0), amounts[position])
+        yield position, build_schedule(amounts[position], rates[position], term, methods[position], grace, balloon)
+
+
+# Hàm ghép lịch trả nợ của cả danh mục thành một bảng dài
+def stack_schedules(loans):
+    """Lịch trả nợ mọi khoản vay hợp lệ nối tiếp nhau: dict cột như ``build_schedule`` thêm cột 'loan'
+    (vị trí khoản vay trong ``loans``); mỗi khoản vay một đoạn liên tiếp, tháng tăng dần"""
+    positions, schedules = [], []
+    for position, schedule in loan_schedules(normalize_loans(loans)):
+        positions.append(np.full(len(schedule['month']), position))
+        schedules.append(schedule)
+    stacked = {'loan': np.concatenate(positions) if positions else np.zeros(0, dtype=int)}
+    for key in SCHEDULE_COLUMNS:
+        stacked[key] = (np.concatenate([schedule[key] for schedule in schedules]) if schedules
+                        else np.zeros(0, dtype=int if key == 'month' else float))
+    return stacked
+
+
+# Hàm tính dòng tiền danh mục theo tháng
+def portfolio_cash_flow(stacked):
+    """Cộng lịch trả nợ đã ghép (``stack_schedules``) theo tháng: dict 'month', 'active' (số khoản vay
+    còn trả nợ) và các cột tiền của SCHEDULE_COLUMNS"""
+    index = stacked['month'] - 1
+    length = int(stacked['month'].max()) if len(index) else 0
+    flow = {'month': np.arange(1, length + 1), 'active': np.bincount(index, minlength=length)}
+    for key in list(SCHEDULE_COLUMNS)[1:]:
+        flow[key] = np.bincount(index, weights=stacked[key], minlength=length)
+    return flow
@@ -0,0 +1,140 @@
+"""Giới hạn tần suất gọi API dùng chung cho mọi phiên và mọi tiến trình trên cùng máy.
+
+Thuật toán token bucket, trạng thái lưu trong SQLite. Mỗi request *đặt chỗ* một token
+trong một giao dịch (token có thể âm), rồi ngủ ngoài khóa cho đến lượt của mình, nên các
+request được phục vụ theo thứ tự đến và không giữ khóa cơ sở dữ liệu khi chờ.
+Token âm gồm cả các request đang xếp hàng lẫn thời gian bị phạt khi máy chủ báo quá giới hạn,
+nên mỗi request phải chờ được ghi riêng thời điểm gửi để đếm đúng số request đang chờ.
+"""
+import hashlib
+import os
+import sqlite3
+import time
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    key TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    acquired INTEGER NOT NULL DEFAULT 0,
+    waited INTEGER NOT NULL DEFAULT 0,
+    total_wait REAL NOT NULL DEFAULT 0,
+    max_wait REAL NOT NULL DEFAULT 0,
+    throttled INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS reservations (
+    key TEXT NOT NULL,
+    send_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reservations_key ON reservations (key, send_at);
+"""
+
+# Mặc định 30 request/phút (tương đương giãn cách 2 giây), không cho gửi dồn
+DEFAULT_RATE = 0.5
+DEFAULT_CAPACITY = 1
+
+
+# Hàm tạo khóa bucket theo API key và model
+def bucket_key(api_key, model_name):
+    """Không lưu API key gốc, chỉ lưu mã băm"""
+    digest = hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]
+    return f"{digest}:{model_name}"
+
+
+class TokenBucketLimiter:
+    """Token bucket trên SQLite: ``rate`` token/giây, tối đa ``capacity`` token"""
+
+    def __init__(self, path, rate=DEFAULT_RATE, capacity=DEFAULT_CAPACITY):
+        if rate <= 0 or capacity < 1:
+            raise ValueError("Tốc độ phải lớn hơn 0 và sức chứa ít nhất 1 token")
+        self.path = path
+        self.rate = rate
+        self.capacity = capacity
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self):
+        # isolation_level=None để tự mở giao dịch BEGIN IMMEDIATE (khóa ghi ngay từ đầu)
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def _update(self, key, change):
+        """Chạy ``change(tokens, now)`` trong một giao dịch ghi, trả về (kết quả, số token mới)"""
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            now = time.time()
+            row = conn.execute('SELECT tokens, updated_at FROM buckets WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                conn.execute('INSERT INTO buckets (key, tokens, updated_at) VALUES (?, ?, ?)',
+                             (key, float(self.capacity), now))
+                tokens = float(self.capacity)
+            else:
+                tokens = min(self.capacity, row[0] + max(0.0, now - row[1]) * self.rate)
+            result, tokens = change(conn, tokens, now)
+            conn.execute('UPDATE buckets SET tokens = ?, updated_at = ? WHERE key = ?', (tokens, now, key))
+            conn.execute('COMMIT')
+            return result
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    def reserve(self, key):
+        """Đặt chỗ một token, trả về số giây phải chờ trước khi được gửi request"""
+        def take(conn, tokens, now):
+            tokens -= 1
+            wait = -tokens / self.rate if tokens < 0 else 0.0
+            conn.execute('UPDATE buckets SET acquired = acquired + 1, waited = waited + ?, '
+                         'total_wait = total_wait + ?, max_wait = MAX(max_wait, ?) WHERE key = ?',
+                         (1 if wait > 0 else 0, wait, wait, key))
+            conn.execute('DELETE FROM reservations WHERE key = ? AND send_at <= ?', (key, now))
+            if wait > 0:
+                conn.execute('INSERT INTO reservations (key, send_at) VALUES (?, ?)', (key, now + wait))
+            return wait, tokens
+        return self._update(key, take)
+
+    def acquire(self, key):
+        """Chờ đến lượt rồi trả về số giây đã chờ"""
+        wait = self.reserve(key)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def penalize(self, key, seconds):
+        """Máy chủ báo quá giới hạn: không cấp token mới cho ai trong ``seconds`` giây tới"""
+        def block(conn, tokens, now):
+            conn.execute('UPDATE buckets SET throttled = throttled + 1 WHERE key = ?', (key,))
+            # Token cần thiết để lượt kế tiếp phải chờ ít nhất ``seconds`` giây
+            return None, min(tokens, 1 - seconds * self.rate)
+        self._update(key, block)
+
+    def stats(self, key):
+        """Số request đang chờ, số request đã cấp, thời gian chờ trung bình/tối đa và số lần bị 429"""
+        conn = self._connect()
+        try:
+            row = conn.execute('SELECT acquired, waited, total_wait, max_wait, throttled '
+                               'FROM buckets WHERE key = ?', (key,)).fetchone()
+            # Chỉ đếm request đã đặt chỗ mà chưa đến lượt gửi, không tính thời gian bị phạt
+            queue_depth = conn.execute('SELECT COUNT(*) FROM reservations WHERE key = ? AND send_at > ?',
+                                       (key, time.time())).fetchone()[0]
+        finally:
+            conn.close()
+        if row is None:
+            return {'queue_depth': 0, 'acquired': 0, 'waited': 0, 'avg_wait': 0.0, 'max_wait': 0.0,
+                    'throttled': 0}
+        acquired, waited, total_wait, max_wait, throttled = row
+        return {
+            'queue_depth': queue_depth,
+            'acquired': acquired,
+            'waited': waited,
+            'avg_wait': total_wait / acquired if acquired else 0.0,
+            'max_wait': max_wait,
+            'throttled': throttled,
+        }
@@ -0,0 +1,121 @@
+"""Tạo báo cáo thẩm định hàng loạt (Word hoặc PDF) trên nhiều tiến trình, gom vào một file zip."""
+import csv
+import io
+import multiprocessing
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from thamdinh.finance import calculate_financial_metrics
+
+# Định dạng báo cáo: phần mở rộng -> tên hiển thị
+REPORT_FORMATS = {
+    'docx': 'Word (.docx)',
+    'pdf': 'PDF',
+}
+
+
+# Hàm dựng báo cáo một hồ sơ theo định dạng
+def render_report_bytes(report_format, customer_info, financial_info, collateral_info, metrics,
+                        analysis_file='', analysis_metrics='', template_data=None, charts=True):
+    """Word dùng file mẫu ``template_data`` (mặc định: mẫu có sẵn) và ``charts``; PDF không kèm biểu đồ"""
+    if report_format == 'pdf':
+        from thamdinh.pdf_report import render_pdf_report
+
+        return render_pdf_report(customer_info, financial_info, collateral_info, metrics,
+                                 analysis_file, analysis_metrics)
+    if report_format != 'docx':
+        raise ValueError(f"Định dạng báo cáo không hợp lệ: {report_format}")
+    from thamdinh.word_report import load_template, render_report
+
+    return render_report(load_template(template_data), customer_info, financial_info, collateral_info, metrics,
+                         analysis_file, analysis_metrics, charts)
+
+
+# Hàm chạy trong tiến trình con: dựng báo cáo một hồ sơ, mọi lỗi được gói vào kết quả
+def render_case_report(case, report_format='docx', template_data=None, charts=True):
+    """``case`` có 'file', 'customer_info', 'financial_info', 'collateral_info' (như kết quả trích xuất)
+    và tùy chọn 'analysis_file', 'analysis_metrics'"""
+    result = {'file': case['file'], 'data': None, 'error': None, 'seconds': 0.0}
+    start = time.perf_counter()
+    try:
+        financial_info = case.get('financial_info') or {}
+        result['data'] = render_report_bytes(report_format, case.get('customer_info') or {}, financial_info,
+                                             case.get('collateral_info') or {},
+                                             calculate_financial_metrics(financial_info),
+                                             case.get('analysis_file', ''), case.get('analysis_metrics', ''),
+                                             template_data, charts)
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def report_file_name(case, index, report_format='docx'):
+    """Tên file báo cáo trong zip: số thứ tự + tên file hồ sơ (tránh trùng tên giữa các thư mục)"""
+    stem = os.path.splitext(os.path.basename(case['file']))[0] or 'ho_so'
+    return f"{index + 1:04d}_bao_cao_{stem}.{report_format}"
+
+
+def _prepare(report_format, template_data):
+    """Chạy trước khi tạo tiến trình con: kiểm tra mẫu Word (mẫu lỗi báo ValueError ngay), hoặc dựng thử
+    một PDF để fpdf ghi sẵn số đo font (các tiến trình con chỉ còn đọc)"""
+    if report_format == 'pdf':
+        render_report_bytes('pdf', {}, {}, {}, {})
+    else:
+        render_report_bytes(report_format, {}, {}, {}, {}, template_data=template_data, charts=False)
+
+
+def _render_cases(cases, report_format, template_data, max_workers, charts):
+    """Lần lượt (vị trí, kết quả) theo thứ tự xong trước"""
+    # Chỉ gửi sang tiến trình con các trường cần cho báo cáo (không gửi toàn văn hồ sơ)
+    keys = ('file', 'customer_info', 'financial_info', 'collateral_info', 'analysis_file', 'analysis_metrics')
+    cases = [{key: case[key] for key in keys if key in case} for case in cases]
+    max_workers = max(1, min(max_workers or os.cpu_count() or 1, len(cases)))
+    if max_workers == 1:
+        for index, case in enumerate(cases):
+            yield index, render_case_report(case, report_format, template_data, charts)
+        return
+    # spawn an toàn hơn fork khi tiến trình cha (server Streamlit) đang chạy nhiều thread
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+        futures = {executor.submit(render_case_report, case, report_format, template_data, charts): index
+                   for index, case in enumerate(cases)}
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                # Tiến trình con bị dừng đột ngột (hết bộ nhớ, crash thư viện...)
+                result = {'file': cases[index]['file'], 'data': None, 'seconds': 0.0,
+                          'error': f"{type(e).__name__}: {e}"}
+            yield index, result
+
+
+# Hàm tạo báo cáo hàng loạt bằng process pool, gom vào một file zip
+def generate_report_zip(cases, output, report_format='docx', template_data=None, max_workers=None, charts=True):
+    """Ghi từng báo cáo vào zip ``output`` ngay khi xong, cuối cùng thêm bảng thời gian ``thoi_gian.csv``;
+    lần lượt trả về kết quả từng hồ sơ ('file', 'report', 'seconds', 'size', 'error')
+    """
+    _prepare(report_format, template_data)
+    names = [report_file_name(case, index, report_format) for index, case in enumerate(cases)]
+    results = []
+    # .docx đã được nén sẵn; PDF nén luồng nội dung và font nên zip ngoài chỉ lưu, không nén lại
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_STORED) as archive:
+        for index, result in _render_cases(cases, report_format, template_data, max_workers, charts):
+            data = result.pop('data')
+            result['report'] = names[index] if data is not None else ''
+            result['size'] = len(data) if data is not None else 0
+            if data is not None:
+                archive.writestr(names[index], data)
+            results.append(result)
+            yield result
+
+        timings = io.StringIO()
+        writer = csv.writer(timings)
+        writer.writerow(['Hồ sơ', 'Báo cáo', 'Thời gian (giây)', 'Dung lượng (byte)', 'Lỗi'])
+        for result in results:
+            writer.writerow([result['file'], result['report'], f"{result['seconds']:.3f}", result['size'],
+                             result['error'] or ''])
+        archive.writestr('thoi_gian.csv', timings.getvalue().encode('utf-8-sig'), zipfile.ZIP_DEFLATED)
@@ -0,0 +1,61 @@
+"""Chỉ mục BM25 trên nội dung PASDV để chọn các đoạn liên quan đưa vào câu hỏi chatbox.
+
+Chỉ mục được dựng một lần cho mỗi nội dung tài liệu (khóa theo mã băm) và giữ trong
+bộ nhớ đệm LRU, nên mỗi câu hỏi chỉ tốn một lượt chấm điểm trên các từ của câu hỏi.
+"""
+import hashlib
+import math
+from collections import Counter, defaultdict
+
+from thamdinh.cache import LRUCache
+from thamdinh.summarize import split_sections
+from thamdinh.text import tokenize
+
+# Kích thước mỗi đoạn được đánh chỉ mục (token ước lượng)
+CHUNK_TOKENS = 250
+DEFAULT_TOP_K = 4
+
+_INDEX_CACHE = LRUCache(maxsize=8)
+
+
+class BM25Index:
+    """Chỉ mục BM25 (Okapi) trên danh sách đoạn văn bản"""
+
+    def __init__(self, chunks, k1=1.5, b=0.75):
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+        self.lengths = []
+        # từ -> danh sách (chỉ số đoạn, số lần xuất hiện)
+        self.postings = defaultdict(list)
+        for index, chunk in enumerate(chunks):
+            counts = Counter(tokenize(chunk))
+            self.lengths.append(sum(counts.values()))
+            for term, count in counts.items():
+                self.postings[term].append((index, count))
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+        total = len(chunks)
+        self.idf = {term: math.log(1 + (total - len(docs) + 0.5) / (len(docs) + 0.5))
+                    for term, docs in self.postings.items()}
+
+    def search(self, query, k=DEFAULT_TOP_K):
+        """Trả về tối đa ``k`` cặp (chỉ số đoạn, điểm) có điểm cao nhất, bỏ qua đoạn không chứa từ nào của câu hỏi"""
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for index, count in self.postings[term]:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[index] / self.avg_length)
+                scores[index] += idf * count * (self.k1 + 1) / (count + norm)
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+
+    def top_chunks(self, query, k=DEFAULT_TOP_K):
+        """Các đoạn liên quan nhất, giữ theo thứ tự xuất hiện trong tài liệu"""
+        return [self.chunks[index] for index, _ in sorted(self.search(query, k))]
+
+
+# Hàm lấy chỉ mục của tài liệu (dựng một lần cho mỗi nội dung)
+def get_document_index(text):
+    key = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    return _INDEX_CACHE.get_or_compute(key, lambda: BM25Index(split_sections(text, CHUNK_TOKENS)))
@@ -0,0 +1,161 @@
+"""Giới hạn khoản vay theo chính sách: số tiền vay tối đa, thời hạn tối thiểu và lãi suất tối đa.
+
+Khoản trả nợ dùng để đánh giá (kỳ trả gốc đầu tiên sau ân hạn, như ``calculate_financial_metrics``) không được
+vượt quá mức trả tối đa ``min((thu nhập - chi phí) / DSCR_MIN, thu nhập · DTI_MAX %)``, và số tiền vay không
+vượt quá LTV_MAX % giá trị tài sản đảm bảo. Khoản trả tuyến tính theo số tiền vay và có nghiệm đóng theo thời
+hạn nên hai giới hạn đầu tính trực tiếp; lãi suất tối đa của phương thức trả đều không có nghiệm đóng nên
+được tìm bằng chia đôi, chạy đồng thời trên cả mảng. Mọi hàm nhận mảng NumPy (broadcast như
+``closed_form_metrics``) nên dùng được cho một hồ sơ lẫn cả danh mục.
+"""
+import numpy as np
+
+from thamdinh.amortization import ANNUITY, EQUAL_PRINCIPAL
+from thamdinh.finance import DSCR_MIN, DTI_MAX, LTV_MAX
+from thamdinh.portfolio import REQUIRED_COLUMNS, level_payment, normalize_loans
+
+# Thời hạn dài nhất được xét khi tìm thời hạn tối thiểu (tháng)
+MAX_TERM = 480
+# Số vòng chia đôi khi tìm lãi suất tối đa (sai số ~ lãi suất trần / 2^60)
+BISECTION_STEPS = 60
+
+# Các giới hạn tính cho từng khoản vay: (khóa, nhãn)
+SOLVER_COLUMNS = [
+    ('max_loan', 'Vay tối đa'),
+    ('min_term', 'Thời hạn tối thiểu (tháng)'),
+    ('max_rate', 'Lãi suất tối đa (%/năm)'),
+]
+
+
+# Hàm tính khoản trả nợ tối đa hàng tháng theo DSCR và DTI
+def max_installment(monthly_income, monthly_expense):
+    """Khoản trả lớn nhất vẫn giữ DSCR ≥ DSCR_MIN và DTI ≤ DTI_MAX (0 khi thu nhập ròng không dương)"""
+    monthly_income = np.asarray(monthly_income, dtype=float)
+    net_income = monthly_income - np.asarray(monthly_expense, dtype=float)
+    return np.maximum(np.minimum(net_income / DSCR_MIN, monthly_income * DTI_MAX / 100), 0.0)
+
+
+def _installment(loan, monthly_rate, amortizing, balloon, annuity):
+    """Khoản trả của kỳ trả gốc đầu tiên, như ``closed_form_metrics`` (khi chỉ còn một kỳ, gồm cả khoản balloon)"""
+    equal = (loan - balloon) / amortizing + loan * monthly_rate
+    payment = np.where(annuity, level_payment(loan, monthly_rate, amortizing, balloon), equal)
+    return payment + np.where(amortizing == 1, balloon, 0.0)
+
+
+# Hàm giải các giới hạn khoản vay theo chính sách
+def solve_limits(loan_amount, interest_rate, loan_term, monthly_income, monthly_expense, annuity,
+                 grace_months=0, balloon_amount=0, collateral_value=0):
+    """Các giới hạn cho từng khoản vay (lãi suất %/năm, ``annuity`` là mảng bool); trả về dict mảng:
+
+    - 'max_installment': khoản trả tối đa hàng tháng theo DSCR/DTI
+    - 'max_loan': số tiền vay tối đa với lãi suất và thời hạn hiện tại, nhỏ hơn của 'max_loan_debt_service'
+      (theo DSCR/DTI) và 'max_loan_ltv' (theo LTV, vô cùng khi không có tài sản đảm bảo)
+    - 'min_term': thời hạn ngắn nhất (tháng) đạt DSCR/DTI với số tiền vay và lãi suất hiện tại
+    - 'max_rate': lãi suất cao nhất (%/năm) đạt DSCR/DTI với số tiền vay và thời hạn hiện tại
+    - 'passed': phương án hiện tại đạt cả DSCR, DTI và LTV
+
+    LTV không phụ thuộc thời hạn và lãi suất nên hai giới hạn này chỉ xét DSCR/DTI; chúng là NaN khi không có
+    giá trị nào đạt (hoặc cần hơn MAX_TERM tháng). Khoản vay thiếu số tiền vay hoặc thời hạn có kết quả NaN.
+    """
+    loan_amount = np.asarray(loan_amount, dtype=float)
+    loan_term = np.floor(np.asarray(loan_term, dtype=float))
+    monthly_rate = np.maximum(np.asarray(interest_rate, dtype=float), 0) / 100 / 12
+    collateral_value = np.asarray(collateral_value, dtype=float)
+    payment = max_installment(monthly_income, monthly_expense)
+
+    valid = (loan_amount > 0) & (loan_term > 0)
+    # Như closed_form_metrics: khoản vay không hợp lệ tính trên giá trị giả rồi gán NaN
+    loan = np.where(valid, loan_amount, 1.0)
+    term = np.where(valid, loan_term, 1.0)
+    grace = np.clip(np.floor(grace_months), 0, term - 1)
+    balloon = np.clip(balloon_amount, 0, loan)
+    amortizing = term - grace
+    ltv_limit = np.where(collateral_value > 0, collateral_value * LTV_MAX / 100, np.inf)
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        # Số tiền vay tối đa: khoản trả tuyến tính theo L, hệ số góc là khoản trả của 1 đồng vay không có balloon
+        slope = _installment(1.0, monthly_rate, amortizing, 0.0, annuity)
+        debt_service_limit = balloon + (payment - _installment(balloon, monthly_rate, amortizing, balloon,
+                                                               annuity)) / slope
+        # Khi cả L = B cũng vượt mức trả, gốc cuối kỳ bị giới hạn bằng số tiền vay: khoản trả tỉ lệ thuận với L
+        clipped_slope = _installment(1.0, monthly_rate, amortizing, 1.0, annuity)
+        debt_service_limit = np.where(debt_service_limit >= balloon, debt_service_limit,
+                                      np.minimum(payment / clipped_slope, balloon))
+        debt_service_limit = np.where(payment > 0, debt_service_limit, 0.0)
+
+        # Thời hạn tối thiểu: số kỳ trả gốc n nhỏ nhất để khoản trả ≤ P
+        interest_room = payment - loan * monthly_rate
+        equal_periods = (loan - balloon) / interest_room
+        annuity_periods = np.where(monthly_rate > 0,
+                                   -np.log(interest_room / (payment - balloon * monthly_rate))
+                                   / np.log1p(monthly_rate),
+                                   (loan - balloon) / payment)
+        periods = np.ceil(np.where(annuity, annuity_periods, equal_periods) - 1e-9)
+        periods = np.maximum(periods, 1)
+        # Một kỳ trả gốc duy nhất phải trả luôn khoản balloon
+        periods = np.where((periods == 1) & (loan * (1 + monthly_rate) > payment), 2, periods)
+        # Thời hạn mới dài hơn ân hạn nên ân hạn được giữ nguyên như đã nhập (không giới hạn theo thời hạn cũ)
+        min_term = np.maximum(np.floor(grace_months), 0) + periods
+        term_ok = (interest_room > 0) & (min_term <= MAX_TERM)
+
+        # Lãi suất tối đa: gốc đều tuyến tính theo r, trả đều tìm bằng chia đôi trên [0, P/L]
+        principal_part = _installment(loan, 0.0, amortizing, balloon, annuity)
+        equal_rate = (payment - principal_part) / loan
+        shape = np.broadcast(loan, payment, amortizing, balloon).shape
+        low, high = np.zeros(shape), np.broadcast_to(payment / loan, shape).copy()
+        last_balloon = np.where(amortizing == 1, balloon, 0.0)
+        for _ in range(BISECTION_STEPS):
+            middle = (low + high) / 2
+            fits = level_payment(loan, middle, amortizing, balloon) + last_balloon <= payment
+            low = np.where(fits, middle, low)
+            high = np.where(fits, high, middle)
+        max_rate = np.where(annuity, low, equal_rate) * 12 * 100
+        rate_ok = principal_part <= payment
+
+    installment = _installment(loan, monthly_rate, amortizing, balloon, annuity)
+    return {
+        'max_installment': payment,
+        'max_loan': np.where(valid, np.minimum(debt_service_limit, ltv_limit), np.nan),
+        'max_loan_debt_service': np.where(valid, debt_service_limit, np.nan),
+        'max_loan_ltv': ltv_limit,
+        'min_term': np.where(valid & term_ok, min_term, np.nan),
+        'max_rate': np.where(valid & rate_ok, max_rate, np.nan),
+        # Sai số làm tròn nhỏ khi khoản vay nằm đúng tại giới hạn vẫn được tính là đạt
+        'passed': valid & (installment <= payment * (1 + 1e-12)) & (loan <= ltv_limit),
+    }
+
+
+# Hàm giải giới hạn khoản vay cho một hồ sơ
+def solve_case(financial_info, collateral_info=None):
+    """Như ``solve_limits`` cho một hồ sơ, trả về dict số thực (NaN khi không có giá trị đạt)"""
+    method = financial_info.get('repayment_method', EQUAL_PRINCIPAL)
+    if method not in (EQUAL_PRINCIPAL, ANNUITY):
+        raise ValueError(f"Phương thức trả nợ không hợp lệ: {method}")
+    limits = solve_limits(
+        float(financial_info.get('loan_amount', 0) or 0), float(financial_info.get('interest_rate', 0) or 0),
+        float(financial_info.get('loan_term', 0) or 0), float(financial_info.get('monthly_income', 0) or 0),
+        float(financial_info.get('monthly_expense', 0) or 0), method == ANNUITY,
+        float(financial_info.get('grace_months', 0) or 0), float(financial_info.get('balloon_amount', 0) or 0),
+        float((collateral_info or {}).get('value', 0) or 0))
+    return {name: value.item() for name, value in limits.items()}
+
+
+# Hàm giải giới hạn khoản vay cho danh mục
+def solve_portfolio(loans, collateral_values=0):
+    """Giới hạn cho mọi khoản vay trong DataFrame (cột như ``compute_portfolio_metrics``, giá trị tài sản đảm bảo
+    lấy từ cột 'collateral_value' nếu có, nếu không từ ``collateral_values``), trả về DataFrame cùng chỉ mục"""
+    import pandas as pd
+
+    missing = [name for name in REQUIRED_COLUMNS if name not in loans]
+    if missing:
+        raise ValueError(f"Thiếu cột dữ liệu: {', '.join(missing)}")
+    loans = normalize_loans(loans)
+    methods = loans['repayment_method'].to_numpy()
+    unknown = set(methods) - {EQUAL_PRINCIPAL, ANNUITY}
+    if unknown:
+        raise ValueError(f"Phương thức trả nợ không hợp lệ: {', '.join(map(str, sorted(unknown, key=str)))}")
+    if 'collateral_value' in loans:
+        collateral_values = pd.to_numeric(loans['collateral_value'], errors='coerce').fillna(0.0).to_numpy()
+    limits = solve_limits(*(loans[name].to_numpy(dtype=float) for name in REQUIRED_COLUMNS), methods == ANNUITY,
+                          loans['grace_months'].to_numpy(dtype=float), loans['balloon_amount'].to_numpy(dtype=float),
+                          np.broadcast_to(np.asarray(collateral_values, dtype=float), len(loans)))
+    return pd.DataFrame(limits, index=loans.index)
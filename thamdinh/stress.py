@@ -0,0 +1,98 @@
+"""Kiểm tra sức chịu đựng (stress test) của một phương án vay trên lưới kịch bản.
+
+Lưới gồm 4 chiều: lãi suất × thay đổi thu nhập × thay đổi chi phí × thời hạn. Mọi kịch bản được tính
+một lượt bằng công thức đóng của ``closed_form_metrics`` (cùng kết quả với ``calculate_financial_metrics``)
+nhờ broadcast NumPy, không dựng lịch trả nợ từng kịch bản.
+"""
+import math
+
+import numpy as np
+
+from thamdinh.amortization import ANNUITY, EQUAL_PRINCIPAL
+from thamdinh.finance import DSCR_MIN, DTI_MAX
+from thamdinh.formatting import format_number
+from thamdinh.portfolio import closed_form_metrics
+
+# Các chiều của lưới theo thứ tự trục: tên -> nhãn hiển thị
+STRESS_AXES = {
+    'rate': 'Lãi suất (%/năm)',
+    'income': 'Thu nhập thay đổi (%)',
+    'expense': 'Chi phí thay đổi (%)',
+    'term': 'Thời hạn (tháng)',
+}
+# Số kịch bản tối đa của một lưới (mỗi mảng kết quả 8 byte/kịch bản)
+MAX_SCENARIOS = 2_000_000
+
+
+# Hàm tạo dãy giá trị đều nhau của một chiều
+def axis_values(low, high, step):
+    """Các giá trị từ ``low`` đến ``high`` (kể cả hai đầu) cách nhau ``step``"""
+    if step <= 0:
+        raise ValueError("Bước của lưới phải lớn hơn 0")
+    values = low + np.arange(int(np.floor((high - low) / step + 1e-9)) + 1) * step
+    return np.unique(np.round(np.append(values, high), 6))
+
+
+# Hàm tính lưới kịch bản
+def stress_grid(financial_info, rate_shifts, income_shocks, expense_shocks, terms=None):
+    """Tính DSCR, DTI và số dư sau trả nợ cho mọi tổ hợp kịch bản
+
+    ``rate_shifts``: lãi suất tăng/giảm (điểm %), ``income_shocks``/``expense_shocks``: thay đổi thu nhập/chi phí
+    (%), ``terms``: thời hạn (tháng, mặc định thời hạn hiện tại). Trả về dict 'axes' ({chiều: giá trị}, lãi suất
+    là giá trị sau khi cộng) và các mảng 4 chiều 'dscr', 'dti', 'surplus', 'installment', 'passed' theo thứ tự
+    STRESS_AXES.
+    """
+    rate = float(financial_info.get('interest_rate', 0) or 0)
+    income = float(financial_info.get('monthly_income', 0) or 0)
+    expense = float(financial_info.get('monthly_expense', 0) or 0)
+    rates = np.maximum(rate + np.asarray(rate_shifts, dtype=float), 0)
+    income_shocks = np.asarray(income_shocks, dtype=float)
+    expense_shocks = np.asarray(expense_shocks, dtype=float)
+    terms = np.asarray([financial_info.get('loan_term', 0) or 0] if terms is None else terms, dtype=float)
+    method = financial_info.get('repayment_method', EQUAL_PRINCIPAL)
+    if method not in (EQUAL_PRINCIPAL, ANNUITY):
+        raise ValueError(f"Phương thức trả nợ không hợp lệ: {method}")
+    shape = (len(rates), len(income_shocks), len(expense_shocks), len(terms))
+    if np.prod(shape, dtype=float) > MAX_SCENARIOS:
+        raise ValueError(f"Lưới quá lớn ({format_number(math.prod(shape))} kịch bản, tối đa "
+                         f"{format_number(MAX_SCENARIOS)}): hãy tăng bước hoặc thu hẹp khoảng")
+
+    metrics = closed_form_metrics(
+        float(financial_info.get('loan_amount', 0) or 0),
+        rates[:, None, None, None],
+        terms[None, None, None, :],
+        income * (1 + income_shocks[None, :, None, None] / 100),
+        expense * (1 + expense_shocks[None, None, :, None] / 100),
+        method == ANNUITY,
+        float(financial_info.get('grace_months', 0) or 0),
+        float(financial_info.get('balloon_amount', 0) or 0),
+    )
+    grid = {name: np.broadcast_to(metrics[key], shape)
+            for name, key in (('dscr', 'dscr'), ('dti', 'debt_service_ratio'), ('surplus', 'surplus'),
+                              ('installment', 'installment'))}
+    grid['passed'] = (grid['dscr'] >= DSCR_MIN) & (grid['dti'] <= DTI_MAX)
+    grid['axes'] = {'rate': rates, 'income': income_shocks, 'expense': expense_shocks, 'term': terms}
+    return grid
+
+
+# Hàm cắt lưới thành bảng 2 chiều để vẽ bản đồ nhiệt
+def grid_slice(grid, name, x_axis, y_axis, fixed):
+    """Bảng (số giá trị ``y_axis`` × số giá trị ``x_axis``) của mảng ``grid[name]``; các chiều còn lại lấy
+    tại vị trí ``fixed`` ({chiều: chỉ số})"""
+    axes = list(STRESS_AXES)
+    if x_axis == y_axis:
+        raise ValueError("Hai trục của bản đồ nhiệt phải khác nhau")
+    index = tuple(slice(None) if axis in (x_axis, y_axis) else fixed[axis] for axis in axes)
+    values = grid[name][index]
+    # Sau khi cắt, hai chiều còn lại giữ thứ tự trong STRESS_AXES
+    return values if axes.index(y_axis) < axes.index(x_axis) else values.T
+
+
+# Hàm tính tỷ lệ kịch bản đạt ngưỡng
+def pass_share(grid, x_axis, y_axis):
+    """Tỷ lệ (%) kịch bản đạt cả ngưỡng DSCR và DTI tại mỗi ô (``y_axis`` × ``x_axis``), tính trên mọi giá trị
+    của hai chiều còn lại"""
+    axes = list(STRESS_AXES)
+    other = tuple(position for position, axis in enumerate(axes) if axis not in (x_axis, y_axis))
+    share = grid['passed'].mean(axis=other) * 100
+    return share if axes.index(y_axis) < axes.index(x_axis) else share.T
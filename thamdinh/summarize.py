@@ -0,0 +1,118 @@
+"""Chia tài liệu dài theo ngân sách token và tóm tắt song song (map-reduce) trước khi phân tích.
+
+Số token được ước lượng tại chỗ (không gọi API) theo hướng dư ra, đủ để quyết định
+có cần chia nhỏ hay không và để báo cáo lượng token mỗi lần phân tích.
+"""
+import math
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+# Ngân sách mặc định cho phần nội dung tài liệu trong prompt phân tích cuối cùng
+DEFAULT_TOKEN_BUDGET = 12000
+# Kích thước tối đa của mỗi phần gửi đi tóm tắt
+DEFAULT_SECTION_TOKENS = 4000
+# Số vòng tóm tắt tối đa (tóm tắt của tóm tắt) trước khi cắt bớt
+MAX_ROUNDS = 3
+
+# Ước lượng khoảng 3 ký tự tiếng Việt mỗi token
+CHARS_PER_TOKEN = 3
+
+SECTION_PROMPT = """
+Bạn là chuyên viên thẩm định tín dụng. Dưới đây là phần {index}/{count} của một phương án sử dụng vốn (PASDV).
+Hãy tóm tắt phần này bằng tiếng Việt, giữ nguyên mọi con số, số tiền, tỷ lệ, thời hạn, tên người,
+địa chỉ và thông tin tài sản bảo đảm. Bỏ qua nội dung lặp lại hoặc mang tính thủ tục.
+
+{section}
+"""
+
+_SENTENCE_END = re.compile(r'(?<=[.!?;])\s+')
+
+
+# Hàm ước lượng số token của văn bản
+def estimate_tokens(text):
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+def _split_long_paragraph(paragraph, max_tokens):
+    """Cắt đoạn quá dài theo câu, câu vẫn quá dài thì cắt theo số ký tự"""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    pieces = []
+    for sentence in _SENTENCE_END.split(paragraph):
+        while len(sentence) > max_chars:
+            pieces.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if sentence:
+            pieces.append(sentence)
+    return pieces
+
+
+# Hàm chia văn bản thành các phần theo ngân sách token
+def split_sections(text, max_tokens=DEFAULT_SECTION_TOKENS):
+    """Gom các đoạn liên tiếp thành phần không vượt ``max_tokens``; không cắt giữa đoạn nếu không cần"""
+    sections = []
+    current = []
+    current_tokens = 0
+    for paragraph in text.split('\n'):
+        if not paragraph.strip():
+            continue
+        pieces = [paragraph] if estimate_tokens(paragraph) <= max_tokens else _split_long_paragraph(paragraph, max_tokens)
+        for piece in pieces:
+            tokens = estimate_tokens(piece) + 1
+            if current and current_tokens + tokens > max_tokens:
+                sections.append('\n'.join(current))
+                current = []
+                current_tokens = 0
+            current.append(piece)
+            current_tokens += tokens
+    if current:
+        sections.append('\n'.join(current))
+    return sections
+
+
+# Hàm rút gọn tài liệu cho vừa ngân sách token
+def condense_document(text, summarize, token_budget=DEFAULT_TOKEN_BUDGET, section_tokens=DEFAULT_SECTION_TOKENS,
+                      max_workers=4):
+    """Trả về (nội dung gửi phân tích, báo cáo token)
+
+    Tài liệu vừa ngân sách được giữ nguyên. Nếu không, tài liệu được chia phần, mỗi phần được
+    ``summarize(prompt)`` tóm tắt song song, rồi ghép theo thứ tự; lặp lại nếu bản ghép vẫn dài.
+    """
+    report = {
+        'document_tokens': estimate_tokens(text),
+        'sections': 0,
+        'rounds': 0,
+        'map_prompt_tokens': 0,
+        'map_response_tokens': 0,
+        'truncated': False,
+    }
+    content = text
+    while estimate_tokens(content) > token_budget:
+        if report['rounds'] == MAX_ROUNDS:
+            # Tóm tắt không còn rút ngắn được thêm: cắt theo ngân sách để không vượt giới hạn
+            content = content[:token_budget * CHARS_PER_TOKEN]
+            report['truncated'] = True
+            break
+        sections = split_sections(content, min(section_tokens, token_budget))
+        prompts = [SECTION_PROMPT.format(index=index, count=len(sections), section=section)
+                   for index, section in enumerate(sections, 1)]
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(prompts)))) as executor:
+            summaries = list(executor.map(summarize, prompts))
+        report['rounds'] += 1
+        report['sections'] += len(sections)
+        report['map_prompt_tokens'] += sum(estimate_tokens(prompt) for prompt in prompts)
+        report['map_response_tokens'] += sum(estimate_tokens(summary) for summary in summaries)
+        content = '\n\n'.join(f"[Phần {index}/{len(sections)}]\n{summary.strip()}"
+                              for index, summary in enumerate(summaries, 1))
+    report['content_tokens'] = estimate_tokens(content)
+    return content, report
+
+
+# Hàm tổng hợp số token của một lần phân tích
+def analysis_token_report(prompt, response, condense_report=None):
+    """Cộng token của các bước tóm tắt (nếu có) với prompt và phản hồi phân tích cuối cùng"""
+    report = dict(condense_report or {})
+    report['prompt_tokens'] = estimate_tokens(prompt)
+    report['response_tokens'] = estimate_tokens(response)
+    report['total_tokens'] = (report['prompt_tokens'] + report['response_tokens']
+                              + report.get('map_prompt_tokens', 0) + report.get('map_response_tokens', 0))
+    return report
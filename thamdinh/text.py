@@ -0,0 +1,30 @@
+"""Chuẩn hóa văn bản tiếng Việt để so khớp và tìm kiếm không phân biệt dấu, hoa thường."""
+import re
+import unicodedata
+
+_WORD = re.compile(r'\w+')
+
+
+# Hàm bỏ dấu tiếng Việt
+def fold_vietnamese(text):
+    """Chữ thường, bỏ dấu thanh và dấu mũ, "đ" thành "d" (ví dụ "Đường Hà Huy Tập" -> "duong ha huy tap")"""
+    decomposed = unicodedata.normalize('NFD', text.lower())
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return stripped.replace('đ', 'd')
+
+
+# Hàm tách từ sau khi bỏ dấu
+def tokenize(text):
+    return _WORD.findall(fold_vietnamese(text))
+
+
+# Hàm chuẩn hóa số CCCD / số điện thoại để lưu và tra cứu
+def normalize_digits(value):
+    """Chỉ giữ chữ số ("042 080 001 234" -> "042080001234")"""
+    return re.sub(r'\D', '', str(value or ''))
+
+
+def normalize_phone(value):
+    """Chỉ giữ chữ số, đầu số quốc tế 84 thành 0 ("+84 912 345 678" -> "0912345678")"""
+    digits = normalize_digits(value)
+    return '0' + digits[2:] if digits.startswith('84') and len(digits) == 11 else digits
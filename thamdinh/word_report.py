@@ -0,0 +1,464 @@
+"""Báo cáo thẩm định Word dựng từ file mẫu .docx.
+
+Cú pháp trong file mẫu (soạn trực tiếp bằng Word):
+
+- ``{{customer.name}}``, ``{{metrics.dscr}}``...: thay bằng giá trị đã định dạng (xem ``report_context``);
+- hàng bảng có ``{{row.<cột>}}`` (cột của ``SCHEDULE_COLUMNS``) được lặp lại cho mỗi tháng của lịch trả nợ;
+- đoạn chỉ có ``{{#khóa}}`` ... đoạn chỉ có ``{{/khóa}}``: phần ở giữa chỉ giữ lại khi khóa có giá trị;
+- ảnh PNG có văn bản thay thế (alt text) ``{{chart.balance}}`` hoặc ``{{chart.payment}}``: thay bằng biểu đồ
+  lịch trả nợ vẽ theo đúng kích thước ảnh trong mẫu.
+
+Mẫu được biên dịch một lần thành các đoạn XML tĩnh xen kẽ chỗ giữ chỗ; mỗi báo cáo chỉ còn ghép chuỗi
+và nén lại thành file .docx.
+"""
+import io
+import re
+import struct
+import zipfile
+import zlib
+from datetime import datetime
+from functools import lru_cache
+from xml.sax.saxutils import escape
+
+from lxml import etree
+
+from thamdinh.amortization import REPAYMENT_METHODS, SCHEDULE_COLUMNS
+from thamdinh.formatting import format_number, format_numbers
+
+W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+WP_NS = 'http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing'
+A_NS = 'http://schemas.openxmlformats.org/drawingml/2006/main'
+R_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+XML_SPACE = '{http://www.w3.org/XML/1998/namespace}space'
+EMU_PER_INCH = 914400
+
+PLACEHOLDER = re.compile(r'\{\{\s*[#/]?\s*[\w.]+\s*\}\}')
+BLOCK_MARKER = re.compile(r'\{\{\s*([#/])\s*([\w.]+)\s*\}\}')
+CHART_SLOT = re.compile(r'\{\{\s*chart\.(\w+)\s*\}\}')
+# Chỗ giữ chỗ trong XML đã biên dịch: lệnh khối (processing instruction) hoặc biến
+TOKEN = re.compile(r'<\?tpl (\w+) ([^?]*)\?>|\{\{\s*([\w.]+)\s*\}\}')
+# Các phần của gói .docx có thể chứa chỗ giữ chỗ
+TEMPLATE_PARTS = re.compile(r'word/(document|header\d*|footer\d*)\.xml')
+
+# Biểu đồ có thể đặt trong mẫu: tên -> văn bản thay thế sau khi dựng
+CHART_TITLES = {
+    'balance': 'Biểu đồ dư nợ cuối kỳ',
+    'payment': 'Biểu đồ trả gốc và lãi hàng tháng',
+}
+CHART_DPI = 120
+
+# Các giá trị đưa vào mẫu: (nhóm trong mẫu, nhóm thông tin, khóa, kiểu)
+CONTEXT_FIELDS = [
+    ('customer', 'customer_info', 'name', 'text'),
+    ('customer', 'customer_info', 'cccd', 'text'),
+    ('customer', 'customer_info', 'address', 'text'),
+    ('customer', 'customer_info', 'phone', 'text'),
+    ('customer', 'customer_info', 'email', 'text'),
+    ('financial', 'financial_info', 'purpose', 'text'),
+    ('financial', 'financial_info', 'total_need', 'money'),
+    ('financial', 'financial_info', 'equity', 'money'),
+    ('financial', 'financial_info', 'loan_amount', 'money'),
+    ('financial', 'financial_info', 'interest_rate', 'number'),
+    ('financial', 'financial_info', 'loan_term', 'number'),
+    ('financial', 'financial_info', 'repayment_method', 'method'),
+    ('financial', 'financial_info', 'monthly_income', 'money'),
+    ('financial', 'financial_info', 'monthly_expense', 'money'),
+    ('collateral', 'collateral_info', 'type', 'text'),
+    ('collateral', 'collateral_info', 'value', 'money'),
+    ('collateral', 'collateral_info', 'address', 'text'),
+    ('collateral', 'collateral_info', 'area', 'optional'),
+    ('metrics', 'metrics', 'monthly_principal', 'money'),
+    ('metrics', 'metrics', 'first_month_interest', 'money'),
+    ('metrics', 'metrics', 'first_month_payment', 'money'),
+    ('metrics', 'metrics', 'installment', 'money'),
+    ('metrics', 'metrics', 'total_interest', 'money'),
+    ('metrics', 'metrics', 'total_payment', 'money'),
+    ('metrics', 'metrics', 'net_income', 'money'),
+    ('metrics', 'metrics', 'debt_service_ratio', 'decimal'),
+    ('metrics', 'metrics', 'surplus', 'money'),
+    ('metrics', 'metrics', 'dscr', 'decimal'),
+]
+
+
+def _format_value(value, kind):
+    """Định dạng như báo cáo cũ: thiếu chữ thì "N/A", thiếu số thì 0; kiểu optional thiếu thì để trống"""
+    if kind == 'text':
+        return str(value) if value not in (None, '') else 'N/A'
+    if kind == 'method':
+        return REPAYMENT_METHODS.get(value, REPAYMENT_METHODS[next(iter(REPAYMENT_METHODS))])
+    if kind == 'optional':
+        return format_number(value) if value else ''
+    if kind == 'number':
+        return f"{value or 0:g}" if isinstance(value, (int, float)) else str(value)
+    if kind == 'decimal':
+        return f"{value or 0:.2f}"
+    return format_number(value or 0)
+
+
+# Hàm dựng các giá trị thay vào mẫu
+def report_context(customer_info, financial_info, collateral_info, metrics, analysis_file='', analysis_metrics=''):
+    """Trả về dict ``{khóa trong mẫu: chuỗi}``, ví dụ ``'customer.name'``, ``'metrics.dscr'``"""
+    sources = {'customer_info': customer_info, 'financial_info': financial_info,
+               'collateral_info': collateral_info, 'metrics': metrics}
+    context = {f"{group}.{key}": _format_value(sources[section].get(key), kind)
+               for group, section, key, kind in CONTEXT_FIELDS}
+    context['analysis_file'] = analysis_file or ''
+    context['analysis_metrics'] = analysis_metrics or ''
+    context['report_date'] = datetime.now().strftime('%d/%m/%Y')
+    return context
+
+
+# Hàm dựng các hàng của bảng lịch trả nợ trong mẫu
+def schedule_row_context(schedule):
+    """Mỗi tháng một dict ``{'row.month': ..., 'row.principal': ...}`` đã định dạng"""
+    keys = [f"row.{key}" for key in SCHEDULE_COLUMNS]
+    columns = [schedule['month'].astype(str) if key == 'month' else format_numbers(schedule[key])
+               for key in SCHEDULE_COLUMNS]
+    return [dict(zip(keys, values)) for values in zip(*(column.tolist() for column in columns))]
+
+
+def _xml_text(value):
+    """Giá trị đặt trong w:t: thoát ký tự XML, xuống dòng thành ngắt dòng của Word"""
+    text = escape(value, {'"': '&quot;'})
+    if '\n' in text:
+        text = text.replace('\r\n', '\n').replace('\n', '</w:t><w:br/><w:t xml:space="preserve">')
+    return text
+
+
+def _merge_placeholder_runs(paragraph):
+    """Word hay tách một chỗ giữ chỗ qua nhiều run: dồn cả chỗ giữ chỗ về run chứa ký tự đầu tiên"""
+    nodes = list(paragraph.iter(f'{{{W_NS}}}t'))
+    full = ''.join(node.text or '' for node in nodes)
+    if '{{' not in full:
+        return
+    for match in PLACEHOLDER.finditer(full):
+        start, end = match.span()
+        bounds = []
+        offset = 0
+        for node in nodes:
+            bounds.append((offset, offset + len(node.text or '')))
+            offset = bounds[-1][1]
+        first = next(index for index, (left, right) in enumerate(bounds) if left <= start < right)
+        last = next(index for index, (left, right) in enumerate(bounds) if left < end <= right)
+        if first != last:
+            nodes[first].text = full[bounds[first][0]:end]
+            for node in nodes[first + 1:last]:
+                node.text = ''
+            nodes[last].text = full[end:bounds[last][1]]
+        nodes[first].set(XML_SPACE, 'preserve')
+
+
+def _paragraph_text(paragraph):
+    return ''.join(node.text or '' for node in paragraph.iter(f'{{{W_NS}}}t'))
+
+
+def _mark_blocks(root):
+    """Thay đoạn ``{{#khóa}}``/``{{/khóa}}`` bằng lệnh khối; hai đầu khối phải cùng một cấp"""
+    stack = []
+    for paragraph in list(root.iter(f'{{{W_NS}}}p')):
+        match = BLOCK_MARKER.fullmatch(_paragraph_text(paragraph).strip())
+        if not match:
+            continue
+        parent = paragraph.getparent()
+        key = match.group(2)
+        if match.group(1) == '#':
+            stack.append((key, parent))
+            instruction = etree.ProcessingInstruction('tpl', f'if {key}')
+        else:
+            if not stack or stack[-1] != (key, parent):
+                raise ValueError(f"Mẫu báo cáo: {{{{/{key}}}}} không khớp với {{{{#{key}}}}} cùng cấp")
+            stack.pop()
+            instruction = etree.ProcessingInstruction('tpl', f'end {key}')
+        instruction.tail = paragraph.tail
+        parent.replace(paragraph, instruction)
+    if stack:
+        raise ValueError(f"Mẫu báo cáo: thiếu {{{{/{stack[-1][0]}}}}}")
+
+
+def _mark_rows(root):
+    """Thay hàng bảng có ``{{row.*}}`` bằng lệnh lặp; trả về danh sách các hàng đã biên dịch"""
+    rows = []
+    for row in list(root.iter(f'{{{W_NS}}}tr')):
+        if '{{row.' not in ''.join(node.text or '' for node in row.iter(f'{{{W_NS}}}t')):
+            continue
+        rows.append(_tokenize(etree.tostring(row, encoding='unicode', with_tail=False)))
+        instruction = etree.ProcessingInstruction('tpl', f'rows {len(rows) - 1}')
+        instruction.tail = row.tail
+        row.getparent().replace(row, instruction)
+    return rows
+
+
+def _tokenize(xml, rows=()):
+    """Tách XML thành cây: chuỗi tĩnh, ('var', khóa), ('if', khóa, con), ('rows', con)"""
+    root = []
+    stack = [root]
+    position = 0
+    for match in TOKEN.finditer(xml):
+        if match.start() > position:
+            stack[-1].append(xml[position:match.start()])
+        position = match.end()
+        command, argument, key = match.groups()
+        if key:
+            stack[-1].append(('var', key))
+        elif command == 'if':
+            children = []
+            stack[-1].append(('if', argument, children))
+            stack.append(children)
+        elif command == 'end':
+            stack.pop()
+        else:
+            stack[-1].append(('rows', rows[int(argument)]))
+    if position < len(xml):
+        root.append(xml[position:])
+    return root
+
+
+def _render_nodes(nodes, values, rows, out):
+    for node in nodes:
+        if isinstance(node, str):
+            out.append(node)
+        elif node[0] == 'var':
+            # Khóa không có trong dữ liệu được giữ nguyên để người soạn mẫu dễ nhận ra
+            value = values.get(node[1], f"{{{{{node[1]}}}}}")
+            out.append(value if isinstance(value, str) else '')
+        elif node[0] == 'if':
+            if values.get(node[1]):
+                _render_nodes(node[2], values, rows, out)
+        else:
+            for row in rows:
+                _render_nodes(node[1], {**values, **row}, rows, out)
+
+
+def _relationships(data, part):
+    """{rId: đường dẫn trong gói} của một phần XML"""
+    folder, name = part.rsplit('/', 1)
+    rels = data.get(f"{folder}/_rels/{name}.rels")
+    if rels is None:
+        return {}
+    targets = {}
+    for relationship in etree.fromstring(rels):
+        target = relationship.get('Target', '')
+        if relationship.get('TargetMode') == 'External':
+            continue
+        targets[relationship.get('Id')] = target.lstrip('/') if target.startswith('/') else f"{folder}/{target}"
+    return targets
+
+
+def _chart_slots(root, relationships):
+    """Ảnh có alt text ``{{chart.<tên>}}``: {tên: (ảnh trong gói, rộng, cao (inch))}"""
+    slots = {}
+    for doc_pr in root.iter(f'{{{WP_NS}}}docPr'):
+        match = CHART_SLOT.fullmatch((doc_pr.get('descr') or '').strip())
+        if not match or match.group(1) not in CHART_TITLES:
+            continue
+        drawing = doc_pr.getparent()
+        extent = drawing.find(f'{{{WP_NS}}}extent')
+        blip = next(drawing.iter(f'{{{A_NS}}}blip'), None)
+        target = relationships.get(blip.get(f'{{{R_NS}}}embed')) if blip is not None else None
+        if extent is None or not target or not target.lower().endswith('.png'):
+            continue
+        doc_pr.set('descr', CHART_TITLES[match.group(1)])
+        slots[match.group(1)] = (target, int(extent.get('cx')) / EMU_PER_INCH, int(extent.get('cy')) / EMU_PER_INCH)
+    return slots
+
+
+class ReportTemplate:
+    """File mẫu .docx đã biên dịch: các phần XML có chỗ giữ chỗ và các ảnh biểu đồ cần thay"""
+
+    def __init__(self, data):
+        try:
+            with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                self.entries = [(info.filename, archive.read(info)) for info in archive.infolist()]
+        except zipfile.BadZipFile as e:
+            raise ValueError(f"File mẫu không phải .docx hợp lệ: {e}")
+        contents = dict(self.entries)
+        if 'word/document.xml' not in contents:
+            raise ValueError("File mẫu không phải .docx hợp lệ: thiếu word/document.xml")
+        self.parts = {}
+        self.charts = {}
+        for name, xml in self.entries:
+            if not TEMPLATE_PARTS.fullmatch(name):
+                continue
+            root = etree.fromstring(xml)
+            self.charts.update(_chart_slots(root, _relationships(contents, name)))
+            for paragraph in root.iter(f'{{{W_NS}}}p'):
+                _merge_placeholder_runs(paragraph)
+            _mark_blocks(root)
+            rows = _mark_rows(root)
+            self.parts[name] = _tokenize(
+                etree.tostring(root, xml_declaration=True, encoding='UTF-8', standalone=True).decode('utf-8'), rows)
+
+    def render(self, context, rows=(), charts=None):
+        """Báo cáo .docx (bytes); ``charts`` là {tên biểu đồ: PNG} thay cho ảnh trong mẫu"""
+        values = {key: value if isinstance(value, bool) else _xml_text(value) for key, value in context.items()}
+        rows = [{key: _xml_text(value) for key, value in row.items()} for row in rows]
+        images = {self.charts[name][0]: png for name, png in (charts or {}).items() if name in self.charts}
+        output = io.BytesIO()
+        with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for name, data in self.entries:
+                if name in self.parts:
+                    out = []
+                    _render_nodes(self.parts[name], values, rows, out)
+                    archive.writestr(name, ''.join(out).encode('utf-8'))
+                elif name in images:
+                    archive.writestr(name, images[name], zipfile.ZIP_STORED)
+                else:
+                    archive.writestr(name, data)
+        return output.getvalue()
+
+
+def _placeholder_png(shade):
+    """Ảnh PNG xám 1x1 điểm ảnh giữ chỗ cho biểu đồ (mỗi ảnh một màu để Word không gộp làm một)"""
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', 1, 1, 8, 0, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(bytes([0, shade]))) + chunk(b'IEND', b''))
+
+
+# Hàm dựng file mẫu báo cáo mặc định
+@lru_cache(maxsize=1)
+def default_template():
+    """File mẫu .docx mặc định (bytes): nội dung như báo cáo cũ, thêm bảng lịch trả nợ và biểu đồ"""
+    from docx import Document
+    from docx.oxml import OxmlElement
+    from docx.shared import Inches
+
+    doc = Document()
+
+    def field(label, key, unit=''):
+        doc.add_paragraph(f"{label}: {{{{{key}}}}}{unit}")
+
+    def block(key, *lines):
+        doc.add_paragraph(f"{{{{#{key}}}}}")
+        for line in lines:
+            line()
+        doc.add_paragraph(f"{{{{/{key}}}}}")
+
+    title = doc.add_heading('BÁO CÁO THẨM ĐỊNH PHƯƠNG ÁN VAY VỐN', 0)
+    title.alignment = 1
+    date = doc.add_paragraph('Ngày lập: {{report_date}}')
+    date.alignment = 2
+
+    doc.add_heading('I. THÔNG TIN KHÁCH HÀNG', 1)
+    field('Họ và tên', 'customer.name')
+    field('CCCD', 'customer.cccd')
+    field('Địa chỉ', 'customer.address')
+    field('Số điện thoại', 'customer.phone')
+    field('Email', 'customer.email')
+
+    doc.add_heading('II. THÔNG TIN TÀI CHÍNH', 1)
+    field('Mục đích vay', 'financial.purpose')
+    field('Tổng nhu cầu vốn', 'financial.total_need', ' đồng')
+    field('Vốn đối ứng', 'financial.equity', ' đồng')
+    field('Số tiền vay', 'financial.loan_amount', ' đồng')
+    field('Lãi suất', 'financial.interest_rate', '%/năm')
+    field('Thời hạn vay', 'financial.loan_term', ' tháng')
+    field('Phương thức trả nợ', 'financial.repayment_method')
+    field('Thu nhập hàng tháng', 'financial.monthly_income', ' đồng')
+    field('Chi phí hàng tháng', 'financial.monthly_expense', ' đồng')
+
+    doc.add_heading('III. TÀI SẢN ĐẢM BẢO', 1)
+    field('Loại tài sản', 'collateral.type')
+    field('Giá trị', 'collateral.value', ' đồng')
+    field('Địa chỉ', 'collateral.address')
+    block('collateral.area', lambda: field('Diện tích', 'collateral.area', ' m²'))
+
+    doc.add_heading('IV. CÁC CHỈ TIÊU TÀI CHÍNH', 1)
+    field('Trả nợ gốc hàng tháng', 'metrics.monthly_principal', ' đồng')
+    field('Trả lãi tháng đầu', 'metrics.first_month_interest', ' đồng')
+    field('Tổng trả tháng đầu', 'metrics.first_month_payment', ' đồng')
+    field('Tổng lãi phải trả', 'metrics.total_interest', ' đồng')
+    field('Thu nhập ròng', 'metrics.net_income', ' đồng')
+    field('Tỷ lệ trả nợ/thu nhập', 'metrics.debt_service_ratio', '%')
+    field('Số dư sau trả nợ', 'metrics.surplus', ' đồng')
+    field('DSCR', 'metrics.dscr')
+
+    def schedule_table():
+        doc.add_heading('V. KẾ HOẠCH TRẢ NỢ', 1)
+        table = doc.add_table(rows=2, cols=len(SCHEDULE_COLUMNS))
+        table.style = 'Table Grid'
+        for column, (key, label) in enumerate(SCHEDULE_COLUMNS.items()):
+            table.cell(0, column).text = label
+            table.cell(0, column).paragraphs[0].runs[0].bold = True
+            table.cell(1, column).text = f"{{{{row.{key}}}}}"
+            table.cell(1, column).paragraphs[0].alignment = 2
+        # Lặp lại hàng tiêu đề khi bảng sang trang
+        table.rows[0]._tr.get_or_add_trPr().append(OxmlElement('w:tblHeader'))
+
+    def charts():
+        for shade, name in enumerate(CHART_TITLES, start=1):
+            picture = doc.add_picture(io.BytesIO(_placeholder_png(shade * 64)), width=Inches(6.2), height=Inches(2.6))
+            picture._inline.docPr.set('descr', f"{{{{chart.{name}}}}}")
+
+    block('schedule', schedule_table, lambda: block('charts', charts))
+
+    block('analysis_file', lambda: doc.add_heading('VI. PHÂN TÍCH TỪ FILE UPLOAD', 1),
+          lambda: doc.add_paragraph('{{analysis_file}}'))
+    block('analysis_metrics', lambda: doc.add_heading('VII. PHÂN TÍCH TỪ CÁC CHỈ SỐ', 1),
+          lambda: doc.add_paragraph('{{analysis_metrics}}'))
+
+    output = io.BytesIO()
+    doc.save(output)
+    return output.getvalue()
+
+
+# Hàm biên dịch mẫu (dùng lại trong cùng tiến trình)
+@lru_cache(maxsize=4)
+def load_template(data=None):
+    """``data`` là bytes của file mẫu .docx; không truyền thì dùng mẫu mặc định"""
+    return ReportTemplate(data if data is not None else default_template())
+
+
+# Hàm vẽ biểu đồ lịch trả nợ cho báo cáo
+def schedule_chart_png(schedule, name, width, height, dpi=CHART_DPI):
+    """Biểu đồ 'balance' (dư nợ cuối kỳ) hoặc 'payment' (gốc và lãi từng tháng), ảnh PNG kích thước
+    ``width`` x ``height`` inch"""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    from matplotlib.ticker import FuncFormatter
+
+    figure = Figure(figsize=(width, height), dpi=dpi)
+    FigureCanvasAgg(figure)
+    # Lề cố định (tính lề tự động tốn gần nửa thời gian vẽ)
+    axes = figure.add_axes((0.7 / width, 0.45 / height, 1 - 0.85 / width, 1 - 0.75 / height))
+    months = schedule['month']
+    if name == 'balance':
+        balance = schedule['closing_balance'] / 1e6
+        axes.fill_between(months, balance, color='#667eea', alpha=0.25)
+        axes.plot(months, balance, color='#667eea', linewidth=1.5)
+        axes.set_title('Dư nợ cuối kỳ (triệu đồng)', fontsize=10)
+    elif name == 'payment':
+        axes.stackplot(months, schedule['principal'] / 1e6, schedule['interest'] / 1e6,
+                       labels=['Trả gốc', 'Trả lãi'], colors=['#667eea', '#f5576c'], alpha=0.8)
+        axes.legend(loc='upper right', fontsize=8)
+        axes.set_title('Trả nợ hàng tháng (triệu đồng)', fontsize=10)
+    else:
+        raise ValueError(f"Biểu đồ không hợp lệ: {name}")
+    axes.set_xlabel('Tháng', fontsize=9)
+    axes.set_xlim(months[0], months[-1])
+    axes.set_ylim(bottom=0)
+    axes.yaxis.set_major_formatter(FuncFormatter(
+        lambda value, _: format_number(value) if value == int(value) else f"{value:.1f}".replace('.', ',')))
+    axes.tick_params(labelsize=8)
+    axes.grid(alpha=0.3)
+    output = io.BytesIO()
+    figure.savefig(output, format='png')
+    return output.getvalue()
+
+
+# Hàm dựng báo cáo thẩm định một hồ sơ từ mẫu đã biên dịch
+def render_report(template, customer_info, financial_info, collateral_info, metrics,
+                  analysis_file='', analysis_metrics='', charts=True):
+    """Trả về bytes .docx; ``charts=False`` bỏ phần biểu đồ (nhanh hơn khi tạo hàng loạt)"""
+    context = report_context(customer_info, financial_info, collateral_info, metrics,
+                             analysis_file, analysis_metrics)
+    schedule = metrics.get('schedule')
+    rows = schedule_row_context(schedule) if schedule is not None else []
+    images = {}
+    if charts and schedule is not None:
+        images = {name: schedule_chart_png(schedule, name, width, height)
+                  for name, (_, width, height) in template.charts.items()}
+    context['schedule'] = bool(rows)
+    context['charts'] = bool(images)
+    return template.render(context, rows, images)